@@ -0,0 +1,226 @@
+"""Synthetic models for the benchmarks
+
+Parametrised flexible wings generated with :mod:`sharpy.utils.generate_cases`, together with the solver settings of
+each of the benchmarked pipelines.
+"""
+import os
+
+import numpy as np
+
+import sharpy.utils.generate_cases as gc
+
+
+class SyntheticWing(object):
+    """
+    Straight, uniform, flexible wing clamped at the root
+
+    The wing can be split in ``num_bodies`` segments of ``num_elem`` elements each, which are connected by hinges
+    along the chordwise direction and solved with the multibody structural solvers.
+
+    Args:
+        route (str): Folder where the case files are written.
+        case_name (str): Case name.
+        num_chord_panels (int): Number of chordwise panels.
+        num_elem (int): Number of beam elements of each body.
+        wake_length (float): Length of the wake in chords.
+        num_bodies (int): Number of bodies.
+        n_tsteps (int): Number of time steps of the dynamic simulations.
+    """
+
+    span = 16.
+    chord = 1.
+    elastic_axis = 0.5
+    u_inf = 10.
+    rho = 1.225
+    alpha_deg = 2.
+
+    mass_per_unit_length = 0.75
+    mass_iner = 1e-1
+    EA = 1e7
+    GA = 1e7
+    GJ = 1e4
+    EI = 2e4
+
+    def __init__(self, route, case_name, num_chord_panels=4, num_elem=8, wake_length=10., num_bodies=1, n_tsteps=10):
+        self.route = route
+        self.case_name = case_name
+        self.num_chord_panels = num_chord_panels
+        self.num_elem = num_elem
+        self.wake_length = wake_length
+        self.num_bodies = num_bodies
+        self.n_tsteps = n_tsteps
+
+        self.sim_info = None
+
+    @property
+    def dt(self):
+        return self.chord / self.num_chord_panels / self.u_inf
+
+    @property
+    def mstar(self):
+        return int(self.wake_length * self.num_chord_panels)
+
+    @property
+    def num_node_body(self):
+        return 2 * self.num_elem + 1
+
+    @property
+    def output_folder(self):
+        return self.route + '/output/'
+
+    def generate_aeroelastic_information(self):
+        """
+        Returns the ``AeroelasticInformation`` of the wing with all the bodies assembled
+        """
+        deg2rad = np.pi / 180.
+        airfoil = np.zeros((1, 20, 2), )
+        airfoil[0, :, 0] = np.linspace(0., 1., 20)
+
+        body_span = self.span / self.num_bodies
+        bodies = []
+        for i_body in range(self.num_bodies):
+            node_pos = np.zeros((self.num_node_body, 3), )
+            node_pos[:, 1] = np.linspace(i_body * body_span, (i_body + 1) * body_span, self.num_node_body)
+
+            body = gc.AeroelasticInformation()
+            body.StructuralInformation.generate_uniform_sym_beam(node_pos,
+                                                                 self.mass_per_unit_length,
+                                                                 self.mass_iner,
+                                                                 self.EA,
+                                                                 self.GA,
+                                                                 self.GJ,
+                                                                 self.EI,
+                                                                 num_node_elem=3,
+                                                                 y_BFoR='x_AFoR',
+                                                                 num_lumped_mass=0)
+            body.StructuralInformation.boundary_conditions[0] = 1
+            body.StructuralInformation.boundary_conditions[-1] = -1
+            body.AerodynamicInformation.create_one_uniform_aerodynamics(body.StructuralInformation,
+                                                                        chord=self.chord,
+                                                                        twist=self.alpha_deg * deg2rad,
+                                                                        sweep=0.,
+                                                                        num_chord_panels=self.num_chord_panels,
+                                                                        m_distribution='uniform',
+                                                                        elastic_axis=self.elastic_axis,
+                                                                        num_points_camber=20,
+                                                                        airfoil=airfoil)
+            bodies.append(body)
+
+        wing = bodies[0]
+        if self.num_bodies > 1:
+            wing.assembly(*bodies[1:])
+        return wing
+
+    def generate_multibody_information(self):
+        """
+        Returns the Lagrange constraints and bodies of the multibody wing
+        """
+        body_span = self.span / self.num_bodies
+
+        root = gc.LagrangeConstraint()
+        root.behaviour = 'constant_vel_FoR'
+        root.FoR_body = 0
+        root.vel = np.zeros((6,))
+        constraints = [root]
+
+        bodies = []
+        for i_body in range(self.num_bodies):
+            if i_body > 0:
+                hinge = gc.LagrangeConstraint()
+                hinge.behaviour = 'hinge_node_FoR'
+                hinge.node_in_body = self.num_node_body - 1
+                hinge.body = i_body - 1
+                hinge.body_FoR = i_body
+                hinge.rot_axisB = np.array([0., 1., 0.])
+                constraints.append(hinge)
+
+            body = gc.BodyInformation()
+            body.body_number = i_body
+            body.FoR_position = np.array([0., i_body * body_span, 0., 0., 0., 0.])
+            body.FoR_velocity = np.zeros((6,), )
+            body.FoR_acceleration = np.zeros((6,), )
+            body.FoR_movement = 'free'
+            body.quat = np.array([1., 0., 0., 0.])
+            bodies.append(body)
+
+        return constraints, bodies
+
+    def generate_simulation_information(self, flow):
+        """
+        Returns the ``SimulationInformation`` with the settings shared by all the pipelines
+        """
+        sim_info = gc.SimulationInformation()
+        sim_info.set_default_values()
+
+        sim_info.define_uinf(np.array([1., 0., 0.]), self.u_inf)
+
+        sim_info.solvers['SHARPy']['flow'] = flow
+        sim_info.solvers['SHARPy']['case'] = self.case_name
+        sim_info.solvers['SHARPy']['route'] = self.route
+        sim_info.solvers['SHARPy']['write_screen'] = 'off'
+        sim_info.solvers['SHARPy']['log_folder'] = self.output_folder
+        sim_info.solvers['SHARPy']['profiling'] = 'on'
+
+        sim_info.set_variable_all_dicts('dt', self.dt)
+        sim_info.set_variable_all_dicts('rho', self.rho)
+        sim_info.set_variable_all_dicts('velocity_field_input', sim_info.solvers['SteadyVelocityField'])
+        sim_info.set_variable_all_dicts('folder', self.output_folder)
+        sim_info.set_variable_all_dicts('print_info', 'off')
+        sim_info.define_num_steps(self.n_tsteps)
+
+        sim_info.solvers['AerogridLoader']['mstar'] = self.mstar
+
+        sim_info.solvers['StaticCoupled']['structural_solver'] = 'NonLinearStatic'
+        sim_info.solvers['StaticCoupled']['structural_solver_settings'] = sim_info.solvers['NonLinearStatic']
+        sim_info.solvers['StaticCoupled']['aero_solver'] = 'StaticUvlm'
+        sim_info.solvers['StaticCoupled']['aero_solver_settings'] = sim_info.solvers['StaticUvlm']
+
+        sim_info.solvers['NonLinearStatic']['gravity_on'] = 'on'
+        sim_info.solvers['NonLinearDynamicPrescribedStep']['gravity_on'] = 'on'
+        sim_info.solvers['NonLinearDynamicMultibody']['gravity_on'] = 'on'
+
+        if self.num_bodies > 1:
+            structural_solver = 'NonLinearDynamicMultibody'
+        else:
+            structural_solver = 'NonLinearDynamicPrescribedStep'
+        sim_info.solvers['DynamicCoupled']['structural_solver'] = structural_solver
+        sim_info.solvers['DynamicCoupled']['structural_solver_settings'] = sim_info.solvers[structural_solver]
+        sim_info.solvers['DynamicCoupled']['aero_solver'] = 'StepUvlm'
+        sim_info.solvers['DynamicCoupled']['aero_solver_settings'] = sim_info.solvers['StepUvlm']
+        sim_info.solvers['DynamicCoupled']['postprocessors'] = []
+        sim_info.solvers['DynamicCoupled']['postprocessors_settings'] = dict()
+
+        sim_info.with_forced_vel = False
+        sim_info.with_dynamic_forces = False
+        return sim_info
+
+    def generate(self, flow, sim_info_callback=None):
+        """
+        Writes the case files
+
+        Args:
+            flow (list(str)): Solvers to run.
+            sim_info_callback (callable): Function modifying the ``SimulationInformation`` of the case before the
+                solver file is written.
+
+        Returns:
+            str: Path to the ``.solver.txt`` file.
+        """
+        os.makedirs(self.route, exist_ok=True)
+
+        self.sim_info = self.generate_simulation_information(flow)
+        if 'DynamicCoupled' in flow:
+            self.sim_info.solvers['BeamLoader']['unsteady'] = 'on'
+            self.sim_info.solvers['AerogridLoader']['unsteady'] = 'on'
+        if sim_info_callback is not None:
+            sim_info_callback(self, self.sim_info)
+
+        gc.clean_test_files(self.route, self.case_name)
+        self.sim_info.generate_solver_file()
+        self.sim_info.generate_dyn_file(self.n_tsteps)
+        self.generate_aeroelastic_information().generate_h5_files(self.route, self.case_name)
+        if self.num_bodies > 1:
+            constraints, bodies = self.generate_multibody_information()
+            gc.generate_multibody_file(constraints, bodies, self.route, self.case_name)
+
+        return self.route + '/' + self.case_name + '.solver.txt'
@@ -0,0 +1,368 @@
+"""SHARPy benchmark suite
+
+Times the core pipelines of SHARPy on the parametrised synthetic wings of :mod:`benchmarks.models` and appends the
+results to a machine-readable history, such that performance regressions can be detected and the scaling with the
+model size measured.
+
+The case files of each benchmark are generated in the calling process and SHARPy is then run on them in a separate
+process, with the profiler enabled (see :mod:`sharpy.utils.profiling`), which reports:
+
+    * ``wall_time``: Wall time of the SHARPy run. The minimum of the repetitions is kept.
+
+    * ``peak_memory_mb``: Peak resident memory of the SHARPy process, which does not include the generation of the
+      case files.
+
+    * ``spans``: Total time of the solvers and of their direct children, e.g. ``DynamicCoupled.run/StepUvlm.run``.
+
+Each line of the history file is the JSON record of a benchmark, which also includes the git revision, date and
+host. The results are compared against the last record of the same benchmark in the history and those slower than
+the given tolerance are reported as regressions.
+
+Examples:
+
+    Run the quick suite and append the results to ``benchmarks/history.jsonl``::
+
+        python -m benchmarks.run_benchmarks --suite quick
+
+    Run the scaling benchmarks of the dynamic simulations and return an error code if any of them is more than 20%
+    slower than the last recorded run::
+
+        python -m benchmarks.run_benchmarks --suite scaling --filter dynamic_coupled --tolerance 0.2 --fail
+
+"""
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+benchmarks_dir = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+
+
+# Pipelines: functions returning the solver flow and a function modifying the settings of the case
+def static_coupled(wing):
+    return ['BeamLoader', 'AerogridLoader', 'StaticCoupled'], None
+
+
+def dynamic_coupled(wing):
+    if wing.num_bodies > 1:
+        return ['BeamLoader', 'AerogridLoader', 'DynamicCoupled'], None
+    return ['BeamLoader', 'AerogridLoader', 'StaticCoupled', 'DynamicCoupled'], None
+
+
+def output_writing(wing):
+    def add_postprocessors(wing, sim_info):
+        sim_info.solvers['WriteVariablesTime']['structure_nodes'] = np.array([wing.num_node_body - 1], dtype=int)
+        sim_info.solvers['WriteVariablesTime']['structure_variables'] = ['pos', 'psi']
+        sim_info.solvers['DynamicCoupled']['postprocessors'] = ['BeamPlot', 'AerogridPlot', 'WriteVariablesTime']
+        sim_info.solvers['DynamicCoupled']['postprocessors_settings'] = {
+            'BeamPlot': sim_info.solvers['BeamPlot'],
+            'AerogridPlot': sim_info.solvers['AerogridPlot'],
+            'WriteVariablesTime': sim_info.solvers['WriteVariablesTime']}
+
+    flow = dynamic_coupled(wing)[0]
+    return flow, add_postprocessors
+
+
+def linear_uvlm(wing, rom_method=None):
+    def set_linear_settings(wing, sim_info):
+        sim_info.solvers['Modal']['NumLambda'] = 20
+        sim_info.solvers['Modal']['rigid_body_modes'] = 'off'
+        sim_info.solvers['Modal']['write_dat'] = 'off'
+        sim_info.solvers['Modal']['write_modes_vtk'] = 'off'
+        sim_info.solvers['Modal']['use_undamped_modes'] = 'on'
+
+        if rom_method is None:
+            rom_methods = []
+            rom_settings = dict()
+        else:
+            rom_methods = [rom_method]
+            rom_settings = {'Krylov': {'algorithm': 'mimo_rational_arnoldi',
+                                       'r': 6,
+                                       'frequency': np.array([0.]),
+                                       'print_info': 'off'}}
+
+        sim_info.solvers['LinearAssembler']['linear_system'] = 'LinearAeroelastic'
+        sim_info.solvers['LinearAssembler']['linear_system_settings'] = {
+            'beam_settings': {'modal_projection': 'on',
+                              'inout_coords': 'modes',
+                              'discrete_time': 'on',
+                              'newmark_damp': 0.5e-4,
+                              'discr_method': 'newmark',
+                              'dt': wing.dt,
+                              'proj_modes': 'undamped',
+                              'use_euler': 'off',
+                              'num_modes': 8,
+                              'print_info': 'off',
+                              'gravity': 'on',
+                              'remove_dofs': []},
+            'aero_settings': {'dt': wing.dt,
+                              'ScalingDict': {'length': 0.5 * wing.chord,
+                                              'speed': wing.u_inf,
+                                              'density': wing.rho},
+                              'integr_order': 2,
+                              'density': wing.rho,
+                              'remove_predictor': 'off',
+                              'use_sparse': 'on',
+                              'rigid_body_motion': 'off',
+                              'use_euler': 'off',
+                              'remove_inputs': ['u_gust'],
+                              'rom_method': rom_methods,
+                              'rom_method_settings': rom_settings},
+            'rigid_body_motion': 'off'}
+
+        sim_info.solvers['FrequencyResponse']['compute_fom'] = 'on'
+        sim_info.solvers['FrequencyResponse']['quick_plot'] = 'off'
+        sim_info.solvers['FrequencyResponse']['frequency_unit'] = 'k'
+        sim_info.solvers['FrequencyResponse']['frequency_bounds'] = [1e-3, 1.]
+
+    return ['BeamLoader', 'AerogridLoader', 'StaticCoupled', 'Modal', 'LinearAssembler'], set_linear_settings
+
+
+def rom_reduction(wing):
+    return linear_uvlm(wing, rom_method='Krylov')
+
+
+def frequency_response(wing):
+    flow, set_linear_settings = linear_uvlm(wing)
+    return flow + ['FrequencyResponse'], set_linear_settings
+
+
+pipelines = {'static_coupled': static_coupled,
+             'dynamic_coupled': dynamic_coupled,
+             'output_writing': output_writing,
+             'linear_uvlm': linear_uvlm,
+             'rom_reduction': rom_reduction,
+             'frequency_response': frequency_response}
+
+
+def parameter_grid(pipeline, **kwargs):
+    """
+    Returns the benchmarks of ``pipeline`` for all the combinations of the parameter values given as lists
+    """
+    names = list(kwargs.keys())
+    return [(pipeline, dict(zip(names, values))) for values in itertools.product(*kwargs.values())]
+
+
+small_wing = {'num_chord_panels': 4, 'num_elem': 8, 'wake_length': 5., 'n_tsteps': 10}
+
+suites = {
+    'quick': [('static_coupled', small_wing),
+              ('dynamic_coupled', small_wing),
+              ('dynamic_coupled', dict(small_wing, num_bodies=2)),
+              ('output_writing', small_wing),
+              ('linear_uvlm', small_wing),
+              ('rom_reduction', small_wing),
+              ('frequency_response', small_wing)],
+    'scaling': (parameter_grid('static_coupled', num_chord_panels=[4, 8, 16], num_elem=[8, 16, 32])
+                + parameter_grid('dynamic_coupled', num_chord_panels=[4, 8], num_elem=[8, 16],
+                                 wake_length=[5., 10., 20.], n_tsteps=[20])
+                + parameter_grid('dynamic_coupled', num_bodies=[1, 2, 4], num_elem=[4], n_tsteps=[20])
+                + parameter_grid('output_writing', num_chord_panels=[4, 8, 16], num_elem=[16], n_tsteps=[20])
+                + parameter_grid('linear_uvlm', num_chord_panels=[4, 8, 16], num_elem=[8, 16], wake_length=[10.])
+                + parameter_grid('rom_reduction', num_chord_panels=[4, 8, 16], num_elem=[16], wake_length=[10.])
+                + parameter_grid('frequency_response', num_chord_panels=[4, 8], num_elem=[16], wake_length=[10.])),
+}
+
+
+def benchmark_name(pipeline, params):
+    return pipeline + '[' + ','.join('%s=%s' % (k, params[k]) for k in sorted(params.keys())) + ']'
+
+
+def generate_case(pipeline, params, work_dir):
+    """
+    Generates the case files of a benchmark and returns the path of its solver file
+
+    Args:
+        pipeline (str): Name of the pipeline.
+        params (dict): Parameters of the :class:`benchmarks.models.SyntheticWing`.
+        work_dir (str): Folder where the case files and output are written.
+
+    Returns:
+        str: Path of the solver file.
+    """
+    import benchmarks.models as models
+
+    wing = models.SyntheticWing(work_dir, pipeline, **params)
+    flow, sim_info_callback = pipelines[pipeline](wing)
+    return wing.generate(flow, sim_info_callback)
+
+
+def run_case(solver_file):
+    """
+    Runs SHARPy on a generated case in the current process and returns the results of the benchmark
+
+    Args:
+        solver_file (str): Path of the solver file of the case.
+
+    Returns:
+        dict: ``wall_time``, ``peak_memory_mb`` and ``spans``.
+    """
+    import sharpy.sharpy_main
+    import sharpy.utils.profiling as profiling
+
+    t0 = time.perf_counter()
+    sharpy.sharpy_main.main(['', solver_file])
+    wall_time = time.perf_counter() - t0
+
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is given in bytes in macOS and in kilobytes in Linux
+    peak_memory /= 1024 ** 2 if sys.platform == 'darwin' else 1024
+
+    spans = {entry['path']: entry['total'] for entry in profiling.profiler.summary() if entry['path'].count('/') < 2}
+
+    return {'wall_time': wall_time,
+            'peak_memory_mb': peak_memory,
+            'spans': spans}
+
+
+def run_benchmark(pipeline, params, repeat=1, keep_files=False):
+    """
+    Runs a benchmark ``repeat`` times, each of them in a new process, and returns its record for the history
+    """
+    runs = []
+    for i_repeat in range(repeat):
+        work_dir = tempfile.mkdtemp(prefix='sharpy_benchmark_')
+        result_file = work_dir + '/result.json'
+        try:
+            solver_file = generate_case(pipeline, params, work_dir)
+            subprocess.run([sys.executable, '-m', 'benchmarks.run_benchmarks',
+                            '--worker', solver_file, result_file],
+                           cwd=os.path.dirname(benchmarks_dir),
+                           check=True,
+                           stdout=subprocess.DEVNULL)
+            with open(result_file, 'r') as infile:
+                runs.append(json.load(infile))
+        finally:
+            if not keep_files:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    fastest = min(runs, key=lambda run: run['wall_time'])
+    return {'benchmark': benchmark_name(pipeline, params),
+            'pipeline': pipeline,
+            'params': params,
+            'wall_time': fastest['wall_time'],
+            'wall_times': [run['wall_time'] for run in runs],
+            'peak_memory_mb': max([run['peak_memory_mb'] for run in runs]),
+            'spans': fastest['spans']}
+
+
+def environment_info():
+    try:
+        revision = subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                                           cwd=benchmarks_dir,
+                                           stderr=subprocess.DEVNULL).strip().decode('ascii')
+    except (subprocess.CalledProcessError, OSError):
+        revision = None
+
+    return {'revision': revision,
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'host': platform.node(),
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'numpy': np.__version__}
+
+
+def read_history(filename):
+    if not os.path.isfile(filename):
+        return []
+    with open(filename, 'r') as infile:
+        return [json.loads(line) for line in infile if line.strip()]
+
+
+def append_history(filename, records):
+    with open(filename, 'a') as outfile:
+        for record in records:
+            outfile.write(json.dumps(record) + '\n')
+
+
+def compare(history, records, tolerance=0.1):
+    """
+    Compares the wall time of the benchmarks with the last record of the same benchmark in the history
+
+    Args:
+        history (list(dict)): Previous records.
+        records (list(dict)): New records.
+        tolerance (float): Relative increase of the wall time above which a benchmark is a regression.
+
+    Returns:
+        list(str): Names of the benchmarks that regressed.
+    """
+    last_records = dict()
+    for record in history:
+        last_records[record['benchmark']] = record
+
+    regressions = []
+    print('%-90s %10s %10s %8s' % ('benchmark', 'time [s]', 'ref [s]', 'ratio'))
+    for record in records:
+        try:
+            reference = last_records[record['benchmark']]
+        except KeyError:
+            print('%-90s %10.3f %10s %8s' % (record['benchmark'], record['wall_time'], '-', '-'))
+            continue
+
+        ratio = record['wall_time'] / reference['wall_time']
+        flag = ''
+        if ratio > 1. + tolerance:
+            regressions.append(record['benchmark'])
+            flag = '  REGRESSION'
+        print('%-90s %10.3f %10.3f %8.3f%s' % (record['benchmark'], record['wall_time'], reference['wall_time'],
+                                               ratio, flag))
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='run_benchmarks', description='SHARPy benchmark suite')
+    parser.add_argument('--suite', default='quick', choices=list(suites.keys()), help='Suite of benchmarks to run')
+    parser.add_argument('--filter', default=None, help='Regular expression selecting the benchmarks by name')
+    parser.add_argument('--repeat', type=int, default=1, help='Number of repetitions of each benchmark')
+    parser.add_argument('--history', default=benchmarks_dir + '/history.jsonl', help='History file')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Relative increase of the wall time above which a benchmark is a regression')
+    parser.add_argument('--fail', action='store_true', help='Return an error code if any benchmark regressed')
+    parser.add_argument('--no-save', action='store_true', help='Do not append the results to the history')
+    parser.add_argument('--keep-files', action='store_true', help='Do not remove the case files and output')
+    parser.add_argument('--worker', nargs=2, metavar=('SOLVER_FILE', 'RESULT_FILE'), help=argparse.SUPPRESS)
+    args = parser.parse_args(args)
+
+    if args.worker is not None:
+        solver_file, result_file = args.worker
+        result = run_case(solver_file)
+        with open(result_file, 'w') as outfile:
+            json.dump(result, outfile)
+        return 0
+
+    benchmarks = suites[args.suite]
+    if args.filter is not None:
+        benchmarks = [(pipeline, params) for pipeline, params in benchmarks
+                      if re.search(args.filter, benchmark_name(pipeline, params))]
+
+    environment = environment_info()
+    records = []
+    for pipeline, params in benchmarks:
+        print('Running %s' % benchmark_name(pipeline, params), flush=True)
+        record = run_benchmark(pipeline, params, repeat=args.repeat, keep_files=args.keep_files)
+        record.update(environment)
+        records.append(record)
+
+    regressions = compare(read_history(args.history), records, args.tolerance)
+    if not args.no_save:
+        append_history(args.history, records)
+
+    if args.fail and regressions:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
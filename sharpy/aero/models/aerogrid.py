@@ -198,6 +198,10 @@ class Aerogrid(object):
         except KeyError:
             self.aero_dict['sweep'] = np.zeros_like(self.aero_dict['twist'])
 
+        # orientation of all the nodes of the beam
+        beam_cab = algebra.crv2rotation_vec(structure_tstep.psi)
+        cga = structure_tstep.cga()
+
         # one surface per element
         for i_elem in range(self.n_elem):
             i_surf = self.aero_dict['surface_distribution'][i_elem]
@@ -309,11 +313,12 @@ class Aerogrid(object):
                 node_info['beam_coord'] = structure_tstep.pos[i_global_node, :]
                 node_info['pos_dot'] = structure_tstep.pos_dot[i_global_node, :]
                 node_info['beam_psi'] = structure_tstep.psi[i_elem, i_local_node, :]
+                node_info['beam_Cab'] = beam_cab[i_elem, i_local_node, :, :]
                 node_info['psi_dot'] = structure_tstep.psi_dot[i_elem, i_local_node, :]
                 node_info['for_delta'] = beam.frame_of_reference_delta[i_elem, i_local_node, :]
                 node_info['elem'] = beam.elements[i_elem]
                 node_info['for_pos'] = structure_tstep.for_pos
-                node_info['cga'] = structure_tstep.cga()
+                node_info['cga'] = cga
                 if node_info['M_distribution'].lower() == 'user_defined':
                     ielem_in_surf = i_elem - np.sum(self.surface_distribution < i_surf)
                     node_info['user_defined_m_distribution'] = self.aero_dict['user_defined_m_distribution'][str(i_surf)][:, ielem_in_surf, i_local_node]
@@ -487,8 +492,7 @@ def generate_strip(node_info, airfoil_db, aligned_grid, orientation_in=np.array(
                                             strip_coordinates_b_frame[1, :])
 
     # elastic axis correction
-    for i_M in range(node_info['M'] + 1):
-        strip_coordinates_b_frame[1, i_M] -= node_info['eaxis']
+    strip_coordinates_b_frame[1, :] -= node_info['eaxis']
 
     # chord_line_b_frame = strip_coordinates_b_frame[:, -1] - strip_coordinates_b_frame[:, 0]
     cs_velocity = np.zeros_like(strip_coordinates_b_frame)
@@ -504,23 +508,23 @@ def generate_strip(node_info, airfoil_db, aligned_grid, orientation_in=np.array(
             else:
                 b_frame_hinge_coords =  node_info['control_surface']['hinge_coords']
 
-        for i_M in range(node_info['M'] - node_info['control_surface']['chord'], node_info['M'] + 1):
-            relative_coords = strip_coordinates_b_frame[:, i_M] - b_frame_hinge_coords
-            # rotate the control surface
-            relative_coords = np.dot(algebra.rotation3d_x(-node_info['control_surface']['deflection']),
-                                     relative_coords)
-            # deflection velocity
-            try:
-                cs_velocity[:, i_M] += np.cross(np.array([-node_info['control_surface']['deflection_dot'], 0.0, 0.0]),
-                                                relative_coords)
-            except KeyError:
-                pass
+        cs_points = slice(node_info['M'] - node_info['control_surface']['chord'], node_info['M'] + 1)
+        relative_coords = strip_coordinates_b_frame[:, cs_points] - b_frame_hinge_coords[:, None]
+        # rotate the control surface
+        relative_coords = np.dot(algebra.rotation3d_x(-node_info['control_surface']['deflection']),
+                                 relative_coords)
+        # deflection velocity
+        try:
+            cs_velocity[:, cs_points] += np.cross(np.array([-node_info['control_surface']['deflection_dot'], 0.0, 0.0]),
+                                                  relative_coords, axisb=0, axisc=0)
+        except KeyError:
+            pass
 
-            # restore coordinates
-            relative_coords += b_frame_hinge_coords
+        # restore coordinates
+        relative_coords += b_frame_hinge_coords[:, None]
 
-            # substitute with new coordinates
-            strip_coordinates_b_frame[:, i_M] = relative_coords
+        # substitute with new coordinates
+        strip_coordinates_b_frame[:, cs_points] = relative_coords
 
     # chord scaling
     strip_coordinates_b_frame *= node_info['chord']
@@ -532,7 +536,10 @@ def generate_strip(node_info, airfoil_db, aligned_grid, orientation_in=np.array(
         Ctwist = np.eye(3)
 
     # Cab transformation
-    Cab = algebra.crv2rotation(node_info['beam_psi'])
+    try:
+        Cab = node_info['beam_Cab']
+    except KeyError:
+        Cab = algebra.crv2rotation(node_info['beam_psi'])
 
     rot_angle = algebra.angle_between_vectors_sign(orientation_in, Cab[:, 1], Cab[:, 2])
     if np.sign(np.dot(orientation_in, Cab[:, 1])) >= 0:
@@ -546,31 +553,25 @@ def generate_strip(node_info, airfoil_db, aligned_grid, orientation_in=np.array(
         c_sweep = algebra.rotation3d_z(node_info['sweep'])
 
     # transformation from beam to beam prime (with sweep and twist)
-    for i_M in range(node_info['M'] + 1):
-        strip_coordinates_b_frame[:, i_M] = np.dot(c_sweep, np.dot(Crot,
-                                                   np.dot(Ctwist, strip_coordinates_b_frame[:, i_M])))
-        strip_coordinates_a_frame[:, i_M] = np.dot(Cab, strip_coordinates_b_frame[:, i_M])
+    strip_coordinates_b_frame = np.dot(c_sweep, np.dot(Crot, np.dot(Ctwist, strip_coordinates_b_frame)))
+    strip_coordinates_a_frame = np.dot(Cab, strip_coordinates_b_frame)
 
-        cs_velocity[:, i_M] = np.dot(Cab, cs_velocity[:, i_M])
+    cs_velocity = np.dot(Cab, cs_velocity)
 
     # zeta_dot
     if calculate_zeta_dot:
         # velocity due to pos_dot
-        for i_M in range(node_info['M'] + 1):
-            zeta_dot_a_frame[:, i_M] += node_info['pos_dot']
+        zeta_dot_a_frame += node_info['pos_dot'][:, None]
 
         # velocity due to psi_dot
         omega_a = algebra.crv_dot2omega(node_info['beam_psi'], node_info['psi_dot'])
-        for i_M in range(node_info['M'] + 1):
-            zeta_dot_a_frame[:, i_M] += (
-                np.dot(algebra.skew(omega_a), strip_coordinates_a_frame[:, i_M]))
+        zeta_dot_a_frame += np.dot(algebra.skew(omega_a), strip_coordinates_a_frame)
 
         # control surface deflection velocity contribution
         try:
             if node_info['control_surface'] is not None:
                 node_info['control_surface']['deflection_dot']
-                for i_M in range(node_info['M'] + 1):
-                    zeta_dot_a_frame[:, i_M] += cs_velocity[:, i_M]
+                zeta_dot_a_frame += cs_velocity
         except KeyError:
             pass
 
@@ -578,22 +579,17 @@ def generate_strip(node_info, airfoil_db, aligned_grid, orientation_in=np.array(
         zeta_dot_a_frame = np.zeros((3, node_info['M'] + 1), dtype=ct.c_double)
 
     # add node coords
-    for i_M in range(node_info['M'] + 1):
-        strip_coordinates_a_frame[:, i_M] += node_info['beam_coord']
+    strip_coordinates_a_frame += node_info['beam_coord'][:, None]
 
     # add quarter-chord disp
     delta_c = (strip_coordinates_a_frame[:, -1] - strip_coordinates_a_frame[:, 0])/node_info['M']
     if node_info['M_distribution'] == 'uniform':
-        for i_M in range(node_info['M'] + 1):
-                strip_coordinates_a_frame[:, i_M] += 0.25*delta_c
+        strip_coordinates_a_frame += 0.25*delta_c[:, None]
     else:
         warnings.warn("No quarter chord disp of grid for non-uniform grid distributions implemented", UserWarning)
 
     # rotation from a to g
-    for i_M in range(node_info['M'] + 1):
-        strip_coordinates_a_frame[:, i_M] = np.dot(node_info['cga'],
-                                                   strip_coordinates_a_frame[:, i_M])
-        zeta_dot_a_frame[:, i_M] = np.dot(node_info['cga'],
-                                          zeta_dot_a_frame[:, i_M])
+    strip_coordinates_a_frame = np.dot(node_info['cga'], strip_coordinates_a_frame)
+    zeta_dot_a_frame = np.dot(node_info['cga'], zeta_dot_a_frame)
 
     return strip_coordinates_a_frame, zeta_dot_a_frame
@@ -0,0 +1,85 @@
+"""Flow probes
+
+Evaluation of the velocity induced by the aerodynamic lattice at a fixed set of points.
+"""
+import ctypes as ct
+
+import numpy as np
+
+import sharpy.aero.utils.uvlmlib as uvlmlib
+
+
+class FlowProbe(object):
+    """
+    Induced velocity at a set of points
+
+    The coordinates of the points are stored once as a contiguous ``[n_points, 3]`` array, in the layout required by
+    the UVLM library, so that evaluating the induced velocity at different time steps does not require repacking
+    them.
+
+    If ``cutoff`` is non negative, only the points within the bounding box of the bound and wake lattices enlarged
+    by ``cutoff`` in all directions are sent to the UVLM library. The induced velocity at the rest of the points is
+    taken as zero.
+
+    Args:
+        points (np.ndarray): Point coordinates ``[n_points, 3]``.
+        num_cores (int): Number of cores used by the UVLM library.
+        cutoff (float): Distance to the bounding box of the lattice beyond which the induced velocity is neglected.
+            Negative values disable the bounding test.
+    """
+
+    def __init__(self, points, num_cores=1, cutoff=-1.):
+        self.points = np.ascontiguousarray(np.reshape(points, (-1, 3)), dtype=ct.c_double)
+        self.num_cores = num_cores
+        self.cutoff = cutoff
+
+    @property
+    def n_points(self):
+        return self.points.shape[0]
+
+    def active_points(self, aero_tstep, for_pos=np.zeros((3,))):
+        """
+        Returns a boolean mask of the points within the cutoff distance of the bounding box of the lattice
+        """
+        if self.cutoff < 0:
+            return np.ones((self.n_points,), dtype=bool)
+
+        bbox_min, bbox_max = lattice_bounding_box(aero_tstep)
+        bbox_min += for_pos[0:3] - self.cutoff
+        bbox_max += for_pos[0:3] + self.cutoff
+        return np.all((self.points >= bbox_min) & (self.points <= bbox_max), axis=1)
+
+    def induced_velocity(self, aero_tstep, for_pos=np.zeros((3,))):
+        """
+        Induced velocity at the points
+
+        Args:
+            aero_tstep (sharpy.utils.datastructures.AeroTimeStepInfo): Aerodynamic time step.
+            for_pos (np.ndarray): Position of the A frame of reference, added to the lattice coordinates.
+
+        Returns:
+            np.ndarray: Induced velocity ``[n_points, 3]``.
+        """
+        u_ind = np.zeros((self.n_points, 3))
+        active = self.active_points(aero_tstep, for_pos)
+        if np.all(active):
+            target_triads = self.points
+        elif np.any(active):
+            target_triads = np.ascontiguousarray(self.points[active, :])
+        else:
+            return u_ind
+
+        u_ind[active, :] = uvlmlib.uvlm_calculate_total_induced_velocity_at_points(aero_tstep,
+                                                                                   target_triads,
+                                                                                   for_pos,
+                                                                                   ct.c_uint(self.num_cores))
+        return u_ind
+
+
+def lattice_bounding_box(aero_tstep):
+    """
+    Returns the minimum and maximum coordinates of the bound and wake lattices of all the surfaces
+    """
+    coords = [zeta.reshape(3, -1) for zeta in aero_tstep.zeta + aero_tstep.zeta_star if zeta.size > 0]
+    coords = np.concatenate(coords, axis=1)
+    return np.min(coords, axis=1), np.max(coords, axis=1)
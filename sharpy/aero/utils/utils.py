@@ -1,3 +1,4 @@
+import ctypes as ct
 import numpy as np
 import sharpy.utils.algebra as algebra
 
@@ -18,3 +19,179 @@ def alpha_beta_to_direction(alpha, beta):
     beta_rot = algebra.rotation3d_z(beta)
     direction = np.dot(beta_rot, np.dot(alpha_rot, direction))
     return direction
+
+
+def resample_wake(aero_tstep, dt_ratio):
+    r"""
+    Rediscretises the wake of ``aero_tstep`` after a change of the time step.
+
+    A row of wake panels is shed every time step, so the row ``i`` of wake vertices was shed ``i`` time steps
+    ago. When the time step changes from :math:`\Delta t` to :math:`r\Delta t`, the vertices and circulation of the
+    wake are interpolated (linearly in the time since they were shed) so that the row ``i`` of the new wake
+    corresponds to :math:`ir\Delta t`. The number of wake panels is kept, hence the length of the wake scales with
+    :math:`r`. The wake vertices beyond the current end of the wake are extrapolated from the last row of panels, which
+    also gives them its circulation.
+
+    The wake arrays are modified in place.
+
+    Args:
+        aero_tstep (sharpy.utils.datastructures.AeroTimeStepInfo): Aerodynamic time step information
+        dt_ratio (float): Ratio :math:`r` between the new and the old time steps
+    """
+    for i_surf in range(aero_tstep.n_surf):
+        m_star = aero_tstep.dimensions_star[i_surf, 0]
+        if m_star == 0:
+            continue
+
+        # vertices: linear interpolation between rows i0 and i0 + 1 (extrapolation past the last row)
+        age = dt_ratio*np.arange(m_star + 1)
+        i0 = np.minimum(np.floor(age).astype(int), m_star - 1)
+        weight = (age - i0)[None, :, None]
+        zeta_star = aero_tstep.zeta_star[i_surf]
+        zeta_star[:] = (1. - weight)*zeta_star[:, i0, :] + weight*zeta_star[:, i0 + 1, :]
+
+        # circulation at the centre of the panels
+        centre = np.arange(m_star) + 0.5
+        gamma_star = aero_tstep.gamma_star[i_surf]
+        for i_n in range(gamma_star.shape[1]):
+            gamma_star[:, i_n] = np.interp(dt_ratio*centre, centre, gamma_star[:, i_n])
+
+
+def wake_vertex_distance(zeta_star):
+    """
+    Distance along the wake from the trailing edge to each row of wake vertices, averaged in the spanwise direction.
+
+    Args:
+        zeta_star (np.ndarray): Wake vertices of a surface ``[3, m_star + 1, n + 1]``
+
+    Returns:
+        np.ndarray: Distance of the rows of vertices ``[m_star + 1]``
+    """
+    row_length = np.mean(np.linalg.norm(np.diff(zeta_star, axis=1), axis=0), axis=1)
+    return np.concatenate(([0.], np.cumsum(row_length)))
+
+
+def lump_wake(aero_tstep, distance, ratio):
+    r"""
+    Merges a pair of consecutive far-wake panels into a coarser one.
+
+    Beyond ``distance`` (along the wake from the trailing edge), the first two consecutive rows of panels whose
+    merged length is not larger than ``ratio`` times their distance to the trailing edge are merged into one, so that
+    the length of the far-wake panels grows with their distance.
+
+    The circulation of the merged panel is the length-weighted average of the circulations of the original panels,
+    :math:`\Gamma = (l_1\Gamma_1 + l_2\Gamma_2)/(l_1 + l_2)`, which conserves the total circulation shed in the wake and
+    its centroid. The end of the wake is extended with a panel of the length and circulation of the last one, which
+    is the one dropped by the UVLM when the wake is convected. Called once per time step before the convection, the
+    whole history of the wake is then kept with the same number of panels.
+
+    The wake arrays are modified in place.
+
+    Args:
+        aero_tstep (sharpy.utils.datastructures.AeroTimeStepInfo): Aerodynamic time step information
+        distance (float): Distance to the trailing edge beyond which the panels are merged
+        ratio (float): Maximum ratio between the length of a merged panel and its distance to the trailing edge
+
+    Returns:
+        int: Number of surfaces whose wake panels have been merged
+    """
+    n_merged = 0
+    for i_surf in range(aero_tstep.n_surf):
+        m_star = aero_tstep.dimensions_star[i_surf, 0]
+        if m_star < 3:
+            continue
+
+        zeta_star = aero_tstep.zeta_star[i_surf]
+        gamma_star = aero_tstep.gamma_star[i_surf]
+        u_ext_star = aero_tstep.u_ext_star[i_surf]
+
+        edge_length = np.linalg.norm(np.diff(zeta_star, axis=1), axis=0)
+        panel_length = 0.5*(edge_length[:, :-1] + edge_length[:, 1:])
+        row_length = np.mean(panel_length, axis=1)
+        row_distance = np.concatenate(([0.], np.cumsum(row_length)[:-1]))
+
+        candidates = np.flatnonzero(row_length[:-1] + row_length[1:] <= ratio*row_distance[:-1])
+        candidates = candidates[row_distance[candidates] >= distance]
+        if not len(candidates):
+            continue
+        i_row = candidates[0]
+        n_merged += 1
+
+        length0 = panel_length[i_row, :]
+        length1 = panel_length[i_row + 1, :]
+        total_length = length0 + length1
+        total_length[total_length == 0.] = 1.
+        gamma_star[i_row, :] = (length0*gamma_star[i_row, :] + length1*gamma_star[i_row + 1, :])/total_length
+
+        # the vertices between the merged panels are removed and the end of the wake extended
+        zeta_star[:, i_row + 1:-1, :] = zeta_star[:, i_row + 2:, :]
+        zeta_star[:, -1, :] = 2.*zeta_star[:, -2, :] - zeta_star[:, -3, :]
+        u_ext_star[:, i_row + 1:-1, :] = u_ext_star[:, i_row + 2:, :]
+        gamma_star[i_row + 1:-1, :] = gamma_star[i_row + 2:, :]
+
+    return n_merged
+
+
+def truncate_wake(aero_tstep, tolerance, min_panels=1):
+    r"""
+    Drops the panels at the end of the wake whose influence on the lifting surfaces is negligible.
+
+    The velocity induced by a wake panel on the lifting surfaces is estimated as that of a vortex ring of circulation
+    :math:`\Gamma` and area :math:`A` at the distance :math:`r` between the panel and the trailing edge,
+    :math:`\Gamma A/(4\pi r^3)`. Rows of panels are dropped from the end of the wake as long as the sum of the estimates
+    of all the dropped panels is smaller than ``tolerance`` times the largest external velocity on the lifting
+    surfaces.
+
+    Wakes whose last row of panels has no circulation are not truncated: the circulation shed by the lifting surfaces
+    has not reached their end yet (for instance, in a wake initialised without circulation), and the panels ahead of
+    it would otherwise be dropped before they receive any circulation.
+
+    The wake arrays of the dropped panels are reallocated with the new number of panels, which is stored in
+    ``aero_tstep.dimensions_star``. Dropped panels are not recovered.
+
+    Args:
+        aero_tstep (sharpy.utils.datastructures.AeroTimeStepInfo): Aerodynamic time step information
+        tolerance (float): Tolerance of the induced velocity relative to the external velocity
+        min_panels (int): Minimum number of rows of panels kept in the wake
+
+    Returns:
+        int: Number of dropped rows of panels
+    """
+    u_ref = max([np.max(np.linalg.norm(u_ext, axis=0)) for u_ext in aero_tstep.u_ext] + [0.])
+    if u_ref == 0.:
+        return 0
+
+    n_dropped = 0
+    for i_surf in range(aero_tstep.n_surf):
+        m_star = aero_tstep.dimensions_star[i_surf, 0]
+        if m_star <= min_panels:
+            continue
+
+        if not np.any(aero_tstep.gamma_star[i_surf][-1, :]):
+            continue
+
+        zeta_star = aero_tstep.zeta_star[i_surf]
+        diag0 = zeta_star[:, 1:, 1:] - zeta_star[:, :-1, :-1]
+        diag1 = zeta_star[:, 1:, :-1] - zeta_star[:, :-1, 1:]
+        area = 0.5*np.linalg.norm(np.cross(diag0, diag1, axis=0), axis=0)
+        centre = 0.25*(zeta_star[:, 1:, 1:] + zeta_star[:, :-1, :-1] + zeta_star[:, 1:, :-1] + zeta_star[:, :-1, 1:])
+        trailing_edge = 0.5*(zeta_star[:, 0, 1:] + zeta_star[:, 0, :-1])
+        distance = np.linalg.norm(centre - trailing_edge[:, None, :], axis=0)
+        distance[distance == 0.] = np.inf
+        induced_velocity = np.sum(np.abs(aero_tstep.gamma_star[i_surf])*area/(4.*np.pi*distance**3), axis=1)
+
+        # induced velocity of the rows from each one to the end of the wake
+        tail_velocity = np.cumsum(induced_velocity[::-1])[::-1]
+        new_m_star = max(m_star - np.count_nonzero(tail_velocity < tolerance*u_ref), min_panels)
+        if new_m_star == m_star:
+            continue
+
+        n_dropped += m_star - new_m_star
+        aero_tstep.dimensions_star[i_surf, 0] = new_m_star
+        aero_tstep.zeta_star[i_surf] = zeta_star[:, :new_m_star + 1, :].astype(dtype=ct.c_double, copy=True, order='C')
+        aero_tstep.u_ext_star[i_surf] = aero_tstep.u_ext_star[i_surf][:, :new_m_star + 1, :].astype(dtype=ct.c_double,
+                                                                                                 copy=True, order='C')
+        aero_tstep.gamma_star[i_surf] = aero_tstep.gamma_star[i_surf][:new_m_star, :].astype(dtype=ct.c_double,
+                                                                                         copy=True, order='C')
+
+    return n_dropped
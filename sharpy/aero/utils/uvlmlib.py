@@ -123,28 +123,61 @@ class SHWOptions(ct.Structure):
 # type for 2d integer matrix
 t_2int = ct.POINTER(ct.c_int)*2
 
+# option structures built once for each function filling them in
+_options = ct_utils.StructureCache()
+
+
+def uvmopts_from_settings(ts_info, options, convect_wake=True, dt=None):
+    """
+    Returns the shared ``UVMopts`` filled in from ``options`` and the current call arguments
+    """
+    uvmopts = _options.get(UVMopts)
+    if dt is None:
+        dt = options['dt']
+    return ct_utils.update_structure(uvmopts,
+                                     {'dt': dt,
+                                      'NumCores': options['num_cores'],
+                                      'NumSurfaces': ts_info.n_surf,
+                                      'ImageMethod': False,
+                                      'convection_scheme': options['convection_scheme'],
+                                      'iterative_solver': options['iterative_solver'],
+                                      'iterative_tol': options['iterative_tol'],
+                                      'iterative_precond': options['iterative_precond'],
+                                      'convect_wake': convect_wake})
+
+
+def flight_conditions(ts_info, options):
+    """
+    Returns the shared ``FlightConditions`` filled in from ``options`` and the free stream of ``ts_info``
+    """
+    flightconditions = _options.get(FlightConditions)
+    u_inf = ts_info.u_ext[0][:, 0, 0]
+    u_inf_norm = np.linalg.norm(u_inf)
+    return ct_utils.update_structure(flightconditions,
+                                     {'rho': options['rho'],
+                                      'uinf': u_inf_norm,
+                                      'uinf_direction': u_inf/u_inf_norm})
+
 
 def vlm_solver(ts_info, options):
     run_VLM = UvlmLib.run_VLM
     run_VLM.restype = None
 
-    vmopts = VMopts()
-    vmopts.Steady = ct.c_bool(True)
-    vmopts.NumSurfaces = ct.c_uint(ts_info.n_surf)
-    vmopts.horseshoe = ct.c_bool(options['horseshoe'].value)
-    vmopts.dt = ct.c_double(options["rollup_dt"].value)
-    vmopts.n_rollup = ct.c_uint(options["n_rollup"].value)
-    vmopts.rollup_tolerance = ct.c_double(options["rollup_tolerance"].value)
-    vmopts.rollup_aic_refresh = ct.c_uint(options['rollup_aic_refresh'].value)
-    vmopts.NumCores = ct.c_uint(options['num_cores'].value)
-    vmopts.iterative_solver = ct.c_bool(options['iterative_solver'].value)
-    vmopts.iterative_tol = ct.c_double(options['iterative_tol'].value)
-    vmopts.iterative_precond = ct.c_bool(options['iterative_precond'].value)
-
-    flightconditions = FlightConditions()
-    flightconditions.rho = options['rho']
-    flightconditions.uinf = np.ctypeslib.as_ctypes(np.linalg.norm(ts_info.u_ext[0][:, 0, 0]))
-    flightconditions.uinf_direction = np.ctypeslib.as_ctypes(ts_info.u_ext[0][:, 0, 0]/flightconditions.uinf)
+    vmopts = _options.get(VMopts, tag='vlm')
+    ct_utils.update_structure(vmopts,
+                              {'Steady': True,
+                               'NumSurfaces': ts_info.n_surf,
+                               'horseshoe': options['horseshoe'],
+                               'dt': options['rollup_dt'],
+                               'n_rollup': options['n_rollup'],
+                               'rollup_tolerance': options['rollup_tolerance'],
+                               'rollup_aic_refresh': options['rollup_aic_refresh'],
+                               'NumCores': options['num_cores'],
+                               'iterative_solver': options['iterative_solver'],
+                               'iterative_tol': options['iterative_tol'],
+                               'iterative_precond': options['iterative_precond']})
+
+    flightconditions = flight_conditions(ts_info, options)
 
     ts_info.generate_ctypes_pointers()
     run_VLM(ct.byref(vmopts),
@@ -178,10 +211,7 @@ def uvlm_init(ts_info, options):
         pass
     vmopts.NumCores = ct.c_uint(options['num_cores'].value)
 
-    flightconditions = FlightConditions()
-    flightconditions.rho = options['rho']
-    flightconditions.uinf = np.ctypeslib.as_ctypes(np.linalg.norm(ts_info.u_ext[0][:, 0, 0]))
-    flightconditions.uinf_direction = np.ctypeslib.as_ctypes(ts_info.u_ext[0][:, 0, 0]/flightconditions.uinf)
+    flightconditions = flight_conditions(ts_info, options)
 
     # rbm_vel[0:3] = np.dot(inertial2aero.transpose(), rbm_vel[0:3])
     # rbm_vel[3:6] = np.dot(inertial2aero.transpose(), rbm_vel[3:6])
@@ -209,26 +239,9 @@ def uvlm_solver(i_iter, ts_info, struct_ts_info, options, convect_wake=True, dt=
     run_UVLM = UvlmLib.run_UVLM
     run_UVLM.restype = None
 
-    uvmopts = UVMopts()
-    if dt is None:
-        uvmopts.dt = ct.c_double(options["dt"].value)
-    else:
-        uvmopts.dt = ct.c_double(dt)
-    uvmopts.NumCores = ct.c_uint(options["num_cores"].value)
-    uvmopts.NumSurfaces = ct.c_uint(ts_info.n_surf)
-    uvmopts.ImageMethod = ct.c_bool(False)
-    uvmopts.convection_scheme = ct.c_uint(options["convection_scheme"].value)
-    uvmopts.iterative_solver = ct.c_bool(options['iterative_solver'].value)
-    uvmopts.iterative_tol = ct.c_double(options['iterative_tol'].value)
-    uvmopts.iterative_precond = ct.c_bool(options['iterative_precond'].value)
-    uvmopts.convect_wake = ct.c_bool(convect_wake)
-
-    flightconditions = FlightConditions()
-    flightconditions.rho = options['rho']
-    flightconditions.uinf = np.ctypeslib.as_ctypes(np.linalg.norm(ts_info.u_ext[0][:, 0, 0]))
-    # direction = np.array([1.0, 0, 0])
-    flightconditions.uinf_direction = np.ctypeslib.as_ctypes(ts_info.u_ext[0][:, 0, 0]/flightconditions.uinf)
-    # flightconditions.uinf_direction = np.ctypeslib.as_ctypes(direction)
+    uvmopts = uvmopts_from_settings(ts_info, options, convect_wake, dt)
+
+    flightconditions = flight_conditions(ts_info, options)
 
     rbm_vel = struct_ts_info.for_vel.copy()
     rbm_vel[0:3] = np.dot(struct_ts_info.cga(), rbm_vel[0:3])
@@ -263,19 +276,7 @@ def shw_solver(i_iter, ts_info, struct_ts_info, options, convect_wake=True, dt=N
     run_SHW = UvlmLib.run_SHW
     run_SHW.restype = None
 
-    uvmopts = UVMopts()
-    if dt is None:
-        uvmopts.dt = ct.c_double(options["dt"].value)
-    else:
-        uvmopts.dt = ct.c_double(dt)
-    uvmopts.NumCores = ct.c_uint(options["num_cores"].value)
-    uvmopts.NumSurfaces = ct.c_uint(ts_info.n_surf)
-    uvmopts.ImageMethod = ct.c_bool(False)
-    uvmopts.convection_scheme = ct.c_uint(options["convection_scheme"].value)
-    uvmopts.iterative_solver = ct.c_bool(options['iterative_solver'].value)
-    uvmopts.iterative_tol = ct.c_double(options['iterative_tol'].value)
-    uvmopts.iterative_precond = ct.c_bool(options['iterative_precond'].value)
-    uvmopts.convect_wake = ct.c_bool(convect_wake)
+    uvmopts = uvmopts_from_settings(ts_info, options, convect_wake, dt)
 
     shwopts = SHWOptions()
     shwopts.dt = uvmopts.dt
@@ -283,12 +284,7 @@ def shw_solver(i_iter, ts_info, struct_ts_info, options, convect_wake=True, dt=N
     shwopts.rot_vel = options['rot_vel']
     shwopts.rot_axis = np.ctypeslib.as_ctypes(options['rot_axis'])
 
-    flightconditions = FlightConditions()
-    flightconditions.rho = options['rho']
-    flightconditions.uinf = np.ctypeslib.as_ctypes(np.linalg.norm(ts_info.u_ext[0][:, 0, 0]))
-    # direction = np.array([1.0, 0, 0])
-    flightconditions.uinf_direction = np.ctypeslib.as_ctypes(ts_info.u_ext[0][:, 0, 0]/flightconditions.uinf)
-    # flightconditions.uinf_direction = np.ctypeslib.as_ctypes(direction)
+    flightconditions = flight_conditions(ts_info, options)
 
     rbm_vel = struct_ts_info.for_vel.copy()
     rbm_vel[0:3] = np.dot(struct_ts_info.cga(), rbm_vel[0:3])
@@ -327,24 +323,9 @@ def uvlm_calculate_unsteady_forces(ts_info,
     calculate_unsteady_forces = UvlmLib.calculate_unsteady_forces
     calculate_unsteady_forces.restype = None
 
-    uvmopts = UVMopts()
-    if dt is None:
-        uvmopts.dt = ct.c_double(options["dt"].value)
-    else:
-        uvmopts.dt = ct.c_double(dt)
-    uvmopts.NumCores = ct.c_uint(options["num_cores"].value)
-    uvmopts.NumSurfaces = ct.c_uint(ts_info.n_surf)
-    uvmopts.ImageMethod = ct.c_bool(False)
-    uvmopts.convection_scheme = ct.c_uint(options["convection_scheme"].value)
-    uvmopts.iterative_solver = ct.c_bool(options['iterative_solver'].value)
-    uvmopts.iterative_tol = ct.c_double(options['iterative_tol'].value)
-    uvmopts.iterative_precond = ct.c_bool(options['iterative_precond'].value)
-    uvmopts.convect_wake = ct.c_bool(convect_wake)
+    uvmopts = uvmopts_from_settings(ts_info, options, convect_wake, dt)
 
-    flightconditions = FlightConditions()
-    flightconditions.rho = options['rho']
-    flightconditions.uinf = np.ctypeslib.as_ctypes(np.linalg.norm(ts_info.u_ext[0][:, 0, 0]))
-    flightconditions.uinf_direction = np.ctypeslib.as_ctypes(ts_info.u_ext[0][:, 0, 0]/flightconditions.uinf)
+    flightconditions = flight_conditions(ts_info, options)
 
     rbm_vel = struct_ts_info.for_vel.copy()
     rbm_vel[0:3] = np.dot(struct_ts_info.cga(), rbm_vel[0:3])
@@ -434,14 +415,8 @@ def uvlm_calculate_total_induced_velocity_at_points(ts_info,
     # make a copy of ts info and add for_pos to zeta and zeta_star
     ts_info_copy = ts_info.copy()
     for i_surf in range(ts_info_copy.n_surf):
-        # zeta
-        for iM in range(ts_info_copy.zeta[i_surf].shape[1]):
-            for iN in range(ts_info_copy.zeta[i_surf].shape[2]):
-                ts_info_copy.zeta[i_surf][:, iM, iN] += for_pos[0:3]
-        # zeta_star
-        for iM in range(ts_info_copy.zeta_star[i_surf].shape[1]):
-            for iN in range(ts_info_copy.zeta_star[i_surf].shape[2]):
-                ts_info_copy.zeta_star[i_surf][:, iM, iN] += for_pos[0:3]
+        ts_info_copy.zeta[i_surf] += for_pos[0:3, None, None]
+        ts_info_copy.zeta_star[i_surf] += for_pos[0:3, None, None]
 
     ts_info_copy.generate_ctypes_pointers()
     calculate_uind_at_points(ct.byref(uvmopts),
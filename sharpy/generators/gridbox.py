@@ -58,26 +58,24 @@ class GridBox(generator_interface.BaseGenerator):
         self.dz = self.in_dict['spacing'][2]
 
     def generate(self, params):
-        if self.settings['moving']:
+        if self.in_dict['moving']:
             for_pos = params['for_pos']
         else:
             for_pos = np.zeros((3,))
-        nx = np.abs(int((self.x1.value-self.x0.value)/self.dx.value + 1))
-        ny = np.abs(int((self.y1.value-self.y0.value)/self.dy.value + 1))
-        nz = np.abs(int((self.z1.value-self.z0.value)/self.dz.value + 1))
+        nx = np.abs(int((self.x1-self.x0)/self.dx + 1))
+        ny = np.abs(int((self.y1-self.y0)/self.dy + 1))
+        nz = np.abs(int((self.z1-self.z0)/self.dz + 1))
 
-        xarray = np.linspace(self.x0.value, self.x1.value, nx) + for_pos[0]
-        yarray = np.linspace(self.y0.value, self.y1.value, ny) + for_pos[1]
-        zarray = np.linspace(self.z0.value, self.z1.value, nz) + for_pos[2]
+        xarray = np.linspace(self.x0, self.x1, nx) + for_pos[0]
+        yarray = np.linspace(self.y0, self.y1, ny) + for_pos[1]
+        zarray = np.linspace(self.z0, self.z1, nz) + for_pos[2]
         grid = []
+        xgrid, ygrid = np.meshgrid(xarray, yarray, indexing='ij')
         for iz in range(nz):
             grid.append(np.zeros((3, nx, ny), dtype=ct.c_double))
-            for ix in range(nx):
-                for iy in range(ny):
-                    grid[iz][0, ix, iy] = xarray[ix]
-                    grid[iz][1, ix, iy] = yarray[iy]
-                    grid[iz][2, ix, iy] = zarray[iz]
-
+            grid[iz][0, :, :] = xgrid
+            grid[iz][1, :, :] = ygrid
+            grid[iz][2, :, :] = zarray[iz]
 
         vtk_info = tvtk.RectilinearGrid()
         vtk_info.dimensions = np.array([nx, ny, nz], dtype=int)
@@ -544,27 +544,32 @@ class FlexDynamic():
         FgravA = np.zeros(3)
         FgravG = np.zeros(3)
 
+        # Gravity forces at the linearisation condition (from NL SHARPy in A frame)
+        fgravG_nodes = np.dot(tsstr.gravity_forces[:, :3], Pga.T)
+        fgravA_nodes = np.dot(fgravG_nodes, Pag.T)
+
+        # Nodal orientation, tangential operators (for the moments calculation) and derivatives for all nodes
+        psi_nodes = tsstr.psi[self.structure.node_master_elem[:, 0], self.structure.node_master_elem[:, 1], :]
+        Cab_nodes = algebra.crv2rotation_vec(psi_nodes)
+        Tan_nodes = algebra.crv2tan_vec(psi_nodes)
+        der_Ccrv_by_fgravA = algebra.der_Ccrv_by_v_vec(psi_nodes, fgravA_nodes)
+        if not self.use_euler:
+            der_CquatT_by_fgravG = algebra.der_CquatT_by_v_vec(tsstr.quat, fgravG_nodes)
+
         for i_node in range(num_node):
-            # Gravity forces at the linearisation condition (from NL SHARPy in A frame)
-            fgravA = tsstr.gravity_forces[i_node, :3]
-            fgravG = Pga.dot(fgravA)
-            # fgravG = tsstr.gravity_forces[i_node, :3]
-            mgravA = tsstr.gravity_forces[i_node, 3:]
-            fgravA = Pag.dot(fgravG)
-            mgravG = Pag.dot(mgravA)
+            fgravA = fgravA_nodes[i_node]
+            fgravG = fgravG_nodes[i_node]
 
             # Get nodal position - A frame
             Ra = tsstr.pos[i_node, :]
 
-            # retrieve element and local index
-            ee, node_loc = self.structure.node_master_elem[i_node, :]
-            psi = tsstr.psi[ee, node_loc, :]
-            Cab = algebra.crv2rotation(psi)
+            psi = psi_nodes[i_node]
+            Cab = Cab_nodes[i_node]
             Cba = Cab.T
             Cbg = Cba.dot(Pag)
 
             # Tangential operator for moments calculation
-            Tan = algebra.crv2tan(psi)
+            Tan = Tan_nodes[i_node]
 
             jj = 0  # nodal dof index
             bc_at_node = self.structure.boundary_conditions[i_node]  # Boundary conditions at the node
@@ -586,8 +591,7 @@ class FlexDynamic():
             if bc_at_node != 1:
                 # Nodal centre of gravity (in the case of additional lumped masses, else should be zero)
                 Mss_indices = np.concatenate((jj_tra, jj_rot))
-                Mss_node = Mss[Mss_indices,:]
-                Mss_node = Mss_node[:, Mss_indices]
+                Mss_node = Mss[np.ix_(Mss_indices, Mss_indices)]
                 Xcg_B = Cba.dot(-np.array([Mss_node[2, 4], Mss_node[0, 5], Mss_node[1, 3]]) / Mss_node[0, 0])
                 Xcg_Bskew = algebra.skew(Xcg_B)
 
@@ -609,7 +613,7 @@ class FlexDynamic():
             if self.use_euler:
                 if bc_at_node != 1:
                     # Nodal moments due to gravity -> linearisation terms wrt to delta_psi
-                    Kss_grav[np.ix_(jj_rot, jj_rot)] -= Tan.dot(Xcg_Bskew.dot(algebra.der_Ccrv_by_v(psi, fgravA)))
+                    Kss_grav[np.ix_(jj_rot, jj_rot)] -= Tan.dot(Xcg_Bskew.dot(der_Ccrv_by_fgravA[i_node]))
                     Kss_grav[np.ix_(jj_rot, jj_rot)] -= algebra.der_TanT_by_xv(psi, Xcg_Bskew.dot(Cbg.dot(fgravG)))
 
                     # Nodal forces due to gravity -> linearisation terms wrt to delta_euler
@@ -628,7 +632,7 @@ class FlexDynamic():
             else:
                 if bc_at_node != 1:
                     # Nodal moments due to gravity -> linearisation terms wrt to delta_psi
-                    Kss_grav[np.ix_(jj_rot, jj_rot)] -= Tan.dot(Xcg_Bskew.dot(algebra.der_Ccrv_by_v(psi, fgravA)))
+                    Kss_grav[np.ix_(jj_rot, jj_rot)] -= Tan.dot(Xcg_Bskew.dot(der_Ccrv_by_fgravA[i_node]))
                     Kss_grav[np.ix_(jj_rot, jj_rot)] -= algebra.der_TanT_by_xv(psi, Xcg_Bskew.dot(Cbg.dot(fgravG)))
 
                     # Total moments -> linearisation terms wrt to delta_Ra
@@ -639,11 +643,11 @@ class FlexDynamic():
                     Krs_grav[3:6, jj_rot] += np.dot(algebra.skew(fgravA), algebra.der_Ccrv_by_v(psi, Xcg_B))
 
                     # Nodal forces due to gravity -> linearisation terms wrt to delta_euler
-                    Csr_grav[jj_tra, -4:] -= algebra.der_CquatT_by_v(tsstr.quat, fgravG) # ok
+                    Csr_grav[jj_tra, -4:] -= der_CquatT_by_fgravG[i_node] # ok
                     # Crr_grav[:3, -4:] -= algebra.der_CquatT_by_v(tsstr.quat, fgravG)  # not ok - see below
 
                     # Nodal moments due to gravity -> linearisation terms wrt to delta_euler
-                    Csr_grav[jj_rot, -4:] -= Tan.dot(Xcg_Bskew.dot(Cba.dot(algebra.der_CquatT_by_v(tsstr.quat, fgravG))))
+                    Csr_grav[jj_rot, -4:] -= Tan.dot(Xcg_Bskew.dot(Cba.dot(der_CquatT_by_fgravG[i_node])))
 
 
             # Debugging:
@@ -708,6 +712,12 @@ class FlexDynamic():
 
         2. Continuous time state-space
 
+        With modal projection, the mass, damping and stiffness matrices (including the gravity linearisation terms) are
+        projected onto the retained modes before the system is assembled and discretised, such that the cost of these
+        operations only depends on ``Nmodes``. The Zero-order hold and bilinear discretisations are also carried out
+        in modal coordinates. The nodal gains are applied afterwards, if ``inout_coords='nodes'``, as products with the
+        mode shapes.
+
 
         Args:
             Nmodes (int): number of modes to retain
@@ -736,43 +746,34 @@ class FlexDynamic():
         if dlti:  # ---------------------------------- assemble discrete time
 
             if self.discr_method in ['zoh', 'bilinear']:
-                # assemble continuous-time
+                # assemble continuous-time (in modal coordinates if projected)
+                inout_coords = self.inout_coords
+                if modal:
+                    self.inout_coords = 'modes'
                 self.dlti = False
                 self.assemble(Nmodes)
+                self.inout_coords = inout_coords
                 # convert into discrete
                 self.dlti = True
                 self.cont2disc()
+                if modal and self.inout_coords == 'nodes':
+                    self.SScont = self.project_modal_gains(self.SScont)
+                    self.SSdisc = self.project_modal_gains(self.SSdisc)
+                    self.Kin, self.Kout = None, None
 
             elif self.discr_method == 'newmark':
 
                 if modal:  # Modal projection
                     if self.proj_modes == 'undamped':
-                        Phi = self.U[:, :Nmodes]
-
-                        if self.Ccut is None:
-                            # Ccut = np.zeros((Nmodes, Nmodes))
-                            Ccut = np.dot(Phi.T, np.dot(self.Cstr, Phi))
-                        else:
-                            Ccut = np.dot(Phi.T, np.dot(self.Cstr, Phi))
-
-                        # Ass, Bss, Css, Dss = newmark_ss(
-                        #     np.eye(Nmodes),
-                        #     Ccut,
-                        #     np.diag(self.freq_natural[:Nmodes] ** 2),
-                        #     self.dt,
-                        #     self.newmark_damp)
+                        Phi, Mmodal, Cmodal, Kmodal = self.project_matrices(Nmodes)
+
                         Ass, Bss, Css, Dss = newmark_ss(
-                            # Phi.T.dot(self.Mstr.dot(Phi)),
-                            np.linalg.inv(np.dot(self.U[:, :Nmodes].T, np.dot(self.Mstr, self.U[:, :Nmodes]))),
-                            # np.eye(Nmodes),
-                            Ccut,
-                            np.dot(self.U[:, :Nmodes].T, np.dot(self.Kstr, self.U[:, :Nmodes])),
-                            # Phi.T.dot(self.Kstr.dot(Phi)),
-                            # np.diag(self.freq_natural[:Nmodes]**2),
+                            np.linalg.inv(Mmodal),
+                            Cmodal,
+                            Kmodal,
                             self.dt,
                             self.newmark_damp)
-                        self.Kin = Phi.T
-                        self.Kout = sc.linalg.block_diag(*[Phi, Phi])
+                        self.set_modal_gains(Phi)
                     else:
                         raise NameError(
                             'Newmark-beta discretisation not available ' \
@@ -781,8 +782,7 @@ class FlexDynamic():
                     # build state-space model
                     self.SSdisc = libss.ss(Ass, Bss, Css, Dss, dt=self.dt)
                     if self.inout_coords == 'nodes':
-                        self.SSdisc = libss.addGain(self.SSdisc, self.Kin, 'in')
-                        self.SSdisc = libss.addGain(self.SSdisc, self.Kout, 'out')
+                        self.SSdisc = self.project_modal_gains(self.SSdisc)
                         self.Kin, self.Kout = None, None
 
 
@@ -810,17 +810,15 @@ class FlexDynamic():
                 iivec = np.arange(Nmodes, dtype=int)
 
                 if self.proj_modes == 'undamped':
-                    Phi = self.U[:, :Nmodes]
+                    Phi, _, Cmodal, Kmodal = self.project_matrices(Nmodes)
                     Ass[iivec, Nmodes + iivec] = 1.
                     # Ass[Nmodes:, :Nmodes] = -np.diag(self.freq_natural[:Nmodes] ** 2)
-                    Ass[Nmodes:, :Nmodes] = -self.U.T.dot(self.Kstr.dot(self.U))
-                    if self.Ccut is not None:
-                        Ass[Nmodes:, Nmodes:] = -self.Ccut[:Nmodes, :Nmodes]
+                    Ass[Nmodes:, :Nmodes] = -Kmodal
+                    Ass[Nmodes:, Nmodes:] = -Cmodal
                     Bss = np.zeros((2 * Nmodes, Nmodes))
                     Dss = np.zeros((2 * Nmodes, Nmodes))
                     Bss[Nmodes + iivec, iivec] = 1.
-                    self.Kin = Phi.T
-                    self.Kout = sc.linalg.block_diag(*(Phi, Phi))
+                    self.set_modal_gains(Phi)
                 else:  # damped mode shapes
                     # The algorithm assumes that for each couple of complex conj
                     # eigenvalues, only one eigenvalue (and the eigenvectors
@@ -842,8 +840,7 @@ class FlexDynamic():
                 # build state-space model
                 self.SScont = libss.ss(Ass, Bss, Css, Dss)
                 if self.inout_coords == 'nodes':
-                    self.SScont = libss.addGain(self.SScont, self.Kin, 'in')
-                    self.SScont = libss.addGain(self.SScont, self.Kout, 'out')
+                    self.SScont = self.project_modal_gains(self.SScont)
                     self.Kin, self.Kout = None, None
 
             else:  # Full system
@@ -864,6 +861,75 @@ class FlexDynamic():
                 self.Kout = None
                 self.SScont = libss.ss(Ass, Bss, Css, Dss)
 
+    def project_matrices(self, Nmodes):
+        r"""
+        Projects the mass, damping and stiffness matrices, including the gravity linearisation terms if these have
+        been added, onto the first ``Nmodes`` undamped modes :math:`\mathbf{\Phi}`
+
+        .. math:: \mathbf{M}_\eta = \mathbf{\Phi}^\top\mathbf{M\Phi}, \quad
+            \mathbf{C}_\eta = \mathbf{\Phi}^\top\mathbf{C\Phi}, \quad
+            \mathbf{K}_\eta = \mathbf{\Phi}^\top\mathbf{K\Phi}
+
+        Args:
+            Nmodes (int): number of modes to retain
+
+        Returns:
+            tuple: Modes :math:`\mathbf{\Phi}` and the modal mass, damping and stiffness matrices.
+        """
+        Phi = self.U[:, :Nmodes]
+        PhiT = Phi.T
+        Mmodal = np.dot(np.dot(PhiT, self.Mstr), Phi)
+        Cmodal = np.dot(np.dot(PhiT, self.Cstr), Phi)
+        Kmodal = np.dot(np.dot(PhiT, self.Kstr), Phi)
+
+        return Phi, Mmodal, Cmodal, Kmodal
+
+    def set_modal_gains(self, Phi):
+        r"""
+        Sets the nodal to modal input gain :math:`\mathbf{\Phi}^\top` and the modal to nodal output gain of the
+        undamped modal projection. The latter, a block diagonal matrix with :math:`\mathbf{\Phi}` on each of the
+        displacement and velocity blocks, is only formed if ``Kout`` is accessed.
+
+        Args:
+            Phi (np.ndarray): Retained modes
+        """
+        self._Phi_out = Phi
+        self._Kout = None
+        self.Kin = Phi.T
+
+    @property
+    def Kout(self):
+        if self._Kout is None and self._Phi_out is not None:
+            self._Kout = sc.linalg.block_diag(self._Phi_out, self._Phi_out)
+        return self._Kout
+
+    @Kout.setter
+    def Kout(self, value):
+        self._Kout = value
+        self._Phi_out = None
+
+    def project_modal_gains(self, ss):
+        """
+        Projects the inputs and outputs of the modal state-space system ``ss`` onto the nodal degrees of freedom with
+        the ``Kin`` and ``Kout`` gains. The output gain of the undamped modal projection is applied blockwise, such
+        that the block diagonal ``Kout`` is not formed.
+
+        Args:
+            ss (libss.ss): State-space system in modal coordinates
+
+        Returns:
+            libss.ss: State-space system with nodal inputs and outputs
+        """
+        ss = libss.addGain(ss, self.Kin, 'in')
+        if self._Phi_out is None:
+            return libss.addGain(ss, self.Kout, 'out')
+
+        Phi = self._Phi_out
+        Nmodes = Phi.shape[1]
+        C = np.concatenate((Phi.dot(ss.C[:Nmodes, :]), Phi.dot(ss.C[Nmodes:, :])))
+        D = np.concatenate((Phi.dot(ss.D[:Nmodes, :]), Phi.dot(ss.D[Nmodes:, :])))
+        return libss.ss(ss.A, ss.B, C, D, dt=ss.dt)
+
     def freqresp(self, wv=None, bode=True):
         """
         Computes the frequency response of the current state-space model. If
@@ -968,7 +1034,16 @@ class FlexDynamic():
                 print('Warning, projecting system with damping onto undamped modes')
 
             # Eigenvalues are purely complex - only the complex part is calculated
-            eigenvalues, eigenvectors = np.linalg.eig(np.linalg.solve(self.Mstr, self.Kstr))
+            eigenvalues, eigenvectors = None, None
+            if np.allclose(self.Kstr, self.Kstr.T) and np.allclose(self.Mstr, self.Mstr.T):
+                # symmetric definite problem: compute only the retained modes
+                try:
+                    eigenvalues, eigenvectors = sc.linalg.eigh(
+                        self.Kstr, self.Mstr, subset_by_index=[0, min(self.Nmodes, self.Mstr.shape[0]) - 1])
+                except np.linalg.LinAlgError:
+                    pass
+            if eigenvalues is None:
+                eigenvalues, eigenvectors = np.linalg.eig(np.linalg.solve(self.Mstr, self.Kstr))
 
             omega = np.sqrt(eigenvalues)
             order = np.argsort(omega)[:self.Nmodes]
@@ -982,6 +1057,7 @@ class FlexDynamic():
 
             # Update
             self.eigs = eigenvalues[order]
+            self.Ccut = np.dot(self.U.T, np.dot(self.Cstr, self.U))
 
             # To do: update SHARPy's timestep info modal results
         else:
@@ -5,6 +5,7 @@ S. Maraniello, 7 Jun 2018
 
 import time
 import warnings
+from multiprocessing.pool import ThreadPool
 import numpy as np
 import scipy.linalg as scalg
 import scipy.sparse as sparse
@@ -613,6 +614,9 @@ class Dynamic(Static):
         # Initialise State Space
         self.SS = None
 
+        # dense blocks for the frequency response
+        self._freqresp_cache = None
+
     @property
     def Nu(self):
         """Number of inputs :math:`m` to the system."""
@@ -939,8 +943,8 @@ class Dynamic(Static):
 
 
 
-    def freqresp(self,kv):
-        """
+    def freqresp(self, kv, Ncpu=1):
+        r"""
         Ad-hoc method for fast UVLM frequency response over the frequencies
         kv. The method, only requires inversion of a K x K matrix at each
         frequency as the equation for propagation of wake circulation are solved
@@ -948,15 +952,60 @@ class Dynamic(Static):
         The algorithm implemented here can be used also upon projection of
         the state-space model.
 
+        The wake circulation is condensed into the equations of the bound
+        circulation through the polynomials in :math:`z^{-1}` of each spanwise
+        strip of wake panels (see :meth:`get_freqresp_blocks`), such that
+        neither :math:`\bar{\mathbf{C}}(z)` nor the wake circulation are
+        built at each frequency. The dense blocks of the state-space model are
+        cached across calls.
+
+        Args:
+            kv (np.ndarray): Frequencies.
+            Ncpu (int): Number of threads over which the frequencies are
+                distributed. The solution at each frequency is dominated by
+                LAPACK calls, which release the GIL.
+
         Note:
         This method is very similar to the "minsize" solution option is the
         steady_solve.
         """
 
-        if self.remove_predictor:
-            # raise NameError('Option "remove_predictor=True" not implemented yet. '+
-            #     'Refer to Frequency class implementation.')
+        blocks = self.get_freqresp_blocks()
+
+        Nk = len(kv)
+        kvdt = kv * self.SS.dt
+        zv = np.cos(kvdt) + 1.j * np.sin(kvdt)
+        Yfreq = np.empty((self.SS.outputs, self.SS.inputs, Nk,), dtype=np.complex_)
+
+        if Ncpu > 1:
+            with ThreadPool(Ncpu) as pool:
+                Ylist = pool.map(lambda zval: self.freqresp_point(blocks, zval), zv)
+        else:
+            Ylist = [self.freqresp_point(blocks, zval) for zval in zv]
+
+        for kk in range(Nk):
+            Yfreq[:, :, kk] = Ylist[kk]
 
+        return Yfreq
+
+    def get_freqresp_blocks(self):
+        r"""
+        Dense blocks of the state-space model used by :meth:`freqresp`
+
+        The blocks are cached and only extracted again if any of the state-space
+        matrices (or of the predictor terms) are reassigned. Note that in-place
+        modifications of the matrices are not detected.
+
+        Returns:
+            dict: Dense blocks condensed by :meth:`condense_freqresp_blocks`.
+        """
+
+        source = (self.SS.A, self.SS.B, self.SS.C, self.SS.D, self.B_predictor, self.D_predictor)
+        if self._freqresp_cache is not None and \
+                all([cached is current for cached, current in zip(self._freqresp_cache['source'], source)]):
+            return self._freqresp_cache
+
+        if self.remove_predictor:
             assert self.B_predictor.shape == self.SS.B.shape, \
                 ('In order to use "freqresp" with "remove_predictor=True", project ' +
                  '"self.B_predictor" as per "self.SS.B"!')
@@ -964,70 +1013,122 @@ class Dynamic(Static):
                 ('In order to use "freqresp" with "remove_predictor=True", project ' +
                  '"self.D_predictor" as per "self.SS.D"!')
 
-        MS = self.MS
         K = self.K
         K_star = self.K_star
 
-        Eye = np.eye(K)
         if self.remove_predictor:
             Bup = self.B_predictor[:K, :]
+            D = self.D_predictor
         else:
             Bup = self.SS.B[:K, :]
+            D = self.SS.D
 
-        if self.use_sparse:
-            # warning: behaviour may change in future numpy release.
-            # Ensure P,Pw,Bup are np.ndarray
-            P = np.array(self.SS.A[:K, :K].todense())
-            Pw = np.array(self.SS.A[:K, K:K + K_star].todense())
-            if type(Bup) not in [np.ndarray, libsp.csc_matrix]:
-                Bup = Bup.toarray()
-        else:
-            P = self.SS.A[:K, :K]
-            Pw = self.SS.A[:K, K:K + K_star]
+        self._freqresp_cache = self.condense_freqresp_blocks(self.SS.A[:K, :K],
+                                                             self.SS.A[:K, K:K + K_star],
+                                                             Bup,
+                                                             self.SS.C[:, :K],
+                                                             self.SS.C[:, K:K + K_star],
+                                                             self.SS.C[:, K + K_star:2 * K + K_star],
+                                                             D)
+        self._freqresp_cache['source'] = source
 
-        Nk = len(kv)
-        kvdt = kv * self.SS.dt
-        zv = np.cos(kvdt) + 1.j * np.sin(kvdt)
-        Yfreq = np.empty((self.SS.outputs, self.SS.inputs, Nk,), dtype=np.complex_)
+        return self._freqresp_cache
 
-        for kk in range(Nk):
+    def condense_freqresp_blocks(self, P, Pw, Bup, C_gamma, C_gamma_star, C_gamma_dot, D):
+        r"""
+        Condenses the wake terms of the UVLM equations for the frequency response
 
-            ###  build Cw complex
-            Cw_cpx = self.get_Cw_cpx(zv[kk])
+        Given that the wake circulation at the :math:`m`-th row of wake panels is the
+        circulation shed by the trailing edge panels :math:`m+1` time-steps before, the
+        wake contribution to the bound circulation equations at :math:`z` is
 
-            if self.remove_predictor:
-                Ygamma = zv[kk] * \
-                         libsp.solve(zv[kk] * Eye - P -
-                                     libsp.dot(Pw, Cw_cpx, type_out=libsp.csc_matrix),
-                                     Bup)
-            else:
-                Ygamma = libsp.solve(zv[kk] * Eye - P -
-                                     libsp.dot(Pw, Cw_cpx, type_out=libsp.csc_matrix),
-                                     Bup)
+            .. math:: \mathbf{P}_w\bar{\mathbf{C}}(z) = \sum_{m=0}^{M^*-1} z^{-m-1}\mathbf{P}_{w,m}
 
-            Ygamma_star = Cw_cpx.dot(Ygamma)
+        where :math:`\mathbf{P}_{w,m}` are the columns of :math:`\mathbf{P}_w` associated to the
+        :math:`m`-th row of wake panels. For each surface, these are stored as a single array such that
+        the polynomial is evaluated with a matrix-vector product and only affects the columns of the
+        trailing edge panels. The same applies to the output equation.
 
-            if self.integr_order == 1:
-                dfact = (1. - 1. / zv[kk])
-            elif self.integr_order == 2:
-                dfact = .5 * (3. - 4. / zv[kk] + 1. / zv[kk] ** 2)
-            else:
-                raise NameError('Specify valid integration order')
+        Args:
+            P (np.ndarray): Bound to bound circulation block of the state matrix.
+            Pw (np.ndarray): Wake to bound circulation block of the state matrix.
+            Bup (np.ndarray): Input matrix of the bound circulation equations.
+            C_gamma (np.ndarray): Output matrix of the bound circulation.
+            C_gamma_star (np.ndarray): Output matrix of the wake circulation.
+            C_gamma_dot (np.ndarray): Output matrix of the circulation time derivative.
+            D (np.ndarray): Feedthrough matrix.
 
-            # calculate solution
-            if self.remove_predictor:
-                Yfreq[:, :, kk] = np.dot(self.SS.C[:, :K], Ygamma) + \
-                                  np.dot(self.SS.C[:, K:K + K_star], Ygamma_star) + \
-                                  np.dot(self.SS.C[:, K + K_star:2 * K + K_star], dfact * Ygamma) + \
-                                  self.D_predictor
-            else:
-                Yfreq[:, :, kk] = np.dot(self.SS.C[:, :K], Ygamma) + \
-                                  np.dot(self.SS.C[:, K:K + K_star], Ygamma_star) + \
-                                  np.dot(self.SS.C[:, K + K_star:2 * K + K_star], dfact * Ygamma) + \
-                                  self.SS.D
+        Returns:
+            dict: Condensed blocks.
+        """
 
-        return Yfreq
+        def dense(M):
+            if sparse.issparse(M):
+                return M.toarray()
+            return np.asarray(M)
 
+        MS = self.MS
+        K = self.K
+        Pw = dense(Pw)
+        C_gamma_star = dense(C_gamma_star)
+        Ny = C_gamma_star.shape[0]
+
+        te_index, Pw_strips, Cw_strips = [], [], []
+        K0tot, K0totstar = 0, 0
+        for ss in range(MS.n_surf):
+
+            M, N = self.MS.dimensions[ss]
+            Mstar, N = self.MS.dimensions_star[ss]
+
+            wake = range(K0totstar, K0totstar + Mstar * N)
+            te_index.append(np.arange(K0tot + N * (M - 1), K0tot + N * M))
+            Pw_strips.append(Pw[:, wake].reshape((K, Mstar, N)).transpose((1, 0, 2)).reshape((Mstar, K * N)))
+            Cw_strips.append(C_gamma_star[:, wake].reshape((Ny, Mstar, N)).transpose((1, 0, 2)).reshape((Mstar, Ny * N)))
+
+            K0tot += MS.KK[ss]
+            K0totstar += MS.KK_star[ss]
+
+        return {'P': dense(P),
+                'Bup': dense(Bup),
+                'C_gamma': dense(C_gamma),
+                'C_gamma_dot': dense(C_gamma_dot),
+                'D': dense(D),
+                'te_index': te_index,
+                'Pw_strips': Pw_strips,
+                'Cw_strips': Cw_strips}
+
+    def freqresp_point(self, blocks, zval):
+        r"""
+        Frequency response at :math:`z` from the blocks returned by
+        :meth:`condense_freqresp_blocks`.
+        """
+
+        K = self.K
+
+        if self.integr_order == 1:
+            dfact = (1. - 1. / zval)
+        elif self.integr_order == 2:
+            dfact = .5 * (3. - 4. / zval + 1. / zval ** 2)
+        else:
+            raise NameError('Specify valid integration order')
+
+        Amat = -blocks['P'].astype(np.complex_)
+        Amat[range(K), range(K)] += zval
+        Cw_te = []
+        for te, Pw_strip, Cw_strip in zip(blocks['te_index'], blocks['Pw_strips'], blocks['Cw_strips']):
+            zpow = zval ** (-np.arange(1, Pw_strip.shape[0] + 1))
+            Amat[:, te] -= np.dot(zpow, Pw_strip).reshape((K, len(te)))
+            Cw_te.append(np.dot(zpow, Cw_strip).reshape((-1, len(te))))
+
+        Ygamma = scalg.solve(Amat, blocks['Bup'])
+        if self.remove_predictor:
+            Ygamma *= zval
+
+        Y = np.dot(blocks['C_gamma'] + dfact * blocks['C_gamma_dot'], Ygamma) + blocks['D']
+        for te, Cw_te_here in zip(blocks['te_index'], Cw_te):
+            Y += np.dot(Cw_te_here, Ygamma[te, :])
+
+        return Y
 
     def get_Cw_cpx(self,zval):
         r"""
@@ -2048,61 +2149,27 @@ class DynamicBlock(Dynamic):
         self.cpu_summary['assemble'] = time.time() - t0
         print('\t\t\t...done in %.2f sec' % self.cpu_summary['assemble'])
 
-    def freqresp(self, kv):
+    def get_freqresp_blocks(self):
         """
-        Ad-hoc method for fast UVLM frequency response over the frequencies
-        kv. The method, only requires inversion of a K x K matrix at each
-        frequency as the equation for propagation of wake circulation are solved
-        exactly.
-        The algorithm implemented here can be used also upon projection of
-        the state-space model.
-
-        Note:
-        This method is very similar to the "minsize" solution option is the
-        steady_solve.
+        Dense blocks of the state-space model in list-block form used by
+        :meth:`freqresp`. See :meth:`Dynamic.get_freqresp_blocks`.
         """
 
-        MS = self.MS
-        K = self.K
-        K_star = self.K_star
-
-        Eye = np.eye(K)
-        Bup = np.hstack(self.SS.B[0])
-        P = self.SS.A[0][0]
-        Pw = self.SS.A[0][1]
-
-        Nk = len(kv)
-        kvdt = kv * self.SS.dt
-        zv = np.cos(kvdt) + 1.j * np.sin(kvdt)
-        Yfreq = np.empty((self.SS.outputs, self.SS.inputs, Nk,), dtype=np.complex_)
-
-        for kk in range(Nk):
-
-            ###  build Cw complex
-            Cw_cpx = self.get_Cw_cpx(zv[kk])
-
-            Ygamma=libsp.solve( zv[kk]*Eye-P-
-                        libsp.dot( Pw, Cw_cpx, type_out=libsp.csc_matrix),
-                                   Bup)
-            if self.remove_predictor:
-                Ygamma *= zv[kk]
-
-            Ygamma_star = Cw_cpx.dot(Ygamma)
-
-            if self.integr_order == 1:
-                dfact = (1. - 1. / zv[kk])
-            elif self.integr_order == 2:
-                dfact = .5 * (3. - 4. / zv[kk] + 1. / zv[kk] ** 2)
-            else:
-                raise NameError('Specify valid integration order')
-
-            # calculate solution
-            Yfreq[:, :, kk] = np.dot(self.SS.C[0][0], Ygamma) + \
-                              np.dot(self.SS.C[0][1], Ygamma_star) + \
-                              np.dot(self.SS.C[0][2], dfact * Ygamma) + \
-                              np.hstack(self.SS.D[0])
-
-        return Yfreq
+        source = (self.SS.A, self.SS.B, self.SS.C, self.SS.D)
+        if self._freqresp_cache is not None and \
+                all([cached is current for cached, current in zip(self._freqresp_cache['source'], source)]):
+            return self._freqresp_cache
+
+        self._freqresp_cache = self.condense_freqresp_blocks(self.SS.A[0][0],
+                                                             self.SS.A[0][1],
+                                                             np.hstack(self.SS.B[0]),
+                                                             self.SS.C[0][0],
+                                                             self.SS.C[0][1],
+                                                             self.SS.C[0][2],
+                                                             np.hstack(self.SS.D[0]))
+        self._freqresp_cache['source'] = source
+
+        return self._freqresp_cache
 
     def balfreq(self, DictBalFreq):
         """
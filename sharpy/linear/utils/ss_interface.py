@@ -1,6 +1,7 @@
 """State-space modules loading utilities"""
 import os
 import sharpy.utils.cout_utils as cout
+import sharpy.utils.profiling as profiling
 from abc import ABCMeta, abstractmethod
 import numpy as np
 
@@ -73,6 +74,8 @@ def initialise_system(sys_id):
     cout.cout_wrap('Generating an instance of %s' %sys_id, 2)
     cls_type = sys_from_string(sys_id)
     sys = cls_type()
+    if profiling.profiler.enabled:
+        profiling.profiler.wrap_methods(sys, sys_id, ('assemble',))
     return sys
 
 
@@ -177,3 +180,45 @@ def remove_variables(trim_list, dof_db, sys_id):
                 # Update order and position
                 used_vars_db[item].first_pos -= removed_db[rem_item].size
                 used_vars_db[item].end_pos -= removed_db[rem_item].size
+
+
+def state_indices(linear_system, n_states, variables=(), indices=()):
+    """
+    Indices of a subset of the state vector of a linear system.
+
+    Args:
+        linear_system: Linear system (e.g. ``data.linear.linear_system``). For aeroelastic systems, the variables
+            are searched in the ``state_variables`` of the UVLM and beam systems.
+        n_states (int): Number of states of the system
+        variables (list(str)): Names of the state variables to include (e.g. ``eta``, ``gamma``)
+        indices (list(int)): Indices of additional states to include
+
+    Returns:
+        np.ndarray: Sorted indices of the selected states or ``None`` if neither variables nor indices are given.
+    """
+    if len(variables) == 0 and len(indices) == 0:
+        return None
+
+    # state variables of each system and their offset in the state vector
+    if hasattr(linear_system, 'uvlm') and hasattr(linear_system, 'beam'):
+        if linear_system.uvlm.gust_assembler:
+            aero_offset = linear_system.uvlm.gust_assembler.ss_gust.states
+        else:
+            aero_offset = 0
+        variable_dbs = [(linear_system.uvlm.state_variables, aero_offset),
+                        (linear_system.beam.state_variables, n_states - linear_system.beam.ss.states)]
+    else:
+        variable_dbs = [(linear_system.state_variables, 0)]
+
+    selected = [np.array(indices, dtype=int)]
+    for name in variables:
+        for variable_db, offset in variable_dbs:
+            if isinstance(variable_db, LinearVector):
+                variable_db = variable_db.vector_vars
+            if variable_db is not None and name in variable_db:
+                selected.append(variable_db[name].cols_loc + offset)
+                break
+        else:
+            raise KeyError('State variable %s not found in the linear system' % name)
+
+    return np.unique(np.concatenate(selected))
@@ -72,12 +72,16 @@ class AeroForcesCalculator(BaseSolver):
         self.data = None
         self.ts_max = 0
         self.ts = 0
+        self.ts_processed = 0
 
         self.folder = ''
 
-    def initialise(self, data):
+    def initialise(self, data, custom_settings=None):
         self.data = data
-        self.settings = data.settings[self.solver_id]
+        if custom_settings is None:
+            self.settings = data.settings[self.solver_id]
+        else:
+            self.settings = custom_settings
         if self.data.structure.settings['unsteady']:
             self.ts_max = self.data.ts + 1
         else:
@@ -85,10 +89,6 @@ class AeroForcesCalculator(BaseSolver):
             self.ts_max = len(self.data.structure.timestep_info)
         settings.to_custom_types(self.settings, self.settings_types, self.settings_default)
 
-    def run(self):
-        self.ts = 0
-
-        self.calculate_forces()
         if self.settings['write_text_file']:
             self.folder = (self.settings['folder'] + '/' +
                            self.data.settings['SHARPy']['case'] + '/' +
@@ -97,92 +97,108 @@ class AeroForcesCalculator(BaseSolver):
             if not os.path.exists(self.folder):
                 os.makedirs(self.folder)
             self.folder += self.settings['text_file_name']
-            self.file_output()
+
+    def run(self, online=False):
+        """
+        Calculates the total forces of the time steps.
+
+        Args:
+            online (bool): If ``True``, only the time steps added since the previous call are processed and appended
+                to the output. Otherwise, all the time steps are processed.
+        """
+        if online:
+            time_steps = np.arange(self.ts_processed, len(self.data.aero.timestep_info))
+        else:
+            time_steps = np.arange(self.ts_max)
+        if len(time_steps) == 0:
+            return self.data
+
+        self.calculate_forces(time_steps)
+        if self.settings['write_text_file']:
+            self.file_output(time_steps, append=online and self.ts_processed > 0)
         if self.settings['screen_output']:
-            self.screen_output()
-        cout.cout_wrap('...Finished', 1)
+            self.screen_output(time_steps, header=not online or self.ts_processed == 0)
+        self.ts_processed = time_steps[-1] + 1
+        if not online:
+            cout.cout_wrap('...Finished', 1)
         return self.data
 
-    def calculate_forces(self):
-        for self.ts in range(self.ts_max):
-            rot = algebra.quat2rotation(self.data.structure.timestep_info[self.ts].quat)
-
-            force = self.data.aero.timestep_info[self.ts].forces
-            unsteady_force = self.data.aero.timestep_info[self.ts].dynamic_forces
-            n_surf = len(force)
-            for i_surf in range(n_surf):
-                total_steady_force = np.zeros((3,))
-                total_unsteady_force = np.zeros((3,))
-                _, n_rows, n_cols = force[i_surf].shape
-                for i_m in range(n_rows):
-                    for i_n in range(n_cols):
-                        total_steady_force += force[i_surf][0:3, i_m, i_n]
-                        total_unsteady_force += unsteady_force[i_surf][0:3, i_m, i_n]
-                self.data.aero.timestep_info[self.ts].inertial_steady_forces[i_surf, 0:3] = total_steady_force
-                self.data.aero.timestep_info[self.ts].inertial_unsteady_forces[i_surf, 0:3] = total_unsteady_force
-                self.data.aero.timestep_info[self.ts].body_steady_forces[i_surf, 0:3] = np.dot(rot.T, total_steady_force)
-                self.data.aero.timestep_info[self.ts].body_unsteady_forces[i_surf, 0:3] = np.dot(rot.T, total_unsteady_force)
+    def calculate_forces(self, time_steps):
+        """
+        Sums the steady and unsteady panel forces of each surface for the given time steps and projects them onto
+        the body frame of reference.
+
+        The sum over the panels of all the time steps is performed at once for each surface, whose forces are
+        stacked in an array ``[n_tsteps, 3, M, N]``.
+        """
+        aero_tsteps = [self.data.aero.timestep_info[ts] for ts in time_steps]
+        rot = np.array([algebra.quat2rotation(self.data.structure.timestep_info[ts].quat) for ts in time_steps])
+
+        n_surf = len(aero_tsteps[0].forces)
+        steady = np.zeros((len(time_steps), n_surf, 3))
+        unsteady = np.zeros((len(time_steps), n_surf, 3))
+        for i_surf in range(n_surf):
+            steady[:, i_surf, :] = np.sum([tstep.forces[i_surf][0:3, :, :] for tstep in aero_tsteps], axis=(2, 3))
+            unsteady[:, i_surf, :] = np.sum([tstep.dynamic_forces[i_surf][0:3, :, :] for tstep in aero_tsteps],
+                                            axis=(2, 3))
+
+        # body forces: C^{AG} f_G for each time step and surface
+        body_steady = np.einsum('tji,tsj->tsi', rot, steady)
+        body_unsteady = np.einsum('tji,tsj->tsi', rot, unsteady)
+
+        for i_tstep, tstep in enumerate(aero_tsteps):
+            tstep.inertial_steady_forces[:, 0:3] = steady[i_tstep]
+            tstep.inertial_unsteady_forces[:, 0:3] = unsteady[i_tstep]
+            tstep.body_steady_forces[:, 0:3] = body_steady[i_tstep]
+            tstep.body_unsteady_forces[:, 0:3] = body_unsteady[i_tstep]
+
+    def total_forces(self, time_steps, forces_name):
+        """
+        Returns the sum over the surfaces of the forces ``forces_name`` (e.g. ``inertial_steady_forces``) of the
+        aerodynamic time steps ``[n_tsteps, 3]``
+        """
+        return np.array([np.sum(getattr(self.data.aero.timestep_info[ts], forces_name)[:, 0:3], 0)
+                         for ts in time_steps])
 
     def calculate_coefficients(self, fx, fy, fz):
         qS = self.settings['q_ref'].value * self.settings['S_ref'].value
         return fx/qS, fy/qS, fz/qS
 
-    def screen_output(self):
-        line = ''
-        cout.cout_wrap.print_separator()
+    def screen_output(self, time_steps, header=True):
+        forces = self.total_forces(time_steps, 'inertial_steady_forces') + \
+                 self.total_forces(time_steps, 'inertial_unsteady_forces')
+
+        if header:
+            cout.cout_wrap.print_separator()
         # output header
         if self.settings['coefficients']:
-            line = "{0:5s} | {1:10s} | {2:10s} | {3:10s} | {4:10s} | {5:10s} | {6:10s}".format(
-                'tstep', '  fx_g', '  fy_g', '  fz_g', '  Cfx_g', '  Cfy_g', '  Cfz_g')
-            cout.cout_wrap(line, 1)
-            for self.ts in range(self.ts_max):
-                fx = np.sum(self.data.aero.timestep_info[self.ts].inertial_steady_forces[:, 0], 0) + \
-                     np.sum(self.data.aero.timestep_info[self.ts].inertial_unsteady_forces[:, 0], 0)
-
-                fy = np.sum(self.data.aero.timestep_info[self.ts].inertial_steady_forces[:, 1], 0) + \
-                     np.sum(self.data.aero.timestep_info[self.ts].inertial_unsteady_forces[:, 1], 0)
-
-                fz = np.sum(self.data.aero.timestep_info[self.ts].inertial_steady_forces[:, 2], 0) + \
-                     np.sum(self.data.aero.timestep_info[self.ts].inertial_unsteady_forces[:, 2], 0)
-
-                Cfx, Cfy, Cfz = self.calculate_coefficients(fx, fy, fz)
-
+            if header:
+                line = "{0:5s} | {1:10s} | {2:10s} | {3:10s} | {4:10s} | {5:10s} | {6:10s}".format(
+                    'tstep', '  fx_g', '  fy_g', '  fz_g', '  Cfx_g', '  Cfy_g', '  Cfz_g')
+                cout.cout_wrap(line, 1)
+            coefficients = np.column_stack(self.calculate_coefficients(forces[:, 0], forces[:, 1], forces[:, 2]))
+            for i_tstep, self.ts in enumerate(time_steps):
                 line = "{0:5d} | {1: 8.3e} | {2: 8.3e} | {3: 8.3e} | {4: 8.3e} | {5: 8.3e} | {6: 8.3e}".format(
-                    self.ts, fx, fy, fz, Cfx, Cfy, Cfz)
+                    self.ts, *forces[i_tstep], *coefficients[i_tstep])
                 cout.cout_wrap(line, 1)
         else:
-            line = "{0:5s} | {1:10s} | {2:10s} | {3:10s}".format(
-                'tstep', '  fx_g', '  fy_g', '  fz_g')
-            cout.cout_wrap(line, 1)
-            for self.ts in range(self.ts_max):
-                fx = np.sum(self.data.aero.timestep_info[self.ts].inertial_steady_forces[:, 0], 0) + \
-                     np.sum(self.data.aero.timestep_info[self.ts].inertial_unsteady_forces[:, 0], 0)
-
-                fy = np.sum(self.data.aero.timestep_info[self.ts].inertial_steady_forces[:, 1], 0) + \
-                     np.sum(self.data.aero.timestep_info[self.ts].inertial_unsteady_forces[:, 1], 0)
-
-                fz = np.sum(self.data.aero.timestep_info[self.ts].inertial_steady_forces[:, 2], 0) + \
-                     np.sum(self.data.aero.timestep_info[self.ts].inertial_unsteady_forces[:, 2], 0)
-
+            if header:
+                line = "{0:5s} | {1:10s} | {2:10s} | {3:10s}".format(
+                    'tstep', '  fx_g', '  fy_g', '  fz_g')
+                cout.cout_wrap(line, 1)
+            for i_tstep, self.ts in enumerate(time_steps):
                 line = "{0:5d} | {1: 8.3e} | {2: 8.3e} | {3: 8.3e}".format(
-                    self.ts, fx, fy, fz)
+                    self.ts, *forces[i_tstep])
                 cout.cout_wrap(line, 1)
 
-    def file_output(self):
+    def file_output(self, time_steps, append=False):
         # assemble forces matrix
         # (1 timestep) + (3+3 inertial steady+unsteady) + (3+3 body steady+unsteady)
-        force_matrix = np.zeros((self.ts_max, 1 + 3 + 3 + 3 + 3))
-        for self.ts in range(self.ts_max):
-            i = 0
-            force_matrix[self.ts, i] = self.ts
-            i += 1
-            force_matrix[self.ts, i:i+3] = np.sum(self.data.aero.timestep_info[self.ts].inertial_steady_forces[:, 0:3], 0)
-            i += 3
-            force_matrix[self.ts, i:i+3] = np.sum(self.data.aero.timestep_info[self.ts].inertial_unsteady_forces[:, 0:3], 0)
-            i += 3
-            force_matrix[self.ts, i:i+3] = np.sum(self.data.aero.timestep_info[self.ts].body_steady_forces[:, 0:3], 0)
-            i += 3
-            force_matrix[self.ts, i:i+3] = np.sum(self.data.aero.timestep_info[self.ts].body_unsteady_forces[:, 0:3], 0)
+        force_matrix = np.column_stack((time_steps,
+                                        self.total_forces(time_steps, 'inertial_steady_forces'),
+                                        self.total_forces(time_steps, 'inertial_unsteady_forces'),
+                                        self.total_forces(time_steps, 'body_steady_forces'),
+                                        self.total_forces(time_steps, 'body_unsteady_forces')))
 
         header = ''
         header += 'tstep, '
@@ -191,9 +207,10 @@ class AeroForcesCalculator(BaseSolver):
         header += 'fx_steady_a, fy_steady_a, fz_steady_a, '
         header += 'fx_unsteady_a, fy_unsteady_a, fz_unsteady_a'
 
-        np.savetxt(self.folder,
-                   force_matrix,
-                   fmt='%i' + ', %10e'*12,
-                   delimiter=',',
-                   header=header,
-                   comments='#')
+        with open(self.folder, 'a' if append else 'w') as fid:
+            np.savetxt(fid,
+                       force_matrix,
+                       fmt='%i' + ', %10e'*12,
+                       delimiter=',',
+                       header='' if append else header,
+                       comments='' if append else '#')
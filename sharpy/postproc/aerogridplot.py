@@ -6,9 +6,10 @@ from tvtk.api import tvtk, write_data
 import sharpy.utils.algebra as algebra
 import sharpy.utils.cout_utils as cout
 from sharpy.utils.settings import str2bool
-from sharpy.utils.solver_interface import solver, BaseSolver
+from sharpy.utils.solver_interface import solver, BaseSolver, run_offline_steps
 import sharpy.utils.settings as settings
 import sharpy.aero.utils.uvlmlib as uvlmlib
+import sharpy.utils.xdmfutils as xdmfutils
 
 
 @solver
@@ -52,6 +53,8 @@ class AerogridPlot(BaseSolver):
 
     settings_types['dt'] = 'float'
     settings_default['dt'] = 0.
+    settings_description['dt'] = 'Time step. It gives the time of the ``xdmf`` output if the solver does not ' \
+                                 'record it'
 
     settings_types['include_velocities'] = 'bool'
     settings_default['include_velocities'] = False
@@ -59,6 +62,19 @@ class AerogridPlot(BaseSolver):
     settings_types['num_cores'] = 'int'
     settings_default['num_cores'] = 1
 
+    settings_types['output_format'] = 'str'
+    settings_default['output_format'] = 'vtu'
+    settings_description['output_format'] = 'Output format. ``vtu`` writes one file per surface and time step. ' \
+                                             '``xdmf`` appends all surfaces and time steps to a single HDF5 file ' \
+                                             'described by an XDMF temporal collection'
+
+    settings_types['num_processes'] = 'int'
+    settings_default['num_processes'] = 1
+    settings_description['num_processes'] = 'Number of processes used to postprocess the stored time steps when ' \
+                                            'run offline'
+
+    supported_output_formats = ('vtu', 'xdmf')
+
     table = settings.SettingsTable()
     __doc__ += table.generate(settings_types, settings_default, settings_description)
 
@@ -71,6 +87,9 @@ class AerogridPlot(BaseSolver):
         self.wake_filename = ''
         self.ts_max = 0
 
+        self.xdmf = None
+        self.connectivities = dict()
+
     def initialise(self, data, custom_settings=None):
         self.data = data
         if custom_settings is None:
@@ -78,6 +97,9 @@ class AerogridPlot(BaseSolver):
         else:
             self.settings = custom_settings
         settings.to_custom_types(self.settings, self.settings_types, self.settings_default)
+        if self.settings['output_format'] not in self.supported_output_formats:
+            raise NotImplementedError('Output format %s not recognised. Supported formats are %s'
+                                      % (self.settings['output_format'], self.supported_output_formats))
         self.ts_max = self.data.ts + 1
         # create folder for containing files if necessary
         if not os.path.exists(self.settings['folder']):
@@ -93,22 +115,150 @@ class AerogridPlot(BaseSolver):
                               self.settings['name_prefix'] +
                               'wake_' +
                               self.data.settings['SHARPy']['case'])
+        if self.settings['output_format'] == 'xdmf':
+            self.xdmf = xdmfutils.XdmfTimeSeries(self.folder +
+                                                 self.settings['name_prefix'] +
+                                                 'aero_' +
+                                                 self.data.settings['SHARPy']['case'])
 
     def run(self, online=False):
         # TODO: Create a dictionary to plot any variable as in beamplot
         if not online:
-            for self.ts in range(self.ts_max):
-                self.plot_body()
-                self.plot_wake()
+            run_offline_steps(self, range(self.ts_max), 'step_grids', 'write_step_grids',
+                              self.settings['num_processes'].value)
+            self.finalise()
             cout.cout_wrap('...Finished', 1)
         else:
             aero_tsteps = len(self.data.aero.timestep_info) - 1
             struct_tsteps = len(self.data.structure.timestep_info) - 1
             self.ts = np.max((aero_tsteps, struct_tsteps))
-            self.plot_body()
-            self.plot_wake()
+            self.plot_step()
         return self.data
 
+    def plot_step(self):
+        self.write_step_grids(self.ts, self.step_grids(self.ts))
+
+    def step_grids(self, ts):
+        """
+        Writes the ``vtu`` files of the time step ``ts`` or, for the ``xdmf`` output, returns its grids
+        ``[(name, (coords, conn, point_data, cell_data)), ...]`` to be written by :meth:`write_step_grids`.
+        """
+        self.ts = ts
+        if self.settings['output_format'] == 'xdmf':
+            grids = []
+            for i_surf in range(self.data.aero.timestep_info[self.ts].n_surf):
+                grids.append(('body_%02u' % i_surf, self.body_grid(i_surf)))
+                grids.append(('wake_%02u' % i_surf, self.wake_grid(i_surf)))
+            return grids
+
+        self.plot_body()
+        self.plot_wake()
+
+    def write_step_grids(self, ts, grids):
+        if self.settings['output_format'] == 'xdmf':
+            self.xdmf.add_step(xdmfutils.step_time(self.data, ts, self.settings['dt'].value))
+            for name, (coords, conn, point_data, cell_data) in grids:
+                self.xdmf.add_grid(name, coords, conn, 'Quadrilateral', point_data, cell_data)
+            self.xdmf.write_step()
+
+    def finalise(self):
+        if self.xdmf is not None:
+            self.xdmf.close()
+            self.xdmf = None
+
+    def surface_connectivity(self, dims):
+        """
+        Quadrilateral connectivity of a lattice of ``dims[0] x dims[1]`` panels, whose vertices are numbered
+        with the chordwise index running fastest. It only depends on the dimensions, hence it is computed once.
+        """
+        key = (dims[0], dims[1])
+        try:
+            return self.connectivities[key]
+        except KeyError:
+            pass
+
+        i_m, i_n = np.meshgrid(np.arange(dims[0]), np.arange(dims[1]))
+        node = (i_n * (dims[0] + 1) + i_m).ravel()
+        self.connectivities[key] = np.column_stack((node, node + 1, node + dims[0] + 2, node + dims[0] + 1))
+        return self.connectivities[key]
+
+    def lattice_coords(self, zeta):
+        """
+        Coordinates of the lattice vertices ``zeta[3, M+1, N+1]`` in the plotting frame, numbered with the
+        chordwise index running fastest.
+        """
+        coords = zeta.transpose((2, 1, 0)).reshape((-1, 3)).copy()
+        if self.settings['include_rbm']:
+            coords += self.data.structure.timestep_info[self.ts].for_pos[0:3]
+        if self.settings['include_forward_motion']:
+            coords[:, 0] -= self.settings['dt'].value*self.ts*self.settings['u_inf'].value
+        return coords
+
+    def body_grid(self, i_surf):
+        """
+        Coordinates, connectivity, point and cell data of the ``i_surf`` surface at the current time step.
+        """
+        tstep = self.data.aero.timestep_info[self.ts]
+        dims = tstep.dimensions[i_surf, :]
+
+        def vertex_data(name):
+            try:
+                return getattr(tstep, name)[i_surf][0:3, :, :].transpose((2, 1, 0)).reshape((-1, 3))
+            except AttributeError:
+                return np.zeros(((dims[0] + 1)*(dims[1] + 1), 3))
+
+        coords = self.lattice_coords(tstep.zeta[i_surf])
+        conn = self.surface_connectivity(dims)
+
+        point_data = dict()
+        point_data['n_id'] = np.arange(0, coords.shape[0])
+        point_data['point_struct_id'] = np.repeat(np.array(self.data.aero.aero2struct_mapping[i_surf][:dims[1] + 1]),
+                                                  dims[0] + 1)
+        point_data['point_steady_force'] = vertex_data('forces')
+        point_data['point_unsteady_force'] = vertex_data('dynamic_forces')
+        point_data['zeta_dot'] = vertex_data('zeta_dot')
+        point_data['u_inf'] = vertex_data('u_ext')
+        if self.settings['include_velocities']:
+            point_data['velocity'] = uvlmlib.uvlm_calculate_total_induced_velocity_at_points(tstep,
+                                                                                           coords,
+                                                                                           tstep.for_pos,
+                                                                                           self.settings['num_cores'])
+
+        cell_data = dict()
+        cell_data['panel_n_id'] = np.arange(0, conn.shape[0])
+        cell_data['panel_surface_id'] = np.full((conn.shape[0],), i_surf, dtype=int)
+        cell_data['panel_gamma'] = tstep.gamma[i_surf].T.ravel()
+        cell_data['panel_gamma_dot'] = tstep.gamma_dot[i_surf].T.ravel()
+        try:
+            cell_data['incidence_angle'] = tstep.postproc_cell['incidence_angle'][i_surf].T.ravel()
+        except KeyError:
+            pass
+        cell_data['panel_normal'] = tstep.normals[i_surf].transpose((2, 1, 0)).reshape((-1, 3))
+
+        return coords, conn, point_data, cell_data
+
+    def wake_grid(self, i_surf):
+        """
+        Coordinates, connectivity, point and cell data of the wake of the ``i_surf`` surface at the current time
+        step.
+        """
+        tstep = self.data.aero.timestep_info[self.ts]
+        dims_star = tstep.dimensions_star[i_surf, :].copy()
+        dims_star[0] -= self.settings['minus_m_star']
+
+        coords = self.lattice_coords(tstep.zeta_star[i_surf][:, :dims_star[0] + 1, :dims_star[1] + 1])
+        conn = self.surface_connectivity(dims_star)
+
+        point_data = dict()
+        point_data['n_id'] = np.arange(0, coords.shape[0])
+
+        cell_data = dict()
+        cell_data['panel_n_id'] = np.arange(0, conn.shape[0])
+        cell_data['panel_surface_id'] = np.full((conn.shape[0],), i_surf, dtype=int)
+        cell_data['panel_gamma'] = tstep.gamma_star[i_surf][:dims_star[0], :dims_star[1]].T.ravel()
+
+        return coords, conn, point_data, cell_data
+
     def plot_body(self):
         for i_surf in range(self.data.aero.timestep_info[self.ts].n_surf):
             filename = (self.body_filename +
@@ -116,90 +266,22 @@ class AerogridPlot(BaseSolver):
                         '%02u_' % i_surf +
                         '%06u' % self.ts)
 
-            dims = self.data.aero.timestep_info[self.ts].dimensions[i_surf, :]
-            point_data_dim = (dims[0]+1)*(dims[1]+1)  # + (dims_star[0]+1)*(dims_star[1]+1)
-            panel_data_dim = (dims[0])*(dims[1])  # + (dims_star[0])*(dims_star[1])
-
-            coords = np.zeros((point_data_dim, 3))
-            conn = []
-            panel_id = np.zeros((panel_data_dim,), dtype=int)
-            panel_surf_id = np.zeros((panel_data_dim,), dtype=int)
-            panel_gamma = np.zeros((panel_data_dim,))
-            panel_gamma_dot = np.zeros((panel_data_dim,))
-            normal = np.zeros((panel_data_dim, 3))
-            point_struct_id = np.zeros((point_data_dim,), dtype=int)
-            point_cf = np.zeros((point_data_dim, 3))
-            point_unsteady_cf = np.zeros((point_data_dim, 3))
-            zeta_dot = np.zeros((point_data_dim, 3))
-            u_inf = np.zeros((point_data_dim, 3))
-            if self.settings['include_velocities']:
-                vel = np.zeros((point_data_dim, 3))
-            counter = -1
-
-            # coordinates of corners
-            for i_n in range(dims[1]+1):
-                for i_m in range(dims[0]+1):
-                    counter += 1
-                    coords[counter, :] = self.data.aero.timestep_info[self.ts].zeta[i_surf][:, i_m, i_n]
-                    if self.settings['include_rbm']:
-                        coords[counter, :] += self.data.structure.timestep_info[self.ts].for_pos[0:3]
-                    if self.settings['include_forward_motion']:
-                        coords[counter, 0] -= self.settings['dt'].value*self.ts*self.settings['u_inf'].value
-
-            with_incidence_angle = True
-            try:
-                self.data.aero.timestep_info[self.ts].postproc_cell['incidence_angle']
-            except KeyError:
-                with_incidence_angle = False
-            else:
-                incidence_angle = np.zeros_like(panel_gamma)
-
-            counter = -1
-            node_counter = -1
-            for i_n in range(dims[1] + 1):
-                global_counter = self.data.aero.aero2struct_mapping[i_surf][i_n]
-                for i_m in range(dims[0] + 1):
-                    node_counter += 1
-                    # point data
-                    point_struct_id[node_counter] = global_counter
-                    point_cf[node_counter, :] = self.data.aero.timestep_info[self.ts].forces[i_surf][0:3, i_m, i_n]
-                    try:
-                        point_unsteady_cf[node_counter, :] = self.data.aero.timestep_info[self.ts].dynamic_forces[i_surf][0:3, i_m, i_n]
-                    except AttributeError:
-                        pass
-                    try:
-                        zeta_dot[node_counter, :] = self.data.aero.timestep_info[self.ts].zeta_dot[i_surf][0:3, i_m, i_n]
-                    except AttributeError:
-                        pass
-                    try:
-                        u_inf[node_counter, :] = self.data.aero.timestep_info[self.ts].u_ext[i_surf][0:3, i_m, i_n]
-                    except AttributeError:
-                        pass
-                    if i_n < dims[1] and i_m < dims[0]:
-                        counter += 1
-                    else:
-                        continue
-
-                    conn.append([node_counter + 0,
-                                 node_counter + 1,
-                                 node_counter + dims[0]+2,
-                                 node_counter + dims[0]+1])
-                    # cell data
-                    normal[counter, :] = self.data.aero.timestep_info[self.ts].normals[i_surf][:, i_m, i_n]
-                    panel_id[counter] = counter
-                    panel_surf_id[counter] = i_surf
-                    panel_gamma[counter] = self.data.aero.timestep_info[self.ts].gamma[i_surf][i_m, i_n]
-                    panel_gamma_dot[counter] = self.data.aero.timestep_info[self.ts].gamma_dot[i_surf][i_m, i_n]
-
-                    if with_incidence_angle:
-                        incidence_angle[counter] = \
-                            self.data.aero.timestep_info[self.ts].postproc_cell['incidence_angle'][i_surf][i_m, i_n]
-
+            coords, conn, point_data, cell_data = self.body_grid(i_surf)
+            panel_id = cell_data['panel_n_id']
+            panel_surf_id = cell_data['panel_surface_id']
+            panel_gamma = cell_data['panel_gamma']
+            panel_gamma_dot = cell_data['panel_gamma_dot']
+            with_incidence_angle = 'incidence_angle' in cell_data
+            if with_incidence_angle:
+                incidence_angle = cell_data['incidence_angle']
+            normal = cell_data['panel_normal']
+            point_struct_id = point_data['point_struct_id']
+            point_cf = point_data['point_steady_force']
+            point_unsteady_cf = point_data['point_unsteady_force']
+            zeta_dot = point_data['zeta_dot']
+            u_inf = point_data['u_inf']
             if self.settings['include_velocities']:
-                vel = uvlmlib.uvlm_calculate_total_induced_velocity_at_points(self.data.aero.timestep_info[self.ts],
-                                                                                              coords,
-                                                                                              self.data.aero.timestep_info[self.ts].for_pos,
-                                                                                              self.settings['numcores'])
+                vel = point_data['velocity']
 
             ug = tvtk.UnstructuredGrid(points=coords)
             ug.set_cells(tvtk.Quad().cell_type, conn)
@@ -240,48 +322,10 @@ class AerogridPlot(BaseSolver):
                         '%02u_' % i_surf +
                         '%06u' % self.ts)
 
-            dims_star = self.data.aero.timestep_info[self.ts].dimensions_star[i_surf, :]
-            dims_star[0] -= self.settings['minus_m_star']
-
-            point_data_dim = (dims_star[0]+1)*(dims_star[1]+1)
-            panel_data_dim = (dims_star[0])*(dims_star[1])
-
-            coords = np.zeros((point_data_dim, 3))
-            conn = []
-            panel_id = np.zeros((panel_data_dim,), dtype=int)
-            panel_surf_id = np.zeros((panel_data_dim,), dtype=int)
-            panel_gamma = np.zeros((panel_data_dim,))
-            counter = -1
-            # rotation_mat = self.data.structure.timestep_info[self.ts].cga().T
-            # coordinates of corners
-            for i_n in range(dims_star[1]+1):
-                for i_m in range(dims_star[0]+1):
-                    counter += 1
-                    coords[counter, :] = self.data.aero.timestep_info[self.ts].zeta_star[i_surf][:, i_m, i_n]
-                    if self.settings['include_rbm']:
-                        coords[counter, :] += self.data.structure.timestep_info[self.ts].for_pos[0:3]
-                    if self.settings['include_forward_motion']:
-                        coords[counter, 0] -= self.settings['dt'].value*self.ts*self.settings['u_inf'].value
-
-            counter = -1
-            node_counter = -1
-            # wake
-            for i_n in range(dims_star[1]+1):
-                for i_m in range(dims_star[0]+1):
-                    node_counter += 1
-                    # cell data
-                    if i_n < dims_star[1] and i_m < dims_star[0]:
-                        counter += 1
-                    else:
-                        continue
-
-                    conn.append([node_counter + 0,
-                                 node_counter + 1,
-                                 node_counter + dims_star[0]+2,
-                                 node_counter + dims_star[0]+1])
-                    panel_id[counter] = counter
-                    panel_surf_id[counter] = i_surf
-                    panel_gamma[counter] = self.data.aero.timestep_info[self.ts].gamma_star[i_surf][i_m, i_n]
+            coords, conn, point_data, cell_data = self.wake_grid(i_surf)
+            panel_id = cell_data['panel_n_id']
+            panel_surf_id = cell_data['panel_surface_id']
+            panel_gamma = cell_data['panel_gamma']
 
             ug = tvtk.UnstructuredGrid(points=coords)
             ug.set_cells(tvtk.Quad().cell_type, conn)
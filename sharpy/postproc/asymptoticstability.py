@@ -8,6 +8,7 @@ import sharpy.utils.h5utils as h5
 import sharpy.utils.cout_utils as cout
 import sharpy.utils.algebra as algebra
 import sharpy.solvers.lindynamicsim as lindynamicsim
+from sharpy.linear.utils.ss_interface import state_indices
 import sharpy.structure.utils.modalutils as modalutils
 
 
@@ -49,6 +50,23 @@ class AsymptoticStability(BaseSolver):
     settings_description['export_eigenvalues'] = 'Save eigenvalues and eigenvectors to file. ' \
                                                  'Details in :func:`AsymptoticStability.export_eigenvalues`'
 
+    settings_types['export_format'] = 'str'
+    settings_default['export_format'] = 'dat'
+    settings_description['export_format'] = 'Format of the exported eigenvalues and eigenvectors: ``dat`` for text ' \
+                                            'files or ``h5`` for a compressed binary file. The eigenvectors exported ' \
+                                            'in ``h5`` format are not kept in memory and are read back from the ' \
+                                            'file when needed'
+
+    settings_types['export_variables'] = 'list(str)'
+    settings_default['export_variables'] = []
+    settings_description['export_variables'] = 'State variables (e.g. ``eta``, ``gamma``) whose rows of the ' \
+                                               'eigenvectors are exported in ``h5`` format. If empty, all the ' \
+                                               'states are exported'
+
+    settings_types['compress_float'] = 'bool'
+    settings_default['compress_float'] = False
+    settings_description['compress_float'] = 'Export the eigenvectors in single precision in ``h5`` format'
+
     settings_types['display_root_locus'] = 'bool'
     settings_default['display_root_locus'] = False
     settings_description['display_root_locus'] = 'Show plot with eigenvalues on Argand diagram'
@@ -74,6 +92,8 @@ class AsymptoticStability(BaseSolver):
     settings_table = settings.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
 
+    supported_export_formats = ('dat', 'h5')
+
     def __init__(self):
         self.settings = None
         self.data = None
@@ -100,6 +120,10 @@ class AsymptoticStability(BaseSolver):
 
         self.num_evals = self.settings['num_evals'].value
 
+        if self.settings['export_format'] not in self.supported_export_formats:
+            raise NotImplementedError('Export format %s not recognised. Supported formats are %s'
+                                      % (self.settings['export_format'], self.supported_export_formats))
+
         stability_folder_path = self.settings['folder'] + '/' + self.data.settings['SHARPy']['case'] + '/stability'
         if not os.path.exists(stability_folder_path):
             os.makedirs(stability_folder_path)
@@ -159,6 +183,8 @@ class AsymptoticStability(BaseSolver):
 
         if self.settings['export_eigenvalues'].value:
             self.export_eigenvalues(self.num_evals)
+            if self.settings['export_format'] == 'h5':
+                self.eigenvectors = None
 
         if self.settings['print_info'].value:
             self.eigenvalue_table.print_evals(self.eigenvalues[:self.num_evals])
@@ -181,8 +207,14 @@ class AsymptoticStability(BaseSolver):
 
     def export_eigenvalues(self, num_evals):
         """
-        Saves a ``num_evals`` number of eigenvalues and eigenvectors to file. The files are saved in the output directoy
-        and include:
+        Saves a ``num_evals`` number of eigenvalues and eigenvectors to file. The files are saved in the output directoy.
+
+        If ``export_format == 'h5'``, the eigenvalues and eigenvectors are written to the compressed binary file
+        ``eigen_data.h5`` (see :func:`sharpy.structure.utils.modalutils.write_eigen_data`). Only the rows of the
+        eigenvectors corresponding to the ``export_variables`` are written, and their indices are saved in the
+        ``dof_indices`` dataset. The modes can be loaded back with :func:`AsymptoticStability.mode_shape`.
+
+        Otherwise, the text files include:
 
             * ``eigenvectors.dat``: ``(num_dof, num_evals)`` array of eigenvectors
 
@@ -202,10 +234,48 @@ class AsymptoticStability(BaseSolver):
 
         num_evals = min(num_evals, self.eigenvalues.shape[0])
 
+        if self.settings['export_format'] == 'h5':
+            dof_indices = state_indices(self.data.linear.linear_system,
+                                        self.eigenvectors.shape[0],
+                                        self.settings['export_variables'])
+            modalutils.write_eigen_data(stability_folder_path + '/eigen_data.h5',
+                                        self.eigenvalues,
+                                        self.eigenvectors,
+                                        num_evals=num_evals,
+                                        dof_indices=dof_indices,
+                                        compress_float=self.settings['compress_float'].value)
+            return
+
         np.savetxt(stability_folder_path + '/eigenvalues.dat', self.eigenvalues[:num_evals].view(float).reshape(-1, 2))
         np.savetxt(stability_folder_path + '/eigenvectors_r.dat', self.eigenvectors.real[:, :num_evals])
         np.savetxt(stability_folder_path + '/eigenvectors_i.dat', self.eigenvectors.imag[:, :num_evals])
 
+    def mode_shape(self, mode):
+        """
+        Returns the eigenvalue and eigenvector of a mode.
+
+        If the eigenvectors have been exported in ``h5`` format, they are no longer held in memory and the mode is
+        read from the ``eigen_data.h5`` file in the output folder. The states that were not exported are returned as
+        zero.
+
+        Args:
+            mode (int): Mode number
+
+        Returns:
+            tuple: Eigenvalue and eigenvector ``[num_states]``
+        """
+        if self.eigenvectors is not None:
+            return self.eigenvalues[mode], self.eigenvectors[:, mode]
+
+        eigen_data = modalutils.read_eigen_data(self.folder + '/eigen_data.h5', modes=[mode])
+        eigenvector = eigen_data['eigenvectors'][:, 0]
+        if eigen_data['dof_indices'] is not None:
+            eigenvector_full = np.zeros(self.data.linear.ss.states, dtype=eigenvector.dtype)
+            eigenvector_full[eigen_data['dof_indices']] = eigenvector
+            eigenvector = eigenvector_full
+
+        return eigen_data['eigenvalues'][0], eigenvector
+
     def print_eigenvalues(self):
         """
         Prints the eigenvalues to a table with the corresponding natural frequency, period and damping ratios
@@ -316,14 +386,15 @@ class AsymptoticStability(BaseSolver):
             return
         mode_shape_list = self.settings['modes_to_plot']
         for mode in mode_shape_list:
+            eigenvalue, eigenvector = self.mode_shape(mode)
             # Scale mode
             aero_states = self.data.linear.linear_system.uvlm.ss.states
             displacement_states = self.data.linear.linear_system.beam.ss.states // 2
             amplitude_factor = modalutils.scale_mode(self.data,
-                                                self.eigenvectors[aero_states:aero_states + displacement_states-9,
-                                                mode], rot_max_deg=10, perc_max=0.1)
+                                                eigenvector[aero_states:aero_states + displacement_states-9],
+                                                rot_max_deg=10, perc_max=0.1)
 
-            fact_rbm = self.scale_rigid_body_mode(self.eigenvectors[:, mode], self.eigenvalues[mode].imag)* 100
+            fact_rbm = self.scale_rigid_body_mode(eigenvector, eigenvalue.imag)* 100
             print(fact_rbm)
 
             t, x = self.mode_time_domain(amplitude_factor, fact_rbm, mode)
@@ -381,15 +452,14 @@ class AsymptoticStability(BaseSolver):
 
 
         # Time domain representation of the mode
-        eigenvalue = self.eigenvalues[mode_num]
+        eigenvalue, eigenvector = self.mode_shape(mode_num)
         natural_freq = np.abs(eigenvalue)
         damping = eigenvalue.real / natural_freq
         period = 2*np.pi / natural_freq
         dt = period/100
         t_dom = np.linspace(0, 2 * period, int(np.ceil(2 * cycles * period/dt)))
         t_dom.shape = (1, len(t_dom))
-        eigenvector = self.eigenvectors[:, mode_num]
-        eigenvector.shape = (len(eigenvector), 1)
+        eigenvector = eigenvector.reshape((-1, 1))
 
         # eigenvector[-10:] *= fact_rbm
         # eigenvector[-self.data.linear.linear_system.beam.ss.states // 2 - 10: -self.data.linear.linear_system.beam.ss.states] *= fact_rbm
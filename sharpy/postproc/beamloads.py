@@ -4,7 +4,7 @@ import numpy as np
 from tvtk.api import tvtk, write_data
 
 import sharpy.utils.cout_utils as cout
-from sharpy.utils.solver_interface import solver, BaseSolver
+from sharpy.utils.solver_interface import solver, BaseSolver, run_offline_steps
 import sharpy.utils.settings as settings
 import sharpy.utils.algebra as algebra
 import sharpy.structure.utils.xbeamlib as xbeamlib
@@ -35,6 +35,11 @@ class BeamLoads(BaseSolver):
     settings_default['folder'] = './output'
     settings_description['folder'] = 'Output folder path'
 
+    settings_types['num_processes'] = 'int'
+    settings_default['num_processes'] = 1
+    settings_description['num_processes'] = 'Number of processes used to postprocess the stored time steps when ' \
+                                            'run offline'
+
     settings_table = settings.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
 
@@ -82,7 +87,6 @@ class BeamLoads(BaseSolver):
             np.savetxt(filename, data, delimiter=',', header=header)
         else:
             for it in range(len(self.data.structure.timestep_info)):
-                it = len(self.data.structure.timestep_info) - 1
                 n_elem = self.data.structure.timestep_info[it].num_elem
                 data = np.zeros((n_elem, 10))
                 # coords
@@ -109,17 +113,24 @@ class BeamLoads(BaseSolver):
                                                                                                    it)
             self.calculate_coords_a(self.data.structure.timestep_info[it])
         else:
-            for it in range(len(self.data.structure.timestep_info)):
-                (self.data.structure.timestep_info[it].postproc_cell['strain'],
-                 self.data.structure.timestep_info[it].postproc_cell['loads']) = xbeamlib.cbeam3_loads(self.data.structure,
-                                                                                                       it)
-                self.calculate_coords_a(self.data.structure.timestep_info[it])
+            run_offline_steps(self, range(len(self.data.structure.timestep_info)), 'step_loads', 'store_step_loads',
+                              self.settings['num_processes'].value)
+            # element coordinates of all the time steps at once
+            coords_a = np.array([tstep.pos for tstep in self.data.structure.timestep_info])[
+                :, self.data.structure.connectivities[:, 2], :]
+            for it, tstep in enumerate(self.data.structure.timestep_info):
+                tstep.postproc_cell['coords_a'] = coords_a[it]
+
+    def step_loads(self, it):
+        return xbeamlib.cbeam3_loads(self.data.structure, it)
+
+    def store_step_loads(self, it, strain_loads):
+        (self.data.structure.timestep_info[it].postproc_cell['strain'],
+         self.data.structure.timestep_info[it].postproc_cell['loads']) = strain_loads
 
     def calculate_coords_a(self, timestep_info):
-        timestep_info.postproc_cell['coords_a'] = np.zeros((timestep_info.num_elem, 3))
-        for ielem in range(timestep_info.num_elem):
-            iglobal_node = self.data.structure.connectivities[ielem, 2]
-            timestep_info.postproc_cell['coords_a'][ielem, :] = timestep_info.pos[iglobal_node, :]
+        # the element coordinates are those of the mid node
+        timestep_info.postproc_cell['coords_a'] = timestep_info.pos[self.data.structure.connectivities[:, 2], :]
 
     # def calculate_loads(self):
     #     # initial (ini) loads
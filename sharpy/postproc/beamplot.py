@@ -4,9 +4,10 @@ import numpy as np
 from tvtk.api import tvtk, write_data
 
 import sharpy.utils.cout_utils as cout
-from sharpy.utils.solver_interface import solver, BaseSolver
+from sharpy.utils.solver_interface import solver, BaseSolver, run_offline_steps
 import sharpy.utils.settings as settings
 import sharpy.utils.algebra as algebra
+import sharpy.utils.xdmfutils as xdmfutils
 
 
 @solver
@@ -49,6 +50,24 @@ class BeamPlot(BaseSolver):
     settings_default['output_rbm'] = True
     settings_description['output_rbm'] = 'Write ``csv`` file with rigid body motion data'
 
+    settings_types['output_format'] = 'str'
+    settings_default['output_format'] = 'vtu'
+    settings_description['output_format'] = 'Output format. ``vtu`` writes one file per time step. ``xdmf`` ' \
+                                             'appends all time steps to a single HDF5 file described by an XDMF ' \
+                                             'temporal collection'
+
+    settings_types['dt'] = 'float'
+    settings_default['dt'] = 0.
+    settings_description['dt'] = 'Time step. It gives the time of the ``xdmf`` output if the solver does not ' \
+                                 'record it'
+
+    settings_types['num_processes'] = 'int'
+    settings_default['num_processes'] = 1
+    settings_description['num_processes'] = 'Number of processes used to postprocess the stored time steps when ' \
+                                            'run offline'
+
+    supported_output_formats = ('vtu', 'xdmf')
+
     settings_table = settings.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
 
@@ -60,6 +79,9 @@ class BeamPlot(BaseSolver):
         self.folder = ''
         self.filename = ''
 
+        self.xdmf = None
+        self.connectivity = None
+
     def initialise(self, data, custom_settings=None):
         self.data = data
         if custom_settings is None:
@@ -67,6 +89,9 @@ class BeamPlot(BaseSolver):
         else:
             self.settings = custom_settings
         settings.to_custom_types(self.settings, self.settings_types, self.settings_default)
+        if self.settings['output_format'] not in self.supported_output_formats:
+            raise NotImplementedError('Output format %s not recognised. Supported formats are %s'
+                                      % (self.settings['output_format'], self.supported_output_formats))
         # create folder for containing files if necessary
         if not os.path.exists(self.settings['folder']):
             os.makedirs(self.settings['folder'])
@@ -81,11 +106,14 @@ class BeamPlot(BaseSolver):
                          self.settings['name_prefix'] +
                          'for_' +
                          self.data.settings['SHARPy']['case'])
+        if self.settings['output_format'] == 'xdmf':
+            self.xdmf = xdmfutils.XdmfTimeSeries(self.filename)
 
     def run(self, online=False):
         self.plot(online)
         if not online:
             self.write()
+            self.finalise()
             cout.cout_wrap('...Finished', 1)
         return self.data
 
@@ -101,213 +129,162 @@ class BeamPlot(BaseSolver):
 
     def plot(self, online):
         if not online:
-            for it in range(len(self.data.structure.timestep_info)):
-                self.write_beam(it)
-                if self.settings['include_FoR']:
-                    self.write_for(it)
+            run_offline_steps(self, range(len(self.data.structure.timestep_info)), 'step_grids', 'write_step_grids',
+                              self.settings['num_processes'].value)
         else:
             it = len(self.data.structure.timestep_info) - 1
-            self.write_beam(it)
+            self.plot_step(it)
+
+    def plot_step(self, it):
+        self.write_step_grids(it, self.step_grids(it))
+
+    def step_grids(self, it):
+        """
+        Writes the ``vtu`` files of the time step ``it`` or, for the ``xdmf`` output, returns its grids
+        ``[(name, topology, (coords, conn, point_data, cell_data)), ...]`` to be written by
+        :meth:`write_step_grids`.
+        """
+        if self.settings['output_format'] == 'xdmf':
+            grids = [('beam', 'Polyline', self.beam_grid(it))]
             if self.settings['include_FoR']:
-                self.write_for(it)
-
-    def write_beam(self, it):
-        it_filename = (self.filename +
-                       '%06u' % it)
+                FoR_coords, FoR_point_data = self.for_grid(it)
+                grids.append(('for', 'Polyvertex', (FoR_coords, np.arange(FoR_coords.shape[0]).reshape((-1, 1)),
+                                                    FoR_point_data, None)))
+            return grids
+
+        self.write_beam(it)
+        if self.settings['include_FoR']:
+            self.write_for(it)
+
+    def write_step_grids(self, it, grids):
+        if self.settings['output_format'] == 'xdmf':
+            self.xdmf.add_step(xdmfutils.step_time(self.data, it, self.settings['dt'].value))
+            for name, topology, (coords, conn, point_data, cell_data) in grids:
+                self.xdmf.add_grid(name, coords, conn, topology, point_data, cell_data)
+            self.xdmf.write_step()
+
+    def finalise(self):
+        if self.xdmf is not None:
+            self.xdmf.close()
+            self.xdmf = None
+
+    def beam_grid(self, it):
+        """
+        Coordinates, connectivity, point and cell data of the beam at the time step ``it``.
+        """
+        tstep = self.data.structure.timestep_info[it]
         num_nodes = self.data.structure.num_node
         num_elem = self.data.structure.num_elem
 
-        coords = np.zeros((num_nodes, 3))
-        conn = np.zeros((num_elem, 3), dtype=int)
-        node_id = np.zeros((num_nodes,), dtype=int)
-        elem_id = np.zeros((num_elem,), dtype=int)
-        coords_a_cell = np.zeros((num_elem, 3), dtype=int)
-        local_x = np.zeros((num_nodes, 3))
-        local_y = np.zeros((num_nodes, 3))
-        local_z = np.zeros((num_nodes, 3))
-        coords_a = np.zeros((num_nodes, 3))
+        # the connectivity is constant
+        if self.connectivity is None:
+            self.connectivity = np.array([self.data.structure.elements[i_elem].reordered_global_connectivities
+                                          for i_elem in range(num_elem)], dtype=int)
 
-        app_forces = np.zeros((num_nodes, 3))
-        app_moment = np.zeros((num_nodes, 3))
+        # aero2inertial rotation
+        aero2inertial = tstep.cga()
 
-        forces_constraints_nodes = np.zeros((num_nodes, 3))
-        moments_constraints_nodes = np.zeros((num_nodes, 3))
+        # rotation from the local frame of each node to the inertial frame
+        i_elem = self.data.structure.node_master_elem[:, 0]
+        i_local_node = self.data.structure.node_master_elem[:, 1]
+        rot = np.array([np.dot(aero2inertial, algebra.crv2rotation(psi)) for psi in tstep.psi[i_elem, i_local_node, :]])
 
-        # aero2inertial rotation
-        aero2inertial = self.data.structure.timestep_info[it].cga()
+        def to_inertial(vectors):
+            return np.einsum('nij,nj->ni', rot, vectors)
 
-        # coordinates of corners
-        coords = self.data.structure.timestep_info[it].glob_pos(include_rbm=self.settings['include_rbm'])
+        coords_a_cell = np.zeros((num_elem, 3))
+        coords_a_cell[i_elem[i_local_node == 2], :] = tstep.pos[i_local_node == 2, :]
 
-        # check if I can output gravity forces
-        with_gravity = False
-        try:
-            gravity_forces = self.data.structure.timestep_info[it].gravity_forces[:]
-            gravity_forces_g = np.zeros_like(gravity_forces)
-            with_gravity = True
-        except AttributeError:
-            pass
+        point_data = dict()
+        point_data['node_id'] = np.arange(num_nodes)
+        point_data['local_x'] = rot[:, :, 0]
+        point_data['local_y'] = rot[:, :, 1]
+        point_data['local_z'] = rot[:, :, 2]
+        point_data['coords_a'] = tstep.pos.copy()
 
-        # check if postproc dicts are present and count/prepare
-        with_postproc_cell = False
-        try:
-            self.data.structure.timestep_info[it].postproc_cell
-            with_postproc_cell = True
-        except AttributeError:
-            pass
-        with_postproc_node = False
+        applied_forces = tstep.steady_applied_forces + tstep.unsteady_applied_forces
         try:
-            self.data.structure.timestep_info[it].postproc_node
-            with_postproc_node = True
+            gravity_forces_g = np.zeros_like(tstep.gravity_forces)
+            gravity_forces_g[:, 0:3] = np.dot(tstep.gravity_forces[:, 0:3], aero2inertial.T)
+            gravity_forces_g[:, 3:6] = np.dot(tstep.gravity_forces[:, 3:6], aero2inertial.T)
         except AttributeError:
-            pass
-
-        # count number of arguments
-        postproc_cell_keys = self.data.structure.timestep_info[it].postproc_cell.keys()
-        postproc_cell_vals = self.data.structure.timestep_info[it].postproc_cell.values()
-        postproc_cell_scalar = []
-        postproc_cell_vector = []
-        postproc_cell_6vector = []
-        for k, v in self.data.structure.timestep_info[it].postproc_cell.items():
-            _, cols = v.shape
-            if cols == 1:
-                raise NotImplementedError('scalar cell types not supported in beamplot (Easy to implement)')
-                # postproc_cell_scalar.append(k)
-            elif cols == 3:
-                postproc_cell_vector.append(k)
-            elif cols == 6:
-                postproc_cell_6vector.append(k)
-            else:
-                raise AttributeError('Only scalar and 3-vector types supported in beamplot')
-        # count number of arguments
-        postproc_node_keys = self.data.structure.timestep_info[it].postproc_node.keys()
-        postproc_node_vals = self.data.structure.timestep_info[it].postproc_node.values()
-        postproc_node_scalar = []
-        postproc_node_vector = []
-        postproc_node_6vector = []
-        for k, v in self.data.structure.timestep_info[it].postproc_node.items():
-            _, cols = v.shape
-            if cols == 1:
-                raise NotImplementedError('scalar node types not supported in beamplot (Easy to implement)')
-                # postproc_cell_scalar.append(k)
-            elif cols == 3:
-                postproc_node_vector.append(k)
-            elif cols == 6:
-                postproc_node_6vector.append(k)
-            else:
-                raise AttributeError('Only scalar and 3-vector types supported in beamplot')
-
-        for i_node in range(num_nodes):
-            i_elem = self.data.structure.node_master_elem[i_node, 0]
-            i_local_node = self.data.structure.node_master_elem[i_node, 1]
-            node_id[i_node] = i_node
-
-            v1 = np.array([1., 0, 0])
-            v2 = np.array([0., 1, 0])
-            v3 = np.array([0., 0, 1])
-            cab = algebra.crv2rotation(
-                self.data.structure.timestep_info[it].psi[i_elem, i_local_node, :])
-            local_x[i_node, :] = np.dot(aero2inertial, np.dot(cab, v1))
-            local_y[i_node, :] = np.dot(aero2inertial, np.dot(cab, v2))
-            local_z[i_node, :] = np.dot(aero2inertial, np.dot(cab, v3))
-
-            if i_local_node == 2:
-                coords_a_cell[i_elem, :] = self.data.structure.timestep_info[it].pos[i_node, :]
-            coords_a[i_node, :] = self.data.structure.timestep_info[it].pos[i_node, :]
-
-            # applied forces
-            cab = algebra.crv2rotation(self.data.structure.timestep_info[it].psi[i_elem, i_local_node, :])
-            app_forces[i_node, :] = np.dot(aero2inertial,
-                                           np.dot(cab,
-                                                  self.data.structure.timestep_info[it].steady_applied_forces[i_node, 0:3]+
-                                                  self.data.structure.timestep_info[it].unsteady_applied_forces[i_node, 0:3]))
-            app_moment[i_node, :] = np.dot(aero2inertial,
-                                           np.dot(cab,
-                                                  self.data.structure.timestep_info[it].steady_applied_forces[i_node, 3:6]+
-                                                  self.data.structure.timestep_info[it].unsteady_applied_forces[i_node, 3:6]))
-            forces_constraints_nodes[i_node, :] = np.dot(aero2inertial,
-                                           np.dot(cab,
-                                                  self.data.structure.timestep_info[it].forces_constraints_nodes[i_node, 0:3]))
-            moments_constraints_nodes[i_node, :] = np.dot(aero2inertial,
-                                           np.dot(cab,
-                                                  self.data.structure.timestep_info[it].forces_constraints_nodes[i_node, 3:6]))
-
-            if with_gravity:
-                gravity_forces_g[i_node, 0:3] = np.dot(aero2inertial,
-                                                     gravity_forces[i_node, 0:3])
-                gravity_forces_g[i_node, 3:6] = np.dot(aero2inertial,
-                                                     gravity_forces[i_node, 3:6])
-
-        for i_elem in range(num_elem):
-            conn[i_elem, :] = self.data.structure.elements[i_elem].reordered_global_connectivities
-            elem_id[i_elem] = i_elem
+            gravity_forces_g = None
+        if self.settings['include_applied_forces']:
+            point_data['app_forces'] = to_inertial(applied_forces[:, 0:3])
+            point_data['forces_constraints_nodes'] = to_inertial(tstep.forces_constraints_nodes[:, 0:3])
+            if gravity_forces_g is not None:
+                point_data['gravity_forces'] = gravity_forces_g[:, 0:3]
+        if self.settings['include_applied_moments']:
+            point_data['app_moments'] = to_inertial(applied_forces[:, 3:6])
+            point_data['moments_constraints_nodes'] = to_inertial(tstep.forces_constraints_nodes[:, 3:6])
+            if gravity_forces_g is not None:
+                point_data['gravity_moments'] = gravity_forces_g[:, 3:6]
+
+        cell_data = dict()
+        cell_data['elem_id'] = np.arange(num_elem)
+
+        for postproc, data, suffix in ((getattr(tstep, 'postproc_cell', dict()), cell_data, '_cell'),
+                                       (getattr(tstep, 'postproc_node', dict()), point_data, '_point')):
+            for k, v in postproc.items():
+                _, cols = v.shape
+                if cols == 1:
+                    raise NotImplementedError('scalar types not supported in beamplot (Easy to implement)')
+                elif cols == 3:
+                    data[k + suffix] = v
+                elif cols == 6:
+                    for i in range(0, 2):
+                        data[k + '_' + str(i) + suffix] = v[:, 3*i:3*(i+1)]
+                else:
+                    raise AttributeError('Only scalar and 3-vector types supported in beamplot')
+        cell_data['coords_a_elem'] = coords_a_cell
+
+        coords = tstep.glob_pos(include_rbm=self.settings['include_rbm'])
+        return coords, self.connectivity, point_data, cell_data
+
+    def for_grid(self, it):
+        """
+        Coordinates and point data of the frames of reference of the bodies at the time step ``it``.
+        """
+        tstep = self.data.structure.timestep_info[it]
+
+        # aero2inertial rotation
+        aero2inertial = tstep.cga()
+
+        if self.settings['include_rbm']:
+            offset = np.zeros((3,))
+        else:
+            offset = tstep.mb_FoR_pos[0, 0:3]
+        FoR_coords = tstep.mb_FoR_pos[:, 0:3] - offset
+
+        point_data = dict()
+        point_data['forces_constraints_FoR'] = np.dot(tstep.forces_constraints_FoR[:, 0:3], aero2inertial.T)
+        point_data['moments_constraints_FoR'] = np.dot(tstep.forces_constraints_FoR[:, 3:6], aero2inertial.T)
+
+        return FoR_coords, point_data
+
+    def write_beam(self, it):
+        it_filename = (self.filename +
+                       '%06u' % it)
+
+        coords, conn, point_data, cell_data = self.beam_grid(it)
 
         ug = tvtk.UnstructuredGrid(points=coords)
         ug.set_cells(tvtk.Line().cell_type, conn)
-        ug.cell_data.scalars = elem_id
+        ug.cell_data.scalars = cell_data.pop('elem_id')
         ug.cell_data.scalars.name = 'elem_id'
         counter = 1
-        if with_postproc_cell:
-            for k in postproc_cell_vector:
-                ug.cell_data.add_array(self.data.structure.timestep_info[it].postproc_cell[k])
-                ug.cell_data.get_array(counter).name = k + '_cell'
-                counter += 1
-            for k in postproc_cell_6vector:
-                for i in range(0, 2):
-                    ug.cell_data.add_array(self.data.structure.timestep_info[it].postproc_cell[k][:, 3*i:3*(i+1)])
-                    ug.cell_data.get_array(counter).name = k + '_' + str(i) + '_cell'
-                    counter += 1
-        ug.cell_data.add_array(coords_a_cell)
-        ug.cell_data.get_array(counter).name = 'coords_a_elem'
-        counter += 1
-
-        ug.point_data.scalars = node_id
+        for name, array in cell_data.items():
+            ug.cell_data.add_array(array)
+            ug.cell_data.get_array(counter).name = name
+            counter += 1
+
+        ug.point_data.scalars = point_data.pop('node_id')
         ug.point_data.scalars.name = 'node_id'
         point_vector_counter = 1
-        ug.point_data.add_array(local_x, 'vector')
-        ug.point_data.get_array(point_vector_counter).name = 'local_x'
-        point_vector_counter += 1
-        ug.point_data.add_array(local_y, 'vector')
-        ug.point_data.get_array(point_vector_counter).name = 'local_y'
-        point_vector_counter += 1
-        ug.point_data.add_array(local_z, 'vector')
-        ug.point_data.get_array(point_vector_counter).name = 'local_z'
-        point_vector_counter += 1
-        ug.point_data.add_array(coords_a, 'vector')
-        ug.point_data.get_array(point_vector_counter).name = 'coords_a'
-        if self.settings['include_applied_forces']:
-            point_vector_counter += 1
-            ug.point_data.add_array(app_forces, 'vector')
-            ug.point_data.get_array(point_vector_counter).name = 'app_forces'
-            point_vector_counter += 1
-            ug.point_data.add_array(forces_constraints_nodes, 'vector')
-            ug.point_data.get_array(point_vector_counter).name = 'forces_constraints_nodes'
-            if with_gravity:
-                point_vector_counter += 1
-                ug.point_data.add_array(gravity_forces_g[:, 0:3], 'vector')
-                ug.point_data.get_array(point_vector_counter).name = 'gravity_forces'
-
-        if self.settings['include_applied_moments']:
-            point_vector_counter += 1
-            ug.point_data.add_array(app_moment, 'vector')
-            ug.point_data.get_array(point_vector_counter).name = 'app_moments'
+        for name, array in point_data.items():
+            ug.point_data.add_array(array, 'vector')
+            ug.point_data.get_array(point_vector_counter).name = name
             point_vector_counter += 1
-            ug.point_data.add_array(moments_constraints_nodes, 'vector')
-            ug.point_data.get_array(point_vector_counter).name = 'moments_constraints_nodes'
-            if with_gravity:
-                point_vector_counter += 1
-                ug.point_data.add_array(gravity_forces_g[:, 3:6], 'vector')
-                ug.point_data.get_array(point_vector_counter).name = 'gravity_moments'
-        if with_postproc_node:
-            for k in postproc_node_vector:
-                point_vector_counter += 1
-                ug.point_data.add_array(self.data.structure.timestep_info[it].postproc_node[k])
-                ug.point_data.get_array(point_vector_counter).name = k + '_point'
-            for k in postproc_node_6vector:
-                for i in range(0, 2):
-                    point_vector_counter += 1
-                    ug.point_data.add_array(self.data.structure.timestep_info[it].postproc_node[k][:, 3*i:3*(i+1)])
-                    ug.point_data.get_array(point_vector_counter).name = k + '_' + str(i) + '_point'
 
         write_data(ug, it_filename)
 
@@ -315,37 +292,14 @@ class BeamPlot(BaseSolver):
         it_filename = (self.filename_for +
                        '%06u' % it)
 
-        forces_constraints_FoR = np.zeros((self.data.structure.num_bodies, 3))
-        moments_constraints_FoR = np.zeros((self.data.structure.num_bodies, 3))
-        # TODO: what should I do with the forces of the quaternion?
-
-        # aero2inertial rotation
-        aero2inertial = self.data.structure.timestep_info[it].cga()
-
-        # coordinates of corners
-        FoR_coords = np.zeros((self.data.structure.num_bodies, 3))
-        if self.settings['include_rbm']:
-            offset = np.zeros((3,))
-        else:
-            offset = self.data.structure.timestep_info[it].mb_FoR_pos[0, 0:3]
-        for ibody in range(self.data.structure.num_bodies):
-            FoR_coords[ibody, :] = self.data.structure.timestep_info[it].mb_FoR_pos[ibody, 0:3] - offset
-
-        for ibody in range(self.data.structure.num_bodies):
-            forces_constraints_FoR[ibody, :] = np.dot(aero2inertial,
-                                                  self.data.structure.timestep_info[it].forces_constraints_FoR[ibody, 0:3])
-            moments_constraints_FoR[ibody, :] = np.dot(aero2inertial,
-                                                  self.data.structure.timestep_info[it].forces_constraints_FoR[ibody, 3:6])
+        FoR_coords, point_data = self.for_grid(it)
 
         FoRmesh = tvtk.PolyData()
         FoRmesh.points = FoR_coords
         for_vector_counter = -1
-        for_vector_counter += 1
-        FoRmesh.point_data.add_array(forces_constraints_FoR , 'vector')
-        FoRmesh.point_data.get_array(for_vector_counter).name = 'forces_constraints_FoR'
-
-        for_vector_counter += 1
-        FoRmesh.point_data.add_array(moments_constraints_FoR , 'vector')
-        FoRmesh.point_data.get_array(for_vector_counter).name = 'moments_constraints_FoR'
+        for name, array in point_data.items():
+            for_vector_counter += 1
+            FoRmesh.point_data.add_array(array, 'vector')
+            FoRmesh.point_data.get_array(for_vector_counter).name = name
 
         write_data(FoRmesh, it_filename)
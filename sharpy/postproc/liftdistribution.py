@@ -6,7 +6,7 @@ from tvtk.api import tvtk, write_data
 import sharpy.utils.algebra as algebra
 import sharpy.utils.cout_utils as cout
 from sharpy.utils.settings import str2bool
-from sharpy.utils.solver_interface import solver, BaseSolver
+from sharpy.utils.solver_interface import solver, BaseSolver, run_offline_steps
 import sharpy.utils.settings as settings
 from sharpy.utils.datastructures import init_matrix_structure, standalone_ctypes_pointer
 import sharpy.aero.utils.uvlmlib as uvlmlib
@@ -26,6 +26,9 @@ class LiftDistribution(BaseSolver):
         self.settings_types['normalise'] = 'bool'
         self.settings_default['normalise'] = True
 
+        self.settings_types['num_processes'] = 'int'
+        self.settings_default['num_processes'] = 1
+
         self.settings = None
         self.data = None
 
@@ -43,14 +46,22 @@ class LiftDistribution(BaseSolver):
 
     def run(self, online=False):
         if not online:
-            for self.ts in range(self.ts_max):
-                self.lift_distribution()
+            run_offline_steps(self, range(self.ts_max), 'step_lift_distribution', 'store_lift_distribution',
+                              self.settings['num_processes'].value)
             cout.cout_wrap('...Finished', 1)
         else:
             self.ts = len(self.data.structure.timestep_info) - 1
             self.lift_distribution()
         return self.data
 
+    def step_lift_distribution(self, ts):
+        self.ts = ts
+        self.lift_distribution()
+        return self.data.aero.timestep_info[ts].postproc_cell['lift_distribution']
+
+    def store_lift_distribution(self, ts, lift_distribution):
+        self.data.aero.timestep_info[ts].postproc_cell['lift_distribution'] = lift_distribution
+
     def lift_distribution(self):
         # add entry to dictionary for postproc
         tstep = self.data.aero.timestep_info[self.ts]
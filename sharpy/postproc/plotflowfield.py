@@ -13,17 +13,26 @@ Notes:
 
 """
 import os
+from multiprocessing.pool import ThreadPool
 import numpy as np
 from tvtk.api import tvtk, write_data
-from sharpy.utils.solver_interface import solver, BaseSolver
+from sharpy.utils.solver_interface import solver, BaseSolver, run_offline_steps
 import sharpy.utils.generator_interface as gen_interface
 import sharpy.utils.settings as settings
-import sharpy.aero.utils.uvlmlib as uvlmlib
+from sharpy.aero.utils.flowprobe import FlowProbe
 import ctypes as ct
 
 
 @solver
 class PlotFlowField(BaseSolver):
+    """
+    Computes the flow velocity at the points of a grid and/or at a set of probes.
+
+    The grid is generated once and its points are stored in a :class:`~sharpy.aero.utils.flowprobe.FlowProbe`,
+    unless it moves with the body. Planes can be obtained with a grid whose corners share one of the coordinates.
+    With ``asynchronous`` the velocities are computed in a worker thread while the solver continues with the
+    following time steps.
+    """
     solver_id = 'PlotFlowField'
 
     def __init__(self):
@@ -31,11 +40,14 @@ class PlotFlowField(BaseSolver):
         self.settings_default = dict()
 
         self.settings_types['postproc_grid_generator'] = 'str'
-        self.settings_default['postproc_grid_generator'] = 'box'
+        self.settings_default['postproc_grid_generator'] = 'GridBox'
 
         self.settings_types['postproc_grid_input'] = 'dict'
         self.settings_default['postproc_grid_input'] = dict()
 
+        self.settings_types['probe_points'] = 'list(float)'
+        self.settings_default['probe_points'] = np.array([])
+
         self.settings_types['velocity_field_generator'] = 'str'
         self.settings_default['velocity_field_generator'] = 'SteadyVelocityField'
 
@@ -51,16 +63,34 @@ class PlotFlowField(BaseSolver):
         self.settings_types['include_induced'] = 'bool'
         self.settings_default['include_induced'] = True
 
+        self.settings_types['induced_velocity_cutoff'] = 'float'
+        self.settings_default['induced_velocity_cutoff'] = -1.
+
         self.settings_types['stride'] = 'int'
         self.settings_default['stride'] = 1
 
         self.settings_types['num_cores'] = 'int'
         self.settings_default['num_cores'] = 1
 
+        self.settings_types['asynchronous'] = 'bool'
+        self.settings_default['asynchronous'] = False
+
+        self.settings_types['num_processes'] = 'int'
+        self.settings_default['num_processes'] = 1
+
         self.settings = None
         self.data = None
         self.dir = 'output/'
 
+        self.postproc_grid_generator = None
+        self.moving_grid = False
+        self.grid = None
+        self.grid_probe = None
+        self.probe = None
+
+        self.pool = None
+        self.pending = None
+
     def initialise(self, data, custom_settings=None):
         self.data = data
         if custom_settings is None:
@@ -80,98 +110,167 @@ class PlotFlowField(BaseSolver):
         self.velocity_generator.initialise(self.settings['velocity_field_input'])
 
         # init postproc grid generator
-        postproc_grid_generator_type = gen_interface.generator_from_string(
-            self.settings['postproc_grid_generator'])
-        self.postproc_grid_generator = postproc_grid_generator_type()
-        self.postproc_grid_generator.initialise(self.settings['postproc_grid_input'])
+        if self.settings['postproc_grid_generator']:
+            postproc_grid_generator_type = gen_interface.generator_from_string(
+                self.settings['postproc_grid_generator'])
+            self.postproc_grid_generator = postproc_grid_generator_type()
+            self.postproc_grid_generator.initialise(self.settings['postproc_grid_input'])
+            self.moving_grid = bool(self.settings['postproc_grid_input'].get('moving', False))
+
+        # user defined probes
+        if len(self.settings['probe_points']) > 0:
+            self.probe = FlowProbe(self.settings['probe_points'],
+                                   self.settings['num_cores'].value,
+                                   self.settings['induced_velocity_cutoff'].value)
+
+        if self.settings['asynchronous']:
+            self.pool = ThreadPool(1)
 
     def output_velocity_field(self, ts):
-        # Notice that SHARPy utilities deal with several two-dimensional surfaces
-        # To be able to build 3D volumes, I will make use of the surface index as
-        # the third index in space
-        # It does not apply to the 'u' array because this way it is easier to
-        # write it in paraview
-
-        # Generate the grid
-        vtk_info, grid = self.postproc_grid_generator.generate({
-                'for_pos': self.data.structure.timestep_info[ts].for_pos[0:3]})
-
-        # Compute the induced velocities
-        nx = grid[0].shape[1]
-        ny = grid[0].shape[2]
-        nz = len(grid)
-
-        array_counter = 0
-        u_ind = np.zeros((nx, ny, nz, 3), dtype=float)
+        """
+        Computes and writes the flow velocity at the grid and probes for the time step ``ts``.
+
+        With ``asynchronous``, a copy of the aerodynamic time step is handed to the worker thread after waiting for
+        the previous time step to be finished.
+        """
+        aero_tstep = self.data.aero.timestep_info[ts]
+        for_pos = self.data.structure.timestep_info[ts].for_pos.copy()
+        if self.pool is None:
+            self.write_velocity_field(ts, aero_tstep, for_pos)
+        else:
+            aero_tstep = aero_tstep.copy()
+            self.wait()
+            self.pending = self.pool.apply_async(self.write_velocity_field, (ts, aero_tstep, for_pos))
+
+    def write_velocity_field(self, ts, aero_tstep, for_pos):
+        if self.postproc_grid_generator is not None:
+            self.write_grid(ts, aero_tstep, for_pos)
+        if self.probe is not None:
+            self.write_probes(ts, aero_tstep, for_pos)
+
+    def write_time_step(self, ts):
+        self.write_velocity_field(ts, self.data.aero.timestep_info[ts], self.data.structure.timestep_info[ts].for_pos)
+
+    def generate_grid(self, for_pos):
+        """
+        Returns the grid information, generating it only the first time unless the grid moves
+        """
+        if self.grid is None or self.moving_grid:
+            vtk_info, grid = self.postproc_grid_generator.generate({'for_pos': for_pos[0:3]})
+            # points ordered as [iz, ix, iy]
+            points = np.array(grid).transpose(0, 2, 3, 1).reshape(-1, 3)
+            self.grid = (vtk_info, grid)
+            self.grid_probe = FlowProbe(points,
+                                        self.settings['num_cores'].value,
+                                        self.settings['induced_velocity_cutoff'].value)
+        return self.grid
+
+    def compute_velocities(self, probe, zeta, ts, aero_tstep, for_pos):
+        """
+        Computes the induced and external velocities at the points of ``probe``, given in the format of the velocity
+        field generators in ``zeta``.
+
+        Returns:
+            tuple: Induced and external velocities ``[n_points, 3]`` in the order of the probe points.
+        """
         if self.settings['include_induced']:
-            target_triads = np.zeros((nx*ny*nz, 3))
-            ipoint = -1
-            for iz in range(nz):
-                for ix in range(nx):
-                    for iy in range(ny):
-                        ipoint += 1
-                        target_triads[ipoint, :] = grid[iz][:, ix, iy].astype(dtype=ct.c_double, order='F', copy=True)
-
-            u_ind_points = uvlmlib.uvlm_calculate_total_induced_velocity_at_points(self.data.aero.timestep_info[ts],
-                                                                                                      target_triads,
-                                                                                                      self.data.structure.timestep_info[ts].for_pos[0:3],
-                                                                                                      self.settings['num_cores'])
-            ipoint = -1
-            for iz in range(nz):
-                for ix in range(nx):
-                    for iy in range(ny):
-                        ipoint += 1
-                        u_ind[ix, iy, iz, :] = u_ind_points[ipoint, :]
-
-            # Write the data
-            vtk_info.point_data.add_array(u_ind.reshape((-1, u_ind.shape[-1]), order='F')) # Reshape the array except from the last dimension
-            vtk_info.point_data.get_array(array_counter).name = 'induced_velocity'
-            vtk_info.point_data.update()
-            array_counter += 1
-
-        # Add the external velocities
-        u_ext_out = np.zeros((nx, ny, nz, 3), dtype=float)
+            u_ind = probe.induced_velocity(aero_tstep, for_pos)
+        else:
+            u_ind = np.zeros((probe.n_points, 3))
 
         if self.settings['include_external']:
-            u_ext = []
-            for iz in range(nz):
-                u_ext.append(np.zeros((3, nx, ny), dtype=ct.c_double))
-            self.velocity_generator.generate({'zeta': grid,
+            u_ext = [np.zeros(zeta_i.shape, dtype=ct.c_double) for zeta_i in zeta]
+            self.velocity_generator.generate({'zeta': zeta,
                                               'override': True,
                                               't': ts*self.settings['dt'].value,
                                               'ts': ts,
                                               'dt': self.settings['dt'].value,
-                                              'for_pos': 0*self.data.structure.timestep_info[ts].for_pos},
+                                              'for_pos': 0*for_pos},
                                              u_ext)
-            for iz in range(nz):
-                for ix in range(nx):
-                    for iy in range(ny):
-                        u_ext_out[ix, iy, iz, :] += u_ext[iz][:, ix, iy]
-
-            # Write the data
-            vtk_info.point_data.add_array(u_ext_out.reshape((-1, u_ext_out.shape[-1]), order='F')) # Reshape the array except from the last dimension
-            vtk_info.point_data.get_array(array_counter).name = 'external_velocity'
-            vtk_info.point_data.update()
-            array_counter += 1
-
-        # add the data
-        u = u_ind + u_ext_out
-
-        # Write the data
-        vtk_info.point_data.add_array(u.reshape((-1, u.shape[-1]), order='F')) # Reshape the array except from the last dimension
-        vtk_info.point_data.get_array(array_counter).name = 'velocity'
-        vtk_info.point_data.update()
-        array_counter += 1
+            u_ext = np.array(u_ext).transpose(0, 2, 3, 1).reshape(-1, 3)
+        else:
+            u_ext = np.zeros((probe.n_points, 3))
+
+        return u_ind, u_ext
+
+    def write_grid(self, ts, aero_tstep, for_pos):
+        # Notice that SHARPy utilities deal with several two-dimensional surfaces
+        # To be able to build 3D volumes, I will make use of the surface index as
+        # the third index in space
+        vtk_grid, grid = self.generate_grid(for_pos)
+        nx = grid[0].shape[1]
+        ny = grid[0].shape[2]
+        nz = len(grid)
+
+        u_ind, u_ext = self.compute_velocities(self.grid_probe, grid, ts, aero_tstep, for_pos)
+
+        vtk_info = type(vtk_grid)()
+        vtk_info.copy_structure(vtk_grid)
+        self.add_velocities(vtk_info,
+                            # from [iz, ix, iy] to paraview ordering, in which x is the fastest index
+                            [u.reshape((nz, nx, ny, 3)).transpose(0, 2, 1, 3).reshape((-1, 3))
+                             for u in (u_ind, u_ext)])
 
         filename = self.dir + "VelocityField_" + '%06u' % ts + ".vtk"
         write_data(vtk_info, filename)
 
+    def write_probes(self, ts, aero_tstep, for_pos):
+        points = self.probe.points
+        n_points = self.probe.n_points
+        u_ind, u_ext = self.compute_velocities(self.probe, [points.T.reshape((3, n_points, 1)).copy()],
+                                               ts, aero_tstep, for_pos)
+
+        vtk_info = tvtk.PolyData()
+        vtk_info.points = points
+        vtk_info.verts = np.arange(n_points).reshape((n_points, 1))
+        self.add_velocities(vtk_info, (u_ind, u_ext))
+
+        filename = self.dir + "VelocityProbes_" + '%06u' % ts + ".vtk"
+        write_data(vtk_info, filename)
+
+    def add_velocities(self, vtk_info, velocities):
+        u_ind, u_ext = velocities
+        array_counter = 0
+        for include, name, u in (('include_induced', 'induced_velocity', u_ind),
+                                 ('include_external', 'external_velocity', u_ext)):
+            if self.settings[include]:
+                vtk_info.point_data.add_array(u)
+                vtk_info.point_data.get_array(array_counter).name = name
+                vtk_info.point_data.update()
+                array_counter += 1
+
+        vtk_info.point_data.add_array(u_ind + u_ext)
+        vtk_info.point_data.get_array(array_counter).name = 'velocity'
+        vtk_info.point_data.update()
+
+    def wait(self):
+        """
+        Waits for the velocity field being computed in the worker thread, if any, raising its exceptions
+        """
+        if self.pending is not None:
+            pending = self.pending
+            self.pending = None
+            pending.get()
+
+    def finalise(self):
+        if self.pool is not None:
+            self.wait()
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
     def run(self, online=False):
         if online:
             if divmod(self.data.ts, self.settings['stride'].value)[1] == 0:
                 self.output_velocity_field(len(self.data.structure.timestep_info) - 1)
         else:
-            for ts in range(0, len(self.data.structure.timestep_info)):
-                if not self.data.structure.timestep_info[ts] is None:
+            time_steps = [ts for ts in range(0, len(self.data.structure.timestep_info))
+                          if self.data.structure.timestep_info[ts] is not None]
+            if self.settings['num_processes'].value > 1:
+                run_offline_steps(self, time_steps, 'write_time_step',
+                                  num_processes=self.settings['num_processes'].value)
+            else:
+                for ts in time_steps:
                     self.output_velocity_field(ts)
+            self.finalise()
         return self.data
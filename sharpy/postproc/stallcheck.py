@@ -6,7 +6,7 @@ from tvtk.api import tvtk, write_data
 import sharpy.utils.algebra as algebra
 import sharpy.utils.cout_utils as cout
 from sharpy.utils.settings import str2bool
-from sharpy.utils.solver_interface import solver, BaseSolver
+from sharpy.utils.solver_interface import solver, BaseSolver, run_offline_steps
 import sharpy.utils.settings as settings
 from sharpy.utils.datastructures import init_matrix_structure, standalone_ctypes_pointer
 import sharpy.aero.utils.uvlmlib as uvlmlib
@@ -36,6 +36,11 @@ class StallCheck(BaseSolver):
     settings_default['output_degrees'] = False
     settings_description['output_degrees'] = 'Output incidence angles in degrees vs radians'
 
+    settings_types['num_processes'] = 'int'
+    settings_default['num_processes'] = 1
+    settings_description['num_processes'] = 'Number of processes used to postprocess the stored time steps when ' \
+                                            'run offline'
+
     settings_table = settings.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
 
@@ -58,14 +63,26 @@ class StallCheck(BaseSolver):
 
     def run(self, online=False):
         if not online:
-            for self.ts in range(self.ts_max):
-                self.check_stall()
+            run_offline_steps(self, range(self.ts_max), 'step_incidence_angle', 'store_incidence_angle',
+                              self.settings['num_processes'].value)
             cout.cout_wrap('...Finished', 1)
         else:
             self.ts = len(self.data.structure.timestep_info) - 1
             self.check_stall()
         return self.data
 
+    def step_incidence_angle(self, ts):
+        self.ts = ts
+        self.check_stall()
+        return self.data.aero.timestep_info[ts].postproc_cell['incidence_angle']
+
+    def store_incidence_angle(self, ts, incidence_angle):
+        # the ctypes pointers are not shared by the worker processes
+        tstep = self.data.aero.timestep_info[ts]
+        tstep.postproc_cell['incidence_angle'] = incidence_angle
+        tstep.postproc_cell['incidence_angle_ct_list'], tstep.postproc_cell['incidence_angle_ct_pointer'] = \
+            standalone_ctypes_pointer(tstep.postproc_cell['incidence_angle'])
+
     def check_stall(self):
         # add entry to dictionary for postproc
         tstep = self.data.aero.timestep_info[self.ts]
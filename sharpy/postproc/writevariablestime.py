@@ -1,6 +1,7 @@
 import os
 
 import numpy as np
+import h5py as h5
 from tvtk.api import tvtk, write_data
 
 import sharpy.utils.cout_utils as cout
@@ -19,6 +20,12 @@ class WriteVariablesTime(BaseSolver):
 
     It is a postprocessor that outputs the value of variables with time onto a text file.
 
+    The values are accumulated in memory for ``buffer_size`` time steps and then written in a single block. With
+    ``output_format = 'h5'`` all the variables are stored in the ``variables.h5`` file, with one dataset per text
+    file (and the same name without extension), whose rows are the time steps listed in the ``ts`` dataset.
+    The text files can still be exported with ``export_text``. The last block is written by ``finalise``, which the
+    time-marching solver calls after its last time step.
+
     Attributes:
         settings_types (dict): Acceptable data types of the input data
         settings_default (dict): Default values for input data should the user not provide them
@@ -94,6 +101,21 @@ class WriteVariablesTime(BaseSolver):
     settings_default['cleanup_old_solution'] = 'false'
     settings_description['cleanup_old_solution'] = 'Remove the existing files'
 
+    settings_types['output_format'] = 'str'
+    settings_default['output_format'] = 'text'
+    settings_description['output_format'] = 'Output format: ``text`` writes one ``.dat`` file per variable and ' \
+                                             'monitor point. ``h5`` writes all of them to a single HDF5 file'
+
+    settings_types['buffer_size'] = 'int'
+    settings_default['buffer_size'] = 1
+    settings_description['buffer_size'] = 'Number of time steps accumulated in memory before writing to file'
+
+    settings_types['export_text'] = 'bool'
+    settings_default['export_text'] = False
+    settings_description['export_text'] = 'Write also the text files if ``output_format = h5``'
+
+    supported_output_formats = ('text', 'h5')
+
     settings_table = settings.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
 
@@ -102,6 +124,10 @@ class WriteVariablesTime(BaseSolver):
         self.data = None
         self.dir = 'output/'
 
+        self.h5_filename = None
+        self.buffer_ts = []
+        self.buffer = dict()
+
     def initialise(self, data, custom_settings=None):
         self.data = data
         if custom_settings is None:
@@ -109,10 +135,14 @@ class WriteVariablesTime(BaseSolver):
         else:
             self.settings = custom_settings
         settings.to_custom_types(self.settings, self.settings_types, self.settings_default)
+        if self.settings['output_format'] not in self.supported_output_formats:
+            raise NotImplementedError('Output format %s not recognised. Supported formats are %s'
+                                      % (self.settings['output_format'], self.supported_output_formats))
 
         self.dir = self.settings['folder'] + '/' + self.data.settings['SHARPy']['case'] + '/WriteVariablesTime/'
         if not os.path.isdir(self.dir):
             os.makedirs(self.dir)
+        self.h5_filename = self.dir + 'variables.h5'
 
         # Check inputs
         if not ((len(self.settings['aero_panels_isurf']) == len(self.settings['aero_panels_im'])) and (len(self.settings['aero_panels_isurf']) == len(self.settings['aero_panels_in']))):
@@ -121,6 +151,11 @@ class WriteVariablesTime(BaseSolver):
             print("ERROR: aero_nodes should be defined as [i_surf,i_m,i_n]")
 
         if self.settings['cleanup_old_solution']:
+            try:
+                os.remove(self.h5_filename)
+            except FileNotFoundError:
+                pass
+
             for ivariable in range(len(self.settings['FoR_variables'])):
                 if self.settings['FoR_variables'][ivariable] == '':
                     continue
@@ -181,95 +216,146 @@ class WriteVariablesTime(BaseSolver):
         else:
             self.settings['FoR_number'] = np.array([0], dtype=int)
 
-        for ivariable in range(len(self.settings['FoR_variables'])):
-            if self.settings['FoR_variables'][ivariable] == '':
+        self.buffer_ts.append(self.data.ts)
+        for name, value in self.collect_variables().items():
+            try:
+                self.buffer[name].append(value)
+            except KeyError:
+                self.buffer[name] = [value]
+
+        if len(self.buffer_ts) >= self.settings['buffer_size'].value or not online:
+            self.flush()
+
+        return self.data
+
+    def collect_variables(self):
+        """
+        Returns the values of the requested variables at the current time step.
+
+        Returns:
+            dict: ``{name: value}``, where ``name`` is the name of the output file without extension. Values are
+            1D arrays, except for variables written as single values, which are floats.
+        """
+
+        variables = dict()
+        struct_tstep = self.data.structure.timestep_info[-1]
+        aero_tstep = self.data.aero.timestep_info[-1] if len(self.settings['aero_panels_variables']) + \
+            len(self.settings['aero_nodes_variables']) > 0 and self.data.aero is not None else None
+
+        for variable in self.settings['FoR_variables']:
+            if variable == '':
                 continue
+            var = np.atleast_2d(getattr(struct_tstep, variable))
+            rows, cols = var.shape
             for ifor in range(len(self.settings['FoR_number'])):
-                filename = self.dir + "FoR_" + '%02d' % self.settings['FoR_number'][ifor] + "_" + self.settings['FoR_variables'][ivariable] + ".dat"
-
-                with open(filename, 'a') as fid:
-                    var = np.atleast_2d(getattr(self.data.structure.timestep_info[-1], self.settings['FoR_variables'][ivariable]))
-                    rows, cols = var.shape
-                    if ((cols == 1) and (rows == 1)):
-                        self.write_value_to_file(fid, self.data.ts, var, self.settings['delimiter'])
-                    elif ((cols > 1) and (rows == 1)):
-                        self.write_nparray_to_file(fid, self.data.ts, var, self.settings['delimiter'])
-                    elif ((cols == 1) and (rows >= 1)):
-                        self.write_value_to_file(fid, self.data.ts, var[ifor], self.settings['delimiter'])
-                    else:
-                        self.write_nparray_to_file(fid, self.data.ts, var[ifor,:], self.settings['delimiter'])
+                name = "FoR_" + '%02d' % self.settings['FoR_number'][ifor] + "_" + variable
+                if rows == 1:
+                    variables[name] = var[0, 0] if cols == 1 else var[0, :].copy()
+                else:
+                    i_for = self.settings['FoR_number'][ifor]
+                    variables[name] = var[i_for, 0] if cols == 1 else var[i_for, :].copy()
 
         # Structure variables at nodes
-        for ivariable in range(len(self.settings['structure_variables'])):
-            if self.settings['structure_variables'][ivariable] == '':
+        nodes = np.array(self.settings['structure_nodes'], dtype=int)
+        for variable in self.settings['structure_variables']:
+            if variable == '':
                 continue
-            var = getattr(self.data.structure.timestep_info[-1], self.settings['structure_variables'][ivariable])
+            var = getattr(struct_tstep, variable)
             num_indices = len(var.shape)
             if num_indices == 1:
                 # Beam global variables (i.e. not node dependant)
-                filename = self.dir + "struct_" + self.settings['structure_variables'][ivariable] + ".dat"
-                with open(filename, 'a') as fid:
-                    self.write_nparray_to_file(fid, self.data.ts, var, self.settings['delimiter'])
-
-            else:  # These variables have nodal values (i.e the number of indices is either 2 or 3)
-                for inode in range(len(self.settings['structure_nodes'])):
-                    node = self.settings['structure_nodes'][inode]
-                    filename = self.dir + "struct_" + self.settings['structure_variables'][ivariable] + "_node" + str(node) + ".dat"
-                    with open(filename, 'a') as fid:
-                        if num_indices == 2:
-                            self.write_nparray_to_file(fid, self.data.ts, var[node,:], self.settings['delimiter'])
-                        elif num_indices == 3:
-                            ielem, inode_in_elem = self.data.structure.node_master_elem[node]
-                            self.write_nparray_to_file(fid, self.data.ts, var[ielem,inode_in_elem,:], self.settings['delimiter'])
-
-
-        # Aerodynamic variables at panels
-        for ivariable in range(len(self.settings['aero_panels_variables'])):
-            if self.settings['aero_panels_variables'][ivariable] == '':
+                variables["struct_" + variable] = var.copy()
                 continue
-            for ipanel in range(len(self.settings['aero_panels_isurf'])):
-                i_surf = self.settings['aero_panels_isurf'][ipanel]
-                i_m = self.settings['aero_panels_im'][ipanel]
-                i_n = self.settings['aero_panels_in'][ipanel]
 
-                filename = self.dir + "aero_" + self.settings['aero_panels_variables'][ivariable] + "_panel" + "_isurf" + str(i_surf) + "_im"+ str(i_m) + "_in"+ str(i_n) + ".dat"
-
-                with open(filename, 'a') as fid:
-                    var = getattr(self.data.aero.timestep_info[-1], self.settings['aero_panels_variables'][ivariable])
-                    self.write_value_to_file(fid, self.data.ts, var.gamma[i_surf][i_m,i_n], self.settings['delimiter'])
+            # These variables have nodal values (i.e the number of indices is either 2 or 3)
+            if num_indices == 2:
+                values = var[nodes, :]
+            else:
+                ielem = self.data.structure.node_master_elem[nodes, 0]
+                inode_in_elem = self.data.structure.node_master_elem[nodes, 1]
+                values = var[ielem, inode_in_elem, :]
+            for inode, node in enumerate(nodes):
+                variables["struct_" + variable + "_node" + str(node)] = values[inode, :]
+
+        # Aerodynamic variables at panels and nodes
+        for location in ('panels', 'nodes'):
+            isurf = self.settings['aero_%s_isurf' % location]
+            im = self.settings['aero_%s_im' % location]
+            in_ = self.settings['aero_%s_in' % location]
+            for variable in self.settings['aero_%s_variables' % location]:
+                if variable == '':
+                    continue
+                var = getattr(aero_tstep, variable)
+                for i_surf, i_m, i_n in zip(isurf, im, in_):
+                    name = "aero_" + variable + "_" + location[:-1] + "_isurf" + str(i_surf) + "_im" + str(i_m) + \
+                           "_in" + str(i_n)
+                    if location == 'panels':
+                        variables[name] = var[i_surf][i_m, i_n]
+                    else:
+                        variables[name] = var[i_surf][:, i_m, i_n].copy()
 
+        return variables
 
-        # Aerodynamic variables at nodes
-        for ivariable in range(len(self.settings['aero_nodes_variables'])):
-            if self.settings['aero_nodes_variables'][ivariable] == '':
-                continue
-            for inode in range(len(self.settings['aero_nodes_isurf'])):
-                i_surf = self.settings['aero_nodes_isurf'][inode]
-                i_m = self.settings['aero_nodes_im'][inode]
-                i_n = self.settings['aero_nodes_in'][inode]
+    def finalise(self):
+        self.flush()
 
-                filename = self.dir + "aero_" + self.settings['aero_nodes_variables'][ivariable] + "_node" + "_isurf" + str(i_surf) + "_im"+ str(i_m) + "_in"+ str(i_n) + ".dat"
+    def flush(self):
+        """
+        Writes the values accumulated in memory to file
+        """
 
-                with open(filename, 'a') as fid:
-                    var = getattr(self.data.aero.timestep_info[-1], self.settings['aero_nodes_variables'][ivariable])
-                    self.write_nparray_to_file(fid, self.data.ts, var[i_surf][:,i_m,i_n], self.settings['delimiter'])
+        if len(self.buffer_ts) == 0:
+            return
 
+        ts = np.array(self.buffer_ts, dtype=int)
+        blocks = dict()
+        for name, values in self.buffer.items():
+            blocks[name] = np.array(values)
 
-        return self.data
+        if self.settings['output_format'] == 'h5':
+            self.write_h5(ts, blocks)
+        if self.settings['output_format'] == 'text' or self.settings['export_text']:
+            for name, block in blocks.items():
+                with open(self.dir + name + ".dat", 'a') as fid:
+                    if block.ndim == 1:
+                        self.write_value_to_file(fid, ts, block, self.settings['delimiter'])
+                    else:
+                        self.write_nparray_to_file(fid, ts, block, self.settings['delimiter'])
+
+        self.buffer_ts = []
+        self.buffer = dict()
+
+    def write_h5(self, ts, blocks):
+        """
+        Appends the blocks of values to the resizable datasets of the HDF5 file, creating them if required
+        """
+
+        with h5.File(self.h5_filename, 'a') as h5file:
+            for name, block in [('ts', ts)] + list(blocks.items()):
+                if name not in h5file:
+                    h5file.create_dataset(name, data=block, maxshape=(None,) + block.shape[1:],
+                                          chunks=(max(self.settings['buffer_size'].value, 1),) + block.shape[1:])
+                else:
+                    dataset = h5file[name]
+                    dataset.resize(dataset.shape[0] + block.shape[0], axis=0)
+                    dataset[-block.shape[0]:] = block
 
     def write_nparray_to_file(self, fid, ts, nparray, delimiter):
+        """
+        Writes each row of ``nparray`` preceded by the corresponding time step in ``ts``
+        """
 
-        fid.write("%d%s" % (ts,delimiter))
-        for idim in range(np.shape(nparray)[0]):
-            try:
-                for jdim in range(np.shape(nparray)[1]):
-                    fid.write("%e%s" % (nparray[idim, jdim],delimiter))
-            except IndexError:
-                fid.write("%e%s" % (nparray[idim],delimiter))
-
-
-        fid.write("\n")
+        nparray = np.atleast_2d(nparray)
+        ts = np.atleast_1d(ts)
+        row_format = "%d" + delimiter + ("%e" + delimiter) * nparray.shape[1] + "\n"
+        fid.write(''.join([row_format % ((ts[irow],) + tuple(nparray[irow, :])) for irow in range(len(ts))]))
 
     def write_value_to_file(self, fid, ts, value, delimiter):
-
-        fid.write("%d%s%e\n" % (ts,delimiter,value))
+        """
+        Writes each value in ``value`` preceded by the corresponding time step in ``ts``
+        """
+
+        value = np.atleast_1d(value)
+        ts = np.atleast_1d(ts)
+        row_format = "%d" + delimiter + "%e\n"
+        fid.write(''.join([row_format % (ts[irow], value[irow]) for irow in range(len(ts))]))
@@ -1,10 +1,12 @@
 
 import configparser
+import os
 
 import sharpy.utils.cout_utils as cout
 from sharpy.utils.solver_interface import solver, dict_of_solvers
 import sharpy.utils.settings as settings
 import sharpy.utils.exceptions as exceptions
+import sharpy.utils.profiling as profiling
 
 
 @solver
@@ -41,7 +43,10 @@ class PreSharpy(object):
         ``write_log``     ``bool``       Write log file to output folder                  ``False``
         ``log_folder``    ``str``        Folder to write log file within ``/output``      ``None``
         ``log_file``      ``str``        Log file name                                    ``log``
+        ``profiling``     ``bool``       Time the solvers and write the results           ``False``
         ================  =============  ===============================================  =====================
+
+        The profiling results are written to ``<log_folder>/<case>_profiling/`` (see :mod:`sharpy.utils.profiling`).
     """
     solver_id = 'PreSharpy'
 
@@ -52,6 +57,8 @@ class PreSharpy(object):
             self._settings = False
 
         self.ts = 0
+        # physical time of the time steps whose time is not ts*dt (adaptive time stepping), by time step
+        self.step_times = dict()
 
         self.settings_types = dict()
         self.settings_default = dict()
@@ -77,6 +84,9 @@ class PreSharpy(object):
         self.settings_types['log_file'] = 'str'
         self.settings_default['log_file'] = 'log'
 
+        self.settings_types['profiling'] = 'bool'
+        self.settings_default['profiling'] = False
+
         if self._settings:
             self.settings = in_settings
             self.settings['SHARPy']['flow'] = self.settings['SHARPy']['flow']
@@ -87,6 +97,7 @@ class PreSharpy(object):
                                       self.settings['SHARPy']['write_log'],
                                       self.settings['SHARPy']['log_folder'],
                                       self.settings['SHARPy']['log_file'])
+            self.initialise_profiler()
 
             self.case_route = in_settings['SHARPy']['route'] + '/'
             self.case_name = in_settings['SHARPy']['case']
@@ -108,6 +119,12 @@ class PreSharpy(object):
                                   self.settings['SHARPy']['write_log'],
                                   self.settings['SHARPy']['log_folder'],
                                   self.settings['SHARPy']['log_file'])
+        self.initialise_profiler()
+
+    def initialise_profiler(self):
+        profiling.profiler.initialise(self.settings['SHARPy']['profiling'].value,
+                                      folder=os.path.join(self.settings['SHARPy']['log_folder'],
+                                                          self.settings['SHARPy']['case'] + '_profiling'))
 
     @staticmethod
     def load_config_file(file_name):
@@ -156,6 +156,27 @@ class FrequencyLimited(BaseBalancedRom):
                                                      ' points. If True, this option also allows to automatically' \
                                                      ' tune the balanced model.'
 
+    settings_types['Ncpu'] = 'int'
+    settings_default['Ncpu'] = 1
+    settings_description['Ncpu'] = 'Number of processes over which the solutions at the integration points are ' \
+                                   'distributed'
+
+    settings_types['streaming_svd'] = 'bool'
+    settings_default['streaming_svd'] = False
+    settings_description['streaming_svd'] = 'Compress the factors of the Gramians with a truncated SVD as the ' \
+                                            'integration points are processed, such that the full factors are ' \
+                                            'never stored'
+
+    settings_types['streaming_svd_tol'] = 'float'
+    settings_default['streaming_svd_tol'] = 1e-10
+    settings_description['streaming_svd_tol'] = 'Relative tolerance on the singular values retained by the ' \
+                                                'streaming SVD'
+
+    settings_types['streaming_svd_rank'] = 'int'
+    settings_default['streaming_svd_rank'] = 0
+    settings_description['streaming_svd_rank'] = 'Maximum rank of the compressed Gramian factors. If ``0`` the rank ' \
+                                                 'is only limited by ``streaming_svd_tol``'
+
     # Integrator options
     settings_options_types = dict()
     settings_options_default = dict()
@@ -253,6 +274,68 @@ class Iterative(BaseBalancedRom):
         return ssrom
 
 
+@bal_rom
+class LowRankADI(BaseBalancedRom):
+    __doc__ = librom.balreal_lr_adi.__doc__
+    _bal_rom_id = 'LowRankADI'
+
+    settings_types = dict()
+    settings_default = dict()
+    settings_description = dict()
+
+    settings_types['adi_tol'] = 'float'
+    settings_default['adi_tol'] = 1e-10
+    settings_description['adi_tol'] = 'Tolerance of the ADI residual relative to the right hand side of the ' \
+                                      'Lyapunov equation'
+
+    settings_types['maxiter'] = 'int'
+    settings_default['maxiter'] = 100
+    settings_description['maxiter'] = 'Maximum number of ADI iterations for each Gramian'
+
+    settings_types['num_shifts'] = 'int'
+    settings_default['num_shifts'] = 8
+    settings_description['num_shifts'] = 'Number of ADI shifts selected at each adaptive step'
+
+    settings_types['tolSVD'] = 'float'
+    settings_default['tolSVD'] = 1e-6
+    settings_description['tolSVD'] = 'Hankel singular value threshold relative to the largest one'
+
+    settings_types['print_info'] = 'bool'
+    settings_default['print_info'] = False
+    settings_description['print_info'] = 'Print ADI convergence information'
+
+    settings_table = settings.SettingsTable()
+    __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
+
+    def __init__(self):
+        self.settings = dict()
+
+    def initialise(self, in_settings=None):
+        if in_settings is not None:
+            self.settings = in_settings
+
+        settings.to_custom_types(self.settings, self.settings_types, self.settings_default)
+
+    def run(self, ss):
+
+        A, B, C, D = ss.get_mats()
+
+        s, T, Tinv, rc, ro = librom.balreal_lr_adi(A, B, C,
+                                                   DLTI=ss.dt is not None,
+                                                   tolADI=self.settings['adi_tol'].value,
+                                                   maxiter=self.settings['maxiter'].value,
+                                                   num_shifts=self.settings['num_shifts'].value,
+                                                   tolSVD=self.settings['tolSVD'].value,
+                                                   Print=self.settings['print_info'].value)
+
+        Ar = Tinv.dot(A.dot(T))
+        Br = Tinv.dot(B)
+        Cr = C.dot(T)
+
+        ssrom = libss.ss(Ar, Br, Cr, D, dt=ss.dt)
+        return ssrom
+
+
 @rom_interface.rom
 class Balanced(rom_interface.BaseRom):
     """Balancing ROM methods
@@ -267,6 +350,8 @@ class Balanced(rom_interface.BaseRom):
 
         * Frequency limited balancing :class:`.FrequencyLimited`
 
+        * Low-rank ADI balancing :class:`.LowRankADI`
+
     """
     rom_id = 'Balanced'
 
@@ -1,4 +1,5 @@
 import numpy as np
+import multiprocessing as mpr
 import scipy.sparse as scsp
 import sharpy.linear.src.libsparse as libsp
 import scipy.linalg as sclalg
@@ -79,6 +80,35 @@ class Krylov(rom_interface.BaseRom):
     settings_default['restart_arnoldi'] = False
     settings_description['restart_arnoldi'] = 'Restart Arnoldi iteration with r-=1 if ROM is unstable'
 
+    settings_types['parallel'] = 'bool'
+    settings_default['parallel'] = False
+    settings_description['parallel'] = 'Factorise the shifted systems and build the Krylov bases of each ' \
+                                       'interpolation point concurrently in worker processes. Only used by the ' \
+                                       '``dual_rational_arnoldi`` and ``mimo_rational_arnoldi`` algorithms'
+
+    settings_types['num_cores'] = 'int'
+    settings_default['num_cores'] = 4
+    settings_description['num_cores'] = 'Number of worker processes if ``parallel``'
+
+    settings_types['orthogonalisation'] = 'str'
+    settings_default['orthogonalisation'] = 'mgs'
+    settings_description['orthogonalisation'] = 'Orthogonalisation of the ``mimo_rational_arnoldi`` bases. ``mgs`` ' \
+                                                'for vector-wise modified Gram-Schmidt or ``block_cgs`` for block ' \
+                                                'classical Gram-Schmidt with reorthogonalisation'
+
+    settings_types['warm_start'] = 'bool'
+    settings_default['warm_start'] = False
+    settings_description['warm_start'] = 'Cache the bases of each interpolation point and reuse them in later ' \
+                                         '``run`` calls for the interpolation points that lie within ' \
+                                         '``warm_start_tolerance`` of a cached one. The Arnoldi iteration is not ' \
+                                         'restarted from the cached basis: the moments of a reused point are ' \
+                                         'matched at the cached interpolation point'
+
+    settings_types['warm_start_tolerance'] = 'float'
+    settings_default['warm_start_tolerance'] = 1e-3
+    settings_description['warm_start_tolerance'] = 'Relative distance between an interpolation point and a cached ' \
+                                                   'one below which the cached basis is reused'
+
     settings_table = settings.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
 
@@ -88,6 +118,8 @@ class Krylov(rom_interface.BaseRom):
                          'mimo_rational_arnoldi',
                          'mimo_block_arnoldi')
 
+    supported_orthogonalisation = ('mgs', 'block_cgs')
+
     def __init__(self):
         self.settings = dict()
 
@@ -106,6 +138,8 @@ class Krylov(rom_interface.BaseRom):
         self.cpu_summary = dict()
         self.eigenvalue_table = None
 
+        self.point_bases = list()  # (system, spec, sigma, bases) of each interpolation point for warm starts
+
     def initialise(self, in_settings=None):
 
         if in_settings is not None:
@@ -125,6 +159,10 @@ class Krylov(rom_interface.BaseRom):
                                       'could be that is not yet implemented'
                                       % self.algorithm)
 
+        if self.settings['orthogonalisation'] not in self.supported_orthogonalisation:
+            raise NotImplementedError('Orthogonalisation %s not recognised. Supported methods are %s'
+                                      % (self.settings['orthogonalisation'], self.supported_orthogonalisation))
+
         self.frequency = np.array(self.settings['frequency'], dtype=complex)
         self.r = self.settings['r'].value
         self.restart_arnoldi = self.settings['restart_arnoldi'].value
@@ -532,39 +570,31 @@ class Krylov(rom_interface.BaseRom):
         V = np.zeros((nx, rom_dim), dtype=complex)
         W = np.zeros((nx, rom_dim), dtype=complex)
 
+        # group the bases to build by interpolation point such that each shifted system is only factorised once
+        sigmas = list()
+        for sigma in list(fc) + list(fo):
+            if sigma not in sigmas:
+                sigmas.append(sigma)
+        specs = [('dual',
+                  tuple((int(rc[i]), tuple(right_tangent[:, i])) for i in range(len(fc)) if fc[i] == sigma),
+                  tuple((int(ro[i]), tuple(left_tangent[:, i])) for i in range(len(fo)) if fo[i] == sigma))
+                 for sigma in sigmas]
+        bases = self.interpolation_point_bases(sigmas, specs)
+
         we = 0
-        dict_of_luas = dict()
+        block_counter = [0] * len(sigmas)
         for i in range(len(fc)):
-            sigma = fc[i]
-            if sigma == np.inf:
-                approx_type = 'partial_realisation'
-                lu_A = A
-            else:
-                approx_type = 'Pade'
-                try:
-                    lu_A = dict_of_luas[sigma]
-                except KeyError:
-                    lu_A = krylovutils.lu_factor(sigma, A)
-                    dict_of_luas[sigma] = lu_A
-            V[:, we:we+rc[i]] = krylovutils.construct_krylov(rc[i], lu_A, B.dot(right_tangent[:, i:i+1]), approx_type, 'b')
-
+            i_sigma = sigmas.index(fc[i])
+            V[:, we:we+rc[i]] = bases[i_sigma][0][block_counter[i_sigma]]
+            block_counter[i_sigma] += 1
             we += rc[i]
 
         we = 0
+        block_counter = [0] * len(sigmas)
         for i in range(len(fo)):
-            sigma = fo[i]
-            if sigma == np.inf:
-                approx_type = 'partial_realisation'
-                lu_A = A
-            else:
-                approx_type = 'Pade'
-                try:
-                    lu_A = dict_of_luas[sigma]
-                except KeyError:
-                    lu_A = krylovutils.lu_factor(sigma, A)
-                    dict_of_luas[sigma] = lu_A
-            W[:, we:we+ro[i]] = krylovutils.construct_krylov(ro[i], lu_A, C.T.dot(left_tangent[:, i:i+1]), approx_type, 'c')
-
+            i_sigma = sigmas.index(fo[i])
+            W[:, we:we+ro[i]] = bases[i_sigma][1][block_counter[i_sigma]]
+            block_counter[i_sigma] += 1
             we += ro[i]
 
         T = W.T.dot(V)
@@ -577,8 +607,6 @@ class Krylov(rom_interface.BaseRom):
         Br = W.T.dot(self.ss.B)
         Cr = self.ss.C.dot(V.dot(Tinv))
 
-        del dict_of_luas
-
         self.cpu_summary['algorithm'] = time.time() - t0
 
         return Ar, Br, Cr
@@ -630,20 +658,19 @@ class Krylov(rom_interface.BaseRom):
         B = self.ss.B
         C = self.ss.C
 
-        for i in range(self.nfreq):
+        ortho = self.settings['orthogonalisation']
+        bases = self.interpolation_point_bases(frequency, [('mimo', r_c, r_o, ortho)] * self.nfreq)
 
-            if frequency[i] == np.inf or frequency[i].real == np.inf:
-                lu_a = self.ss.A
-                approx_type = 'partial_realisation'
-            else:
-                approx_type = 'Pade'
-                lu_a = krylovutils.lu_factor(frequency[i], self.ss.A)
+        for i in range(self.nfreq):
+            Vi, Wi = bases[i]
             if i == 0:
-                V = krylovutils.construct_mimo_krylov(r_c, lu_a, B, approx_type=approx_type, side='controllability')
-                W = krylovutils.construct_mimo_krylov(r_o, lu_a, C.T, approx_type=approx_type, side='observability')
+                V = Vi
+                W = Wi
+            elif ortho == 'block_cgs':
+                # only the new columns are orthogonalised against the bases of the previous points
+                V = krylovutils.block_cgs_ortho(Vi, V)
+                W = krylovutils.block_cgs_ortho(Wi, W)
             else:
-                Vi = krylovutils.construct_mimo_krylov(r_c, lu_a, B, approx_type=approx_type, side='controllability')
-                Wi = krylovutils.construct_mimo_krylov(r_o, lu_a, C.T, approx_type=approx_type, side='observability')
                 V = np.block([V, Vi])
                 W = np.block([W, Wi])
                 V = krylovutils.mgs_ortho(V)
@@ -698,6 +725,64 @@ class Krylov(rom_interface.BaseRom):
 
         return Ar, Br, Cr
 
+    def interpolation_point_bases(self, sigmas, specs):
+        r"""
+        Krylov bases about each interpolation point.
+
+        The shifted system :math:`(\sigma_i\mathbf{I}_n - \mathbf{A})` of each interpolation point is factorised and
+        its controllability and observability bases are built. Since the interpolation points are independent, if
+        the ``parallel`` setting is chosen the points are distributed among ``num_cores`` worker processes.
+
+        If ``warm_start`` is selected, the bases are cached in ``point_bases`` and those of a previous run are reused
+        for the points that lie within ``warm_start_tolerance`` of a cached interpolation point, provided the system
+        dimensions and the rest of the basis specification are unchanged. The cache is only a tolerance lookup: the
+        moments of a reused point are matched at the cached interpolation point.
+
+        Args:
+            sigmas (list): Interpolation points :math:`\sigma_i`.
+            specs (list): Basis specification for each interpolation point (see :func:`point_krylov_bases`).
+
+        Returns:
+            list: Tuple of controllability and observability bases for each interpolation point.
+        """
+        A = self.ss.A
+        B = self.ss.B
+        C = self.ss.C
+        system = (self.ss.states, self.ss.inputs, self.ss.outputs)
+        warm_start = self.settings['warm_start'].value
+        tolerance = self.settings['warm_start_tolerance'].value
+
+        bases = [None] * len(sigmas)
+        if warm_start:
+            for i in range(len(sigmas)):
+                for cached_system, cached_spec, cached_sigma, cached_bases in self.point_bases:
+                    if cached_system != system or cached_spec != specs[i]:
+                        continue
+                    if sigmas[i] == cached_sigma or \
+                            np.abs(sigmas[i] - cached_sigma) <= tolerance * max(np.abs(cached_sigma), 1.):
+                        bases[i] = cached_bases
+                        break
+
+        missing = [i for i in range(len(sigmas)) if bases[i] is None]
+        if warm_start and self.settings['print_info'].value:
+            cout.cout_wrap('\tReusing bases of %d interpolation points' % (len(sigmas) - len(missing)), 1)
+
+        if self.settings['parallel'].value and len(missing) > 1:
+            with mpr.Pool(min(self.settings['num_cores'].value, len(missing)),
+                          initializer=_initialise_worker, initargs=(A, B, C)) as pool:
+                P = [pool.apply_async(_worker_point_krylov_bases, args=(sigmas[i], specs[i])) for i in missing]
+                results = [pp.get() for pp in P]
+        else:
+            results = [point_krylov_bases(A, B, C, sigmas[i], specs[i]) for i in missing]
+
+        for i, res in zip(missing, results):
+            bases[i] = res
+
+        if warm_start:
+            self.point_bases = [(system, specs[i], sigmas[i], bases[i]) for i in range(len(sigmas))]
+
+        return bases
+
     def check_stability(self, restart_arnoldi=False):
         r"""
         Checks the stability of the ROM by computing its eigenvalues.
@@ -883,6 +968,65 @@ class Krylov(rom_interface.BaseRom):
 
         pass
 
+def point_krylov_bases(A, B, C, sigma, spec):
+    r"""
+    Controllability and observability Krylov bases about a single interpolation point.
+
+    The shifted system :math:`(\sigma\mathbf{I}_n - \mathbf{A})` is factorised once and used for all the bases
+    about this point.
+
+    Args:
+        A (np.ndarray or libsp.csc_matrix): System plant matrix.
+        B (np.ndarray): System input matrix.
+        C (np.ndarray): System output matrix.
+        sigma (complex): Interpolation point. If infinite, the partial realisation is built instead.
+        spec (tuple): Specification of the bases. ``('mimo', r_c, r_o, ortho)`` for the vector-wise MIMO
+            construction (see :func:`sharpy.rom.utils.krylovutils.construct_mimo_krylov`) or
+            ``('dual', v_blocks, w_blocks)`` for tangential interpolation, where each block is a tuple of the Krylov
+            order and the tangential direction.
+
+    Returns:
+        tuple: Controllability and observability bases. For the ``dual`` specification, these are lists with the
+        basis of each block.
+    """
+    if sigma == np.inf or sigma.real == np.inf:
+        approx_type = 'partial_realisation'
+        lu_a = A
+    else:
+        approx_type = 'Pade'
+        lu_a = krylovutils.lu_factor(sigma, A)
+
+    if spec[0] == 'mimo':
+        r_c, r_o, ortho = spec[1:]
+        V = krylovutils.construct_mimo_krylov(r_c, lu_a, B, approx_type=approx_type, side='controllability',
+                                              ortho=ortho)
+        W = krylovutils.construct_mimo_krylov(r_o, lu_a, C.T, approx_type=approx_type, side='observability',
+                                              ortho=ortho)
+    elif spec[0] == 'dual':
+        V = [krylovutils.construct_krylov(r, lu_a, B.dot(np.array(tangent).reshape(-1, 1)), approx_type, 'b')
+             for r, tangent in spec[1]]
+        W = [krylovutils.construct_krylov(r, lu_a, C.T.dot(np.array(tangent).reshape(-1, 1)), approx_type, 'c')
+             for r, tangent in spec[2]]
+    else:
+        raise NotImplementedError('Unknown Krylov basis specification %s' % spec[0])
+
+    return V, W
+
+
+# system shared with the worker processes, set once per worker by the pool initialiser
+_worker_system = dict()
+
+
+def _initialise_worker(A, B, C):
+    _worker_system['A'] = A
+    _worker_system['B'] = B
+    _worker_system['C'] = C
+
+
+def _worker_point_krylov_bases(sigma, spec):
+    return point_krylov_bases(_worker_system['A'], _worker_system['B'], _worker_system['C'], sigma, spec)
+
+
 if __name__=="__main__":
     import numpy as np
 
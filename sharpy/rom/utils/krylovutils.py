@@ -76,6 +76,60 @@ def mgs_ortho(X):
     return Q
 
 
+def block_cgs_ortho(X, Q=None, deflation_tolerance=None):
+    r"""
+    Block Classical Gram-Schmidt Orthogonalisation with reorthogonalisation (BCGS2)
+
+    Orthogonalises the block :math:`\mathbf{X}` against the orthonormal basis :math:`\mathbf{Q}` and appends the
+    resulting orthonormal columns to it. Each pass consists of a projection
+
+    .. math:: \mathbf{Y} = \mathbf{X} - \mathbf{Q}(\mathbf{Q}^H\mathbf{X})
+
+    followed by a QR decomposition of :math:`\mathbf{Y}`. The pass is repeated once to recover the orthogonality lost
+    in finite precision. Unlike :func:`mgs_ortho`, all operations are matrix-matrix products (BLAS-3) and
+    the columns of :math:`\mathbf{Q}` are not orthogonalised again.
+
+    Args:
+        X (np.ndarray): Block to orthogonalise of dimensions :math:`n` by :math:`k`.
+        Q (np.ndarray): Orthonormal basis of dimensions :math:`n` by :math:`m`. If ``None``, :math:`\mathbf{X}`
+            is simply orthonormalised.
+        deflation_tolerance (float): If given, columns of :math:`\mathbf{X}` that, once projected, have a norm
+            below ``deflation_tolerance`` times the largest column norm of :math:`\mathbf{X}` are deflated.
+
+    Returns:
+        np.ndarray: Orthonormal basis of dimensions :math:`n` by :math:`m + k`, or fewer columns if any were deflated.
+    """
+    if Q is None:
+        Q = np.zeros((X.shape[0], 0), dtype=X.dtype)
+
+    dtype = np.result_type(X.dtype, Q.dtype, float)
+    Y = np.array(X, dtype=dtype)
+    if Y.ndim == 1:
+        Y.shape = (Y.shape[0], 1)
+
+    Qh = Q.conj().T
+    if Q.shape[1] > 0:
+        Y -= Q.dot(Qh.dot(Y))
+
+    if deflation_tolerance is None:
+        Q1, R1 = sclalg.qr(Y, mode='economic')
+    else:
+        x_norm = np.max(np.linalg.norm(X.reshape(X.shape[0], -1), axis=0))
+        Q1, R1, P1 = sclalg.qr(Y, mode='economic', pivoting=True)
+        rank = np.sum(np.abs(np.diag(R1)) > deflation_tolerance * x_norm)
+        Q1 = Q1[:, :rank]
+
+    if Q1.shape[1] == 0:
+        return Q.astype(dtype)
+
+    # reorthogonalisation pass
+    if Q.shape[1] > 0:
+        Q1 -= Q.dot(Qh.dot(Q1))
+    Q2, R2 = sclalg.qr(Q1, mode='economic')
+
+    return np.concatenate((Q.astype(dtype), Q2), axis=1)
+
+
 def construct_krylov(r, lu_A, B, approx_type='Pade', side='b'):
     r"""
     Contructs a Krylov subspace in an iterative manner following the methods of Gugercin [1].
@@ -251,7 +305,29 @@ def lu_solve(lu_A, b, trans=0):
 
 
 
-def construct_mimo_krylov(r, lu_A_input, B, approx_type='Pade',side='controllability'):
+def construct_mimo_krylov(r, lu_A_input, B, approx_type='Pade',side='controllability', ortho='mgs'):
+    r"""
+    Vector-wise construction of the Krylov space of a MIMO system following Gugercin [1].
+
+    Args:
+        r (int): Krylov space order
+        lu_A_input (tuple or SuperLU or np.ndarray): LU factorisation of :math:`(\sigma I - \mathbf{A})` for Pade
+            approximations or simply :math:`\mathbf{A}` for partial realisations.
+        B (np.ndarray): :math:`\mathbf{B}` for the controllability space or :math:`\mathbf{C}^T` for the
+            observability space.
+        approx_type (str): Type of approximation: ``partial_realisation`` or ``Pade``.
+        side (str): ``controllability`` or ``observability``.
+        ortho (str): Orthogonalisation of each new vector. ``mgs`` reorthogonalises the whole basis using
+            :func:`mgs_ortho`. ``block_cgs`` only orthogonalises the new vector against the existing basis
+            using :func:`block_cgs_ortho`.
+
+    Returns:
+        np.ndarray: Projection matrix
+
+    References:
+        [1] Gugercin, S. Projection Methods for Model Reduction of Large-Scale Dynamical
+        Systems PhD Thesis. Rice University 2003.
+    """
 
     if side=='controllability':
         transpose_mode = 0
@@ -278,12 +354,16 @@ def construct_mimo_krylov(r, lu_A_input, B, approx_type='Pade',side='controllabi
     else:
         G = lu_solve(lu_A_input, B, transpose_mode)
 
-    for k in range(m):
-        w[:, k] = G[:, k]
+    if ortho == 'block_cgs':
+        w[:, :m] = G
+        w[:, :m] = block_cgs_ortho(w[:, :m])[:, :m]
+    else:
+        for k in range(m):
+            w[:, k] = G[:, k]
 
-        ## Orthogonalise w_k to preceding w_j for j < k
-        if k >= 1:
-            w[:, :k+1] = mgs_ortho(w[:, :k+1])[:, :k+1]
+            ## Orthogonalise w_k to preceding w_j for j < k
+            if k >= 1:
+                w[:, :k+1] = mgs_ortho(w[:, :k+1])[:, :k+1]
 
     V[:, :m+1] = w[:, :m+1]
     last_column += m
@@ -300,12 +380,20 @@ def construct_mimo_krylov(r, lu_A_input, B, approx_type='Pade',side='controllabi
                 w[:, t] = lu_solve(lu_A_input, w[:, t-mu], transpose_mode)
 
             # Orthogonalise w[:,t] against V_i -
-            w[:, :t+1] = mgs_ortho(w[:, :t+1])[:, :t+1]
+            if ortho == 'block_cgs':
+                w_ortho = block_cgs_ortho(w[:, t:t+1], w[:, :t], deflation_tolerance=deflation_tolerance)
+                if w_ortho.shape[1] == t:
+                    # column deflated
+                    w[:, t] = 0.
+                else:
+                    w[:, t] = w_ortho[:, t]
+            else:
+                w[:, :t+1] = mgs_ortho(w[:, :t+1])[:, :t+1]
 
             if np.linalg.norm(w[:, t]) < deflation_tolerance:
                 # Deflate w_k
                 print('Vector deflated')
-                w = [w[:, 0:t], w[:, t+1:]]
+                w[:, t] = 0.
                 last_column -= 1
                 mu -= 1
             else:
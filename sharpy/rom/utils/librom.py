@@ -4,8 +4,11 @@ S. Maraniello, 14 Feb 2018
 """
 
 import warnings
+import multiprocessing as mpr
 import numpy as np
 import scipy.linalg as scalg
+import scipy.sparse as scsp
+import scipy.sparse.linalg
 
 # from IPython import embed
 import sharpy.linear.src.libsparse as libsp
@@ -660,6 +663,298 @@ def low_rank_smith(A, Q, tol=1e-10, Square=True, tolSVD=1e-12, tolAbs=False,
     return Zk
 
 
+def lr_adi(A, B, DLTI=True, tol=1e-10, maxiter=100, num_shifts=8, transpose=False, factorisations=None,
+           Print=False):
+    r"""
+    Low-rank ADI solution of the Lyapunov equation in factorised form :math:`\mathbf{X}=\mathbf{ZZ}^T`
+
+    For continuous time systems (``DLTI=False``) the equation
+
+    .. math:: \mathbf{AX} + \mathbf{XA}^T + \mathbf{BB}^T = 0
+
+    is solved, while for discrete time systems (``DLTI=True``) the Stein equation
+
+    .. math:: \mathbf{AXA}^T - \mathbf{X} + \mathbf{BB}^T = 0
+
+    is first brought to the continuous form through the Cayley transformation
+
+    .. math::
+        \mathbf{A}_c &= (\mathbf{A} - \mathbf{I})(\mathbf{A} + \mathbf{I})^{-1} \\
+        \mathbf{B}_c &= \sqrt{2}(\mathbf{A} + \mathbf{I})^{-1}\mathbf{B}
+
+    which leaves the solution unchanged. If ``transpose=True``, :math:`\mathbf{A}` is replaced by
+    :math:`\mathbf{A}^T` such that the observability Gramian can be obtained by passing :math:`\mathbf{C}^T`
+    in place of :math:`\mathbf{B}`.
+
+    At each iteration the factor is enlarged with :math:`\mathbf{V}_i=(\mathbf{A}_c + p_i\mathbf{I})^{-1}
+    \mathbf{W}_{i-1}`, where :math:`\mathbf{W}` is the low-rank factor of the Lyapunov residual [1]. Complex shifts
+    are used in conjugate pairs and processed in real arithmetic [2]. The shifts are adaptive: whenever the current
+    set is exhausted, a new set is selected with Penzl's heuristic among the eigenvalues of :math:`\mathbf{A}_c`
+    projected onto the span of the current factor, accounting for the shifts already used.
+
+    Only linear systems with shifted matrices :math:`(\alpha\mathbf{A} + \beta\mathbf{I})` are solved. If
+    :math:`\mathbf{A}` is a :class:`sharpy.linear.src.libsparse.csc_matrix`, these are factorised with a sparse LU
+    decomposition. The factorisations are stored in the ``factorisations`` dictionary, if given, such that
+    they can be reused, for example, by the solution of the dual Gramian.
+
+    Args:
+        A (np.ndarray or libsp.csc_matrix): Plant matrix. It must be stable and, for discrete time systems,
+            :math:`-1` cannot be an eigenvalue.
+        B (np.ndarray): Input matrix (or :math:`\mathbf{C}^T` for observability).
+        DLTI (bool): Discrete time system.
+        tol (float): Tolerance on the 2-norm of the residual relative to the one of :math:`\mathbf{B}_c\mathbf{B}_c^T`.
+        maxiter (int): Maximum number of ADI iterations.
+        num_shifts (int): Number of shifts selected at each adaptive step.
+        transpose (bool): Solve the equation with :math:`\mathbf{A}^T`.
+        factorisations (dict): Cache of LU factorisations.
+        Print (bool): Print convergence information.
+
+    Returns:
+        np.ndarray: Low-rank factor :math:`\mathbf{Z}` of the solution.
+
+    References:
+        [1] Benner, P., Kurschner, P., Saak, J.. An improved numerical method for balanced truncation for symmetric
+        second-order systems. Mathematical and Computer Modelling of Dynamical Systems, 2013.
+
+        [2] Benner, P., Kurschner, P., Saak, J.. Efficient handling of complex shift parameters in the low-rank
+        ADI method. Numerical Algorithms, 2013.
+    """
+
+    if factorisations is None:
+        factorisations = dict()
+
+    N = A.shape[0]
+    trans = int(transpose)
+
+    def lu(alpha, beta):
+        # LU factorisation of (alpha A + beta I)
+        key = (alpha, beta)
+        if key not in factorisations:
+            if type(A) is libsp.csc_matrix:
+                M = alpha * A + beta * scsp.identity(N, dtype=np.result_type(alpha, beta, float), format='csc')
+                factorisations[key] = scsp.linalg.splu(scsp.csc_matrix(M))
+            else:
+                factorisations[key] = scalg.lu_factor(alpha * A + beta * np.eye(N))
+        return factorisations[key]
+
+    def lu_solve(lu_M, b, trans_mode):
+        if type(lu_M) is scsp.linalg.SuperLU:
+            return lu_M.solve(b, trans=('N', 'T')[trans_mode])
+        return scalg.lu_solve(lu_M, b, trans=trans_mode)
+
+    def dot_A(b):
+        if transpose:
+            return A.T.dot(b)
+        return A.dot(b)
+
+    # operators of the equivalent continuous time system
+    if DLTI:
+        lu_ApI = lu(1., 1.)
+
+        def dot_Ac(b):
+            # (A - I)(A + I)^{-1} b, which commute
+            if transpose:
+                b = dot_A(b) - b
+                return lu_solve(lu_ApI, b, 1)
+            v = lu_solve(lu_ApI, b, 0)
+            return dot_A(v) - v
+
+        def solve_shifted(p, b):
+            # (Ac + pI)^{-1} b = (A + I)((1+p)A - (1-p)I)^{-1} b
+            lu_M = lu(1. + p, -(1. - p))
+            if transpose:
+                v = dot_A(b) + b
+                return lu_solve(lu_M, v, 1)
+            v = lu_solve(lu_M, b, 0)
+            return dot_A(v) + v
+
+        W = np.sqrt(2.) * lu_solve(lu_ApI, B, trans)
+    else:
+        dot_Ac = dot_A
+
+        def solve_shifted(p, b):
+            return lu_solve(lu(1., p), b, trans)
+
+        W = np.array(B, dtype=float)
+
+    if W.ndim == 1:
+        W.shape = (N, 1)
+
+    res0 = np.linalg.norm(W, 2) ** 2
+    Z = []
+    shifts = lr_adi_shifts(dot_Ac, W, num_shifts)
+    used_shifts = np.zeros((0,), dtype=complex)
+    i_shift = 0
+
+    if Print:
+        print('Iter\tRes\tRank')
+    for kk in range(maxiter):
+        if i_shift >= len(shifts):
+            # adaptive shifts from the current factor
+            used_shifts = np.concatenate((used_shifts, shifts))
+            shifts = lr_adi_shifts(dot_Ac, np.concatenate(Z, axis=1), num_shifts, used_shifts)
+            i_shift = 0
+
+        p = shifts[i_shift]
+        V = solve_shifted(p, W)
+        if p.imag == 0.:
+            p = p.real
+            V = V.real
+            W = W - 2. * p * V
+            Z.append(np.sqrt(-2. * p) * V)
+            i_shift += 1
+        else:
+            gamma = 2. * np.sqrt(-p.real)
+            delta = p.real / p.imag
+            Vr = V.real + delta * V.imag
+            W = W + gamma ** 2 * Vr
+            Z.append(gamma * Vr)
+            Z.append(gamma * np.sqrt(delta ** 2 + 1.) * V.imag)
+            # skip conjugate shift
+            i_shift += 2
+
+        res = np.linalg.norm(W, 2) ** 2 / res0
+        if Print:
+            print('%.4d\t%.3e\t%.5d' % (kk, res, sum([z.shape[1] for z in Z])))
+        if res < tol:
+            break
+    else:
+        warnings.warn('Low-rank ADI did not converge after %d iterations. Relative residual %.3e'
+                      % (maxiter, res))
+
+    return np.concatenate(Z, axis=1)
+
+
+def lr_adi_shifts(dot_A, V, num_shifts, used_shifts=None):
+    r"""
+    Adaptive shifts for the low-rank ADI iteration
+
+    The eigenvalues of :math:`\mathbf{A}` projected onto the span of :math:`\mathbf{V}` are used as candidate
+    shifts, from which ``num_shifts`` are chosen with Penzl's heuristic, i.e. by repeatedly adding the candidate
+    :math:`\lambda` worse approximated by the ADI rational function
+
+    .. math:: r(\lambda) = \prod_j\frac{\lambda - \bar{p}_j}{\lambda + p_j}
+
+    where the product extends over the shifts already used in the iteration and those selected so far.
+
+    If :math:`\mathbf{V}` has fewer columns than ``num_shifts``, the projection space is enlarged with a Krylov
+    sequence. Candidates on the right half plane are mirrored about the imaginary axis and complex shifts are always
+    returned in conjugate pairs, with the positive imaginary part first.
+
+    Args:
+        dot_A (function): Returns the product of :math:`\mathbf{A}` with a matrix.
+        V (np.ndarray): Matrix spanning the projection space.
+        num_shifts (int): Number of shifts.
+        used_shifts (np.ndarray): Shifts used in previous ADI iterations.
+
+    Returns:
+        np.ndarray: Shifts.
+    """
+    if used_shifts is None:
+        used_shifts = []
+
+    Q = scalg.orth(V)
+    while Q.shape[1] < num_shifts:
+        Qnew = scalg.orth(np.concatenate((Q, dot_A(Q[:, -1:])), axis=1))
+        if Qnew.shape[1] == Q.shape[1]:
+            break
+        Q = Qnew
+
+    candidates = scalg.eigvals(Q.T.dot(dot_A(Q)))
+    candidates = -np.abs(candidates.real) + 1j * candidates.imag
+    candidates = candidates[candidates.real < 0]
+    if len(candidates) == 0:
+        raise ValueError('Unable to find stable shifts for the low-rank ADI iteration')
+
+    def rational(p_list):
+        r = np.ones(len(candidates))
+        for p in p_list:
+            r *= np.abs((candidates - np.conj(p)) / (candidates + p))
+        return r
+
+    def conj_pair(p):
+        if p.imag == 0.:
+            return [complex(p.real, 0.)]
+        return [complex(p.real, np.abs(p.imag)), complex(p.real, -np.abs(p.imag))]
+
+    if len(used_shifts) == 0:
+        # first shift minimises the maximum of the rational function
+        max_rational = [np.max(rational(conj_pair(p))) for p in candidates]
+        shifts = conj_pair(candidates[np.argmin(max_rational)])
+    else:
+        shifts = []
+    while len(shifts) < num_shifts:
+        i_max = np.argmax(rational(list(used_shifts) + shifts))
+        new_shifts = conj_pair(candidates[i_max])
+        if new_shifts[0] in shifts:
+            break
+        shifts += new_shifts
+
+    return np.array(shifts)
+
+
+def balreal_lr_adi(A, B, C, DLTI=True, tolADI=1e-10, maxiter=100, num_shifts=8, tolSVD=1e-6, Print=False):
+    r"""
+    Balanced realisation through low-rank ADI Gramians
+
+    The controllability and observability Gramians are obtained in factorised form
+
+    .. math::
+        \mathbf{W_c} &\approx \mathbf{Z_c\,Z_c^T} \\
+        \mathbf{W_o} &\approx \mathbf{Z_o\,Z_o^T}
+
+    with the low-rank ADI iteration (:func:`lr_adi`) such that the dense Gramians are never formed. The LU
+    factorisations of the shifted plant matrix (sparse, if :math:`\mathbf{A}` is a
+    :class:`sharpy.linear.src.libsparse.csc_matrix`) are shared between both Gramians. The balancing transformation
+    follows from the square root method
+
+    .. math::
+        \mathbf{Z_o^T\,Z_c} &= \mathbf{U\,\Sigma\,V^T} \\
+        \mathbf{T} &= \mathbf{Z_c\,V\,\Sigma}^{-1/2} \\
+        \mathbf{T}^{-1} &= \mathbf{\Sigma}^{-1/2}\,\mathbf{U^T\,Z_o^T}
+
+    where only the Hankel singular values above ``tolSVD`` times the largest one are retained.
+
+    The balanced system is of the form :math:`\mathbf{A_b}=\mathbf{T^{-1}AT}`, :math:`\mathbf{B_b}=\mathbf{T^{-1}B}`
+    and :math:`\mathbf{C_b}=\mathbf{CT}`.
+
+    Args:
+        A (np.ndarray or libsp.csc_matrix): Plant matrix.
+        B (np.ndarray): Input matrix.
+        C (np.ndarray): Output matrix.
+        DLTI (bool): Discrete time system.
+        tolADI (float): Relative tolerance of the ADI residual.
+        maxiter (int): Maximum number of ADI iterations per Gramian.
+        num_shifts (int): Number of ADI shifts selected at each adaptive step.
+        tolSVD (float): Relative threshold on the Hankel singular values.
+        Print (bool): Print convergence information.
+
+    Returns:
+        tuple: Hankel singular values, transformation :math:`\mathbf{T}`, inverse transformation
+        :math:`\mathbf{T}^{-1}` and ranks of the controllability and observability factors.
+    """
+
+    factorisations = dict()
+    Zc = lr_adi(A, B, DLTI=DLTI, tol=tolADI, maxiter=maxiter, num_shifts=num_shifts,
+                factorisations=factorisations, Print=Print)
+    Zo = lr_adi(A, C.T, DLTI=DLTI, tol=tolADI, maxiter=maxiter, num_shifts=num_shifts, transpose=True,
+                factorisations=factorisations, Print=Print)
+    factorisations = None
+
+    U, s, Vh = scalg.svd(np.dot(Zo.T, Zc), full_matrices=False)
+    nb = np.sum(s > tolSVD * s[0])
+    U, s, Vh = U[:, :nb], s[:nb], Vh[:nb, :]
+
+    sinv = s ** (-0.5)
+    T = np.dot(Zc, Vh.T * sinv)
+    Tinv = np.dot((U * sinv).T, Zo.T)
+
+    if Print:
+        print('rank(Zc)=%.4d\trank(Zo)=%.4d\tbalanced states=%.4d' % (Zc.shape[1], Zo.shape[1], nb))
+
+    return s, T, Tinv, Zc.shape[1], Zo.shape[1]
+
+
 ### utilities for balfreq
 
 def get_trapz_weights(k0,kend,Nk,knyq=False):
@@ -726,7 +1021,7 @@ def get_gauss_weights(k0,kend,Npart,order):
 
 
 def balfreq(SS,DictBalFreq):
-    '''
+    r'''
     Method for frequency limited balancing.
     The Observability ad controllability Gramians over the frequencies kv
     are solved in factorised form. Balancd modes are then obtained with a
@@ -771,8 +1066,27 @@ def balfreq(SS,DictBalFreq):
         points. If True, this option also allows to automatically tune the
         balanced model.
 
-    Future options:
-        - Ncpu: for parallel run
+        - 'Ncpu': number of processes over which the solutions at the
+        integration points are distributed (default 1, i.e. serial run).
+
+        - 'streaming_svd': if True, the factors of the Gramians are not
+        stored in full but compressed through a truncated SVD as the
+        integration points are processed (default False). Only a number of
+        columns proportional to the retained rank and to 'Ncpu' is held in
+        memory at any time. If 'output_modes' is True, the compressed factors
+        are returned in place of Zc and Zo.
+
+        - 'streaming_svd_tol': relative tolerance on the singular values of
+        the Gramian factors retained by the streaming SVD (default 1e-10).
+
+        - 'streaming_svd_rank': maximum rank of the compressed Gramian
+        factors. If 0, the rank is only limited by 'streaming_svd_tol'.
+
+    For each integration point a single LU factorisation of
+    :math:`(z\mathbf{I} - \mathbf{A})` is used for both the controllability
+    and the observability systems. For sparse systems the fill-reducing
+    column ordering is computed only once, given that the sparsity pattern of
+    the matrix is the same at all points.
 
 
     The following integration schemes are available:
@@ -835,6 +1149,18 @@ def balfreq(SS,DictBalFreq):
     if 'get_frequency_response' not in DictBalFreq:
         DictBalFreq['get_frequency_response'] = False
 
+    if 'Ncpu' not in DictBalFreq:
+        DictBalFreq['Ncpu'] = 1
+
+    if 'streaming_svd' not in DictBalFreq:
+        DictBalFreq['streaming_svd'] = False
+
+    if 'streaming_svd_tol' not in DictBalFreq:
+        DictBalFreq['streaming_svd_tol'] = 1e-10
+
+    if 'streaming_svd_rank' not in DictBalFreq:
+        DictBalFreq['streaming_svd_rank'] = 0
+
 
     ### get integration points and weights
 
@@ -881,42 +1207,71 @@ def balfreq(SS,DictBalFreq):
     wv = np.concatenate( (wv_low,wv_high) ) * SS.dt
     zv = np.cos(kvdt)+1.j*np.sin(kvdt)
 
-    Eye=libsp.eye_as(SS.A)
-    Zc=np.zeros( (SS.states,2*SS.inputs*len(kvdt)),)
-    Zo=np.zeros( (SS.states,2*SS.outputs*Nk_low),)
+    Ncpu = DictBalFreq['Ncpu']
+    streaming = DictBalFreq['streaming_svd']
+
+    # fill-reducing ordering computed once and reused at all points
+    perm_c = balfreq_ordering(SS.A, zv[0])
+
+    if streaming:
+        Zc, Zo = None, None
+    else:
+        Zc=np.zeros( (SS.states,2*SS.inputs*len(kvdt)),)
+        Zo=np.zeros( (SS.states,2*SS.outputs*Nk_low),)
 
     if DictBalFreq['get_frequency_response']:
         Yfreq=np.empty((SS.outputs,SS.inputs,Nk_low,),dtype=np.complex_)
         kv=kv_low
 
-    for kk in range( len(kvdt) ):
-
-        zval=zv[kk]
-        Intfact=wv[kk]   # integration factor
+    # points are processed in chunks such that only Ncpu solutions are held in memory
+    chunk = max(Ncpu, 1)
+    pool = None
+    if Ncpu > 1:
+        pool = mpr.Pool(Ncpu, initializer=_initialise_balfreq_worker, initargs=(SS.A, SS.B, SS.C, perm_c))
+    try:
+        for kk_start in range(0, len(kvdt), chunk):
+            kk_chunk = range(kk_start, min(kk_start + chunk, len(kvdt)))
+            if pool is not None:
+                P = [pool.apply_async(_worker_balfreq_point, args=(zv[kk], kk < Nk_low)) for kk in kk_chunk]
+                results = [pp.get() for pp in P]
+            else:
+                results = [balfreq_point(SS.A, SS.B, SS.C, zv[kk], kk < Nk_low, perm_c) for kk in kk_chunk]
 
-        Qctrl = Intfact * libsp.solve(zval*Eye-SS.A,SS.B)
-        kkvec=range( 2*kk*SS.inputs, 2*(kk+1)*SS.inputs )
-        Zc[:,kkvec[:SS.inputs]]= Qctrl.real
-        Zc[:,kkvec[SS.inputs:]]= Qctrl.imag
+            Zc_chunk, Zo_chunk = [], []
+            for kk, (Qctrl, Qobs) in zip(kk_chunk, results):
+                Intfact = wv[kk]   # integration factor
 
+                Qctrl = Intfact * Qctrl
+                Zc_chunk += [Qctrl.real, Qctrl.imag]
 
-        ### ----- frequency response
-        if DictBalFreq['get_frequency_response'] and kk<Nk_low:
-            Yfreq[:,:,kk]= (1./Intfact)*\
-            				 libsp.dot(SS.C,Qctrl,type_out=np.ndarray)+SS.D
+                ### ----- frequency response
+                if DictBalFreq['get_frequency_response'] and kk<Nk_low:
+                    Yfreq[:,:,kk]= (1./Intfact)*\
+                                     libsp.dot(SS.C,Qctrl,type_out=np.ndarray)+SS.D
 
-        ### ----- observability
-        if kk>=Nk_low:
-            continue
+                ### ----- observability
+                if kk>=Nk_low:
+                    continue
 
-        Qobs = Intfact * libsp.solve(np.conj(zval)*Eye-SS.A.T,SS.C.T)
+                Qobs = Intfact * Qobs
+                Zo_chunk += [Intfact*Qobs.real, Intfact*Qobs.imag]
 
-        kkvec=range( 2*kk*SS.outputs, 2*(kk+1)*SS.outputs )
-        Zo[:,kkvec[:SS.outputs]]= Intfact*Qobs.real
-        Zo[:,kkvec[SS.outputs:]]= Intfact*Qobs.imag
+            if streaming:
+                Zc = streaming_lowrank_update(Zc, Zc_chunk, DictBalFreq['streaming_svd_tol'],
+                                              DictBalFreq['streaming_svd_rank'])
+                Zo = streaming_lowrank_update(Zo, Zo_chunk, DictBalFreq['streaming_svd_tol'],
+                                              DictBalFreq['streaming_svd_rank'])
+            else:
+                Zc[:, 2*kk_chunk[0]*SS.inputs:2*(kk_chunk[-1]+1)*SS.inputs] = np.concatenate(Zc_chunk, axis=1)
+                if len(Zo_chunk) > 0:
+                    Zo[:, 2*kk_chunk[0]*SS.outputs:2*kk_chunk[0]*SS.outputs + SS.outputs*len(Zo_chunk)] = \
+                        np.concatenate(Zo_chunk, axis=1)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
 
     # delete full matrices
-    Kernel=None
     Qctrl=None
     Qobs=None
 
@@ -951,6 +1306,109 @@ def balfreq(SS,DictBalFreq):
     return outs
 
 
+def balfreq_ordering(A, zval):
+    r"""
+    Returns the fill-reducing column permutation of :math:`(z\mathbf{I} - \mathbf{A})` used by the sparse LU
+    factorisations in :func:`balfreq`. As the sparsity pattern does not depend on :math:`z`, this is computed only
+    once. ``None`` is returned for dense matrices.
+    """
+    if type(A) is not libsp.csc_matrix:
+        return None
+    M = scsp.csc_matrix(zval * scsp.identity(A.shape[0], format='csc') - A)
+    return scsp.linalg.splu(M, permc_spec='COLAMD').perm_c
+
+
+def balfreq_point(A, B, C, zval, observability=True, perm_c=None):
+    r"""
+    Solves the controllability and observability systems of :func:`balfreq` at the integration point ``zval``
+
+    .. math::
+        (z\mathbf{I} - \mathbf{A})\mathbf{Q}_c &= \mathbf{B} \\
+        (\bar{z}\mathbf{I} - \mathbf{A}^T)\mathbf{Q}_o &= \mathbf{C}^T
+
+    The second system is the conjugate transpose of the first, hence the same LU factorisation is used for both.
+
+    Args:
+        A (np.ndarray or libsp.csc_matrix): State matrix.
+        B (np.ndarray): Input matrix.
+        C (np.ndarray): Output matrix.
+        zval (complex): Integration point on the unit circle.
+        observability (bool): Solve also for the observability system.
+        perm_c (np.ndarray): Column ordering of sparse matrices, as returned by :func:`balfreq_ordering`.
+
+    Returns:
+        tuple: ``(Qctrl, Qobs)``, where ``Qobs`` is ``None`` if ``observability=False``.
+    """
+
+    B = np.array(libsp.dense(B), dtype=complex)
+    Qobs = None
+    if type(A) is libsp.csc_matrix:
+        M = scsp.csc_matrix(zval * scsp.identity(A.shape[0], format='csc') - A)
+        if perm_c is None:
+            perm_c = balfreq_ordering(A, zval)
+        lu = scsp.linalg.splu(M[:, perm_c], permc_spec='NATURAL')
+        Qctrl = np.empty_like(B)
+        Qctrl[perm_c, :] = lu.solve(B)
+        if observability:
+            CT = np.array(libsp.dense(C).T, dtype=complex)
+            Qobs = lu.solve(CT[perm_c, :], trans='H')
+    else:
+        lu = scalg.lu_factor(zval * np.eye(A.shape[0]) - A)
+        Qctrl = scalg.lu_solve(lu, B)
+        if observability:
+            Qobs = scalg.lu_solve(lu, np.array(libsp.dense(C).T, dtype=complex), trans=2)
+
+    return Qctrl, Qobs
+
+
+def streaming_lowrank_update(L, new_columns, tol=1e-10, max_rank=0):
+    r"""
+    Updates the compressed factor :math:`\mathbf{L}` of :math:`\mathbf{ZZ}^T` when new columns are appended to
+    :math:`\mathbf{Z}`.
+
+    The SVD :math:`[\mathbf{L}, \mathbf{Z}_{new}] = \mathbf{U\Sigma V}^T` is truncated to the singular values
+    greater than ``tol`` times the largest one and to at most ``max_rank`` columns (if greater than 0). The updated
+    factor is :math:`\mathbf{L} = \mathbf{U\Sigma}`, such that :math:`\mathbf{LL}^T` is the best low rank
+    approximation of :math:`\mathbf{ZZ}^T` and the right singular vectors never need to be stored.
+
+    Args:
+        L (np.ndarray or None): Current factor (``None`` at the first update).
+        new_columns (list): Blocks of columns to append.
+        tol (float): Relative truncation tolerance.
+        max_rank (int): Maximum rank.
+
+    Returns:
+        np.ndarray: Updated factor.
+    """
+
+    if L is not None:
+        new_columns = [L] + list(new_columns)
+    if len(new_columns) == 0:
+        return L
+
+    U, sv, _ = scalg.svd(np.concatenate(new_columns, axis=1), full_matrices=False)
+    rank = np.sum(sv > tol * sv[0])
+    if max_rank > 0:
+        rank = min(rank, max_rank)
+
+    return U[:, :rank] * sv[:rank]
+
+
+_balfreq_worker_system = dict()
+
+
+def _initialise_balfreq_worker(A, B, C, perm_c):
+    _balfreq_worker_system['A'] = A
+    _balfreq_worker_system['B'] = B
+    _balfreq_worker_system['C'] = C
+    _balfreq_worker_system['perm_c'] = perm_c
+
+
+def _worker_balfreq_point(zval, observability):
+    return balfreq_point(_balfreq_worker_system['A'], _balfreq_worker_system['B'], _balfreq_worker_system['C'],
+                         zval, observability, _balfreq_worker_system['perm_c'])
+
+
 
 def modred(SSb, N, method='residualisation'):
     """
@@ -18,6 +18,11 @@ The module includes the methods:
     wrapper of the libss.join method.
     - BT_transfer_function: evolution of transfer function methods. The growth of
     the interpolated system size is avoided through balancing.
+    - save_rom_database: stores the ROMs built over a parameter grid, together
+    with their projection bases, in a HDF5 file.
+    - ROMDatabase and InterpROMDatabase: lazy access to a ROM database and
+    interpolation front end, which only loads the ROMs at the grid points
+    neighbouring the interpolation point.
 
 
 References:
@@ -28,11 +33,15 @@ References:
 """
 
 import warnings
+import collections
 import numpy as np
 import scipy.linalg as scalg
+import scipy.spatial as scspatial
+import h5py
 
 # dependency
 import sharpy.linear.src.libss as libss
+import sharpy.linear.src.libsparse as libsp
 
 
 def transfer_function(SS_list, wv):
@@ -196,6 +205,110 @@ def FLB_transfer_function(SS_list, wv, U_list, VT_list, hsv_list=None, M_list=No
 
 
 
+def congruence_transformation(V, WT, Vref, WTref, method_proj):
+    '''
+    Returns the matrices Q and Qinv that project a ROM, obtained with the basis
+    V and WT, onto the generalised coordinates of the reference basis Vref and
+    WTref, i.e.
+
+        A_proj = Qinv A Q
+
+    The transformation only depends on the bases of the ROM and on the
+    reference ones, hence it can be computed independently for each ROM. See
+    InterpROM for the available values of method_proj. The 'panzer' method
+    requires all the bases and is only available in InterpROM.
+    '''
+
+    if method_proj=='amsallem':
+        warnings.warn('Method untested!')
+
+        U,sv,Z = scalg.svd( np.dot(V.T, Vref) ,
+                            full_matrices=False,overwrite_a=False,
+                            lapack_driver='gesdd')
+        Q = np.dot(U,Z.T)
+        U,sv,Z = scalg.svd( np.dot(WT, WTref) ,
+                            full_matrices=False,overwrite_a=False,
+                            lapack_driver='gesdd')
+        Qinv = np.dot(U,Z.T).T
+
+    elif method_proj=='leastsq':
+
+        Q,_,_,_ = scalg.lstsq(V,Vref)
+        print('det(Q): %.3e\tcond(Q): %.3e'\
+                                  %(np.linalg.det(Q),np.linalg.cond(Q)))
+        # if cond(Q) is small...
+        # Qinv = np.linalg.inv(Q)
+        P,_,_,_ = scalg.lstsq(WT.T,WTref.T)
+        Qinv = P.T
+
+    elif method_proj=='strongMAC':
+        '''
+        Strong MAC enforcements as per Ref.[4]
+        '''
+
+        VTVref = np.dot(Vref.T,Vref)
+        Q = np.linalg.solve( np.dot(Vref.T,V), VTVref )
+        Qinv =  np.linalg.inv(Q)
+        print('det(Q): %.3e\tcond(Q): %.3e'\
+                                 %(np.linalg.det(Q),np.linalg.cond(Q)))
+
+    elif method_proj=='strongMAC_BT':
+        '''
+        This is equivalent to Mahony 2004, Eq. 7, for the case of basis
+        obtained by balancing. In general, it will fail if V and Vref
+        do not describe the same subspace
+        '''
+
+        Q = np.linalg.inv( np.dot(WTref, V) )
+        Qinv =  np.dot(WTref, V)
+        print('det(Q): %.3e\tcond(Q): %.3e'\
+                                 %(np.linalg.det(Q),np.linalg.cond(Q)))
+
+    elif method_proj=='maraniello_BT':
+        '''
+        Projection over ii. This is a sort of weak enforcement
+        '''
+
+        Q = np.dot(WT, Vref)
+        Qinv =  np.dot( WTref, V )
+        print('det(Q): %.3e\tcond(Q): %.3e'\
+                                 %(np.linalg.det(Q),np.linalg.cond(Q)))
+
+    elif method_proj=='weakMAC_right_orth':
+        '''
+        This is like Amsallem, but only for state-space models with right 
+        orthogonal basis 
+        '''
+
+        Q,sc = scalg.orthogonal_procrustes(V, Vref)
+        Qinv =  Q.T
+        print('det(Q): %.3e\tcond(Q): %.3e'\
+                                 %(np.linalg.det(Q),np.linalg.cond(Q)))
+
+    elif method_proj=='weakMAC':
+        '''
+        WeakMAC enforcement on the right hand side basis, V
+        '''
+
+        # svd of reference
+        Uref,svref,Zhref = scalg.svd(Vref,full_matrices=False)
+
+        # svd of basis
+        Uhere,svhere,Zhhere = scalg.svd(V, full_matrices=False)
+
+        R,sc = scalg.orthogonal_procrustes(Uhere, Uref)
+        Q = np.dot( np.dot(Zhhere.T, np.diag(svhere**(-1))), R )
+        Qinv = np.dot( R.T, np.dot(np.diag(svhere), Zhhere) )
+        print('det(Q): %.3e\tcond(Q): %.3e'\
+                                 %(np.linalg.det(Q),np.linalg.cond(Q)))
+
+    else:
+        raise NameError('Projection method %s not implemented!' %method_proj)
+
+    return Q, Qinv
+
+
+
 
 class InterpROM():
     '''
@@ -351,24 +464,7 @@ class InterpROM():
         self.QQinv = []
 
 
-        if self.method_proj=='amsallem':
-            warnings.warn('Method untested!')
-
-            for ii in range(len(self.SS)):
-
-                U,sv,Z = scalg.svd( np.dot(self.VV[ii].T, self.Vref) ,
-                                    full_matrices=False,overwrite_a=False,
-                                    lapack_driver='gesdd')
-                Q = np.dot(U,Z.T)
-                U,sv,Z = scalg.svd( np.dot(self.WWT[ii], self.WTref) ,
-                                    full_matrices=False,overwrite_a=False,
-                                    lapack_driver='gesdd')
-                Qinv = np.dot(U,Z.T).T
-                self.QQ.append(Q)
-                self.QQinv.append(Qinv)
-
-
-        elif self.method_proj=='panzer':
+        if self.method_proj=='panzer':
             warnings.warn('Method untested!')
 
             # generate basis
@@ -384,118 +480,296 @@ class InterpROM():
                 self.QQ.append(Q)
                 self.QQinv.append(Qinv)
 
-
-        elif self.method_proj=='leastsq':
-
+        else:
             for ii in range(len(self.SS)):
-             
-                Q,_,_,_ = scalg.lstsq(self.VV[ii],self.Vref)
-                print('det(Q): %.3e\tcond(Q): %.3e'\
-                                          %(np.linalg.det(Q),np.linalg.cond(Q)))
-                # if cond(Q) is small...
-                # Qinv = np.linalg.inv(Q)
-                P,_,_,_ = scalg.lstsq(self.WWT[ii].T,self.WTref.T) 
+                Q, Qinv = congruence_transformation(self.VV[ii], self.WWT[ii],
+                                                    self.Vref, self.WTref, self.method_proj)
                 self.QQ.append(Q)
-                self.QQinv.append(P.T)
+                self.QQinv.append(Qinv)
 
 
-        elif self.method_proj=='strongMAC':
-            '''
-            Strong MAC enforcements as per Ref.[4]
-            '''
+        ### Project 
+        for ii in range(len(self.SS)):
 
-            VTVref = np.dot(self.Vref.T,self.Vref)
-            for ii in range(len(self.SS)):
+            self.AA.append( np.dot(self.QQinv[ii], np.dot(self.SS[ii].A, self.QQ[ii])) )
+            self.BB.append( np.dot(self.QQinv[ii], self.SS[ii].B) )
+            self.CC.append( np.dot(self.SS[ii].C, self.QQ[ii]) )   
 
-                Q = np.linalg.solve( np.dot(self.Vref.T,self.VV[ii]), VTVref )
-                Qinv =  np.linalg.inv(Q)
-                print('det(Q): %.3e\tcond(Q): %.3e'\
-                                         %(np.linalg.det(Q),np.linalg.cond(Q)))                
-                self.QQ.append(Q)
-                self.QQinv.append(Qinv)
+        self.Projected = True
 
 
-        elif self.method_proj=='strongMAC_BT':
-            '''
-            This is equivalent to Mahony 2004, Eq. 7, for the case of basis
-            obtained by balancing. In general, it will fail if VV[ii] and Vref
-            do not describe the same subspace
-            '''
 
-            for ii in range(len(self.SS)):
+def save_rom_database(filename, params, SS, VV=None, WWT=None, Vref=None, WTref=None):
+    '''
+    Saves the ROMs built over a parameter grid in the HDF5 file filename.
 
-                Q = np.linalg.inv( np.dot(self.WTref, self.VV[ii]) )
-                Qinv =  np.dot(self.WTref, self.VV[ii]) 
-                print('det(Q): %.3e\tcond(Q): %.3e'\
-                                         %(np.linalg.det(Q),np.linalg.cond(Q)))                
-                self.QQ.append(Q)
-                self.QQinv.append(Qinv)
+    Inputs:
+    - params: array of shape (N, Np) with the Np parameters of the N ROMs. For
+    a 1D parameter grid, an array of length N is also accepted.
 
+    - SS: list of N state-space models (instances of libss.ss class)
 
-        elif self.method_proj=='maraniello_BT':
-            '''
-            Projection over ii. This is a sort of weak enforcement
-            '''
+    - VV, WWT: lists of the V and W^T matrices used to produce SS (optional)
 
-            for ii in range(len(self.SS)):
+    - Vref, WTref: reference subspaces for projection (optional)
 
-                Q = np.dot(self.WWT[ii], self.Vref)
-                Qinv =  np.dot( self.WTref, self.VV[ii] )
-                print('det(Q): %.3e\tcond(Q): %.3e'\
-                                         %(np.linalg.det(Q),np.linalg.cond(Q)))                
-                self.QQ.append(Q)
-                self.QQinv.append(Qinv)
+    The file contains the dataset 'parameters' and, for each ROM, a group
+    'rom_XXXXX' with the datasets A, B, C, D and, if given, V and WT. The
+    time-step is stored as the attribute 'dt' of each group, for discrete-time
+    systems only.
+    '''
 
+    params = np.array(params, dtype=float)
+    if params.ndim == 1:
+        params = params.reshape((-1, 1))
+    assert params.shape[0] == len(SS), 'Number of parameters and state-space models do not match'
+
+    with h5py.File(filename, 'w') as h5file:
+        h5file.create_dataset('parameters', data=params)
+        if Vref is not None:
+            h5file.create_dataset('Vref', data=libsp.dense(Vref))
+        if WTref is not None:
+            h5file.create_dataset('WTref', data=libsp.dense(WTref))
+
+        for ii, ss_here in enumerate(SS):
+            grp = h5file.create_group('rom_%05d' % ii)
+            for name in ['A', 'B', 'C', 'D']:
+                grp.create_dataset(name, data=libsp.dense(getattr(ss_here, name)))
+            if ss_here.dt is not None:
+                grp.attrs['dt'] = ss_here.dt
+            if VV is not None:
+                grp.create_dataset('V', data=libsp.dense(VV[ii]))
+            if WWT is not None:
+                grp.create_dataset('WT', data=libsp.dense(WWT[ii]))
+
+
+class ROMDatabase():
+    '''
+    Lazy access to a ROM database written by save_rom_database.
 
-        elif self.method_proj=='weakMAC_right_orth':
-            '''
-            This is like Amsallem, but only for state-space models with right 
-            orthogonal basis 
-            '''        
+    Only the grid parameters are read when the database is opened. ROMs and
+    projection bases are loaded on request and kept in a least recently used
+    cache of cache_size entries, such that large databases can be accessed
+    with bounded memory.
 
-            for ii in range(len(self.SS)):
+    Inputs:
+    - filename: HDF5 database
+    - cache_size: number of ROMs kept in memory
+    '''
 
-                Q,sc = scalg.orthogonal_procrustes(self.VV[ii], self.Vref)
-                Qinv =  Q.T
-                print('det(Q): %.3e\tcond(Q): %.3e'\
-                                         %(np.linalg.det(Q),np.linalg.cond(Q)))                
-                self.QQ.append(Q)
-                self.QQinv.append(Qinv)
- 
+    def __init__(self, filename, cache_size=8):
 
-        elif self.method_proj=='weakMAC':
-            '''
-            WeakMAC enforcement on the right hand side basis, V
-            '''
+        self.filename = filename
+        self.h5file = h5py.File(filename, 'r')
+        self.params = self.h5file['parameters'][()]
+        self.cache_size = cache_size
+        self._cache = collections.OrderedDict()
 
-            # svd of reference
-            Uref,svref,Zhref = scalg.svd(self.Vref,full_matrices=False)
+    def __len__(self):
+        return self.params.shape[0]
 
-            for ii in range(len(self.SS)):
+    def __enter__(self):
+        return self
 
-                # svd of basis
-                Uhere,svhere,Zhhere = scalg.svd(self.VV[ii], full_matrices=False)
+    def __exit__(self, *args):
+        self.close()
 
-                R,sc = scalg.orthogonal_procrustes(Uhere, Uref)
-                Q = np.dot( np.dot(Zhhere.T, np.diag(svhere**(-1))), R )
-                Qinv = np.dot( R.T, np.dot(np.diag(svhere), Zhhere) )
-                print('det(Q): %.3e\tcond(Q): %.3e'\
-                                         %(np.linalg.det(Q),np.linalg.cond(Q)))  
-                self.QQ.append(Q)
-                self.QQinv.append(Qinv)
+    def close(self):
+        self.h5file.close()
+        self._cache.clear()
+
+    @property
+    def Vref(self):
+        if 'Vref' in self.h5file:
+            return self.h5file['Vref'][()]
+
+    @property
+    def WTref(self):
+        if 'WTref' in self.h5file:
+            return self.h5file['WTref'][()]
+
+    def load(self, ii):
+        '''
+        Returns the tuple (ss, V, WT) of the ii-th ROM. V and WT are None if
+        not stored in the database.
+        '''
+
+        if ii in self._cache:
+            self._cache.move_to_end(ii)
+            return self._cache[ii]
+
+        grp = self.h5file['rom_%05d' % ii]
+        dt = grp.attrs['dt'] if 'dt' in grp.attrs else None
+        ss_here = libss.ss(grp['A'][()], grp['B'][()], grp['C'][()], grp['D'][()], dt=dt)
+        V = grp['V'][()] if 'V' in grp else None
+        WT = grp['WT'][()] if 'WT' in grp else None
+
+        self._cache[ii] = (ss_here, V, WT)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return self._cache[ii]
+
+
+class InterpROMDatabase():
+    '''
+    Interpolation of the ROMs stored in a ROMDatabase.
+
+    At each interpolation point, only the ROMs at the vertices of the grid
+    interval (1D parameter grids) or of the Delaunay simplex (N-D grids)
+    containing the point are loaded, and interpolated with linear
+    (barycentric) weights.
+
+    Two interpolation methods are available:
+
+    - __call__: the state-space matrices are interpolated, as in InterpROM,
+    after projecting the ROMs over the reference basis with the method
+    method_proj (see InterpROM). If method_proj is None, the ROMs are assumed
+    to be defined over the same basis. The congruence transformations and
+    projected matrices are cached.
+
+    - transfer_function: the frequency responses of the ROMs are interpolated,
+    as for the transfer_function method. For each ROM, the state matrix is
+    diagonalised only once, such that the frequency response at all
+    frequencies is evaluated through array operations.
+
+    Inputs:
+    - database: ROMDatabase instance
+    - method_proj: projection method (see InterpROM)
+    - Vref, WTref: reference basis for projection. If None, these are read
+    from the database.
+    - cache_size: number of projected and diagonalised ROMs kept in memory
+    '''
+
+    def __init__(self, database, method_proj=None, Vref=None, WTref=None, cache_size=8):
+
+        self.database = database
+        self.method_proj = method_proj
+        self.Vref = Vref if Vref is not None else database.Vref
+        self.WTref = WTref if WTref is not None else database.WTref
+        self.cache_size = cache_size
+
+        if method_proj == 'panzer':
+            raise NameError('Projection method panzer requires all the bases. Use InterpROM instead')
 
+        self.params = database.params
+        if self.params.shape[1] == 1:
+            self.order = np.argsort(self.params[:, 0])
+            self.triangulation = None
         else:
-            raise NameError('Projection method %s not implemented!' %self.method_proj)
+            self.triangulation = scspatial.Delaunay(self.params)
 
+        self._projected = collections.OrderedDict()
+        self._modal = collections.OrderedDict()
 
-        ### Project 
-        for ii in range(len(self.SS)):
+    def _add_to_cache(self, cache, ii, value):
+        cache[ii] = value
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return value
 
-            self.AA.append( np.dot(self.QQinv[ii], np.dot(self.SS[ii].A, self.QQ[ii])) )
-            self.BB.append( np.dot(self.QQinv[ii], self.SS[ii].B) )
-            self.CC.append( np.dot(self.SS[ii].C, self.QQ[ii]) )   
+    def weights(self, param):
+        '''
+        Returns the indices of the ROMs neighbouring the point param and the
+        associated interpolation weights.
+        '''
 
-        self.Projected = True
+        param = np.atleast_1d(np.array(param, dtype=float))
+
+        if self.triangulation is None:
+            grid = self.params[self.order, 0]
+            if param[0] < grid[0] or param[0] > grid[-1]:
+                raise ValueError('Parameter %s outside the database range' % param)
+            jj = min(np.searchsorted(grid, param[0], side='right'), len(grid) - 1)
+            if jj == 0:
+                return self.order[:1], np.ones(1)
+            xi = (param[0] - grid[jj - 1]) / (grid[jj] - grid[jj - 1])
+            return self.order[[jj - 1, jj]], np.array([1. - xi, xi])
+
+        simplex = self.triangulation.find_simplex(param)
+        if simplex < 0:
+            raise ValueError('Parameter %s outside the database range' % param)
+        Tr = self.triangulation.transform[simplex]
+        bary = np.dot(Tr[:-1], param - Tr[-1])
+        return self.triangulation.simplices[simplex], np.append(bary, 1. - np.sum(bary))
+
+    def projected(self, ii):
+        '''
+        Returns the matrices (A, B, C, D) of the ii-th ROM projected over the
+        reference basis.
+        '''
+
+        if ii in self._projected:
+            self._projected.move_to_end(ii)
+            return self._projected[ii]
+
+        ss_here, V, WT = self.database.load(ii)
+        if self.method_proj is None:
+            return self._add_to_cache(self._projected, ii, (ss_here.A, ss_here.B, ss_here.C, ss_here.D))
+
+        Q, Qinv = congruence_transformation(V, WT, self.Vref, self.WTref, self.method_proj)
+        return self._add_to_cache(self._projected, ii,
+                                  (np.dot(Qinv, np.dot(ss_here.A, Q)), np.dot(Qinv, ss_here.B),
+                                   np.dot(ss_here.C, Q), ss_here.D))
+
+    def __call__(self, param):
+        '''
+        Evaluate the interpolated state-space model at the point param.
+        '''
+
+        indices, wv = self.weights(param)
+
+        mats = [np.zeros_like(M, dtype=float) for M in self.projected(indices[0])]
+        for ii, ww in zip(indices, wv):
+            for M, Mhere in zip(mats, self.projected(ii)):
+                M += ww * Mhere
+
+        return libss.ss(*mats, dt=self.database.load(indices[0])[0].dt)
+
+    def modal(self, ii):
+        '''
+        Returns the eigenvalues and the projected input/output matrices of
+        the ii-th ROM, (eigs, CX, XinvB, D), with A = X diag(eigs) X^{-1}.
+        '''
+
+        if ii in self._modal:
+            self._modal.move_to_end(ii)
+            return self._modal[ii]
+
+        ss_here = self.database.load(ii)[0]
+        eigs, X = scalg.eig(ss_here.A)
+        if np.linalg.cond(X) > 1e12:
+            warnings.warn('State matrix of ROM %d is close to defective: frequency '
+                          'response may be inaccurate' % ii)
+        return self._add_to_cache(self._modal, ii,
+                                  (eigs, np.dot(ss_here.C, X), np.linalg.solve(X, ss_here.B), ss_here.D,
+                                   ss_here.dt))
+
+    def transfer_function(self, param, wv):
+        '''
+        Frequency response, at the frequencies wv, of the transfer function
+        interpolation of the ROMs at the point param. Returns an array of shape
+        (outputs, inputs, len(wv)).
+        '''
+
+        indices, weights = self.weights(param)
+        wv = np.atleast_1d(wv)
+
+        Yfreq = None
+        for ii, ww in zip(indices, weights):
+            eigs, CX, XinvB, D, dt = self.modal(ii)
+            if dt is not None:
+                zv = np.exp(1.j * wv * dt)
+            else:
+                zv = 1.j * wv
+
+            Yhere = np.einsum('in,nk,nj->ijk', CX, 1. / (zv[None, :] - eigs[:, None]), XinvB) + D[:, :, None]
+            if Yfreq is None:
+                Yfreq = ww * Yhere
+            else:
+                Yfreq += ww * Yhere
+
+        return Yfreq
 
 
 # ------------------------------------------------------------------------------
@@ -5,6 +5,7 @@ import copy
 import numpy as np
 
 import sharpy.aero.utils.mapping as mapping
+import sharpy.aero.utils.utils as aero_utils
 import sharpy.utils.cout_utils as cout
 import sharpy.utils.solver_interface as solver_interface
 import sharpy.utils.controller_interface as controller_interface
@@ -13,6 +14,7 @@ import sharpy.utils.settings as settings
 import sharpy.utils.algebra as algebra
 import sharpy.structure.utils.xbeamlib as xbeam
 import sharpy.utils.exceptions as exc
+import sharpy.utils.profiling as profiling
 
 
 @solver
@@ -24,6 +26,36 @@ class DynamicCoupled(BaseSolver):
     Using the ``DynamicCoupled`` solver requires that an instance of the ``StaticCoupled`` solver is called in the
     SHARPy solution ``flow`` when defining the problem case.
 
+    With ``adaptive_time_step`` on, the time step is adapted to the local error of the structural integration, so
+    that quiescent phases of the simulation are run with longer steps than, for instance, a gust encounter. The
+    error is estimated at the end of every step from the difference between the structural states and their explicit
+    second order prediction from the states at the beginning of the step (see :meth:`time_step_error`). Steps whose
+    error exceeds ``time_step_tolerance`` are rejected and repeated with a shorter time step, and the next time step
+    is chosen from the error of the last one within ``[dt_min, dt_max]``. The simulation then ends at
+    ``n_time_steps*dt`` regardless of the number of steps needed. When the time step changes, a wake convected with
+    the flow is rediscretised to the new time step (see :func:`sharpy.aero.utils.utils.resample_wake`) and the
+    prescribed forces of the ``.dyn.h5`` file are taken at the nominal time step ``dt`` closest to the time of the
+    step. Adaptive time stepping therefore needs a wake convected with the flow (``convection_scheme > 1``) and not
+    lumped (``wake_lumping_distance`` of ``StepUvlm``), and is not available with a prescribed motion of the reference
+    frame, which the structural solvers read by step number.
+
+    The FSI iterations of every step start, by default, from the converged state of the previous step. With
+    ``fsi_predictor``, the geometry of the first aerodynamic solution and the forces it is relaxed with are instead
+    predicted from the last converged steps (see :meth:`predict_step`), and the first iteration counts towards
+    convergence if its structural solution agrees with the prediction. On smooth responses this saves FSI iterations
+    only when ``minimum_steps`` allows convergence in the first iterations: its default of 3 requires four iterations
+    per step regardless of the prediction, so it should be lowered to ``0`` or ``1`` with a predictor. The number of
+    FSI iterations is shown at the end of the simulation with ``print_info``.
+
+    For cheap runs, such as design-space explorations, the FSI iterations can be replaced by a staggered
+    ``coupling_scheme`` that performs a single aerodynamic and structural solution per step (see
+    :meth:`staggered_step`): ``css`` (conventional serial staggered) solves the aerodynamics on the structural state at
+    the beginning of the step and ``gss`` (generalised serial staggered) on the state predicted with ``fsi_predictor``.
+    With ``aero_subcycles`` larger than one, the aerodynamics are only solved every ``aero_subcycles`` steps, with a
+    time step (and wake discretisation) ``aero_subcycles`` times longer, and the forces applied on the structure are
+    interpolated in between. The wake is then rediscretised at the first step, which needs a wake convected with the
+    flow (``convection_scheme > 1``) and not lumped.
+
     """
     solver_id = 'DynamicCoupled'
     solver_classification = 'Coupled'
@@ -124,6 +156,47 @@ class DynamicCoupled(BaseSolver):
     settings_default['pseudosteps_ramp_unsteady_force'] = 0
     settings_description['pseudosteps_ramp_unsteady_force'] = 'Length of the ramp with which unsteady force contribution is introduced every time step during the FSI iteration process'
 
+    settings_types['adaptive_time_step'] = 'bool'
+    settings_default['adaptive_time_step'] = False
+    settings_description['adaptive_time_step'] = 'Adapt the time step to the local error of the structural integration. The simulation ends at ``n_time_steps*dt``'
+
+    settings_types['dt_min'] = 'float'
+    settings_default['dt_min'] = 0.
+    settings_description['dt_min'] = 'Minimum time step with ``adaptive_time_step``. If ``0``, ``dt/10`` is used'
+
+    settings_types['dt_max'] = 'float'
+    settings_default['dt_max'] = 0.
+    settings_description['dt_max'] = 'Maximum time step with ``adaptive_time_step``. If ``0``, ``10*dt`` is used'
+
+    settings_types['time_step_tolerance'] = 'float'
+    settings_default['time_step_tolerance'] = 1e-5
+    settings_description['time_step_tolerance'] = 'Tolerance of the local error estimate of the structural states, relative to the norm of the displacement from the initial state, with ``adaptive_time_step``'
+
+    settings_types['max_time_step_ratio'] = 'float'
+    settings_default['max_time_step_ratio'] = 2.
+    settings_description['max_time_step_ratio'] = 'Maximum ratio between consecutive time steps with ``adaptive_time_step``'
+
+    settings_types['fsi_predictor'] = 'str'
+    settings_default['fsi_predictor'] = 'none'
+    settings_description['fsi_predictor'] = 'Prediction of the structural state and applied forces at the first FSI ' \
+                                            'iteration: ``none``, ``linear`` or ``quadratic`` extrapolation from the ' \
+                                            'last converged steps or ``newmark`` for the Newmark-beta predictor. ' \
+                                            'FSI iterations are only saved with ``minimum_steps`` lower than its ' \
+                                            'default, such as ``0`` or ``1``'
+
+    settings_types['coupling_scheme'] = 'str'
+    settings_default['coupling_scheme'] = 'strong'
+    settings_description['coupling_scheme'] = 'Aeroelastic coupling: ``strong`` iterates to FSI convergence every ' \
+                                              'step, ``css`` and ``gss`` perform a single aerodynamic and structural ' \
+                                              'solution per step (conventional and generalised serial staggered, ' \
+                                              'the latter with the ``fsi_predictor``, ``linear`` if ``none``)'
+
+    settings_types['aero_subcycles'] = 'int'
+    settings_default['aero_subcycles'] = 1
+    settings_description['aero_subcycles'] = 'Number of steps per aerodynamic solution with a staggered ' \
+                                             '``coupling_scheme``. The forces are interpolated between aerodynamic ' \
+                                             'solutions'
+
     settings_table = settings.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
 
@@ -144,7 +217,30 @@ class DynamicCoupled(BaseSolver):
         self.substep_dt = 0.
         self.initial_n_substeps = None
 
+        # adaptive time stepping
+        self.time = 0.
+        self.final_time = 0.
+        self.current_dt = 0.
+        self.next_dt = 0.
+        self.dt_min = 0.
+        self.dt_max = 0.
+        self.aero_dt = 0.
+        self.resample_wake = False
+        self.num_rejected_steps = 0
+
+        # FSI predictor
         self.predictor = False
+        self.predictor_order = 0
+        self.step_times = []
+        self.num_fsi_iterations = 0
+
+        # staggered coupling
+        self.staggered = False
+        self.first_ts = 0
+        self.staggered_aero_kstep = None
+        self.staggered_forces = None
+        self.staggered_initial_forces = None
+
         self.residual_table = None
         self.postprocessors = dict()
         self.with_postprocessors = False
@@ -199,6 +295,40 @@ class DynamicCoupled(BaseSolver):
             self.dt.value/(self.settings['structural_substeps'].value + 1))
         self.initial_n_substeps = self.settings['structural_substeps'].value
 
+        self.current_dt = self.dt.value
+        self.next_dt = self.dt.value
+        self.dt_min = self.settings['dt_min'].value
+        if not self.dt_min:
+            self.dt_min = 0.1*self.dt.value
+        self.dt_max = self.settings['dt_max'].value
+        if not self.dt_max:
+            self.dt_max = 10.*self.dt.value
+        if self.settings['adaptive_time_step'].value and self.settings['aero_solver'] == 'StepLinearUVLM':
+            raise NotImplementedError('Adaptive time stepping is not supported with the discrete-time StepLinearUVLM')
+
+        if self.settings['coupling_scheme'] not in ['strong', 'css', 'gss']:
+            raise NotImplementedError('coupling_scheme %s not recognised' % self.settings['coupling_scheme'])
+        self.staggered = self.settings['coupling_scheme'] != 'strong'
+        if self.settings['aero_subcycles'].value < 1:
+            raise ValueError('aero_subcycles has to be at least 1')
+        if self.settings['aero_subcycles'].value > 1:
+            if not self.staggered:
+                raise NotImplementedError('aero_subcycles is only supported with a staggered coupling_scheme')
+            if self.settings['adaptive_time_step'].value:
+                raise NotImplementedError('aero_subcycles is not supported with adaptive_time_step')
+            if self.settings['aero_solver'] == 'StepLinearUVLM':
+                raise NotImplementedError('aero_subcycles is not supported with the discrete-time StepLinearUVLM')
+        self.aero_dt = self.dt.value
+
+        predictor_orders = {'none': 0, 'linear': 1, 'quadratic': 2, 'newmark': 1}
+        try:
+            self.predictor_order = predictor_orders[self.settings['fsi_predictor']]
+        except KeyError:
+            raise NotImplementedError('fsi_predictor %s not recognised' % self.settings['fsi_predictor'])
+        self.predictor = self.settings['fsi_predictor'] != 'none'
+        if self.settings['coupling_scheme'] == 'gss' and not self.predictor:
+            self.predictor_order = 1
+
         self.print_info = self.settings['print_info']
         if self.settings['cleanup_previous_solution']:
             # if there's data in timestep_info[>0], copy the last one to
@@ -215,6 +345,31 @@ class DynamicCoupled(BaseSolver):
                                     self.settings['aero_solver_settings'])
         self.data = self.aero_solver.data
 
+        # the wake is rediscretised when the time step changes if it is convected with the flow
+        try:
+            convection_scheme = self.aero_solver.settings['convection_scheme'].value
+        except KeyError:
+            convection_scheme = None
+        self.resample_wake = convection_scheme is not None and convection_scheme > 1
+        if self.settings['adaptive_time_step'].value:
+            if convection_scheme is not None and convection_scheme < 2:
+                raise NotImplementedError('Adaptive time stepping is only supported with a wake convected with the '
+                                          'flow (convection_scheme > 1)')
+            if 'for_vel' in self.data.structure.dyn_dict or 'for_acc' in self.data.structure.dyn_dict:
+                raise NotImplementedError('Adaptive time stepping is not supported with a prescribed motion of the '
+                                          'reference frame')
+        if self.settings['aero_subcycles'].value > 1 and convection_scheme is not None and convection_scheme < 2:
+            raise NotImplementedError('aero_subcycles is only supported with a wake convected with the flow '
+                                      '(convection_scheme > 1)')
+        # the rediscretisation assumes a row of wake panels shed per time step, which the wake lumping breaks
+        try:
+            wake_lumping = self.aero_solver.settings['wake_lumping_distance'].value > 0.
+        except KeyError:
+            wake_lumping = False
+        if wake_lumping and (self.settings['adaptive_time_step'].value or self.settings['aero_subcycles'].value > 1):
+            raise NotImplementedError('wake_lumping_distance is not supported with adaptive_time_step or '
+                                      'aero_subcycles')
+
         # initialise postprocessors
         self.postprocessors = dict()
         if self.settings['postprocessors']:
@@ -319,10 +474,17 @@ class DynamicCoupled(BaseSolver):
         included.
         """
         # dynamic simulations start at tstep == 1, 0 is reserved for the initial state
-        for self.data.ts in range(
-                len(self.data.structure.timestep_info),
-                self.settings['n_time_steps'].value + len(self.data.structure.timestep_info)):
+        self.data.ts = len(self.data.structure.timestep_info) - 1
+        last_ts = self.data.ts + self.settings['n_time_steps'].value
+        self.time = self.data.ts*self.dt.value
+        self.final_time = last_ts*self.dt.value
+        self.step_times = [self.time]
+        self.first_ts = self.data.ts + 1
+        self.num_fsi_iterations = 0
+        while not self.finished(last_ts):
+            self.data.ts += 1
             initial_time = time.perf_counter()
+            profiling.profiler.set_time_step(self.data.ts)
             structural_kstep = self.data.structure.timestep_info[-1].copy()
             aero_kstep = self.data.aero.timestep_info[-1].copy()
 
@@ -344,94 +506,27 @@ class DynamicCoupled(BaseSolver):
             controlled_structural_kstep = structural_kstep.copy()
             controlled_aero_kstep = aero_kstep.copy()
 
-            k = 0
-            for k in range(self.settings['fsi_substeps'].value + 1):
-                if (k == self.settings['fsi_substeps'].value and
-                        self.settings['fsi_substeps']):
-                    cout.cout_wrap('The FSI solver did not converge!!!')
-                    break
-
-                # generate new grid (already rotated)
-                aero_kstep = controlled_aero_kstep.copy()
-                self.aero_solver.update_custom_grid(
-                    structural_kstep,
-                    aero_kstep)
-
-                # compute unsteady contribution
-                force_coeff = 0.0
-                unsteady_contribution = False
-                if self.settings['include_unsteady_force_contribution'].value:
-                    if self.data.ts > self.settings['steps_without_unsteady_force'].value:
-                        unsteady_contribution = True
-                        if k < self.settings['pseudosteps_ramp_unsteady_force'].value:
-                            force_coeff = k/self.settings['pseudosteps_ramp_unsteady_force'].value
-                        else:
-                            force_coeff = 1.
-
-                # run the solver
-                ini_time_aero = time.perf_counter()
-                self.data = self.aero_solver.run(aero_kstep,
-                                                 structural_kstep,
-                                                 convect_wake=True,
-                                                 unsteady_contribution=unsteady_contribution)
-                self.time_aero += time.perf_counter() - ini_time_aero
-
-                previous_kstep = structural_kstep.copy()
-                structural_kstep = controlled_structural_kstep.copy()
-
-                # move the aerodynamic surface according the the structural one
-                self.aero_solver.update_custom_grid(structural_kstep,
-                                                    aero_kstep)
-                self.map_forces(aero_kstep,
-                                structural_kstep,
-                                force_coeff)
-
-                # relaxation
-                relax_factor = self.relaxation_factor(k)
-                relax(self.data.structure,
-                      structural_kstep,
-                      previous_kstep,
-                      relax_factor)
-
-                # check if nan anywhere.
-                # if yes, raise exception
-                if np.isnan(structural_kstep.steady_applied_forces).any():
-                    raise exc.NotConvergedSolver('NaN found in steady_applied_forces!')
-                if np.isnan(structural_kstep.unsteady_applied_forces).any():
-                    raise exc.NotConvergedSolver('NaN found in unsteady_applied_forces!')
-
-                copy_structural_kstep = structural_kstep.copy()
-                ini_time_struc = time.perf_counter()
-                for i_substep in range(
-                        self.settings['structural_substeps'].value + 1):
-                    # run structural solver
-                    coeff = ((i_substep + 1)/
-                             (self.settings['structural_substeps'].value + 1))
-
-                    structural_kstep = self.interpolate_timesteps(
-                        step0=self.data.structure.timestep_info[-1],
-                        step1=copy_structural_kstep,
-                        out_step=structural_kstep,
-                        coeff=coeff)
-
-                    self.data = self.structural_solver.run(
-                        structural_step=structural_kstep,
-                        dt=self.substep_dt)
-
-                self.time_struc += time.perf_counter() - ini_time_struc
-
-                # check convergence
-                if self.convergence(k,
-                                    structural_kstep,
-                                    previous_kstep):
-                    # move the aerodynamic surface according to the structural one
-                    self.aero_solver.update_custom_grid(
-                        structural_kstep,
-                        aero_kstep)
+            # rejected steps (adaptive time stepping) are repeated with a shorter time step
+            while True:
+                dt = self.set_time_step(controlled_aero_kstep)
+                if self.staggered:
+                    structural_kstep, aero_kstep, k = self.staggered_step(controlled_structural_kstep,
+                                                                          controlled_aero_kstep)
+                else:
+                    structural_kstep, aero_kstep, k = self.fsi_step(controlled_structural_kstep,
+                                                                    controlled_aero_kstep)
+                self.num_fsi_iterations += k + 1
+                if self.accept_time_step(structural_kstep, dt):
                     break
 
-            # move the aerodynamic surface according the the structural one
-            self.aero_solver.update_custom_grid(structural_kstep, aero_kstep)
+            if self.settings['adaptive_time_step'].value:
+                self.time += dt
+            else:
+                self.time = self.data.ts*self.dt.value
+            self.step_times.append(self.time)
+            del self.step_times[:-3]
+            if self.settings['adaptive_time_step'].value:
+                self.data.step_times[self.data.ts] = self.time
 
             self.aero_solver.add_step()
             self.data.aero.timestep_info[-1] = aero_kstep.copy()
@@ -442,7 +537,7 @@ class DynamicCoupled(BaseSolver):
 
             if self.print_info:
                 self.residual_table.print_line([self.data.ts,
-                                                self.data.ts*self.dt.value,
+                                                self.time,
                                                 k,
                                                 self.time_struc/(self.time_aero + self.time_struc),
                                                 final_time - initial_time,
@@ -454,14 +549,340 @@ class DynamicCoupled(BaseSolver):
             self.structural_solver.extract_resultants()
             # run postprocessors
             if self.with_postprocessors:
-                for postproc in self.postprocessors:
-                    self.data = self.postprocessors[postproc].run(online=True)
+                with profiling.profiler.span('postprocessors'):
+                    for postproc in self.postprocessors:
+                        self.data = self.postprocessors[postproc].run(online=True)
+
+        if self.with_postprocessors:
+            for postproc in self.postprocessors:
+                self.postprocessors[postproc].finalise()
 
+        profiling.profiler.set_time_step(None)
         if self.print_info:
+            num_steps = self.data.ts - last_ts + self.settings['n_time_steps'].value
+            if num_steps:
+                cout.cout_wrap('FSI iterations: %u (%.2f per step)' % (self.num_fsi_iterations,
+                                                                      self.num_fsi_iterations/num_steps), 1)
+            if self.settings['adaptive_time_step'].value:
+                cout.cout_wrap('Adaptive time stepping: %u steps, %u rejected' % (num_steps,
+                                                                              self.num_rejected_steps), 1)
             cout.cout_wrap('...Finished', 1)
         return self.data
 
-    def convergence(self, k, tstep, previous_tstep):
+    def fsi_step(self, controlled_structural_kstep, controlled_aero_kstep):
+        """
+        Runs the FSI iterations of a time step of length ``self.current_dt``
+
+        Args:
+            controlled_structural_kstep (sharpy.utils.datastructures.StructTimeStepInfo): Structural state at the
+                beginning of the step, after the controllers are run. It is not modified.
+            controlled_aero_kstep (sharpy.utils.datastructures.AeroTimeStepInfo): Aerodynamic state at the
+                beginning of the step, after the controllers are run. It is not modified.
+
+        Returns:
+            tuple: Structural and aerodynamic states at the end of the step and number of FSI iterations
+        """
+        # the structural solver always starts from the controlled state, the prediction only sets the geometry and
+        # forces of the first iteration
+        predicted_kstep = None
+        if self.predictor:
+            predicted_kstep = self.predict_step(controlled_structural_kstep, self.current_dt)
+        if predicted_kstep is None:
+            structural_kstep = controlled_structural_kstep.copy()
+        else:
+            structural_kstep = predicted_kstep
+        aero_kstep = controlled_aero_kstep.copy()
+        if self.settings['adaptive_time_step'].value:
+            aero_kwargs = {'dt': self.current_dt,
+                           't': self.time + self.current_dt}
+        else:
+            aero_kwargs = dict()
+
+        k = 0
+        for k in range(self.settings['fsi_substeps'].value + 1):
+            if (k == self.settings['fsi_substeps'].value and
+                    self.settings['fsi_substeps']):
+                cout.cout_wrap('The FSI solver did not converge!!!')
+                break
+
+            # generate new grid (already rotated)
+            aero_kstep = controlled_aero_kstep.copy()
+            self.aero_solver.update_custom_grid(
+                structural_kstep,
+                aero_kstep)
+
+            # compute unsteady contribution
+            force_coeff = 0.0
+            unsteady_contribution = False
+            if self.settings['include_unsteady_force_contribution'].value:
+                if self.data.ts > self.settings['steps_without_unsteady_force'].value:
+                    unsteady_contribution = True
+                    if k < self.settings['pseudosteps_ramp_unsteady_force'].value:
+                        force_coeff = k/self.settings['pseudosteps_ramp_unsteady_force'].value
+                    else:
+                        force_coeff = 1.
+
+            # run the solver
+            ini_time_aero = time.perf_counter()
+            self.data = self.aero_solver.run(aero_kstep,
+                                             structural_kstep,
+                                             convect_wake=True,
+                                             unsteady_contribution=unsteady_contribution,
+                                             **aero_kwargs)
+            self.time_aero += time.perf_counter() - ini_time_aero
+
+            previous_kstep = structural_kstep.copy()
+            structural_kstep = controlled_structural_kstep.copy()
+
+            # move the aerodynamic surface according the the structural one
+            self.aero_solver.update_custom_grid(structural_kstep,
+                                                aero_kstep)
+            self.map_forces(aero_kstep,
+                            structural_kstep,
+                            force_coeff)
+
+            # relaxation
+            relax_factor = self.relaxation_factor(k)
+            relax(self.data.structure,
+                  structural_kstep,
+                  previous_kstep,
+                  relax_factor)
+
+            # check if nan anywhere.
+            # if yes, raise exception
+            if np.isnan(structural_kstep.steady_applied_forces).any():
+                raise exc.NotConvergedSolver('NaN found in steady_applied_forces!')
+            if np.isnan(structural_kstep.unsteady_applied_forces).any():
+                raise exc.NotConvergedSolver('NaN found in unsteady_applied_forces!')
+
+            self.run_structural_solver(structural_kstep)
+
+            # check convergence
+            if self.convergence(k,
+                                structural_kstep,
+                                previous_kstep,
+                                predicted=predicted_kstep is not None):
+                # move the aerodynamic surface according to the structural one
+                self.aero_solver.update_custom_grid(
+                    structural_kstep,
+                    aero_kstep)
+                break
+
+        # move the aerodynamic surface according the the structural one
+        self.aero_solver.update_custom_grid(structural_kstep, aero_kstep)
+
+        return structural_kstep, aero_kstep, k
+
+    def staggered_step(self, controlled_structural_kstep, controlled_aero_kstep):
+        """
+        Runs a time step of length ``self.current_dt`` with a staggered ``coupling_scheme``.
+
+        At the first step of every cycle of ``aero_subcycles`` steps, the aerodynamics are solved once over the whole
+        cycle on the structural state at the beginning of the cycle (``css``) or on its prediction at the end of the
+        cycle (``gss``, see :meth:`predict_step`). The structure is then solved once per step with the forces
+        interpolated between those at the beginning of the cycle and the ones of the aerodynamic solution.
+
+        Args:
+            controlled_structural_kstep (sharpy.utils.datastructures.StructTimeStepInfo): Structural state at the
+                beginning of the step, after the controllers are run. It is not modified.
+            controlled_aero_kstep (sharpy.utils.datastructures.AeroTimeStepInfo): Aerodynamic state at the
+                beginning of the step, after the controllers are run. It is not modified.
+
+        Returns:
+            tuple: Structural and aerodynamic states at the end of the step and number of FSI iterations (always 0)
+        """
+        subcycles = self.settings['aero_subcycles'].value
+        i_subcycle = (self.data.ts - self.first_ts) % subcycles
+
+        if not i_subcycle:
+            aero_dt = subcycles*self.current_dt
+            structural_kstep = None
+            if self.settings['coupling_scheme'] == 'gss':
+                structural_kstep = self.predict_step(controlled_structural_kstep, aero_dt)
+            if structural_kstep is None:
+                structural_kstep = controlled_structural_kstep.copy()
+
+            aero_kstep = controlled_aero_kstep.copy()
+            self.aero_solver.update_custom_grid(structural_kstep, aero_kstep)
+
+            unsteady_contribution = False
+            if self.settings['include_unsteady_force_contribution'].value:
+                if self.data.ts > self.settings['steps_without_unsteady_force'].value:
+                    unsteady_contribution = True
+
+            ini_time_aero = time.perf_counter()
+            self.data = self.aero_solver.run(aero_kstep,
+                                             structural_kstep,
+                                             convect_wake=True,
+                                             unsteady_contribution=unsteady_contribution,
+                                             dt=aero_dt,
+                                             t=self.time + aero_dt)
+            self.time_aero += time.perf_counter() - ini_time_aero
+
+            self.map_forces(aero_kstep, structural_kstep)
+            if np.isnan(structural_kstep.steady_applied_forces).any():
+                raise exc.NotConvergedSolver('NaN found in steady_applied_forces!')
+            if np.isnan(structural_kstep.unsteady_applied_forces).any():
+                raise exc.NotConvergedSolver('NaN found in unsteady_applied_forces!')
+
+            self.staggered_aero_kstep = aero_kstep
+            self.staggered_forces = structural_kstep
+            self.staggered_initial_forces = controlled_structural_kstep.copy()
+            self.res_dqdt = np.nan
+
+        structural_kstep = controlled_structural_kstep.copy()
+        self.interpolate_timesteps(step0=self.staggered_initial_forces,
+                                   step1=self.staggered_forces,
+                                   out_step=structural_kstep,
+                                   coeff=(i_subcycle + 1)/subcycles)
+        self.run_structural_solver(structural_kstep)
+
+        if i_subcycle == subcycles - 1:
+            # coupling residual: difference between the structural state the aerodynamics were solved on and the
+            # final one
+            base_dqdt = np.linalg.norm(structural_kstep.dqdt)
+            if base_dqdt == 0:
+                base_dqdt = 1.
+            self.res_dqdt = np.linalg.norm(structural_kstep.dqdt - self.staggered_forces.dqdt)/base_dqdt
+
+        aero_kstep = self.staggered_aero_kstep.copy()
+        self.aero_solver.update_custom_grid(structural_kstep, aero_kstep)
+
+        return structural_kstep, aero_kstep, 0
+
+    def run_structural_solver(self, structural_kstep):
+        """
+        Advances the structure from the last converged step to ``structural_kstep`` in ``structural_substeps + 1``
+        substeps, interpolating the applied forces of ``structural_kstep`` with those of the last converged step.
+        """
+        copy_structural_kstep = structural_kstep.copy()
+        ini_time_struc = time.perf_counter()
+        for i_substep in range(
+                self.settings['structural_substeps'].value + 1):
+            # run structural solver
+            coeff = ((i_substep + 1)/
+                     (self.settings['structural_substeps'].value + 1))
+
+            structural_kstep = self.interpolate_timesteps(
+                step0=self.data.structure.timestep_info[-1],
+                step1=copy_structural_kstep,
+                out_step=structural_kstep,
+                coeff=coeff)
+
+            self.data = self.structural_solver.run(
+                structural_step=structural_kstep,
+                dt=self.substep_dt)
+
+        self.time_struc += time.perf_counter() - ini_time_struc
+
+    def finished(self, last_ts):
+        """
+        Returns ``True`` when the simulation has reached its last time step or, with ``adaptive_time_step``, its
+        final time
+        """
+        if self.settings['adaptive_time_step'].value:
+            return self.time >= self.final_time - 1e-9*self.dt.value
+        return self.data.ts >= last_ts
+
+    def set_time_step(self, aero_kstep):
+        """
+        Sets the length of the next time step. The wake of ``aero_kstep`` is rediscretised if the time step of the
+        aerodynamic solver changes (with ``adaptive_time_step`` or, at the first step, with ``aero_subcycles``).
+
+        Returns:
+            float: Time step
+        """
+        dt = self.current_dt
+        if self.settings['adaptive_time_step'].value:
+            dt = self.next_dt
+            # avoid leaving a very short step at the end of the simulation
+            remaining = self.final_time - self.time
+            if remaining <= dt:
+                dt = remaining
+            elif remaining < dt + self.dt_min:
+                dt = 0.5*remaining
+        self.current_dt = dt
+
+        aero_dt = self.settings['aero_subcycles'].value*dt
+        if aero_dt != self.aero_dt:
+            if self.resample_wake:
+                aero_utils.resample_wake(aero_kstep, aero_dt/self.aero_dt)
+            self.aero_dt = aero_dt
+            self.aero_solver.settings['dt'] = ct.c_double(aero_dt)
+        self.substep_dt = dt/(self.settings['structural_substeps'].value + 1)
+        return dt
+
+    def accept_time_step(self, structural_kstep, dt):
+        """
+        Decides if the step ending in ``structural_kstep`` is accepted and chooses the length of the next time step
+        (or of the repetition of the current one) from its error estimate.
+
+        Steps are always accepted without ``adaptive_time_step``.
+        """
+        if not self.settings['adaptive_time_step'].value:
+            return True
+
+        error = self.time_step_error(structural_kstep, self.data.structure.timestep_info[-1], dt)
+
+        # the local error of the Newmark integration is third order in dt. The safety factor makes the next step
+        # likely to be accepted
+        max_ratio = self.settings['max_time_step_ratio'].value
+        if error > 0.:
+            ratio = min(max(0.9*error**(-1./3.), 1./max_ratio), max_ratio)
+        else:
+            ratio = max_ratio
+        self.next_dt = min(max(ratio*dt, self.dt_min), self.dt_max)
+
+        if error <= 1. or dt <= self.dt_min:
+            return True
+
+        self.num_rejected_steps += 1
+        if self.print_info:
+            cout.cout_wrap('Time step %u rejected (error estimate %.2e). Repeating with dt = %.3e' %
+                           (self.data.ts, error*self.settings['time_step_tolerance'].value, self.next_dt), 2)
+        return False
+
+    def time_step_error(self, tstep, previous_tstep, dt):
+        r"""
+        Local error estimate of the structural integration over a time step, relative to ``time_step_tolerance``.
+
+        The estimate is the difference between the structural states at the end of the step and their explicit
+        second order prediction from the states at the beginning of the step
+
+        .. math:: \mathbf{e} = \mathbf{q}^{n+1} - \left(\mathbf{q}^n + \Delta t\,\dot{\mathbf{q}}^n +
+            \frac{\Delta t^2}{2}\ddot{\mathbf{q}}^n\right)
+
+        which, for the Newmark-:math:`\beta` integration, is :math:`\beta\Delta t^2(\ddot{\mathbf{q}}^{n+1} -
+        \ddot{\mathbf{q}}^n)`.
+
+        Args:
+            tstep (sharpy.utils.datastructures.StructTimeStepInfo): Structural state at the end of the step
+            previous_tstep (sharpy.utils.datastructures.StructTimeStepInfo): Structural state at the beginning of the
+                step
+            dt (float): Time step
+
+        The error is relative to the displacement of the structure from its initial state
+        :math:`\mathbf{q}^0`, rather than to the states themselves, which hold the absolute position of the nodes and
+        would make the accepted error depend on the size of the model and its offset from the origin of the ``A``
+        frame.
+
+        Returns:
+            float: :math:`\|\mathbf{e}\|/(\epsilon\|\mathbf{q}^{n+1} - \mathbf{q}^0\|)`, where :math:`\epsilon` is
+            the ``time_step_tolerance``. The step is accepted if it is not larger than one.
+        """
+        num_dof = self.data.structure.num_dof.value
+        q = tstep.q[:num_dof]
+        prediction = (previous_tstep.q[:num_dof] +
+                      dt*previous_tstep.dqdt[:num_dof] +
+                      0.5*dt*dt*previous_tstep.dqddt[:num_dof])
+
+        displacement = q - self.data.structure.ini_info.q[:num_dof]
+        scale = self.settings['time_step_tolerance'].value*np.linalg.norm(displacement)
+        if scale == 0.:
+            scale = self.settings['time_step_tolerance'].value
+        return np.linalg.norm(q - prediction)/scale
+
+    def convergence(self, k, tstep, previous_tstep, predicted=False):
         r"""
         Check convergence in the FSI loop.
 
@@ -472,6 +893,9 @@ class DynamicCoupled(BaseSolver):
 
         FSI converged if :math:`\epsilon_q^k < \mathrm{FSI\ tolerance}` and :math:`\epsilon_\dot{q}^k < \mathrm{FSI\ tolerance}`
 
+        If the first iteration started from a ``predicted`` state, :math:`q^{-1}` is the prediction and the first
+        iteration may already be converged.
+
         """
         # check for non-convergence
         if not all(np.isfinite(tstep.q)):
@@ -486,7 +910,8 @@ class DynamicCoupled(BaseSolver):
             self.base_dqdt = np.linalg.norm(tstep.dqdt.copy())
             if self.base_dqdt == 0:
                 self.base_dqdt = 1.
-            return False
+            if not predicted:
+                return False
 
         # relative residuals
         self.res = (np.linalg.norm(tstep.q-
@@ -509,6 +934,67 @@ class DynamicCoupled(BaseSolver):
 
         return False
 
+    def predict_step(self, tstep, dt):
+        r"""
+        Predicts the structural state and applied forces at the end of a time step of length ``dt`` starting from
+        ``tstep`` for the first FSI iteration.
+
+        With ``fsi_predictor`` set to ``linear`` or ``quadratic``, the displacements, velocities, reference frame
+        position and orientation and applied forces are extrapolated with a polynomial through ``tstep`` and the
+        previous converged steps. With ``newmark``, the structural degrees of freedom take the Newmark-:math:`\beta`
+        predictor values
+
+        .. math:: \mathbf{q}_p = \mathbf{q}^n + \Delta t\,\dot{\mathbf{q}}^n + (0.5 - \beta)\Delta t^2\ddot{\mathbf{q}}^n
+        .. math:: \dot{\mathbf{q}}_p = \dot{\mathbf{q}}^n + (1 - \gamma)\Delta t\,\ddot{\mathbf{q}}^n
+
+        and the rest of the quantities are extrapolated linearly.
+
+        Args:
+            tstep (sharpy.utils.datastructures.StructTimeStepInfo): Structural state at the beginning of the step.
+                It is not modified.
+            dt (float): Time step
+
+        Returns:
+            sharpy.utils.datastructures.StructTimeStepInfo: Predicted state or ``None`` if there are not enough
+            converged steps to predict it.
+        """
+        num_points = min(self.predictor_order + 1, len(self.step_times))
+        newmark = self.settings['fsi_predictor'] == 'newmark'
+        if num_points < 2 and not newmark:
+            return None
+
+        predicted = tstep.copy()
+        if num_points > 1:
+            # tstep replaces the last converged step, which might have been modified by the controllers
+            steps = self.data.structure.timestep_info[-num_points:-1] + [tstep]
+            times = self.step_times[-num_points:]
+            target_time = times[-1] + dt
+
+            # Lagrange extrapolation weights
+            weights = np.ones((num_points,))
+            for i in range(num_points):
+                for j in range(num_points):
+                    if i != j:
+                        weights[i] *= (target_time - times[j])/(times[i] - times[j])
+
+            for name in ['pos', 'psi', 'pos_dot', 'psi_dot', 'for_pos', 'quat', 'q', 'dqdt',
+                         'steady_applied_forces', 'unsteady_applied_forces']:
+                value = getattr(predicted, name)
+                value[:] = sum(w*getattr(step, name) for w, step in zip(weights, steps))
+            predicted.quat[:] = algebra.unit_vector(predicted.quat)
+
+        if newmark:
+            num_dof = self.data.structure.num_dof.value
+            gamma = 0.5 + self.structural_solver.settings['newmark_damp'].value
+            beta = 0.25*(gamma + 0.5)*(gamma + 0.5)
+            predicted.q[:num_dof] = (tstep.q[:num_dof] + dt*tstep.dqdt[:num_dof] +
+                                     (0.5 - beta)*dt*dt*tstep.dqddt[:num_dof])
+            predicted.dqdt[:num_dof] = tstep.dqdt[:num_dof] + (1. - gamma)*dt*tstep.dqddt[:num_dof]
+            xbeam.cbeam3_solv_state2disp(self.data.structure, predicted)
+
+        return predicted
+
+    @profiling.profile('force_mapping')
     def map_forces(self, aero_kstep, structural_kstep, unsteady_forces_coeff=1.0):
         # set all forces to 0
         structural_kstep.steady_applied_forces.fill(0.0)
@@ -540,7 +1026,7 @@ class DynamicCoupled(BaseSolver):
                 (struct_forces + self.data.structure.ini_info.steady_applied_forces).
                 astype(dtype=ct.c_double, order='F', copy=True))
             structural_kstep.unsteady_applied_forces = (
-                (dynamic_struct_forces + self.data.structure.dynamic_input[max(self.data.ts - 1, 0)]['dynamic_forces']).
+                (dynamic_struct_forces + self.data.structure.dynamic_input[self.dynamic_input_index()]['dynamic_forces']).
                 astype(dtype=ct.c_double, order='F', copy=True))
         except KeyError:
             structural_kstep.steady_applied_forces = (
@@ -548,6 +1034,16 @@ class DynamicCoupled(BaseSolver):
                 astype(dtype=ct.c_double, order='F', copy=True))
             structural_kstep.unsteady_applied_forces = dynamic_struct_forces
 
+    def dynamic_input_index(self):
+        """
+        Index of the prescribed ``dynamic_input`` of the structure for the current time step. With
+        ``adaptive_time_step``, it is the nominal time step closest to the beginning of the step.
+        """
+        if not self.settings['adaptive_time_step'].value:
+            return max(self.data.ts - 1, 0)
+        index = int(round(self.time/self.dt.value))
+        return min(max(index, 0), len(self.data.structure.dynamic_input) - 1)
+
     def relaxation_factor(self, k):
         initial = self.settings['relaxation_factor'].value
         if not self.settings['dynamic_relaxation'].value:
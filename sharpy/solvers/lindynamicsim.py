@@ -6,8 +6,9 @@ import sharpy.utils.settings as settings
 import sharpy.linear.src.libss as libss
 import scipy.linalg as sclalg
 import sharpy.utils.h5utils as h5utils
-from sharpy.utils.datastructures import LinearTimeStepInfo
+from sharpy.utils.datastructures import LinearTimeSeries
 import sharpy.utils.cout_utils as cout
+from sharpy.linear.utils.ss_interface import state_indices
 import time
 import warnings
 
@@ -31,6 +32,37 @@ class LinDynamicSim(BaseSolver):
     settings_default['write_dat'] = []
     settings_description['write_dat'] = 'List of vectors to write: ``x``, ``y``, ``u`` and/or ``t``'
 
+    settings_types['output_format'] = 'str'
+    settings_default['output_format'] = 'dat'
+    settings_description['output_format'] = 'Format of the files with the vectors in ``write_dat``: ``dat`` writes ' \
+                                             'one text file per vector. ``h5`` writes them as compressed, chunked ' \
+                                             'datasets of ``lindynamicsim.h5``'
+
+    settings_types['compression'] = 'str'
+    settings_default['compression'] = 'gzip'
+    settings_description['compression'] = 'Compression filter of the ``h5`` output: ``gzip``, ``lzf`` or ``none``'
+
+    settings_types['compress_float'] = 'bool'
+    settings_default['compress_float'] = False
+    settings_description['compress_float'] = 'Write the ``h5`` output in single precision'
+
+    settings_types['x_variables'] = 'list(str)'
+    settings_default['x_variables'] = []
+    settings_description['x_variables'] = 'Names of the state variables to write (e.g. ``eta`` or ``gamma``), ' \
+                                          'as defined in the ``state_variables`` of the linear systems. ' \
+                                          'Combined with ``x_indices``. If both are empty, the full state is written'
+
+    settings_types['x_indices'] = 'list(int)'
+    settings_default['x_indices'] = np.array([], dtype=int)
+    settings_description['x_indices'] = 'Indices of the states to write'
+
+    settings_types['y_indices'] = 'list(int)'
+    settings_default['y_indices'] = np.array([], dtype=int)
+    settings_description['y_indices'] = 'Indices of the outputs to write. If empty, all outputs are written'
+
+    supported_output_formats = ('dat', 'h5')
+    supported_compression = ('gzip', 'lzf', 'none')
+
     settings_types['reference_velocity'] = 'float'
     settings_default['reference_velocity'] = 1.
     settings_description['reference_velocity'] = 'Velocity to scale the structural equations when using a non-dimensional system'
@@ -76,6 +108,12 @@ class LinDynamicSim(BaseSolver):
         else:
             self.settings = data.settings[self.solver_id]
         settings.to_custom_types(self.settings, self.settings_types, self.settings_default)
+        if self.settings['output_format'] not in self.supported_output_formats:
+            raise NotImplementedError('Output format %s not recognised. Supported formats are %s'
+                                      % (self.settings['output_format'], self.supported_output_formats))
+        if self.settings['compression'] not in self.supported_compression:
+            raise NotImplementedError('Compression %s not recognised. Supported filters are %s'
+                                      % (self.settings['compression'], self.supported_compression))
 
         # Read initial state and input data and store in dictionary
         self.read_files()
@@ -146,31 +184,14 @@ class LinDynamicSim(BaseSolver):
         y_out = out[1]
 
         if self.settings['write_dat']:
-            cout.cout_wrap('Writing linear simulation output .dat files to %s' % self.folder)
-            if 'y' in self.settings['write_dat']:
-                np.savetxt(self.folder + '/y_out.dat', y_out)
-                cout.cout_wrap('Output vector written', 2)
-            if 'x' in self.settings['write_dat']:
-                np.savetxt(self.folder + '/x_out.dat', x_out)
-                cout.cout_wrap('State vector written', 2)
-            if 'u' in self.settings['write_dat']:
-                np.savetxt(self.folder + '/u_out.dat', u)
-                cout.cout_wrap('Input vector written', 2)
-            if 't' in self.settings['write_dat']:
-                np.savetxt(self.folder + '/t_out.dat', t_out)
-                cout.cout_wrap('Time domain written', 2)
-            cout.cout_wrap('Success', 1)
-
-        # Pack state variables into linear timestep info
+            self.write_output(t_out, x_out, y_out, u)
+
+        # Results stored as arrays, the time steps are views of them
+        self.data.linear.timestep_info = LinearTimeSeries(t_out, x_out, y_out, u)
+
         cout.cout_wrap('Plotting results...')
         for n in range(len(t_out)-1):
-            tstep = LinearTimeStepInfo()
-            tstep.x = x_out[n, :]
-            tstep.y = y_out[n, :]
-            tstep.t = t_out[n]
-            tstep.u = u[n, :]
-            self.data.linear.timestep_info.append(tstep)
-            # TODO: option to save to h5
+            tstep = self.data.linear.timestep_info[n]
 
             # Pack variables into respective aero or structural time step infos (with the + f0 from lin)
             # Need to obtain information from the variables in a similar fashion as done with the database
@@ -186,8 +207,53 @@ class LinDynamicSim(BaseSolver):
                 for postproc in self.postprocessors:
                     self.data = self.postprocessors[postproc].run(online=True)
 
+        if self.with_postprocessors:
+            for postproc in self.postprocessors:
+                self.postprocessors[postproc].finalise()
+
         return self.data
 
+    def write_output(self, t_out, x_out, y_out, u):
+        """
+        Writes the vectors in ``write_dat``, restricted to the selected states and outputs, in the ``output_format``
+        """
+        x_indices = self.state_indices(x_out.shape[1])
+        y_indices = self.settings['y_indices']
+        vectors = {'t': t_out,
+                   'x': x_out if x_indices is None else x_out[:, x_indices],
+                   'y': y_out if len(y_indices) == 0 else y_out[:, y_indices],
+                   'u': u}
+        names = {'t': 'Time domain', 'x': 'State vector', 'y': 'Output vector', 'u': 'Input vector'}
+
+        if self.settings['output_format'] == 'h5':
+            filename = self.folder + '/lindynamicsim.h5'
+            cout.cout_wrap('Writing linear simulation output to %s' % filename)
+            compression = self.settings['compression'] if self.settings['compression'] != 'none' else None
+            with h5.File(filename, 'w') as h5file:
+                for vector in self.settings['write_dat']:
+                    values = vectors[vector]
+                    dtype = 'f4' if self.settings['compress_float'] and values.dtype == np.float64 else values.dtype
+                    h5file.create_dataset(vector, data=values, dtype=dtype, chunks=True, compression=compression)
+                    cout.cout_wrap('%s written' % names[vector], 2)
+                if x_indices is not None:
+                    h5file['x_indices'] = x_indices
+                if len(y_indices) > 0:
+                    h5file['y_indices'] = y_indices
+        else:
+            cout.cout_wrap('Writing linear simulation output .dat files to %s' % self.folder)
+            for vector in self.settings['write_dat']:
+                np.savetxt(self.folder + '/%s_out.dat' % vector, vectors[vector])
+                cout.cout_wrap('%s written' % names[vector], 2)
+        cout.cout_wrap('Success', 1)
+
+    def state_indices(self, n_states):
+        """
+        Returns the indices of the states selected with ``x_variables`` and ``x_indices`` or ``None`` if the full
+        state is to be written.
+        """
+        return state_indices(self.data.linear.linear_system, n_states,
+                             self.settings['x_variables'], self.settings['x_indices'])
+
     def read_files(self):
 
         self.input_file_name = self.data.settings['SHARPy']['route'] + '/' + self.data.settings['SHARPy']['case'] + '.lininput.h5'
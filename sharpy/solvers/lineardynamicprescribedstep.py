@@ -0,0 +1,243 @@
+import numpy as np
+import scipy.sparse as scsp
+import scipy.sparse.linalg
+
+import sharpy.structure.utils.xbeamlib as xbeamlib
+from sharpy.utils.solver_interface import solver, solver_from_string
+import sharpy.utils.settings as settings
+import sharpy.utils.cout_utils as cout
+import sharpy.utils.algebra as algebra
+
+_BaseStructural = solver_from_string('_BaseStructural')
+
+
+@solver
+class LinearDynamicPrescribedStep(_BaseStructural):
+    r"""
+    Linear structural solver for the dynamic simulation of clamped structures or those subject to a prescribed motion.
+
+    It is a drop-in replacement of ``NonLinearDynamicPrescribedStep`` for structures that remain in the linear
+    regime. The structural equations are linearised about the state of the structure when the solver is initialised
+    (the undeformed configuration or, in a coupled simulation, the static equilibrium computed by a preceding solver).
+    The residual of the equations of motion at step :math:`n+1` is then
+
+    .. math:: \mathbf{Q} = \mathbf{Q}_0 + \mathbf{M}_0(\ddot{\mathbf{q}} - \ddot{\mathbf{q}}_0) +
+        \mathbf{C}_0(\dot{\mathbf{q}} - \dot{\mathbf{q}}_0) + \mathbf{K}_0(\mathbf{q} - \mathbf{q}_0) -
+        \mathbf{G}_0(\mathbf{f} - \mathbf{f}_0)
+
+    where the subscript 0 denotes the linearisation point and :math:`\mathbf{G}_0` maps the nodal follower forces and
+    moments onto the generalised forces. Each step (and FSI sub-iteration) requires a single Newmark-:math:`\beta`
+    correction with the effective stiffness
+
+    .. math:: \mathbf{S} = \mathbf{K}_0 + \frac{\gamma}{\beta\Delta t}\mathbf{C}_0 +
+        \frac{1}{\beta\Delta t^2}\mathbf{M}_0
+
+    whose sparse LU factorisation is computed once and reused until the time step changes or the structure is
+    relinearised.
+
+    If ``relinearisation_threshold`` is larger than zero, the structure is relinearised about the current state
+    whenever the largest change of the structural degrees of freedom with respect to the linearisation point exceeds
+    this value.
+
+    The gravity forces and the motion of the reference frame are taken at the linearisation point.
+
+    """
+    solver_id = 'LinearDynamicPrescribedStep'
+    solver_classification = 'structural'
+
+    settings_types = _BaseStructural.settings_types.copy()
+    settings_default = _BaseStructural.settings_default.copy()
+    settings_description = _BaseStructural.settings_description.copy()
+
+    settings_types['relinearisation_threshold'] = 'float'
+    settings_default['relinearisation_threshold'] = 0.
+    settings_description['relinearisation_threshold'] = 'Relinearise the structure when the largest change of the ' \
+                                                        'degrees of freedom from the linearisation point exceeds ' \
+                                                        'this value. If ``0``, the structure is not relinearised'
+
+    settings_table = settings.SettingsTable()
+    __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
+
+    def __init__(self):
+        self.data = None
+        self.settings = None
+
+        self.gamma = None
+        self.beta = None
+
+        # linearisation point
+        self.q0 = None
+        self.dqdt0 = None
+        self.dqddt0 = None
+        self.forces0 = None
+        self.Q0 = None
+
+        self.M = None
+        self.C = None
+        self.K = None
+        self.force_gain = None
+
+        # factorised effective stiffness
+        self.lu = None
+        self.lu_dt = None
+
+        self.num_linearisations = 0
+
+    def initialise(self, data, custom_settings=None):
+        self.data = data
+        if custom_settings is None:
+            self.settings = data.settings[self.solver_id]
+        else:
+            self.settings = custom_settings
+        settings.to_custom_types(self.settings, self.settings_types, self.settings_default)
+
+        # load info from dyn dictionary
+        self.data.structure.add_unsteady_information(self.data.structure.dyn_dict, self.settings['num_steps'].value)
+
+        # Define Newmark constants
+        self.gamma = 0.5 + self.settings['newmark_damp'].value
+        self.beta = 0.25*(self.gamma + 0.5)*(self.gamma + 0.5)
+
+        tstep = self.data.structure.timestep_info[-1]
+        xbeamlib.cbeam3_solv_disp2state(self.data.structure, tstep)
+        self.linearise(tstep)
+
+    def linearise(self, tstep):
+        """
+        Linearises the structural equations about ``tstep``
+
+        Args:
+            tstep (sharpy.utils.datastructures.StructTimeStepInfo): Linearisation point
+        """
+        structure = self.data.structure
+        num_dof = structure.num_dof.value
+
+        ref_step = tstep.copy()
+        M, C, K, Q = xbeamlib.cbeam3_asbly_dynamic(structure, ref_step, self.settings)
+        self.M = scsp.csr_matrix(M)
+        self.C = scsp.csr_matrix(C)
+        self.K = scsp.csr_matrix(K)
+        self.Q0 = Q.copy()
+
+        self.q0 = tstep.q[:num_dof].copy()
+        self.dqdt0 = tstep.dqdt[:num_dof].copy()
+        self.dqddt0 = tstep.dqddt[:num_dof].copy()
+        self.forces0 = (tstep.steady_applied_forces + tstep.unsteady_applied_forces).copy()
+
+        # nodal follower forces (B frame) to generalised forces
+        rows = []
+        cols = []
+        vals = []
+        for i_node in range(structure.num_node):
+            if structure.vdof[i_node] < 0:
+                continue
+            i_elem, i_local_node = structure.node_master_elem[i_node, :]
+            psi = tstep.psi[i_elem, i_local_node, :]
+            block = np.zeros((6, 6))
+            block[:3, :3] = algebra.crv2rotation(psi)
+            block[3:, 3:] = algebra.crv2tan(psi).T
+
+            dofs = 6*structure.vdof[i_node] + np.arange(6)
+            node_cols = 6*i_node + np.arange(6)
+            rows.append(np.repeat(dofs, 6))
+            cols.append(np.tile(node_cols, 6))
+            vals.append(block.ravel())
+        self.force_gain = scsp.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                                          shape=(num_dof, 6*structure.num_node))
+
+        self.lu = None
+        self.lu_dt = None
+        self.num_linearisations += 1
+        if self.settings['print_info'].value and self.num_linearisations > 1:
+            cout.cout_wrap('Relinearised structure at time step %u' % self.data.ts, 1)
+
+    def factorise(self, dt):
+        r"""
+        Factorises the Newmark-:math:`\beta` effective stiffness for the time step ``dt``
+        """
+        Asys = self.K + self.C*(self.gamma/(self.beta*dt)) + self.M*(1./(self.beta*dt*dt))
+        self.lu = scipy.sparse.linalg.splu(scsp.csc_matrix(Asys))
+        self.lu_dt = dt
+
+    def run(self, structural_step=None, dt=None):
+        if structural_step is None:
+            structural_step = self.data.structure.timestep_info[-1]
+        if dt is None:
+            dt = self.settings['dt'].value
+
+        if self.data.ts > 0:
+            try:
+                structural_step.for_vel[:] = self.data.structure.dynamic_input[self.data.ts - 1]['for_vel']
+                structural_step.for_acc[:] = self.data.structure.dynamic_input[self.data.ts - 1]['for_acc']
+            except IndexError:
+                pass
+
+        num_dof = self.data.structure.num_dof.value
+        q = structural_step.q[:num_dof]
+        dqdt = structural_step.dqdt[:num_dof]
+        dqddt = structural_step.dqddt[:num_dof]
+
+        threshold = self.settings['relinearisation_threshold'].value
+        if threshold > 0. and np.max(np.abs(q - self.q0)) > threshold:
+            self.linearise(structural_step)
+
+        if self.lu is None or dt != self.lu_dt:
+            self.factorise(dt)
+
+        # Predictor step
+        q_pred = q + dt*dqdt + (0.5 - self.beta)*dt*dt*dqddt
+        dqdt_pred = dqdt + (1.0 - self.gamma)*dt*dqddt
+
+        # Linearised residual at the predicted state (zero acceleration)
+        forces = structural_step.steady_applied_forces + structural_step.unsteady_applied_forces
+        Q = (self.Q0
+             + self.K.dot(q_pred - self.q0)
+             + self.C.dot(dqdt_pred - self.dqdt0)
+             - self.M.dot(self.dqddt0)
+             - self.force_gain.dot((forces - self.forces0).ravel()))
+
+        # Newmark-beta correction
+        Dq = self.lu.solve(-Q)
+
+        structural_step.q[:num_dof] = q_pred + Dq
+        structural_step.dqdt[:num_dof] = dqdt_pred + self.gamma/(self.beta*dt)*Dq
+        structural_step.dqddt[:num_dof] = 1.0/(self.beta*dt*dt)*Dq
+
+        xbeamlib.cbeam3_solv_state2disp(self.data.structure, structural_step)
+
+        self.data.structure.integrate_position(structural_step, dt)
+        return self.data
+
+    def add_step(self):
+        self.data.structure.next_step()
+
+    def next_step(self):
+        pass
+
+    def extract_resultants(self, step=None):
+        if step is None:
+            step = self.data.structure.timestep_info[-1]
+        applied_forces = self.data.structure.nodal_b_for_2_a_for(step.steady_applied_forces + step.unsteady_applied_forces,
+                                                                 step)
+
+        applied_forces_copy = applied_forces.copy()
+        gravity_forces_copy = step.gravity_forces.copy()
+        for i_node in range(self.data.structure.num_node):
+            applied_forces_copy[i_node, 3:6] += np.cross(step.pos[i_node, :],
+                                                         applied_forces_copy[i_node, 0:3])
+            gravity_forces_copy[i_node, 3:6] += np.cross(step.pos[i_node, :],
+                                                         gravity_forces_copy[i_node, 0:3])
+
+        totals = np.sum(applied_forces_copy + gravity_forces_copy, axis=0)
+        step.total_forces = np.sum(applied_forces_copy, axis=0)
+        step.total_gravity_forces = np.sum(gravity_forces_copy, axis=0)
+        return totals[0:3], totals[3:6]
+
+    def update(self, tstep=None):
+        self.create_q_vector(tstep)
+
+    def create_q_vector(self, tstep=None):
+        if tstep is None:
+            tstep = self.data.structure.timestep_info[-1]
+
+        xbeamlib.xbeam_solv_disp2state(self.data.structure, tstep)
@@ -6,10 +6,12 @@ import ctypes as ct
 import numpy as np
 import scipy as sc
 import os
-import itertools
 import warnings
 from tvtk.api import tvtk, write_data
 import scipy.linalg
+import scipy.optimize
+import scipy.sparse as scsp
+import scipy.sparse.linalg
 
 import sharpy.structure.utils.xbeamlib as xbeamlib
 from sharpy.utils.solver_interface import solver, BaseSolver
@@ -57,6 +59,23 @@ class Modal(BaseSolver):
     settings_default['NumLambda'] = 20  # doubles if use_undamped_modes is False
     settings_description['NumLambda'] = 'Number of modes to retain'
 
+    settings_types['eigensolver'] = 'str'
+    settings_default['eigensolver'] = 'dense'
+    settings_description['eigensolver'] = 'Eigenvalue solver: ``dense`` solves the full eigenvalue problem, while ' \
+                                          '``sparse`` uses a shift-invert Arnoldi/Lanczos iterative solver on the ' \
+                                          'sparse mass, damping and stiffness matrices to find only the ' \
+                                          '``NumLambda`` modes closest to ``eigensolver_shift``. The matrices are ' \
+                                          'still assembled dense by the structural library, so the memory required ' \
+                                          'grows with the square of the number of degrees of freedom; only the ' \
+                                          'eigensolution is sparse'
+
+    settings_types['eigensolver_shift'] = 'float'
+    settings_default['eigensolver_shift'] = 0.
+    settings_description['eigensolver_shift'] = 'Shift of the ``sparse`` eigensolver, in the units of the ' \
+                                                r'eigenvalues (:math:`\omega^2` for undamped modes). It must be ' \
+                                                'non-zero if the stiffness matrix is singular, e.g. when ' \
+                                                'computing rigid body modes'
+
     settings_types['keep_linear_matrices'] = 'bool'  # attach linear M,C,K matrices to output dictionary
     settings_default['keep_linear_matrices'] = True
     settings_description['keep_linear_matrices'] = 'Save M, C and K matrices to output dictionary'
@@ -74,6 +93,15 @@ class Modal(BaseSolver):
     settings_default['write_dat'] = True
     settings_description['write_dat'] = 'Write mode shapes, frequencies and damping to file'
 
+    settings_types['write_format'] = 'str'
+    settings_default['write_format'] = 'dat'
+    settings_description['write_format'] = 'Format of the files written with ``write_dat``: ``dat`` for text files ' \
+                                           'or ``h5`` for a single compressed binary file ``eigen_data.h5``'
+
+    settings_types['compress_float'] = 'bool'
+    settings_default['compress_float'] = False
+    settings_description['compress_float'] = 'Write the mode shapes in single precision in ``h5`` format'
+
     settings_types['continuous_eigenvalues'] = 'bool'
     settings_default['continuous_eigenvalues'] = False
     settings_description['continuous_eigenvalues'] = 'Use continuous time eigenvalues'
@@ -110,6 +138,9 @@ class Modal(BaseSolver):
     settings_table = settings.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
 
+    supported_write_formats = ('dat', 'h5')
+    supported_eigensolvers = ('dense', 'sparse')
+
     def __init__(self):
         self.data = None
         self.settings = None
@@ -133,6 +164,14 @@ class Modal(BaseSolver):
 
         self.rigid_body_motion = self.settings['rigid_body_modes'].value
 
+        if self.settings['eigensolver'] not in self.supported_eigensolvers:
+            raise NotImplementedError('Eigensolver %s not recognised. Supported eigensolvers are %s'
+                                      % (self.settings['eigensolver'], self.supported_eigensolvers))
+
+        if self.settings['write_format'] not in self.supported_write_formats:
+            raise NotImplementedError('Write format %s not recognised. Supported formats are %s'
+                                      % (self.settings['write_format'], self.supported_write_formats))
+
         self.data.ts = len(self.data.structure.timestep_info) - 1
         if self.settings['use_custom_timestep'].value > -1:
             self.data.ts = self.settings['use_custom_timestep'].value
@@ -277,13 +316,10 @@ class Modal(BaseSolver):
 
         # Check if the damping matrix is zero (issue working)
         if self.settings['use_undamped_modes'].value:
-            zero_FullCglobal = True
-            for i,j in itertools.product(range(num_dof),range(num_dof)):
-                if(np.absolute(FullCglobal[i, j]) > np.finfo(float).eps):
-                    zero_FullCglobal = False
-                    warnings.warn(
-                        'Projecting a system with damping on undamped modal shapes')
-                    break
+            zero_FullCglobal = not np.any(np.absolute(FullCglobal) > np.finfo(float).eps)
+            if not zero_FullCglobal:
+                warnings.warn(
+                    'Projecting a system with damping on undamped modal shapes')
         # Check if the damping matrix is skew-symmetric
         # skewsymmetric_FullCglobal = True
         # for i in range(num_dof):
@@ -294,12 +330,27 @@ class Modal(BaseSolver):
         #             skewsymmetric_FullCglobal = False
 
         NumLambda = min(num_dof, self.settings['NumLambda'].value)
+        sparse_eigensolver = self.settings['eigensolver'] == 'sparse'
+        if sparse_eigensolver:
+            # only the sparse matrices are used from here on, the dense ones are released unless they are output
+            Mglobal = scsp.csc_matrix(FullMglobal)
+            Cglobal = scsp.csc_matrix(FullCglobal)
+            Kglobal = scsp.csc_matrix(FullKglobal)
+            if not self.settings['keep_linear_matrices'].value:
+                del FullMglobal, FullCglobal, FullKglobal
+        else:
+            Mglobal = FullMglobal
+            Cglobal = FullCglobal
+            Kglobal = FullKglobal
 
         if self.settings['use_undamped_modes'].value:
 
-            # Solve for eigenvalues (with unit eigenvectors)            
-            eigenvalues,eigenvectors=np.linalg.eig(
-                                       np.linalg.solve(FullMglobal,FullKglobal))
+            # Solve for eigenvalues (with unit eigenvectors)
+            if sparse_eigensolver:
+                eigenvalues, eigenvectors = self.sparse_undamped_modes(Mglobal, Kglobal, NumLambda)
+            else:
+                eigenvalues,eigenvectors=np.linalg.eig(
+                                           np.linalg.solve(FullMglobal,FullKglobal))
             eigenvectors_left=None
             # Define vibration frequencies and damping
             freq_natural = np.sqrt(eigenvalues)
@@ -310,6 +361,9 @@ class Modal(BaseSolver):
             eigenvectors = eigenvectors[:,order]
             damping = np.zeros((NumLambda,))
 
+        elif sparse_eigensolver:
+            eigenvalues, eigenvectors_left, eigenvectors = \
+                self.sparse_damped_modes(Mglobal, Cglobal, Kglobal, NumLambda)
         else:
             # State-space model
             Minv_neg = -np.linalg.inv(FullMglobal)
@@ -321,6 +375,8 @@ class Modal(BaseSolver):
             # Solve the eigenvalues problem
             eigenvalues, eigenvectors_left, eigenvectors = \
                 sc.linalg.eig(A,left=True,right=True)
+
+        if not self.settings['use_undamped_modes'].value:
             freq_natural = np.abs(eigenvalues)
             damping = np.zeros_like(freq_natural)
             iiflex = freq_natural > 1e-16*np.mean(freq_natural)  # Pick only structural modes
@@ -339,7 +395,7 @@ class Modal(BaseSolver):
             freq_natural = freq_natural[order]
             eigenvalues = eigenvalues[order]
 
-            include = np.ones((2*NumLambda,), dtype=np.bool)
+            include = np.ones((2*NumLambda,), dtype=bool)
             ii = 0
             tol_rel = np.finfo(float).eps * freq_damped[ii]
             while ii < 2*NumLambda:
@@ -369,21 +425,27 @@ class Modal(BaseSolver):
         # Modify rigid body modes for them to be defined wrt the CG
         if self.settings['rigid_modes_cg']:
             if not eigenvectors_left:
-                eigenvectors = self.free_free_modes(eigenvectors, FullMglobal)
+                eigenvectors = self.free_free_modes(eigenvectors, Mglobal)
 
         # Scaling
-        eigenvectors, eigenvectors_left = self.scale_modes_unit_mass_matrix(eigenvectors, FullMglobal, eigenvectors_left)
+        eigenvectors, eigenvectors_left = self.scale_modes_unit_mass_matrix(eigenvectors, Mglobal, eigenvectors_left)
 
         # Other terms required for state-space realisation
         # non-zero damping matrix
         # Modal damping matrix
         if self.settings['use_undamped_modes'] and not(zero_FullCglobal):
-            Ccut = np.dot(eigenvectors.T, np.dot(FullCglobal, eigenvectors))
+            Ccut = np.dot(eigenvectors.T, Cglobal.dot(eigenvectors))
         else:
             Ccut = None
 
         # forces gain matrix (nodal -> modal)
-        if not self.settings['use_undamped_modes']:
+        if not self.settings['use_undamped_modes'] and sparse_eigensolver:
+            # Kin_damp = V_L^T M^{-1}, computed as (M^{-T} V_L)^T
+            Mlu = scipy.sparse.linalg.splu(Mglobal)
+            vl = eigenvectors_left[num_dof:, :]
+            Kin_damp = (Mlu.solve(np.ascontiguousarray(vl.real), trans='T') +
+                        1j*Mlu.solve(np.ascontiguousarray(vl.imag), trans='T')).T
+        elif not self.settings['use_undamped_modes']:
             Kin_damp = np.dot(eigenvectors_left[num_dof:, :].T, -Minv_neg)
         else:
             Kin_damp = None
@@ -398,7 +460,19 @@ class Modal(BaseSolver):
 
 
         # Write dat files
-        if self.settings['write_dat'].value:
+        if self.settings['write_dat'].value and self.settings['write_format'] == 'h5':
+            if not self.settings['use_undamped_modes'].value:
+                frequencies = freq_damped[:NumLambda]
+            else:
+                frequencies = freq_natural[:NumLambda]
+            modalutils.write_eigen_data(self.folder + 'eigen_data.h5',
+                                        eigenvalues,
+                                        eigenvectors[:num_dof],
+                                        num_evals=NumLambda,
+                                        compress_float=self.settings['compress_float'].value,
+                                        frequencies=frequencies,
+                                        damping=damping[:NumLambda])
+        elif self.settings['write_dat'].value:
             if type(eigenvalues) == complex:
                 np.savetxt(self.folder + "eigenvalues.dat", eigenvalues.view(float).reshape(-1, 2), fmt='%.12f',
                            delimiter='\t', newline='\n')
@@ -475,10 +549,102 @@ class Modal(BaseSolver):
 
         return self.data
 
+    def sparse_undamped_modes(self, M, K, num_modes):
+        r"""
+        Solves the symmetric generalised eigenvalue problem :math:`\mathbf{K\Phi} = \omega^2\mathbf{M\Phi}` for the
+        ``num_modes`` eigenvalues closest to ``eigensolver_shift`` with the shift-invert Lanczos method.
+
+        Args:
+            M (scipy.sparse.csc_matrix or np.ndarray): Mass matrix
+            K (scipy.sparse.csc_matrix or np.ndarray): Stiffness matrix
+            num_modes (int): Number of modes
+
+        Returns:
+            tuple: Eigenvalues :math:`\omega^2` and eigenvectors
+        """
+        num_dof = M.shape[0]
+        if num_modes >= num_dof:
+            raise ValueError('The sparse eigensolver requires NumLambda to be smaller than the number of degrees of '
+                             'freedom (%g). Use the dense eigensolver instead' % num_dof)
+
+        eigenvalues, eigenvectors = scipy.sparse.linalg.eigsh(scsp.csc_matrix(K), k=num_modes, M=scsp.csc_matrix(M),
+                                                              sigma=self.settings['eigensolver_shift'].value,
+                                                              which='LM')
+        return eigenvalues, eigenvectors
+
+    def sparse_damped_modes(self, M, C, K, num_modes):
+        r"""
+        Finds the ``2 num_modes`` eigenvalues closest to ``eigensolver_shift`` (:math:`\sigma`), and their right and
+        left eigenvectors, of the first order system
+
+            .. math:: \mathbf{B\dot{x}} = \bar{\mathbf{A}}\mathbf{x}, \quad \mathbf{B} = \begin{bmatrix}\mathbf{I}
+                & \mathbf{0} \\ \mathbf{0} & \mathbf{M}\end{bmatrix}, \quad \bar{\mathbf{A}} = \begin{bmatrix}
+                \mathbf{0} & \mathbf{I} \\ -\mathbf{K} & -\mathbf{C}\end{bmatrix}
+
+        with the shift-invert Arnoldi method, using the sparse LU factorisation of :math:`\bar{\mathbf{A}} -
+        \sigma\mathbf{B}` to apply :math:`(\mathbf{A} - \sigma\mathbf{I})^{-1} = (\bar{\mathbf{A}} -
+        \sigma\mathbf{B})^{-1}\mathbf{B}` and its transpose, where :math:`\mathbf{A} = \mathbf{B}^{-1}\bar{\mathbf{A}}`.
+
+        Args:
+            M (scipy.sparse.csc_matrix or np.ndarray): Mass matrix
+            C (scipy.sparse.csc_matrix or np.ndarray): Damping matrix
+            K (scipy.sparse.csc_matrix or np.ndarray): Stiffness matrix
+            num_modes (int): Number of pairs of modes
+
+        Returns:
+            tuple: Eigenvalues, left eigenvectors and right eigenvectors of :math:`\mathbf{A}`, as returned by
+            ``scipy.linalg.eig(A, left=True, right=True)``. The left and right eigenvectors of repeated eigenvalues
+            are biorthonormal.
+        """
+        num_dof = M.shape[0]
+        if num_modes >= num_dof:
+            raise ValueError('The sparse eigensolver requires NumLambda to be smaller than the number of degrees of '
+                             'freedom (%g). Use the dense eigensolver instead' % num_dof)
+
+        sigma = self.settings['eigensolver_shift'].value
+        eye = scsp.identity(num_dof, format='csc')
+        B = scsp.block_diag((eye, scsp.csc_matrix(M)), format='csc')
+        A_bar = scsp.bmat([[None, eye],
+                           [-scsp.csc_matrix(K), -scsp.csc_matrix(C)]], format='csc')
+        lu = scipy.sparse.linalg.splu(scsp.csc_matrix(A_bar - sigma * B))
+
+        op_inv = scipy.sparse.linalg.LinearOperator(B.shape, matvec=lambda x: lu.solve(B.dot(x)), dtype=float)
+        op_inv_transpose = scipy.sparse.linalg.LinearOperator(B.shape,
+                                                              matvec=lambda x: B.T.dot(lu.solve(x, trans='T')),
+                                                              dtype=float)
+
+        # complex conjugate pairs converge unreliably with the default number of Arnoldi vectors
+        ncv = min(2 * num_dof, max(8 * num_modes, 40))
+        nu, eigenvectors = scipy.sparse.linalg.eigs(op_inv, k=2 * num_modes, which='LM', ncv=ncv)
+        nu_left, eigenvectors_left = scipy.sparse.linalg.eigs(op_inv_transpose, k=2 * num_modes, which='LM', ncv=ncv)
+        eigenvalues = sigma + 1. / nu
+        eigenvalues_left = sigma + 1. / nu_left
+
+        # pair each left eigenvector with a different right one
+        _, pairs = scipy.optimize.linear_sum_assignment(np.abs(eigenvalues[:, np.newaxis] -
+                                                               eigenvalues_left[np.newaxis, :]))
+        eigenvectors_left = eigenvectors_left[:, pairs].conj()
+
+        # the eigenvectors of repeated eigenvalues are arbitrary bases of their eigenspace, so that the left and right
+        # bases are made biorthonormal (V_l^H V_r = I) for each cluster of eigenvalues
+        tol = 1e-6 * np.max(np.abs(eigenvalues))
+        clustered = np.zeros(len(eigenvalues), dtype=bool)
+        for i_eval in range(len(eigenvalues)):
+            if clustered[i_eval]:
+                continue
+            cluster = np.where(np.abs(eigenvalues - eigenvalues[i_eval]) < tol)[0]
+            clustered[cluster] = True
+            if len(cluster) > 1:
+                overlap = eigenvectors_left[:, cluster].conj().T.dot(eigenvectors[:, cluster])
+                eigenvectors_left[:, cluster] = np.linalg.solve(overlap,
+                                                                eigenvectors_left[:, cluster].conj().T).conj().T
+
+        return eigenvalues, eigenvectors_left, eigenvectors
+
     def scale_modes_unit_mass_matrix(self, eigenvectors, FullMglobal, eigenvectors_left=None):
         if self.settings['use_undamped_modes']:
             # mass normalise (diagonalises M and K)
-            dfact = np.diag(np.dot(eigenvectors.T, np.dot(FullMglobal, eigenvectors)))
+            dfact = np.diag(np.dot(eigenvectors.T, FullMglobal.dot(eigenvectors)))
             eigenvectors = (1./np.sqrt(dfact))*eigenvectors
         else:
             # unit normalise (diagonalises A)
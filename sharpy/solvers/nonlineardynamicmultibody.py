@@ -47,6 +47,8 @@ class NonLinearDynamicMultibody(_BaseStructural):
         # Total number of equations associated to the Lagrange multipliers
         self.lc_list = None
         self.num_LM_eq = None
+        # sparsity patterns of the Lagrange multipliers damping and stiffness matrices
+        self.lm_patterns = None
 
         self.gamma = None
         self.beta = None
@@ -71,6 +73,7 @@ class NonLinearDynamicMultibody(_BaseStructural):
         # Define the number of equations
         self.lc_list = lagrangeconstraints.initialize_constraints(self.data.structure.ini_mb_dict)
         self.num_LM_eq = lagrangeconstraints.define_num_LM_eq(self.lc_list)
+        self.lm_patterns = (lagrangeconstraints.SparsityPattern(), lagrangeconstraints.SparsityPattern())
 
         # Define the number of dofs
         self.define_sys_size()
@@ -144,11 +147,14 @@ class NonLinearDynamicMultibody(_BaseStructural):
             dt,
             Lambda,
             Lambda_dot,
-            "dynamic")
+            "dynamic",
+            self.lm_patterns)
 
         # Include the matrices associated to Lagrange Multipliers
-        MB_C += LM_C
-        MB_K += LM_K
+        LM_C = LM_C.tocoo()
+        LM_K = LM_K.tocoo()
+        MB_C[LM_C.row, LM_C.col] += LM_C.data
+        MB_K[LM_K.row, LM_K.col] += LM_K.data
         MB_Q += LM_Q
 
         MB_Asys = MB_K + MB_C*self.gamma/(self.beta*dt) + MB_M/(self.beta*dt*dt)
@@ -185,8 +191,8 @@ class NonLinearDynamicMultibody(_BaseStructural):
             return
 
         # TODO the output of this routine is wrong. check at some point.
-        LM_C, LM_K, LM_Q = lagrangeconstraints.generate_lagrange_matrix(self.lc_list, MB_beam, MB_tstep, ts, self.num_LM_eq, self.sys_size, dt, Lambda, Lambda_dot, "dynamic")
-        F = -np.dot(LM_C[:, -self.num_LM_eq:], Lambda_dot) - np.dot(LM_K[:, -self.num_LM_eq:], Lambda)
+        LM_C, LM_K, LM_Q = lagrangeconstraints.generate_lagrange_matrix(self.lc_list, MB_beam, MB_tstep, ts, self.num_LM_eq, self.sys_size, dt, Lambda, Lambda_dot, "dynamic", self.lm_patterns)
+        F = -LM_C[:, -self.num_LM_eq:].dot(Lambda_dot) - LM_K[:, -self.num_LM_eq:].dot(Lambda)
 
         first_dof = 0
         for ibody in range(len(MB_beam)):
@@ -5,10 +5,12 @@ import scipy.signal
 
 import sharpy.utils.algebra as algebra
 import sharpy.aero.utils.uvlmlib as uvlmlib
+import sharpy.aero.utils.utils as aero_utils
 import sharpy.utils.settings as settings
 from sharpy.utils.solver_interface import solver, BaseSolver
 import sharpy.utils.generator_interface as gen_interface
 import sharpy.utils.cout_utils as cout
+import sharpy.utils.profiling as profiling
 
 
 @solver
@@ -29,6 +31,31 @@ class StepUvlm(BaseSolver):
 
     amongst others.
 
+    The cost of long wakes can be reduced with the following options, measured along the wake from the trailing edge:
+
+    * ``wake_velocity_distance``: the velocity field is only evaluated on the wake vertices closer than this distance
+      to the trailing edge. Farther vertices are still convected, with the external velocity of the last vertex
+      evaluated in the same spanwise position, which is exact for a uniform flow. With ``convection_scheme = 3`` the
+      velocities induced on the wake are still computed on the whole wake by the UVLM library. For non-uniform
+      velocity fields (gusts, turbulence...) the far wake is convected with the velocity of the near wake.
+
+    * ``wake_freeze_distance``: the wake vertices farther than this distance from the trailing edge are frozen, they
+      are not convected and keep their position while they travel along the wake. The UVLM library still convects the
+      whole wake, whose far part is restored after each step, so this option saves no computations by itself, but
+      keeps the far wake clean of the roll-up and distortions of the near wake.
+
+    * ``wake_lumping_distance``: beyond this distance, consecutive wake panels are merged into coarser ones
+      (see :func:`sharpy.aero.utils.utils.lump_wake`), so that a longer wake is represented with the same number of
+      panels.
+
+    * ``wake_truncation_tolerance``: the panels at the end of the wake whose induced velocity on the lifting surfaces
+      is estimated to be smaller than this tolerance (relative to the external velocity) are dropped
+      (see :func:`sharpy.aero.utils.utils.truncate_wake`). The wake is only truncated once the circulation shed by the
+      lifting surfaces has reached its end, so that a wake initialised without circulation is kept.
+
+    The partial evaluation of the velocity field and the freezing and lumping of the wake require a wake convected with
+    the flow (``convection_scheme > 1``).
+
     """
     solver_id = 'StepUvlm'
     solver_classification = 'aero'
@@ -85,6 +112,34 @@ class StepUvlm(BaseSolver):
     settings_default['rho'] = 1.225
     settings_description['rho'] = 'Air density'
 
+    settings_types['wake_velocity_distance'] = 'float'
+    settings_default['wake_velocity_distance'] = 0.
+    settings_description['wake_velocity_distance'] = 'Distance to the trailing edge beyond which the velocity field ' \
+                                                     'is not evaluated on the wake, whose vertices take the external ' \
+                                                     'velocity of the last evaluated one. If ``0``, it is evaluated ' \
+                                                     'on the whole wake'
+
+    settings_types['wake_freeze_distance'] = 'float'
+    settings_default['wake_freeze_distance'] = 0.
+    settings_description['wake_freeze_distance'] = 'Distance to the trailing edge beyond which the wake vertices ' \
+                                                   'are not convected. If ``0``, the whole wake is convected'
+
+    settings_types['wake_lumping_distance'] = 'float'
+    settings_default['wake_lumping_distance'] = 0.
+    settings_description['wake_lumping_distance'] = 'Distance to the trailing edge beyond which wake panels are ' \
+                                                    'merged into coarser ones. If ``0``, the panels are not merged'
+
+    settings_types['wake_lumping_ratio'] = 'float'
+    settings_default['wake_lumping_ratio'] = 0.2
+    settings_description['wake_lumping_ratio'] = 'Maximum ratio between the length of merged wake panels and their ' \
+                                                 'distance to the trailing edge'
+
+    settings_types['wake_truncation_tolerance'] = 'float'
+    settings_default['wake_truncation_tolerance'] = 0.
+    settings_description['wake_truncation_tolerance'] = 'Wake panels at the end of the wake with a smaller estimated ' \
+                                                        'induced velocity (relative to the external velocity) are ' \
+                                                        'dropped. If ``0``, the wake is not truncated'
+
     settings_table = settings.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
 
@@ -128,6 +183,17 @@ class StepUvlm(BaseSolver):
                     self.settings['gamma_dot_filtering'] = (
                         ct.c_int(self.settings['gamma_dot_filtering'].value + 1))
 
+        if self.settings['convection_scheme'].value < 2:
+            for name in ['wake_velocity_distance', 'wake_freeze_distance', 'wake_lumping_distance']:
+                if self.settings[name].value > 0.:
+                    cout.cout_wrap('%s requires convection_scheme > 1. Changing it to 0' % name, 2)
+                    self.settings[name] = ct.c_double(0.)
+
+        if (self.settings['wake_velocity_distance'].value > 0. and
+                self.settings['velocity_field_generator'] != 'SteadyVelocityField'):
+            cout.cout_wrap('WARNING: the far wake beyond wake_velocity_distance is convected with the velocity of the near '
+                           'wake, which is only exact for a uniform flow (SteadyVelocityField)', 3)
+
         # init velocity generator
         velocity_generator_type = gen_interface.generator_from_string(
             self.settings['velocity_field_generator'])
@@ -166,22 +232,42 @@ class StepUvlm(BaseSolver):
                                           'dt': dt,
                                           'for_pos': structure_tstep.for_pos},
                                          aero_tstep.u_ext)
+        if convect_wake:
+            self.manage_wake(aero_tstep)
+
         if self.settings['convection_scheme'].value > 1 and convect_wake:
             # generate uext_star
-            self.velocity_generator.generate({'zeta': aero_tstep.zeta_star,
+            if self.settings['wake_velocity_distance'].value > 0.:
+                zeta_star, u_ext_star = self.near_wake(aero_tstep)
+            else:
+                zeta_star = aero_tstep.zeta_star
+                u_ext_star = aero_tstep.u_ext_star
+            self.velocity_generator.generate({'zeta': zeta_star,
                                               'override': True,
                                               'ts': self.data.ts,
                                               'dt': dt,
                                               't': t,
                                               'for_pos': structure_tstep.for_pos},
-                                             aero_tstep.u_ext_star)
-
-        uvlmlib.uvlm_solver(self.data.ts,
-                            aero_tstep,
-                            structure_tstep,
-                            self.settings,
-                            convect_wake=convect_wake,
-                            dt=dt)
+                                             u_ext_star)
+            # the far wake is convected with the velocity of the last near-wake vertices
+            for i_surf in range(len(u_ext_star)):
+                n_near = u_ext_star[i_surf].shape[1]
+                aero_tstep.u_ext_star[i_surf][:, n_near:, :] = u_ext_star[i_surf][:, n_near - 1:n_near, :]
+
+        far_wake = None
+        if convect_wake and self.settings['wake_freeze_distance'].value > 0.:
+            far_wake = self.far_wake(aero_tstep)
+
+        with profiling.profiler.span('uvlm_solver'):
+            uvlmlib.uvlm_solver(self.data.ts,
+                                aero_tstep,
+                                structure_tstep,
+                                self.settings,
+                                convect_wake=convect_wake,
+                                dt=dt)
+
+        if far_wake is not None:
+            self.freeze_far_wake(aero_tstep, far_wake)
 
         if unsteady_contribution:
             # calculate unsteady (added mass) forces:
@@ -211,12 +297,70 @@ class StepUvlm(BaseSolver):
     def add_step(self):
         self.data.aero.add_timestep()
 
+    def manage_wake(self, aero_tstep):
+        """
+        Merges and drops far-wake panels of ``aero_tstep`` according to the ``wake_lumping_distance`` and
+        ``wake_truncation_tolerance`` settings
+        """
+        if self.settings['wake_lumping_distance'].value > 0.:
+            aero_utils.lump_wake(aero_tstep,
+                                 self.settings['wake_lumping_distance'].value,
+                                 self.settings['wake_lumping_ratio'].value)
+        if self.settings['wake_truncation_tolerance'].value > 0.:
+            aero_utils.truncate_wake(aero_tstep, self.settings['wake_truncation_tolerance'].value)
+
+    def near_wake(self, aero_tstep):
+        """
+        Views of the wake vertices and their external velocity closer than ``wake_velocity_distance`` to the trailing
+        edge, where the velocity field is evaluated
+
+        Returns:
+            tuple: Lists of the ``zeta_star`` and ``u_ext_star`` views of each surface
+        """
+        zeta_star = []
+        u_ext_star = []
+        for i_surf in range(aero_tstep.n_surf):
+            distance = aero_utils.wake_vertex_distance(aero_tstep.zeta_star[i_surf])
+            n_near = max(int(np.searchsorted(distance, self.settings['wake_velocity_distance'].value,
+                                             side='right')), 1)
+            zeta_star.append(aero_tstep.zeta_star[i_surf][:, :n_near, :])
+            u_ext_star.append(aero_tstep.u_ext_star[i_surf][:, :n_near, :])
+        return zeta_star, u_ext_star
+
+    def far_wake(self, aero_tstep):
+        """
+        Copies of the wake vertices farther than ``wake_freeze_distance`` from the trailing edge, to be restored by
+        :meth:`freeze_far_wake` once the wake has been convected. The vertices of the last row are not kept, since
+        they leave the wake when it is convected.
+
+        Returns:
+            list: Index of the first far vertex row and copy of the far vertices of each surface
+        """
+        far_wake = []
+        for i_surf in range(aero_tstep.n_surf):
+            distance = aero_utils.wake_vertex_distance(aero_tstep.zeta_star[i_surf])
+            n_near = max(int(np.searchsorted(distance, self.settings['wake_freeze_distance'].value,
+                                             side='right')), 1)
+            far_wake.append((n_near, aero_tstep.zeta_star[i_surf][:, n_near:-1, :].copy()))
+        return far_wake
+
+    @staticmethod
+    def freeze_far_wake(aero_tstep, far_wake):
+        """
+        Restores the far wake vertices saved by :meth:`far_wake` before the wake was convected. The UVLM library
+        shifts the wake vertices one row downstream when it convects the wake, so they are restored one row behind
+        their previous position.
+        """
+        for i_surf, (n_near, zeta_star) in enumerate(far_wake):
+            aero_tstep.zeta_star[i_surf][:, n_near + 1:, :] = zeta_star
+
     def update_grid(self, beam):
         self.data.aero.generate_zeta(beam,
                                      self.data.aero.aero_settings,
                                      -1,
                                      beam_ts=-1)
 
+    @profiling.profile('grid_update')
     def update_custom_grid(self, structure_tstep, aero_tstep):
         self.data.aero.generate_zeta_timestep_info(structure_tstep,
                                                    aero_tstep,
@@ -455,37 +455,33 @@ class Beam(BaseStructure):
 
 
     def nodal_b_for_2_a_for(self, nodal, tstep, filter=np.array([True]*6)):
-        nodal_a = nodal.copy(order='F')
-        for i_node in range(self.num_node):
-            # get master elem and i_local_node
-            i_master_elem, i_local_node = self.node_master_elem[i_node, :]
-            crv = tstep.psi[i_master_elem, i_local_node, :]
-            cab = algebra.crv2rotation(crv)
-            temp = np.zeros((6,))
-            temp[0:3] = np.dot(cab, nodal[i_node, 0:3])
-            temp[3:6] = np.dot(cab, nodal[i_node, 3:6])
-            for i in range(6):
-                if filter[i]:
-                    nodal_a[i_node, i] = temp[i]
-
-        return nodal_a
+        cab = algebra.crv2rotation_vec(self.nodal_master_psi(tstep))
+        return self.nodal_premultiply(nodal, cab, filter)
 
     def nodal_premultiply_inv_T_transpose(self, nodal, tstep, filter=np.array([True]*6)):
-        # nodal_t = np.zeros_like(nodal, dtype=ct.c_double, order='F')
-        nodal_t = nodal.copy(order='F')
-        for i_node in range(self.num_node):
-            # get master elem and i_local_node
-            i_master_elem, i_local_node = self.node_master_elem[i_node, :]
-            crv = tstep.psi[i_master_elem, i_local_node, :]
-            inv_tanT = algebra.crv2invtant(crv)
-            temp = np.zeros((6,))
-            temp[0:3] = np.dot(inv_tanT, nodal[i_node, 0:3])
-            temp[3:6] = np.dot(inv_tanT, nodal[i_node, 3:6])
-            for i in range(6):
-                if filter[i]:
-                    nodal_t[i_node, i] = temp[i]
-
-        return nodal_t
+        inv_tanT = np.linalg.inv(np.swapaxes(algebra.crv2tan_vec(self.nodal_master_psi(tstep)), 1, 2))
+        return self.nodal_premultiply(nodal, inv_tanT, filter)
+
+    def nodal_master_psi(self, tstep):
+        """
+        Returns the ``(num_node, 3)`` array of the rotation vectors of the nodes in their master element
+        """
+        return tstep.psi[self.node_master_elem[:, 0], self.node_master_elem[:, 1], :]
+
+    @staticmethod
+    def nodal_premultiply(nodal, matrices, filter=np.array([True]*6)):
+        """
+        Premultiplies the forces and moments of each node of ``nodal`` by the corresponding matrix of the
+        ``(num_node, 3, 3)`` stack ``matrices``. Only the components where ``filter`` is ``True`` are modified.
+        """
+        temp = np.zeros(nodal.shape)
+        temp[:, 0:3] = np.matmul(matrices, nodal[:, 0:3, None])[:, :, 0]
+        temp[:, 3:6] = np.matmul(matrices, nodal[:, 3:6, None])[:, :, 0]
+
+        filter = np.asarray(filter, dtype=bool)
+        nodal_out = nodal.copy(order='F')
+        nodal_out[:, filter] = temp[:, filter]
+        return nodal_out
 
     def get_body(self, ibody):
         """
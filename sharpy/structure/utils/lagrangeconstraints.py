@@ -19,6 +19,7 @@ import sharpy.utils.cout_utils as cout
 import os
 import ctypes as ct
 import numpy as np
+import scipy.sparse as scsp
 import sharpy.utils.algebra as algebra
 
 dict_of_lc = {}
@@ -84,16 +85,22 @@ class BaseLagrangeConstraint(metaclass=ABCMeta):
 
     @abstractmethod
     # def staticmat(self, **kwargs):
-    def staticmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def staticmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                   sys_size, dt, Lambda, Lambda_dot,
                   scalingFactor, penaltyFactor):
+        """
+        Returns the :class:`ConstraintBlocks` with the contribution of the constraint to the static equations
+        """
         pass
 
     @abstractmethod
     # def dynamicmat(self, **kwargs):
-    def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def dynamicmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                    sys_size, dt, Lambda, Lambda_dot,
-                  scalingFactor, penaltyFactor):
+                   scalingFactor, penaltyFactor):
+        """
+        Returns the :class:`ConstraintBlocks` with the contribution of the constraint to the dynamic equations
+        """
         pass
 
     @abstractmethod
@@ -107,6 +114,106 @@ class BaseLagrangeConstraint(metaclass=ABCMeta):
         pass
 
 
+class ConstraintBlocks(object):
+    """
+    Non-zero blocks of the contribution of a constraint to the Lagrange multipliers matrices
+
+    The blocks of ``LM_C`` and ``LM_K`` are stored as ``(row, col, values)``, where ``row`` and ``col`` are the
+    position in the system matrix of the first entry of the 2D array ``values``. The blocks of ``LM_Q`` are stored as
+    ``(row, values)``. Blocks may overlap, in which case they are added.
+
+    Args:
+        sys_size (int): Number of degrees of freedom of the multibody system. The equations of the constraints are
+            placed after them.
+    """
+    def __init__(self, sys_size):
+        self.sys_size = sys_size
+        self.C = []
+        self.K = []
+        self.Q = []
+
+    def add_C(self, row, col, values):
+        self.C.append((row, col, values))
+
+    def add_K(self, row, col, values):
+        self.K.append((row, col, values))
+
+    def add_Q(self, row, values):
+        self.Q.append((row, np.atleast_1d(values)))
+
+    def add_C_jacobian(self, ieq, col, B, multipliers, scalingFactor):
+        """
+        Adds the block ``B`` of the Jacobian of non-holonomic constraint equations to ``LM_C``
+
+        The block relates the equations starting at ``ieq`` and the degrees of freedom starting at ``col``. Its
+        transpose and the generalised forces of the Lagrange multipliers ``B^T multipliers`` are added as well.
+        """
+        self._add_jacobian(self.C, ieq, col, B, multipliers, scalingFactor)
+
+    def add_K_jacobian(self, ieq, col, B, multipliers, scalingFactor):
+        """
+        Adds the block ``B`` of the Jacobian of holonomic constraint equations to ``LM_K``
+
+        See :meth:`add_C_jacobian`.
+        """
+        self._add_jacobian(self.K, ieq, col, B, multipliers, scalingFactor)
+
+    def _add_jacobian(self, blocks, ieq, col, B, multipliers, scalingFactor):
+        row = self.sys_size + ieq
+        blocks.append((row, col, scalingFactor*B))
+        blocks.append((col, row, scalingFactor*B.T))
+        self.Q.append((col, scalingFactor*np.dot(B.T, multipliers[ieq:ieq + B.shape[0]])))
+
+
+class SparsityPattern(object):
+    """
+    Sparsity pattern of a matrix assembled from dense blocks
+
+    The indices of the non-zero entries are only computed when the layout of the blocks (their position and shape)
+    changes, such that assembling the matrix with the same layout only requires summing the values of the blocks.
+    """
+    def __init__(self):
+        self.layout = None
+        self.nnz = 0
+        self.indices = None
+        self.indptr = None
+        # position in the data of the matrix of each entry of the blocks
+        self.entries = None
+
+    def update(self, blocks, shape):
+        rows = [np.zeros((0,), dtype=int)]
+        cols = [np.zeros((0,), dtype=int)]
+        for row, col, values in blocks:
+            n_rows, n_cols = values.shape
+            rows.append(np.repeat(np.arange(row, row + n_rows), n_cols))
+            cols.append(np.tile(np.arange(col, col + n_cols), n_rows))
+        unique, self.entries = np.unique(np.concatenate(rows)*shape[1] + np.concatenate(cols), return_inverse=True)
+        unique_rows, self.indices = np.divmod(unique, shape[1])
+        self.indptr = np.zeros((shape[0] + 1,), dtype=int)
+        self.indptr[1:] = np.cumsum(np.bincount(unique_rows, minlength=shape[0]))
+        self.nnz = len(unique)
+
+    def assemble(self, blocks, shape):
+        """
+        Returns the sum of ``blocks`` as a ``scipy.sparse.csr_matrix`` of size ``shape``
+
+        Args:
+            blocks (list(tuple)): ``(row, col, values)`` of each block.
+            shape (tuple(int)): Size of the matrix.
+        """
+        layout = (shape,) + tuple((row, col, values.shape) for row, col, values in blocks)
+        if layout != self.layout:
+            self.update(blocks, shape)
+            self.layout = layout
+
+        if blocks:
+            values = np.concatenate([values.ravel() for row, col, values in blocks])
+        else:
+            values = np.zeros((0,))
+        data = np.bincount(self.entries, weights=values, minlength=self.nnz)
+        return scsp.csr_matrix((data, self.indices.copy(), self.indptr.copy()), shape=shape)
+
+
 ################################################################################
 # Auxiliar functions
 ################################################################################
@@ -168,7 +275,7 @@ def define_FoR_dof(MB_beam, FoR_body):
 ################################################################################
 # Equations
 ################################################################################
-def equal_lin_vel_node_FoR(MB_tstep, MB_beam, FoR_body, node_body, node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, scalingFactor, penaltyFactor, ieq, LM_K, LM_C, LM_Q):
+def equal_lin_vel_node_FoR(MB_tstep, MB_beam, FoR_body, node_body, node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, scalingFactor, penaltyFactor, ieq, blocks):
 
     # Variables names. The naming of the variables can be quite confusing. The reader should think that
     # the BC relates one "node" and one "FoR" (writen between quotes in these lines).
@@ -181,44 +288,38 @@ def equal_lin_vel_node_FoR(MB_tstep, MB_beam, FoR_body, node_body, node_number,
     # FoR_dof: position of the first degree of freedom associated to the "FoR"
 
     num_LM_eq_specific = 3
-    Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
-    B = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
 
-    Bnh[:, FoR_dof:FoR_dof+3] = algebra.quat2rotation(MB_tstep[FoR_body].quat)
+    blocks.add_C_jacobian(ieq, FoR_dof, algebra.quat2rotation(MB_tstep[FoR_body].quat), Lambda_dot, scalingFactor)
 
-    Bnh[:, node_dof:node_dof+3] = -1.0*algebra.quat2rotation(MB_tstep[node_body].quat)
+    blocks.add_C_jacobian(ieq, node_dof, -1.0*algebra.quat2rotation(MB_tstep[node_body].quat), Lambda_dot, scalingFactor)
     if MB_beam[node_body].FoR_movement == 'free':
-        Bnh[:, node_FoR_dof:node_FoR_dof+3] = -1.0*algebra.quat2rotation(MB_tstep[node_body].quat)
-        Bnh[:, node_FoR_dof+3:node_FoR_dof+6] = 1.0*np.dot(algebra.quat2rotation(MB_tstep[node_body].quat),algebra.skew(MB_tstep[node_body].pos[node_number,:]))
+        blocks.add_C_jacobian(ieq, node_FoR_dof, -1.0*algebra.quat2rotation(MB_tstep[node_body].quat), Lambda_dot, scalingFactor)
+        blocks.add_C_jacobian(ieq, node_FoR_dof+3, 1.0*np.dot(algebra.quat2rotation(MB_tstep[node_body].quat),algebra.skew(MB_tstep[node_body].pos[node_number,:])), Lambda_dot, scalingFactor)
 
-    LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scalingFactor*Bnh
-    LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*np.transpose(Bnh)
+    blocks.add_Q(sys_size+ieq, (np.dot(algebra.quat2rotation(MB_tstep[FoR_body].quat),MB_tstep[FoR_body].for_vel[0:3]) +
+                                -1.0*np.dot(algebra.quat2rotation(MB_tstep[node_body].quat),
+                                            MB_tstep[node_body].pos_dot[node_number,:] +
+                                            MB_tstep[node_body].for_vel[0:3] +
+                                            -1.0*np.dot(algebra.skew(MB_tstep[node_body].pos[node_number,:]),MB_tstep[node_body].for_vel[3:6]))))
 
-    LM_Q[:sys_size] += scalingFactor*np.dot(np.transpose(Bnh),Lambda_dot[ieq:ieq+num_LM_eq_specific])
-    LM_Q[sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += (np.dot(algebra.quat2rotation(MB_tstep[FoR_body].quat),MB_tstep[FoR_body].for_vel[0:3]) +
-                                                          -1.0*np.dot(algebra.quat2rotation(MB_tstep[node_body].quat),
-                                                                      MB_tstep[node_body].pos_dot[node_number,:] +
-                                                                      MB_tstep[node_body].for_vel[0:3] +
-                                                                      -1.0*np.dot(algebra.skew(MB_tstep[node_body].pos[node_number,:]),MB_tstep[node_body].for_vel[3:6])))
-
-    LM_C[FoR_dof:FoR_dof+3,FoR_dof+6:FoR_dof+10] += algebra.der_CquatT_by_v(MB_tstep[FoR_body].quat,scalingFactor*Lambda_dot[ieq:ieq+num_LM_eq_specific])
+    blocks.add_C(FoR_dof, FoR_dof+6, algebra.der_CquatT_by_v(MB_tstep[FoR_body].quat,scalingFactor*Lambda_dot[ieq:ieq+num_LM_eq_specific]))
 
     if MB_beam[node_body].FoR_movement == 'free':
-        LM_C[node_dof:node_dof+3,node_FoR_dof+6:node_FoR_dof+10] -= algebra.der_CquatT_by_v(MB_tstep[node_body].quat,scalingFactor*Lambda_dot[ieq:ieq+num_LM_eq_specific])
+        blocks.add_C(node_dof, node_FoR_dof+6, -algebra.der_CquatT_by_v(MB_tstep[node_body].quat,scalingFactor*Lambda_dot[ieq:ieq+num_LM_eq_specific]))
 
-        LM_C[node_FoR_dof:node_FoR_dof+3,node_FoR_dof+6:node_FoR_dof+10] -= algebra.der_CquatT_by_v(MB_tstep[node_body].quat,scalingFactor*Lambda_dot[ieq:ieq+num_LM_eq_specific])
+        blocks.add_C(node_FoR_dof, node_FoR_dof+6, -algebra.der_CquatT_by_v(MB_tstep[node_body].quat,scalingFactor*Lambda_dot[ieq:ieq+num_LM_eq_specific]))
 
-        LM_C[node_FoR_dof+3:node_FoR_dof+6,node_FoR_dof+6:node_FoR_dof+10] -= np.dot(algebra.skew(MB_tstep[node_body].pos[node_number,:]),
-                                                                                     algebra.der_CquatT_by_v(MB_tstep[node_body].quat,
-                                                                                                             scalingFactor*Lambda_dot[ieq:ieq+num_LM_eq_specific]))
+        blocks.add_C(node_FoR_dof+3, node_FoR_dof+6, -np.dot(algebra.skew(MB_tstep[node_body].pos[node_number,:]),
+                                                             algebra.der_CquatT_by_v(MB_tstep[node_body].quat,
+                                                                                     scalingFactor*Lambda_dot[ieq:ieq+num_LM_eq_specific])))
 
-        LM_K[node_FoR_dof+3:node_FoR_dof+6,node_dof:node_dof+3] += algebra.skew(np.dot(algebra.quat2rotation(MB_tstep[node_body].quat).T,Lambda_dot[ieq:ieq+num_LM_eq_specific]))
+        blocks.add_K(node_FoR_dof+3, node_dof, algebra.skew(np.dot(algebra.quat2rotation(MB_tstep[node_body].quat).T,Lambda_dot[ieq:ieq+num_LM_eq_specific])))
 
     ieq += 3
     return ieq
 
 
-def def_rot_axis_FoR_wrt_node(MB_tstep, MB_beam, FoR_body, node_body, node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, rot_axisB, scalingFactor, penaltyFactor, ieq, LM_K, LM_C, LM_Q, indep):
+def def_rot_axis_FoR_wrt_node(MB_tstep, MB_beam, FoR_body, node_body, node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, rot_axisB, scalingFactor, penaltyFactor, ieq, blocks, indep):
 
     # Variables names. The naming of the variables can be quite confusing. The reader should think that
     # the BC relates one "node" and one "FoR" (writen between quotes in these lines).
@@ -260,53 +361,48 @@ def def_rot_axis_FoR_wrt_node(MB_tstep, MB_beam, FoR_body, node_body, node_numbe
     new_Lambda_dot[indep[1]] = Lambda_dot[ieq+1]
 
     num_LM_eq_specific = 2
-    Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
-    B = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
 
     # Lambda_dot[ieq:ieq+num_LM_eq_specific]
     # np.concatenate((Lambda_dot[ieq:ieq+num_LM_eq_specific], np.array([0.])))
 
     # print(indep)
-    Bnh[:, FoR_dof+3:FoR_dof+6] = algebra.multiply_matrices(algebra.skew(rot_axisB),
-                                                  algebra.crv2rotation(MB_tstep[node_body].psi[ielem,inode_in_elem,:]).T,
-                                                  algebra.quat2rotation(MB_tstep[node_body].quat).T,
-                                                  algebra.quat2rotation(MB_tstep[FoR_body].quat))[indep,:]
+    Bnh = algebra.multiply_matrices(algebra.skew(rot_axisB),
+                                    algebra.crv2rotation(MB_tstep[node_body].psi[ielem,inode_in_elem,:]).T,
+                                    algebra.quat2rotation(MB_tstep[node_body].quat).T,
+                                    algebra.quat2rotation(MB_tstep[FoR_body].quat))[indep,:]
 
     # Constrain angular velocities
-    LM_Q[:sys_size] += scalingFactor*np.dot(np.transpose(Bnh),Lambda_dot[ieq:ieq+num_LM_eq_specific])
-    LM_Q[sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += algebra.multiply_matrices(algebra.skew(rot_axisB),
-                                                  algebra.crv2rotation(MB_tstep[node_body].psi[ielem,inode_in_elem,:]).T,
-                                                  algebra.quat2rotation(MB_tstep[node_body].quat).T,
-                                                  algebra.quat2rotation(MB_tstep[FoR_body].quat),
-                                                  MB_tstep[FoR_body].for_vel[3:6])[indep]
-
-    LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scalingFactor*Bnh
-    LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*np.transpose(Bnh)
+    blocks.add_C_jacobian(ieq, FoR_dof+3, Bnh, Lambda_dot, scalingFactor)
+    blocks.add_Q(sys_size+ieq, algebra.multiply_matrices(algebra.skew(rot_axisB),
+                                                         algebra.crv2rotation(MB_tstep[node_body].psi[ielem,inode_in_elem,:]).T,
+                                                         algebra.quat2rotation(MB_tstep[node_body].quat).T,
+                                                         algebra.quat2rotation(MB_tstep[FoR_body].quat),
+                                                         MB_tstep[FoR_body].for_vel[3:6])[indep])
 
     if MB_beam[node_body].FoR_movement == 'free':
-        LM_C[FoR_dof+3:FoR_dof+6,node_FoR_dof+6:node_FoR_dof+10] += np.dot(algebra.quat2rotation(MB_tstep[FoR_body].quat).T,
-                                                                           algebra.der_Cquat_by_v(MB_tstep[node_body].quat,
-                                                                                                  algebra.multiply_matrices(algebra.crv2rotation(MB_tstep[node_body].psi[ielem,inode_in_elem,:]),
-                                                                                                                    algebra.skew(rot_axisB).T,
-                                                                                                                    new_Lambda_dot)))
-
-    LM_C[FoR_dof+3:FoR_dof+6,FoR_dof+6:FoR_dof+10] += algebra.der_CquatT_by_v(MB_tstep[FoR_body].quat,
-                                                                              algebra.multiply_matrices(algebra.quat2rotation(MB_tstep[node_body].quat),
-                                                                                                algebra.crv2rotation(MB_tstep[node_body].psi[ielem,inode_in_elem,:]).T,
-                                                                                                algebra.skew(rot_axisB).T,
-                                                                                                new_Lambda_dot))
-
-    LM_K[FoR_dof+3:FoR_dof+6,node_dof+3:node_dof+6] += algebra.multiply_matrices(algebra.quat2rotation(MB_tstep[FoR_body].quat).T,
-                                                                         algebra.quat2rotation(MB_tstep[node_body].quat),
-                                                                         algebra.der_Ccrv_by_v(MB_tstep[node_body].psi[ielem,inode_in_elem,:],
-                                                                                                np.dot(algebra.skew(rot_axisB).T,
-                                                                                                       new_Lambda_dot)))
+        blocks.add_C(FoR_dof+3, node_FoR_dof+6, np.dot(algebra.quat2rotation(MB_tstep[FoR_body].quat).T,
+                                                       algebra.der_Cquat_by_v(MB_tstep[node_body].quat,
+                                                                              algebra.multiply_matrices(algebra.crv2rotation(MB_tstep[node_body].psi[ielem,inode_in_elem,:]),
+                                                                                                        algebra.skew(rot_axisB).T,
+                                                                                                        new_Lambda_dot))))
+
+    blocks.add_C(FoR_dof+3, FoR_dof+6, algebra.der_CquatT_by_v(MB_tstep[FoR_body].quat,
+                                                               algebra.multiply_matrices(algebra.quat2rotation(MB_tstep[node_body].quat),
+                                                                                         algebra.crv2rotation(MB_tstep[node_body].psi[ielem,inode_in_elem,:]).T,
+                                                                                         algebra.skew(rot_axisB).T,
+                                                                                         new_Lambda_dot)))
+
+    blocks.add_K(FoR_dof+3, node_dof+3, algebra.multiply_matrices(algebra.quat2rotation(MB_tstep[FoR_body].quat).T,
+                                                                  algebra.quat2rotation(MB_tstep[node_body].quat),
+                                                                  algebra.der_Ccrv_by_v(MB_tstep[node_body].psi[ielem,inode_in_elem,:],
+                                                                                        np.dot(algebra.skew(rot_axisB).T,
+                                                                                               new_Lambda_dot))))
 
     ieq += 2
     return ieq
 
 
-def def_rot_vel_FoR_wrt_node(MB_tstep, MB_beam, FoR_body, node_body, node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, rot_axisB, rot_vel, scalingFactor, penaltyFactor, ieq, LM_K, LM_C, LM_Q):
+def def_rot_vel_FoR_wrt_node(MB_tstep, MB_beam, FoR_body, node_body, node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, rot_axisB, rot_vel, scalingFactor, penaltyFactor, ieq, blocks):
 
     # Variables names. The naming of the variables can be quite confusing. The reader should think that
     # the BC relates one "node" and one "FoR" (writen between quotes in these lines).
@@ -319,45 +415,40 @@ def def_rot_vel_FoR_wrt_node(MB_tstep, MB_beam, FoR_body, node_body, node_number
     # FoR_dof: position of the first degree of freedom associated to the "FoR"
 
     num_LM_eq_specific = 1
-    Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
-    B = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
 
     # Lambda_dot[ieq:ieq+num_LM_eq_specific]
     # np.concatenate((Lambda_dot[ieq:ieq+num_LM_eq_specific], np.array([0.])))
 
     ielem, inode_in_elem = MB_beam[node_body].node_master_elem[node_number]
-    Bnh[:, FoR_dof+3:FoR_dof+6] = algebra.multiply_matrices(rot_axisB,
-                                                  algebra.crv2rotation(MB_tstep[node_body].psi[ielem,inode_in_elem,:]).T,
-                                                  algebra.quat2rotation(MB_tstep[node_body].quat).T,
-                                                  algebra.quat2rotation(MB_tstep[FoR_body].quat))
+    Bnh = algebra.multiply_matrices(rot_axisB,
+                                    algebra.crv2rotation(MB_tstep[node_body].psi[ielem,inode_in_elem,:]).T,
+                                    algebra.quat2rotation(MB_tstep[node_body].quat).T,
+                                    algebra.quat2rotation(MB_tstep[FoR_body].quat)).reshape((num_LM_eq_specific, 3))
 
     # Constrain angular velocities
-    LM_Q[:sys_size] += scalingFactor*np.dot(np.transpose(Bnh),Lambda_dot[ieq:ieq+num_LM_eq_specific])
-    LM_Q[sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += algebra.multiply_matrices(rot_axisB,
-                                                  algebra.crv2rotation(MB_tstep[node_body].psi[ielem,inode_in_elem,:]).T,
-                                                  algebra.quat2rotation(MB_tstep[node_body].quat).T,
-                                                  algebra.quat2rotation(MB_tstep[FoR_body].quat),
-                                                  MB_tstep[FoR_body].for_vel[3:6]) - rot_vel
-
-    LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scalingFactor*Bnh
-    LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*np.transpose(Bnh)
+    blocks.add_C_jacobian(ieq, FoR_dof+3, Bnh, Lambda_dot, scalingFactor)
+    blocks.add_Q(sys_size+ieq, algebra.multiply_matrices(rot_axisB,
+                                                         algebra.crv2rotation(MB_tstep[node_body].psi[ielem,inode_in_elem,:]).T,
+                                                         algebra.quat2rotation(MB_tstep[node_body].quat).T,
+                                                         algebra.quat2rotation(MB_tstep[FoR_body].quat),
+                                                         MB_tstep[FoR_body].for_vel[3:6]) - rot_vel)
 
     if MB_beam[node_body].FoR_movement == 'free':
-        LM_C[FoR_dof+3:FoR_dof+6,node_FoR_dof+6:node_FoR_dof+10] += np.dot(algebra.quat2rotation(MB_tstep[FoR_body].quat).T,
-                                                                           algebra.der_Cquat_by_v(MB_tstep[node_body].quat,
-                                                                                                  algebra.multiply_matrices(algebra.crv2rotation(MB_tstep[node_body].psi[ielem,inode_in_elem,:]),
-                                                                                                                    # rot_axisB.T,
-                                                                                                                    rot_axisB.T*Lambda_dot[ieq:ieq+num_LM_eq_specific])))
-
-    LM_C[FoR_dof+3:FoR_dof+6,FoR_dof+6:FoR_dof+10] += algebra.der_CquatT_by_v(MB_tstep[FoR_body].quat,
-                                                                              algebra.multiply_matrices(algebra.quat2rotation(MB_tstep[node_body].quat),
-                                                                                                algebra.crv2rotation(MB_tstep[node_body].psi[ielem,inode_in_elem,:]).T,
-                                                                                                rot_axisB.T*Lambda_dot[ieq:ieq+num_LM_eq_specific]))
-
-    LM_K[FoR_dof+3:FoR_dof+6,node_dof+3:node_dof+6] += algebra.multiply_matrices(algebra.quat2rotation(MB_tstep[FoR_body].quat).T,
-                                                                         algebra.quat2rotation(MB_tstep[node_body].quat),
-                                                                         algebra.der_Ccrv_by_v(MB_tstep[node_body].psi[ielem,inode_in_elem,:],
-                                                                                                rot_axisB.T*Lambda_dot[ieq:ieq+num_LM_eq_specific]))
+        blocks.add_C(FoR_dof+3, node_FoR_dof+6, np.dot(algebra.quat2rotation(MB_tstep[FoR_body].quat).T,
+                                                       algebra.der_Cquat_by_v(MB_tstep[node_body].quat,
+                                                                              algebra.multiply_matrices(algebra.crv2rotation(MB_tstep[node_body].psi[ielem,inode_in_elem,:]),
+                                                                                                        # rot_axisB.T,
+                                                                                                        rot_axisB.T*Lambda_dot[ieq:ieq+num_LM_eq_specific]))))
+
+    blocks.add_C(FoR_dof+3, FoR_dof+6, algebra.der_CquatT_by_v(MB_tstep[FoR_body].quat,
+                                                               algebra.multiply_matrices(algebra.quat2rotation(MB_tstep[node_body].quat),
+                                                                                         algebra.crv2rotation(MB_tstep[node_body].psi[ielem,inode_in_elem,:]).T,
+                                                                                         rot_axisB.T*Lambda_dot[ieq:ieq+num_LM_eq_specific])))
+
+    blocks.add_K(FoR_dof+3, node_dof+3, algebra.multiply_matrices(algebra.quat2rotation(MB_tstep[FoR_body].quat).T,
+                                                                  algebra.quat2rotation(MB_tstep[node_body].quat),
+                                                                  algebra.der_Ccrv_by_v(MB_tstep[node_body].psi[ielem,inode_in_elem,:],
+                                                                                        rot_axisB.T*Lambda_dot[ieq:ieq+num_LM_eq_specific])))
 
     ieq += 1
     return ieq
@@ -386,15 +477,15 @@ class SampleLagrange(BaseLagrangeConstraint):
 
         return self._ieq + self._n_eq
 
-    def staticmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def staticmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        return np.zeros((6, 6))
+        return ConstraintBlocks(sys_size)
 
-    def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def dynamicmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        return np.zeros((10, 10))
+        return ConstraintBlocks(sys_size)
 
     def staticpost(self, lc_list, MB_beam, MB_tstep):
         return
@@ -430,12 +521,12 @@ class hinge_node_FoR(BaseLagrangeConstraint):
 
         return self._ieq + self._n_eq
 
-    def staticmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def staticmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        return
+        return ConstraintBlocks(sys_size)
 
-    def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def dynamicmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
 
@@ -444,12 +535,13 @@ class hinge_node_FoR(BaseLagrangeConstraint):
         node_FoR_dof = define_FoR_dof(MB_beam, self.node_body)
         FoR_dof = define_FoR_dof(MB_beam, self.FoR_body)
         ieq = self._ieq
+        blocks = ConstraintBlocks(sys_size)
 
         # Define the equations
-        ieq = equal_lin_vel_node_FoR(MB_tstep, MB_beam, self.FoR_body, self.node_body, self.node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, scalingFactor, penaltyFactor, ieq, LM_K, LM_C, LM_Q)
-        ieq = def_rot_axis_FoR_wrt_node(MB_tstep, MB_beam, self.FoR_body, self.node_body, self.node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, self.rot_axisB, scalingFactor, penaltyFactor, ieq, LM_K, LM_C, LM_Q, self.indep)
+        ieq = equal_lin_vel_node_FoR(MB_tstep, MB_beam, self.FoR_body, self.node_body, self.node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, scalingFactor, penaltyFactor, ieq, blocks)
+        ieq = def_rot_axis_FoR_wrt_node(MB_tstep, MB_beam, self.FoR_body, self.node_body, self.node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, self.rot_axisB, scalingFactor, penaltyFactor, ieq, blocks, self.indep)
 
-        return
+        return blocks
 
     def staticpost(self, lc_list, MB_beam, MB_tstep):
         return
@@ -487,12 +579,12 @@ class hinge_node_FoR_constant_vel(BaseLagrangeConstraint):
 
         return self._ieq + self._n_eq
 
-    def staticmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def staticmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        return
+        return ConstraintBlocks(sys_size)
 
-    def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def dynamicmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
 
@@ -501,12 +593,13 @@ class hinge_node_FoR_constant_vel(BaseLagrangeConstraint):
         node_FoR_dof = define_FoR_dof(MB_beam, self.node_body)
         FoR_dof = define_FoR_dof(MB_beam, self.FoR_body)
         ieq = self._ieq
+        blocks = ConstraintBlocks(sys_size)
 
         # Define the equations
-        ieq = equal_lin_vel_node_FoR(MB_tstep, MB_beam, self.FoR_body, self.node_body, self.node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, scalingFactor, penaltyFactor, ieq, LM_K, LM_C, LM_Q)
-        ieq = def_rot_axis_FoR_wrt_node(MB_tstep, MB_beam, self.FoR_body, self.node_body, self.node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, self.rot_axisB, scalingFactor, penaltyFactor, ieq, LM_K, LM_C, LM_Q, self.indep)
-        ieq = def_rot_vel_FoR_wrt_node(MB_tstep, MB_beam, self.FoR_body, self.node_body, self.node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, self.rot_axisB, self.rot_vel, scalingFactor, penaltyFactor, ieq, LM_K, LM_C, LM_Q)
-        return
+        ieq = equal_lin_vel_node_FoR(MB_tstep, MB_beam, self.FoR_body, self.node_body, self.node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, scalingFactor, penaltyFactor, ieq, blocks)
+        ieq = def_rot_axis_FoR_wrt_node(MB_tstep, MB_beam, self.FoR_body, self.node_body, self.node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, self.rot_axisB, scalingFactor, penaltyFactor, ieq, blocks, self.indep)
+        ieq = def_rot_vel_FoR_wrt_node(MB_tstep, MB_beam, self.FoR_body, self.node_body, self.node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, self.rot_axisB, self.rot_vel, scalingFactor, penaltyFactor, ieq, blocks)
+        return blocks
 
     def staticpost(self, lc_list, MB_beam, MB_tstep):
         return
@@ -541,12 +634,12 @@ class spherical_node_FoR(BaseLagrangeConstraint):
 
         return self._ieq + self._n_eq
 
-    def staticmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def staticmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        return
+        return ConstraintBlocks(sys_size)
 
-    def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def dynamicmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
 
@@ -555,11 +648,12 @@ class spherical_node_FoR(BaseLagrangeConstraint):
         node_FoR_dof = define_FoR_dof(MB_beam, self.node_body)
         FoR_dof = define_FoR_dof(MB_beam, self.FoR_body)
         ieq = self._ieq
+        blocks = ConstraintBlocks(sys_size)
 
         # Define the equations
-        ieq = equal_lin_vel_node_FoR(MB_tstep, MB_beam, self.FoR_body, self.node_body, self.node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, scalingFactor, penaltyFactor, ieq, LM_K, LM_C, LM_Q)
+        ieq = equal_lin_vel_node_FoR(MB_tstep, MB_beam, self.FoR_body, self.node_body, self.node_number, node_FoR_dof, node_dof, FoR_dof, sys_size, Lambda_dot, scalingFactor, penaltyFactor, ieq, blocks)
 
-        return
+        return blocks
 
     def staticpost(self, lc_list, MB_beam, MB_tstep):
         return
@@ -590,15 +684,15 @@ class free(BaseLagrangeConstraint):
         self._ieq = ieq
         return self._ieq + self._n_eq
 
-    def staticmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def staticmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        return
+        return ConstraintBlocks(sys_size)
 
-    def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def dynamicmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        return
+        return ConstraintBlocks(sys_size)
 
     def staticpost(self, lc_list, MB_beam, MB_tstep):
         return
@@ -630,33 +724,26 @@ class spherical_FoR(BaseLagrangeConstraint):
 
         return self._ieq + self._n_eq
 
-    def staticmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def staticmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        return
+        return ConstraintBlocks(sys_size)
 
-    def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def dynamicmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        num_LM_eq_specific = self._n_eq
-        Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
-        B = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
+        blocks = ConstraintBlocks(sys_size)
 
         # Define the position of the first degree of freedom associated to the FoR
         FoR_dof = define_FoR_dof(MB_beam, self.body_FoR)
         ieq = self._ieq
 
-        Bnh[:3, FoR_dof:FoR_dof+3] = 1.0*np.eye(3)
-
-        LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scalingFactor*Bnh
-        LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*np.transpose(Bnh)
+        blocks.add_C_jacobian(ieq, FoR_dof, 1.0*np.eye(3), Lambda_dot, scalingFactor)
 
-        LM_Q[:sys_size] += scalingFactor*np.dot(np.transpose(Bnh),Lambda_dot[ieq:ieq+num_LM_eq_specific])
-
-        LM_Q[sys_size+ieq:sys_size+ieq+3] += MB_tstep[self.body_FoR].for_vel[0:3].astype(dtype=ct.c_double, copy=True, order='F')
+        blocks.add_Q(sys_size+ieq, MB_tstep[self.body_FoR].for_vel[0:3].astype(dtype=ct.c_double, copy=True, order='F'))
 
         ieq += 3
-        return
+        return blocks
 
     def staticpost(self, lc_list, MB_beam, MB_tstep):
         return
@@ -689,23 +776,21 @@ class hinge_FoR(BaseLagrangeConstraint):
 
         return self._ieq + self._n_eq
 
-    def staticmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def staticmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        return
+        return ConstraintBlocks(sys_size)
 
-    def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def dynamicmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        num_LM_eq_specific = self._n_eq
-        Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
-        B = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
+        blocks = ConstraintBlocks(sys_size)
 
         # Define the position of the first degree of freedom associated to the FoR
         FoR_dof = define_FoR_dof(MB_beam, self.body_FoR)
         ieq = self._ieq
 
-        Bnh[:3, FoR_dof:FoR_dof+3] = 1.0*np.eye(3)
+        blocks.add_C_jacobian(ieq, FoR_dof, 1.0*np.eye(3), Lambda_dot, scalingFactor)
 
         # Only two of these equations are linearly independent
         skew_rot_axis = algebra.skew(self.rot_axis)
@@ -722,18 +807,13 @@ class hinge_FoR(BaseLagrangeConstraint):
             row0 = 0
             row1 = 1
 
-        Bnh[3:5, FoR_dof+3:FoR_dof+6] = skew_rot_axis[[row0,row1],:]
-
-        LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scalingFactor*Bnh
-        LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*np.transpose(Bnh)
-
-        LM_Q[:sys_size] += scalingFactor*np.dot(np.transpose(Bnh),Lambda_dot[ieq:ieq+num_LM_eq_specific])
+        blocks.add_C_jacobian(ieq+3, FoR_dof+3, skew_rot_axis[[row0,row1],:], Lambda_dot, scalingFactor)
 
-        LM_Q[sys_size+ieq:sys_size+ieq+3] += MB_tstep[self.body_FoR].for_vel[0:3].astype(dtype=ct.c_double, copy=True, order='F')
-        LM_Q[sys_size+ieq+3:sys_size+ieq+5] += np.dot(skew_rot_axis[[row0,row1],:], MB_tstep[self.body_FoR].for_vel[3:6])
+        blocks.add_Q(sys_size+ieq, MB_tstep[self.body_FoR].for_vel[0:3].astype(dtype=ct.c_double, copy=True, order='F'))
+        blocks.add_Q(sys_size+ieq+3, np.dot(skew_rot_axis[[row0,row1],:], MB_tstep[self.body_FoR].for_vel[3:6]))
 
         ieq += 5
-        return
+        return blocks
 
     def staticpost(self, lc_list, MB_beam, MB_tstep):
         return
@@ -766,23 +846,21 @@ class hinge_FoR_wrtG(BaseLagrangeConstraint):
 
         return self._ieq + self._n_eq
 
-    def staticmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def staticmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        return
+        return ConstraintBlocks(sys_size)
 
-    def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def dynamicmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        num_LM_eq_specific = self._n_eq
-        Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
-        B = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
+        blocks = ConstraintBlocks(sys_size)
 
         # Define the position of the first degree of freedom associated to the FoR
         FoR_dof = define_FoR_dof(MB_beam, self.body_FoR)
         ieq = self._ieq
 
-        Bnh[:3, FoR_dof:FoR_dof+3] = algebra.quat2rotation(MB_tstep[self.body_FoR].quat)
+        blocks.add_C_jacobian(ieq, FoR_dof, algebra.quat2rotation(MB_tstep[self.body_FoR].quat), Lambda_dot, scalingFactor)
 
         # Only two of these equations are linearly independent
         skew_rot_axis = algebra.skew(self.rot_axis)
@@ -799,20 +877,15 @@ class hinge_FoR_wrtG(BaseLagrangeConstraint):
             row0 = 0
             row1 = 1
 
-        Bnh[3:5, FoR_dof+3:FoR_dof+6] = skew_rot_axis[[row0,row1],:]
-
-        LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scalingFactor*Bnh
-        LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*np.transpose(Bnh)
-
-        LM_C[FoR_dof:FoR_dof+3,FoR_dof+6:FoR_dof+10] += algebra.der_CquatT_by_v(MB_tstep[self.body_FoR].quat,Lambda_dot[ieq:ieq+3])
+        blocks.add_C_jacobian(ieq+3, FoR_dof+3, skew_rot_axis[[row0,row1],:], Lambda_dot, scalingFactor)
 
-        LM_Q[:sys_size] += scalingFactor*np.dot(np.transpose(Bnh),Lambda_dot[ieq:ieq+num_LM_eq_specific])
+        blocks.add_C(FoR_dof, FoR_dof+6, algebra.der_CquatT_by_v(MB_tstep[self.body_FoR].quat,Lambda_dot[ieq:ieq+3]))
 
-        LM_Q[sys_size+ieq:sys_size+ieq+3] += np.dot(algebra.quat2rotation(MB_tstep[self.body_FoR].quat),MB_tstep[self.body_FoR].for_vel[0:3])
-        LM_Q[sys_size+ieq+3:sys_size+ieq+5] += np.dot(skew_rot_axis[[row0,row1],:], MB_tstep[self.body_FoR].for_vel[3:6])
+        blocks.add_Q(sys_size+ieq, np.dot(algebra.quat2rotation(MB_tstep[self.body_FoR].quat),MB_tstep[self.body_FoR].for_vel[0:3]))
+        blocks.add_Q(sys_size+ieq+3, np.dot(skew_rot_axis[[row0,row1],:], MB_tstep[self.body_FoR].for_vel[3:6]))
 
         ieq += 5
-        return
+        return blocks
 
     def staticpost(self, lc_list, MB_beam, MB_tstep):
         return
@@ -846,17 +919,15 @@ class fully_constrained_node_FoR(BaseLagrangeConstraint):
         self._ieq = ieq
         return self._ieq + self._n_eq
 
-    def staticmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def staticmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        return
+        return ConstraintBlocks(sys_size)
 
-    def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def dynamicmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        num_LM_eq_specific = self._n_eq
-        Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
-        B = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
+        blocks = ConstraintBlocks(sys_size)
 
         node_dof = define_node_dof(MB_beam, self.node_body, self.node_number)
         FoR_dof = define_FoR_dof(MB_beam, self.FoR_body)
@@ -864,31 +935,27 @@ class fully_constrained_node_FoR(BaseLagrangeConstraint):
 
         # Option with non holonomic constraints
         # BC for linear velocities
-        Bnh[:3, node_dof:node_dof+3] = -1.0*np.eye(3)
+        blocks.add_C_jacobian(ieq, node_dof, -1.0*np.eye(3), Lambda_dot, scalingFactor)
         quat = algebra.quat_bound(MB_tstep[self.FoR_body].quat)
-        Bnh[:3, FoR_dof:FoR_dof+3] = algebra.quat2rotation(quat)
+        blocks.add_C_jacobian(ieq, FoR_dof, algebra.quat2rotation(quat), Lambda_dot, scalingFactor)
 
         # BC for angular velocities
-        Bnh[3:6,FoR_dof+3:FoR_dof+6] = -1.0*algebra.quat2rotation(quat)
+        blocks.add_C_jacobian(ieq+3, FoR_dof+3, -1.0*algebra.quat2rotation(quat), Lambda_dot, scalingFactor)
         ielem, inode_in_elem = MB_beam[0].node_master_elem[self.node_number]
-        Bnh[3:6,node_dof+3:node_dof+6] = algebra.crv2tan(MB_tstep[0].psi[ielem, inode_in_elem, :])
-
-        LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scalingFactor*Bnh
-        LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*np.transpose(Bnh)
+        blocks.add_C_jacobian(ieq+3, node_dof+3, algebra.crv2tan(MB_tstep[0].psi[ielem, inode_in_elem, :]), Lambda_dot, scalingFactor)
 
-        LM_Q[:sys_size] += scalingFactor*np.dot(np.transpose(Bnh),Lambda_dot[ieq:ieq+num_LM_eq_specific])
-        LM_Q[sys_size+ieq:sys_size+ieq+3] += -MB_tstep[0].pos_dot[-1,:] + np.dot(algebra.quat2rotation(quat),MB_tstep[1].for_vel[0:3])
-        LM_Q[sys_size+ieq+3:sys_size+ieq+6] += (np.dot(algebra.crv2tan(MB_tstep[0].psi[ielem, inode_in_elem, :]),MB_tstep[0].psi_dot[ielem, inode_in_elem, :]) -
-                                      np.dot(algebra.quat2rotation(quat), MB_tstep[self.FoR_body].for_vel[3:6]))
+        blocks.add_Q(sys_size+ieq, -MB_tstep[0].pos_dot[-1,:] + np.dot(algebra.quat2rotation(quat),MB_tstep[1].for_vel[0:3]))
+        blocks.add_Q(sys_size+ieq+3, (np.dot(algebra.crv2tan(MB_tstep[0].psi[ielem, inode_in_elem, :]),MB_tstep[0].psi_dot[ielem, inode_in_elem, :]) -
+                                      np.dot(algebra.quat2rotation(quat), MB_tstep[self.FoR_body].for_vel[3:6])))
 
         #LM_K[FoR_dof:FoR_dof+3,FoR_dof+6:FoR_dof+10] = algebra.der_CquatT_by_v(MB_tstep[body_FoR].quat,Lambda_dot)
-        LM_C[FoR_dof:FoR_dof+3,FoR_dof+6:FoR_dof+10] += algebra.der_CquatT_by_v(quat,scalingFactor*Lambda_dot[ieq:ieq+3])
-        LM_C[FoR_dof+3:FoR_dof+6,FoR_dof+6:FoR_dof+10] -= algebra.der_CquatT_by_v(quat,scalingFactor*Lambda_dot[ieq+3:ieq+6])
+        blocks.add_C(FoR_dof, FoR_dof+6, algebra.der_CquatT_by_v(quat,scalingFactor*Lambda_dot[ieq:ieq+3]))
+        blocks.add_C(FoR_dof+3, FoR_dof+6, -algebra.der_CquatT_by_v(quat,scalingFactor*Lambda_dot[ieq+3:ieq+6]))
 
-        LM_K[node_dof+3:node_dof+6,node_dof+3:node_dof+6] += algebra.der_TanT_by_xv(MB_tstep[0].psi[ielem, inode_in_elem, :],scalingFactor*Lambda_dot[ieq+3:ieq+6])
+        blocks.add_K(node_dof+3, node_dof+3, algebra.der_TanT_by_xv(MB_tstep[0].psi[ielem, inode_in_elem, :],scalingFactor*Lambda_dot[ieq+3:ieq+6]))
 
         ieq += 6
-        return
+        return blocks
 
     def staticpost(self, lc_list, MB_beam, MB_tstep):
         return
@@ -917,12 +984,12 @@ class fully_constrained_node_FoR(BaseLagrangeConstraint):
 #         self._ieq = ieq
 #         return self._ieq + self._n_eq
 #
-#     def staticmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+#     def staticmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
 #                 sys_size, dt, Lambda, Lambda_dot,
 #                 scalingFactor, penaltyFactor):
 #         return
 #
-#     def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+#     def dynamicmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
 #                 sys_size, dt, Lambda, Lambda_dot,
 #                 scalingFactor, penaltyFactor):
 #         return
@@ -957,32 +1024,25 @@ class constant_rot_vel_FoR(BaseLagrangeConstraint):
 
         return self._ieq + self._n_eq
 
-    def staticmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def staticmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        return
+        return ConstraintBlocks(sys_size)
 
-    def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def dynamicmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        num_LM_eq_specific = self._n_eq
-        Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
-        B = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order = 'F')
+        blocks = ConstraintBlocks(sys_size)
 
         # Define the position of the first degree of freedom associated to the FoR
         FoR_dof = define_FoR_dof(MB_beam, self.FoR_body)
         ieq = self._ieq
 
-        Bnh[:3,FoR_dof+3:FoR_dof+6] = np.eye(3)
-
-        LM_C[sys_size+ieq:sys_size+ieq+num_LM_eq_specific,:sys_size] += scalingFactor*Bnh
-        LM_C[:sys_size,sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += scalingFactor*np.transpose(Bnh)
-
-        LM_Q[:sys_size] += scalingFactor*np.dot(np.transpose(Bnh),Lambda_dot[ieq:ieq+num_LM_eq_specific])
-        LM_Q[sys_size+ieq:sys_size+ieq+num_LM_eq_specific] += MB_tstep[self.FoR_body].for_vel[3:6] - self.rot_vel
+        blocks.add_C_jacobian(ieq, FoR_dof+3, np.eye(3), Lambda_dot, scalingFactor)
+        blocks.add_Q(sys_size+ieq, MB_tstep[self.FoR_body].for_vel[3:6] - self.rot_vel)
 
         ieq += 3
-        return
+        return blocks
 
     def staticpost(self, lc_list, MB_beam, MB_tstep):
         return
@@ -1014,32 +1074,25 @@ class constant_vel_FoR(BaseLagrangeConstraint):
 
         return self._ieq + self._n_eq
 
-    def staticmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def staticmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        return
+        return ConstraintBlocks(sys_size)
 
-    def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def dynamicmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
-        num_LM_eq_specific = self._n_eq
-        Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order='F')
-        B = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order='F')
+        blocks = ConstraintBlocks(sys_size)
 
         # Define the position of the first degree of freedom associated to the FoR
         FoR_dof = define_FoR_dof(MB_beam, self.FoR_body)
         ieq = self._ieq
 
-        Bnh[:num_LM_eq_specific, FoR_dof:FoR_dof+6] = np.eye(6)
-
-        LM_C[sys_size + ieq:sys_size + ieq + num_LM_eq_specific, :sys_size] += scalingFactor * Bnh
-        LM_C[:sys_size, sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += scalingFactor * np.transpose(Bnh)
-
-        LM_Q[:sys_size] += scalingFactor * np.dot(np.transpose(Bnh), Lambda_dot[ieq:ieq + num_LM_eq_specific])
-        LM_Q[sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += MB_tstep[self.FoR_body].for_vel - self.vel
+        blocks.add_C_jacobian(ieq, FoR_dof, np.eye(6), Lambda_dot, scalingFactor)
+        blocks.add_Q(sys_size + ieq, MB_tstep[self.FoR_body].for_vel - self.vel)
 
         ieq += 6
-        return
+        return blocks
 
     def staticpost(self, lc_list, MB_beam, MB_tstep):
         return
@@ -1072,31 +1125,25 @@ class lin_vel_node_wrtA(BaseLagrangeConstraint):
 
         return self._ieq + self._n_eq
 
-    def staticmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def staticmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
 
-        num_LM_eq_specific = self._n_eq
-        B = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order='F')
+        blocks = ConstraintBlocks(sys_size)
 
         # Define the position of the first degree of freedom associated to the FoR
         # FoR_dof = define_FoR_dof(MB_beam, self.body_number)
         node_dof = define_node_dof(MB_beam, self.body_number, self.node_number)
         ieq = self._ieq
 
-        B[:num_LM_eq_specific, node_dof:node_dof+3] = np.eye(3)
-
-        LM_K[sys_size + ieq:sys_size + ieq + num_LM_eq_specific, :sys_size] += scalingFactor * B
-        LM_K[:sys_size, sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += scalingFactor * np.transpose(B)
-
-        LM_Q[:sys_size] += scalingFactor * np.dot(np.transpose(B), Lambda[ieq:ieq + num_LM_eq_specific])
-        LM_Q[sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += MB_tstep[self.body_number].pos[self.node_number,:] - MB_beam[self.body_number].ini_info.pos[self.node_number,:]
+        blocks.add_K_jacobian(ieq, node_dof, np.eye(3), Lambda, scalingFactor)
+        blocks.add_Q(sys_size + ieq, MB_tstep[self.body_number].pos[self.node_number,:] - MB_beam[self.body_number].ini_info.pos[self.node_number,:])
 
         ieq += 3
 
-        return
+        return blocks
 
-    def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def dynamicmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
 
@@ -1105,25 +1152,18 @@ class lin_vel_node_wrtA(BaseLagrangeConstraint):
         else:
             current_vel = self.vel
 
-        num_LM_eq_specific = self._n_eq
-        Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order='F')
-        B = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order='F')
+        blocks = ConstraintBlocks(sys_size)
 
         # Define the position of the first degree of freedom associated to the FoR
         # FoR_dof = define_FoR_dof(MB_beam, self.body_number)
         node_dof = define_node_dof(MB_beam, self.body_number, self.node_number)
         ieq = self._ieq
 
-        Bnh[:num_LM_eq_specific, node_dof:node_dof+3] = np.eye(3)
-
-        LM_C[sys_size + ieq:sys_size + ieq + num_LM_eq_specific, :sys_size] += scalingFactor * Bnh
-        LM_C[:sys_size, sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += scalingFactor * np.transpose(Bnh)
-
-        LM_Q[:sys_size] += scalingFactor * np.dot(np.transpose(Bnh), Lambda_dot[ieq:ieq + num_LM_eq_specific])
-        LM_Q[sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += MB_tstep[self.body_number].pos_dot[self.node_number,:] - current_vel
+        blocks.add_C_jacobian(ieq, node_dof, np.eye(3), Lambda_dot, scalingFactor)
+        blocks.add_Q(sys_size + ieq, MB_tstep[self.body_number].pos_dot[self.node_number,:] - current_vel)
 
         ieq += 3
-        return
+        return blocks
 
     def staticpost(self, lc_list, MB_beam, MB_tstep):
         return
@@ -1155,34 +1195,28 @@ class lin_vel_node_wrtG(BaseLagrangeConstraint):
         self._ieq = ieq
         return self._ieq + self._n_eq
 
-    def staticmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def staticmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
 
-        num_LM_eq_specific = self._n_eq
-        B = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order='F')
+        blocks = ConstraintBlocks(sys_size)
 
         # Define the position of the first degree of freedom associated to the FoR
         # FoR_dof = define_FoR_dof(MB_beam, self.body_number)
         node_dof = define_node_dof(MB_beam, self.body_number, self.node_number)
         ieq = self._ieq
 
-        B[:num_LM_eq_specific, node_dof:node_dof+3] = algebra.quat2rotation(MB_tstep[self.body_number].quat)
-
-        LM_K[sys_size + ieq:sys_size + ieq + num_LM_eq_specific, :sys_size] += scalingFactor * B
-        LM_K[:sys_size, sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += scalingFactor * np.transpose(B)
-
-        LM_Q[:sys_size] += scalingFactor * np.dot(np.transpose(B), Lambda[ieq:ieq + num_LM_eq_specific])
-        LM_Q[sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += (np.dot(algebra.quat2rotation(MB_tstep[self.body_number].quat), MB_tstep[self.body_number].pos[self.node_number,:]) +
-                                                                     MB_tstep[self.body_number].for_pos)
-        LM_Q[sys_size + ieq:sys_size + ieq + num_LM_eq_specific] -= (np.dot(algebra.quat2rotation(MB_beam[self.body_number].ini_info.quat), MB_beam[self.body_number].ini_info.pos[self.node_number,:]) +
-                                                                     MB_beam[self.body_number].ini_info.for_pos)
+        blocks.add_K_jacobian(ieq, node_dof, algebra.quat2rotation(MB_tstep[self.body_number].quat), Lambda, scalingFactor)
+        blocks.add_Q(sys_size + ieq, (np.dot(algebra.quat2rotation(MB_tstep[self.body_number].quat), MB_tstep[self.body_number].pos[self.node_number,:]) +
+                                      MB_tstep[self.body_number].for_pos) -
+                                     (np.dot(algebra.quat2rotation(MB_beam[self.body_number].ini_info.quat), MB_beam[self.body_number].ini_info.pos[self.node_number,:]) +
+                                      MB_beam[self.body_number].ini_info.for_pos))
 
         ieq += 3
 
-        return
+        return blocks
 
-    def dynamicmat(self, LM_C, LM_K, LM_Q, MB_beam, MB_tstep, ts, num_LM_eq,
+    def dynamicmat(self, MB_beam, MB_tstep, ts, num_LM_eq,
                 sys_size, dt, Lambda, Lambda_dot,
                 scalingFactor, penaltyFactor):
         if len(self.vel.shape) > 1:
@@ -1190,9 +1224,7 @@ class lin_vel_node_wrtG(BaseLagrangeConstraint):
         else:
             current_vel = self.vel
 
-        num_LM_eq_specific = self._n_eq
-        Bnh = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order='F')
-        B = np.zeros((num_LM_eq_specific, sys_size), dtype=ct.c_double, order='F')
+        blocks = ConstraintBlocks(sys_size)
 
         # Define the position of the first degree of freedom associated to the FoR
         FoR_dof = define_FoR_dof(MB_beam, self.body_number)
@@ -1200,29 +1232,25 @@ class lin_vel_node_wrtG(BaseLagrangeConstraint):
         ieq = self._ieq
 
         if MB_beam[self.body_number].FoR_movement == 'free':
-            Bnh[:num_LM_eq_specific, FoR_dof:FoR_dof+3] = algebra.quat2rotation(MB_tstep[self.body_number].quat)
-            Bnh[:num_LM_eq_specific, FoR_dof+3:FoR_dof+6] = -np.dot(algebra.quat2rotation(MB_tstep[self.body_number].quat), algebra.skew(MB_tstep[self.body_number].pos[self.node_number,:]))
-        Bnh[:num_LM_eq_specific, node_dof:node_dof+3] = algebra.quat2rotation(MB_tstep[self.body_number].quat)
-
-        LM_C[sys_size + ieq:sys_size + ieq + num_LM_eq_specific, :sys_size] += scalingFactor * Bnh
-        LM_C[:sys_size, sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += scalingFactor * np.transpose(Bnh)
+            blocks.add_C_jacobian(ieq, FoR_dof, algebra.quat2rotation(MB_tstep[self.body_number].quat), Lambda_dot, scalingFactor)
+            blocks.add_C_jacobian(ieq, FoR_dof+3, -np.dot(algebra.quat2rotation(MB_tstep[self.body_number].quat), algebra.skew(MB_tstep[self.body_number].pos[self.node_number,:])), Lambda_dot, scalingFactor)
+        blocks.add_C_jacobian(ieq, node_dof, algebra.quat2rotation(MB_tstep[self.body_number].quat), Lambda_dot, scalingFactor)
 
         if MB_beam[self.body_number].FoR_movement == 'free':
-            LM_C[FoR_dof:FoR_dof+3, FoR_dof+6:FoR_dof+10] += algebra.der_CquatT_by_v(MB_tstep[self.body_number].quat,Lambda_dot[ieq:ieq + num_LM_eq_specific])
-            LM_C[node_dof:node_dof+3, FoR_dof+6:FoR_dof+10] += algebra.der_CquatT_by_v(MB_tstep[self.body_number].quat,Lambda_dot[ieq:ieq + num_LM_eq_specific])
-            LM_C[FoR_dof+3:FoR_dof+6, FoR_dof+6:FoR_dof+10] += np.dot(algebra.skew(MB_tstep[self.body_number].pos[self.node_number,:]), algebra.der_CquatT_by_v(MB_tstep[self.body_number].quat,Lambda_dot[ieq:ieq + num_LM_eq_specific]))
+            blocks.add_C(FoR_dof, FoR_dof+6, algebra.der_CquatT_by_v(MB_tstep[self.body_number].quat,Lambda_dot[ieq:ieq+3]))
+            blocks.add_C(node_dof, FoR_dof+6, algebra.der_CquatT_by_v(MB_tstep[self.body_number].quat,Lambda_dot[ieq:ieq+3]))
+            blocks.add_C(FoR_dof+3, FoR_dof+6, np.dot(algebra.skew(MB_tstep[self.body_number].pos[self.node_number,:]), algebra.der_CquatT_by_v(MB_tstep[self.body_number].quat,Lambda_dot[ieq:ieq+3])))
 
-            LM_K[FoR_dof+3:FoR_dof+6, node_dof:node_dof+3] -= algebra.skew(np.dot(algebra.quat2rotation(MB_tstep[self.body_number].quat).T, Lambda_dot[ieq:ieq + num_LM_eq_specific]))
+            blocks.add_K(FoR_dof+3, node_dof, -algebra.skew(np.dot(algebra.quat2rotation(MB_tstep[self.body_number].quat).T, Lambda_dot[ieq:ieq+3])))
 
-        LM_Q[:sys_size] += scalingFactor * np.dot(np.transpose(Bnh), Lambda_dot[ieq:ieq + num_LM_eq_specific])
-        LM_Q[sys_size + ieq:sys_size + ieq + num_LM_eq_specific] += (np.dot( algebra.quat2rotation(MB_tstep[self.body_number].quat), (
+        blocks.add_Q(sys_size + ieq, (np.dot( algebra.quat2rotation(MB_tstep[self.body_number].quat), (
                 MB_tstep[self.body_number].for_vel[0:3] +
                 np.dot(algebra.skew(MB_tstep[self.body_number].for_vel[3:6]), MB_tstep[self.body_number].pos[self.node_number,:]) +
                 MB_tstep[self.body_number].pos_dot[self.node_number,:])) -
-                current_vel)
+                current_vel))
 
         ieq += 3
-        return
+        return blocks
 
     def staticpost(self, lc_list, MB_beam, MB_tstep):
         return
@@ -1274,7 +1302,8 @@ def define_num_LM_eq(lc_list):
     return num_LM_eq
 
 
-def generate_lagrange_matrix(lc_list, MB_beam, MB_tstep, ts, num_LM_eq, sys_size, dt, Lambda, Lambda_dot, dynamic_or_static):
+def generate_lagrange_matrix(lc_list, MB_beam, MB_tstep, ts, num_LM_eq, sys_size, dt, Lambda, Lambda_dot, dynamic_or_static,
+                             patterns=None):
     """
     generate_lagrange_matrix
 
@@ -1291,10 +1320,12 @@ def generate_lagrange_matrix(lc_list, MB_beam, MB_tstep, ts, num_LM_eq, sys_size
         Lambda(numpy array): list of Lagrange multipliers values
         Lambda_dot(numpy array): list of the first derivative of the Lagrange multipliers values
         dynamic_or_static (str): string defining if the computation is dynamic or static
+        patterns (tuple(SparsityPattern)): sparsity patterns of ``LM_C`` and ``LM_K``. Reusing them across calls
+            avoids recomputing the position of the non-zero entries while the constraints do not change
 
     Returns:
-        LM_C (numpy array): Damping matrix associated to the Lagrange Multipliers equations
-        LM_K (numpy array): Stiffness matrix associated to the Lagrange Multipliers equations
+        LM_C (scipy.sparse.csr_matrix): Damping matrix associated to the Lagrange Multipliers equations
+        LM_K (scipy.sparse.csr_matrix): Stiffness matrix associated to the Lagrange Multipliers equations
         LM_Q (numpy array): Vector of independent terms associated to the Lagrange Multipliers equations
 
     Examples:
@@ -1307,19 +1338,18 @@ def generate_lagrange_matrix(lc_list, MB_beam, MB_tstep, ts, num_LM_eq, sys_size
     penaltyFactor = 0.0
     scalingFactor = 1.0
 
-    # Initialize matrices
-    LM_C = np.zeros((sys_size + num_LM_eq,sys_size + num_LM_eq), dtype=ct.c_double, order = 'F')
-    LM_K = np.zeros((sys_size + num_LM_eq,sys_size + num_LM_eq), dtype=ct.c_double, order = 'F')
-    LM_Q = np.zeros((sys_size + num_LM_eq,),dtype=ct.c_double, order = 'F')
+    if patterns is None:
+        patterns = (SparsityPattern(), SparsityPattern())
 
     # Define the matrices associated to the constratints
     # TODO: Is there a better way to deal with ieq?
     # ieq = 0
+    C_blocks = []
+    K_blocks = []
+    Q_blocks = []
     for lc in lc_list:
         if dynamic_or_static.lower() == "static":
-            lc.staticmat(LM_C=LM_C,
-                        LM_K=LM_K,
-                        LM_Q=LM_Q,
+            blocks = lc.staticmat(
                         # MBdict=MBdict,
                         MB_beam=MB_beam,
                         MB_tstep=MB_tstep,
@@ -1334,9 +1364,7 @@ def generate_lagrange_matrix(lc_list, MB_beam, MB_tstep, ts, num_LM_eq, sys_size
                         penaltyFactor=penaltyFactor)
 
         elif dynamic_or_static.lower() == "dynamic":
-            lc.dynamicmat(LM_C=LM_C,
-                        LM_K=LM_K,
-                        LM_Q=LM_Q,
+            blocks = lc.dynamicmat(
                         # MBdict=MBdict,
                         MB_beam=MB_beam,
                         MB_tstep=MB_tstep,
@@ -1350,6 +1378,17 @@ def generate_lagrange_matrix(lc_list, MB_beam, MB_tstep, ts, num_LM_eq, sys_size
                         scalingFactor=scalingFactor,
                         penaltyFactor=penaltyFactor)
 
+        C_blocks.extend(blocks.C)
+        K_blocks.extend(blocks.K)
+        Q_blocks.extend(blocks.Q)
+
+    shape = (sys_size + num_LM_eq, sys_size + num_LM_eq)
+    LM_C = patterns[0].assemble(C_blocks, shape)
+    LM_K = patterns[1].assemble(K_blocks, shape)
+    LM_Q = np.zeros((sys_size + num_LM_eq,),dtype=ct.c_double, order = 'F')
+    for row, values in Q_blocks:
+        LM_Q[row:row + len(values)] += values
+
     return LM_C, LM_K, LM_Q
 
 
@@ -1,4 +1,5 @@
 import numpy as np
+import h5py
 import sharpy.utils.cout_utils as cout
 import sharpy.utils.algebra as algebra
 from tvtk.api import tvtk, write_data
@@ -291,3 +292,80 @@ def write_modes_vtk(data, eigenvectors, NumLambda, filename_root,
         zeta_mode = get_mode_zeta(data, eigvec)
         write_zeta_vtk(zeta_mode, tsaero.zeta, filename_root + "_%06u" % (mode,))
 
+
+def write_eigen_data(filename, eigenvalues, eigenvectors, num_evals=None, dof_indices=None, compress_float=False,
+                     **kwargs):
+    """
+    Writes the eigenvalues and eigenvectors to a compressed HDF5 file.
+
+    The eigenvectors are stored column-wise in chunks of a single mode, such that individual modes can be read
+    with :func:`read_eigen_data` without loading the rest.
+
+    Args:
+        filename (str): Path to the ``.h5`` file, which is overwritten if it exists.
+        eigenvalues (np.ndarray): Eigenvalues ``[num_modes]``.
+        eigenvectors (np.ndarray): Eigenvectors ``[num_dof, num_modes]``.
+        num_evals (int): Number of eigenvalues and eigenvectors to write. If ``None`` all of them are written.
+        dof_indices (np.ndarray): Indices of the degrees of freedom (rows of ``eigenvectors``) to write. If ``None``
+            all of them are written.
+        compress_float (bool): Write the eigenvectors in single precision.
+        **kwargs: Additional arrays to write, e.g. ``frequencies=freq``.
+    """
+    if num_evals is None:
+        num_evals = len(eigenvalues)
+    num_evals = min(num_evals, len(eigenvalues))
+
+    if dof_indices is None:
+        eigenvectors = eigenvectors[:, :num_evals]
+    else:
+        eigenvectors = eigenvectors[dof_indices, :num_evals]
+
+    if compress_float:
+        dtype = np.complex64 if np.iscomplexobj(eigenvectors) else np.float32
+    else:
+        dtype = eigenvectors.dtype
+
+    with h5py.File(filename, 'w') as h5file:
+        h5file['eigenvalues'] = eigenvalues[:num_evals]
+        if eigenvectors.size > 0:
+            h5file.create_dataset('eigenvectors', data=eigenvectors, dtype=dtype, compression='gzip', shuffle=True,
+                                  chunks=(eigenvectors.shape[0], 1))
+        else:
+            h5file['eigenvectors'] = eigenvectors
+        if dof_indices is not None:
+            h5file['dof_indices'] = dof_indices
+        for name, value in kwargs.items():
+            h5file[name] = value
+
+
+def read_eigen_data(filename, modes=None):
+    """
+    Reads the eigen-data written by :func:`write_eigen_data`.
+
+    Args:
+        filename (str): Path to the ``.h5`` file.
+        modes (list(int)): Modes to read. If ``None`` all of them are read.
+
+    Returns:
+        dict: ``eigenvalues``, ``eigenvectors`` (columns are the requested modes), ``dof_indices`` (``None`` if all
+        the degrees of freedom were written) and any additional arrays in the file.
+    """
+    eigen_data = dict()
+    with h5py.File(filename, 'r') as h5file:
+        for name in h5file.keys():
+            if name in ('eigenvalues', 'eigenvectors'):
+                continue
+            eigen_data[name] = h5file[name][()]
+
+        if modes is None:
+            eigen_data['eigenvalues'] = h5file['eigenvalues'][()]
+            eigen_data['eigenvectors'] = h5file['eigenvectors'][()]
+        else:
+            # h5py requires increasing indices
+            modes = np.atleast_1d(modes)
+            unique_modes, inverse = np.unique(modes, return_inverse=True)
+            eigen_data['eigenvalues'] = h5file['eigenvalues'][unique_modes][inverse]
+            eigen_data['eigenvectors'] = h5file['eigenvectors'][:, unique_modes][:, inverse]
+
+    eigen_data.setdefault('dof_indices', None)
+    return eigen_data
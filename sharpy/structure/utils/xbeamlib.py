@@ -1,4 +1,5 @@
 import ctypes as ct
+import weakref
 import numpy as np
 import scipy as sc
 import scipy.integrate
@@ -67,6 +68,44 @@ doubleP = ct.POINTER(ct.c_double)
 intP = ct.POINTER(ct.c_int)
 charP = ct.POINTER(ct.c_char_p)
 
+# option structures built once for each function filling them in
+_options = ct_utils.StructureCache()
+
+# pointers to the beam.fortran arrays of each beam
+_beam_pointers = weakref.WeakKeyDictionary()
+
+
+def beam_fortran_pointers(beam):
+    """
+    Returns the pointers to the ``beam.fortran`` arrays passed to the library
+
+    The pointers are kept for the lifetime of the beam and only regenerated if any of the arrays is reallocated.
+
+    Args:
+        beam (sharpy.structure.models.beam.Beam): Beam.
+
+    Returns:
+        dict: ``ctypes`` pointers to each of the arrays in ``beam.fortran``.
+    """
+    try:
+        bound_arrays, pointers = _beam_pointers[beam]
+    except KeyError:
+        pass
+    else:
+        if bound_arrays.keys() == beam.fortran.keys() and \
+                all(array is beam.fortran[key] for key, array in bound_arrays.items()):
+            return pointers
+
+    bound_arrays = beam.fortran.copy()
+    pointers = dict()
+    for key, array in bound_arrays.items():
+        if array.dtype == ct.c_double:
+            pointers[key] = array.ctypes.data_as(doubleP)
+        else:
+            pointers[key] = array.ctypes.data_as(intP)
+    _beam_pointers[beam] = (bound_arrays, pointers)
+    return pointers
+
 
 def cbeam3_solv_nlnstatic(beam, settings, ts):
     """@brief Python wrapper for f_cbeam3_solv_nlnstatic
@@ -79,6 +118,7 @@ def cbeam3_solv_nlnstatic(beam, settings, ts):
     n_nodes = ct.c_int(beam.num_node)
     n_mass = ct.c_int(beam.n_mass)
     n_stiff = ct.c_int(beam.n_stiff)
+    fortran = beam_fortran_pointers(beam)
 
     xbopts = Xbopts()
     xbopts.PrintInfo = ct.c_bool(settings['print_info'])
@@ -103,22 +143,22 @@ def cbeam3_solv_nlnstatic(beam, settings, ts):
 
     f_cbeam3_solv_nlnstatic(ct.byref(n_elem),
                             ct.byref(n_nodes),
-                            beam.fortran['num_nodes'].ctypes.data_as(intP),
-                            beam.fortran['num_mem'].ctypes.data_as(intP),
-                            beam.fortran['connectivities'].ctypes.data_as(intP),
-                            beam.fortran['master'].ctypes.data_as(intP),
+                            fortran['num_nodes'],
+                            fortran['num_mem'],
+                            fortran['connectivities'],
+                            fortran['master'],
                             ct.byref(n_mass),
-                            beam.fortran['mass'].ctypes.data_as(doubleP),
-                            beam.fortran['mass_indices'].ctypes.data_as(intP),
+                            fortran['mass'],
+                            fortran['mass_indices'],
                             ct.byref(n_stiff),
-                            beam.fortran['stiffness'].ctypes.data_as(doubleP),
-                            beam.fortran['inv_stiffness'].ctypes.data_as(doubleP),
-                            beam.fortran['stiffness_indices'].ctypes.data_as(intP),
-                            beam.fortran['frame_of_reference_delta'].ctypes.data_as(doubleP),
-                            beam.fortran['rbmass'].ctypes.data_as(doubleP),
-                            beam.fortran['node_master_elem'].ctypes.data_as(intP),
-                            beam.fortran['vdof'].ctypes.data_as(intP),
-                            beam.fortran['fdof'].ctypes.data_as(intP),
+                            fortran['stiffness'],
+                            fortran['inv_stiffness'],
+                            fortran['stiffness_indices'],
+                            fortran['frame_of_reference_delta'],
+                            fortran['rbmass'],
+                            fortran['node_master_elem'],
+                            fortran['vdof'],
+                            fortran['fdof'],
                             ct.byref(xbopts),
                             beam.ini_info.pos.ctypes.data_as(doubleP),
                             beam.ini_info.psi.ctypes.data_as(doubleP),
@@ -139,20 +179,21 @@ def cbeam3_loads(beam, ts):
     n_elem = ct.c_int(beam.num_elem)
     n_nodes = ct.c_int(beam.num_node)
     n_stiff = ct.c_int(beam.n_stiff)
+    fortran = beam_fortran_pointers(beam)
 
     strain = np.zeros((n_elem.value, 6), dtype=ct.c_double, order='F')
     loads = np.zeros((n_elem.value, 6), dtype=ct.c_double, order='F')
 
     f_cbeam3_loads(ct.byref(n_elem),
                    ct.byref(n_nodes),
-                   beam.fortran['connectivities'].ctypes.data_as(intP),
+                   fortran['connectivities'],
                    beam.ini_info.pos.ctypes.data_as(doubleP),
                    beam.timestep_info[ts].pos.ctypes.data_as(doubleP),
                    beam.ini_info.psi.ctypes.data_as(doubleP),
                    beam.timestep_info[ts].psi.ctypes.data_as(doubleP),
-                   beam.fortran['stiffness_indices'].ctypes.data_as(intP),
+                   fortran['stiffness_indices'],
                    ct.byref(n_stiff),
-                   beam.fortran['stiffness'].ctypes.data_as(doubleP),
+                   fortran['stiffness'],
                    strain.ctypes.data_as(doubleP),
                    loads.ctypes.data_as(doubleP))
 
@@ -168,6 +209,7 @@ def cbeam3_solv_nlndyn(beam, settings):
     n_nodes = ct.c_int(beam.num_node)
     n_mass = ct.c_int(beam.n_mass)
     n_stiff = ct.c_int(beam.n_stiff)
+    fortran = beam_fortran_pointers(beam)
 
 
     dt = settings['dt'].value
@@ -212,22 +254,22 @@ def cbeam3_solv_nlndyn(beam, settings):
                          ct.byref(n_nodes),
                          ct.byref(n_tsteps),
                          time.ctypes.data_as(doubleP),
-                         beam.fortran['num_nodes'].ctypes.data_as(intP),
-                         beam.fortran['num_mem'].ctypes.data_as(intP),
-                         beam.fortran['connectivities'].ctypes.data_as(intP),
-                         beam.fortran['master'].ctypes.data_as(intP),
+                         fortran['num_nodes'],
+                         fortran['num_mem'],
+                         fortran['connectivities'],
+                         fortran['master'],
                          ct.byref(n_mass),
-                         beam.fortran['mass'].ctypes.data_as(doubleP),
-                         beam.fortran['mass_indices'].ctypes.data_as(intP),
+                         fortran['mass'],
+                         fortran['mass_indices'],
                          ct.byref(n_stiff),
-                         beam.fortran['stiffness'].ctypes.data_as(doubleP),
-                         beam.fortran['inv_stiffness'].ctypes.data_as(doubleP),
-                         beam.fortran['stiffness_indices'].ctypes.data_as(intP),
-                         beam.fortran['frame_of_reference_delta'].ctypes.data_as(doubleP),
-                         beam.fortran['rbmass'].ctypes.data_as(doubleP),
-                         beam.fortran['node_master_elem'].ctypes.data_as(intP),
-                         beam.fortran['vdof'].ctypes.data_as(intP),
-                         beam.fortran['fdof'].ctypes.data_as(intP),
+                         fortran['stiffness'],
+                         fortran['inv_stiffness'],
+                         fortran['stiffness_indices'],
+                         fortran['frame_of_reference_delta'],
+                         fortran['rbmass'],
+                         fortran['node_master_elem'],
+                         fortran['vdof'],
+                         fortran['fdof'],
                          ct.byref(xbopts),
                          beam.ini_info.pos.ctypes.data_as(doubleP),
                          beam.ini_info.psi.ctypes.data_as(doubleP),
@@ -262,27 +304,28 @@ def cbeam3_step_nlndyn(beam, settings, ts, tstep=None, dt=None):
     n_nodes = ct.c_int(beam.num_node)
     n_mass = ct.c_int(beam.n_mass)
     n_stiff = ct.c_int(beam.n_stiff)
+    fortran = beam_fortran_pointers(beam)
     num_dof = ct.c_int(len(tstep.q) - 10)
 
-    xbopts = Xbopts()
-    xbopts.PrintInfo = ct.c_bool(settings['print_info'])
-    xbopts.Solution = ct.c_int(312)
-    xbopts.MaxIterations = settings['max_iterations']
-    xbopts.NumLoadSteps = settings['num_load_steps']
-    xbopts.NumGauss = ct.c_int(0)
-    xbopts.DeltaCurved = settings['delta_curved']
-    xbopts.MinDelta = settings['min_delta']
-    xbopts.NewmarkDamp = settings['newmark_damp']
-    xbopts.gravity_on = settings['gravity_on']
-    xbopts.gravity = settings['gravity']
-    xbopts.gravity_dir_x = ct.c_double(tstep.gravity_vector_inertial[0])
-    xbopts.gravity_dir_y = ct.c_double(tstep.gravity_vector_inertial[1])
-    xbopts.gravity_dir_z = ct.c_double(tstep.gravity_vector_inertial[2])
-    xbopts.relaxation_factor = settings['relaxation_factor']
-
-    # here we only need to set the flags at True, all the forces are follower
-    xbopts.FollowerForce = ct.c_bool(True)
-    xbopts.FollowerForceRig = ct.c_bool(True)
+    xbopts = _options.get(Xbopts, tag='step_nlndyn')
+    ct_utils.update_structure(xbopts,
+                              {'PrintInfo': settings['print_info'],
+                               'Solution': 312,
+                               'MaxIterations': settings['max_iterations'],
+                               'NumLoadSteps': settings['num_load_steps'],
+                               'NumGauss': 0,
+                               'DeltaCurved': settings['delta_curved'],
+                               'MinDelta': settings['min_delta'],
+                               'NewmarkDamp': settings['newmark_damp'],
+                               'gravity_on': settings['gravity_on'],
+                               'gravity': settings['gravity'],
+                               'gravity_dir_x': tstep.gravity_vector_inertial[0],
+                               'gravity_dir_y': tstep.gravity_vector_inertial[1],
+                               'gravity_dir_z': tstep.gravity_vector_inertial[2],
+                               'relaxation_factor': settings['relaxation_factor'],
+                               # here we only need to set the flags at True, all the forces are follower
+                               'FollowerForce': True,
+                               'FollowerForceRig': True})
 
     if dt is None:
         in_dt = settings['dt']
@@ -293,22 +336,22 @@ def cbeam3_step_nlndyn(beam, settings, ts, tstep=None, dt=None):
                               ct.byref(n_elem),
                               ct.byref(n_nodes),
                               ct.byref(in_dt),
-                              beam.fortran['num_nodes'].ctypes.data_as(intP),
-                              beam.fortran['num_mem'].ctypes.data_as(intP),
-                              beam.fortran['connectivities'].ctypes.data_as(intP),
-                              beam.fortran['master'].ctypes.data_as(intP),
+                              fortran['num_nodes'],
+                              fortran['num_mem'],
+                              fortran['connectivities'],
+                              fortran['master'],
                               ct.byref(n_mass),
-                              beam.fortran['mass'].ctypes.data_as(doubleP),
-                              beam.fortran['mass_indices'].ctypes.data_as(intP),
+                              fortran['mass'],
+                              fortran['mass_indices'],
                               ct.byref(n_stiff),
-                              beam.fortran['stiffness'].ctypes.data_as(doubleP),
-                              beam.fortran['inv_stiffness'].ctypes.data_as(doubleP),
-                              beam.fortran['stiffness_indices'].ctypes.data_as(intP),
-                              beam.fortran['frame_of_reference_delta'].ctypes.data_as(doubleP),
-                              beam.fortran['rbmass'].ctypes.data_as(doubleP),
-                              beam.fortran['node_master_elem'].ctypes.data_as(intP),
-                              beam.fortran['vdof'].ctypes.data_as(intP),
-                              beam.fortran['fdof'].ctypes.data_as(intP),
+                              fortran['stiffness'],
+                              fortran['inv_stiffness'],
+                              fortran['stiffness_indices'],
+                              fortran['frame_of_reference_delta'],
+                              fortran['rbmass'],
+                              fortran['node_master_elem'],
+                              fortran['vdof'],
+                              fortran['fdof'],
                               ct.byref(xbopts),
                               beam.ini_info.pos.ctypes.data_as(doubleP),
                               beam.ini_info.psi.ctypes.data_as(doubleP),
@@ -340,6 +383,7 @@ def xbeam_solv_couplednlndyn(beam, settings):
     n_nodes = ct.c_int(beam.num_node)
     n_mass = ct.c_int(beam.n_mass)
     n_stiff = ct.c_int(beam.n_stiff)
+    fortran = beam_fortran_pointers(beam)
 
     dt = settings['dt'].value
     n_tsteps = settings['num_steps'].value
@@ -395,22 +439,22 @@ def xbeam_solv_couplednlndyn(beam, settings):
                                ct.byref(n_nodes),
                                ct.byref(n_tsteps),
                                time.ctypes.data_as(doubleP),
-                               beam.fortran['num_nodes'].ctypes.data_as(intP),
-                               beam.fortran['num_mem'].ctypes.data_as(intP),
-                               beam.fortran['connectivities'].ctypes.data_as(intP),
-                               beam.fortran['master'].ctypes.data_as(intP),
+                               fortran['num_nodes'],
+                               fortran['num_mem'],
+                               fortran['connectivities'],
+                               fortran['master'],
                                ct.byref(n_mass),
-                               beam.fortran['mass'].ctypes.data_as(doubleP),
-                               beam.fortran['mass_indices'].ctypes.data_as(intP),
+                               fortran['mass'],
+                               fortran['mass_indices'],
                                ct.byref(n_stiff),
-                               beam.fortran['stiffness'].ctypes.data_as(doubleP),
-                               beam.fortran['inv_stiffness'].ctypes.data_as(doubleP),
-                               beam.fortran['stiffness_indices'].ctypes.data_as(intP),
-                               beam.fortran['frame_of_reference_delta'].ctypes.data_as(doubleP),
-                               beam.fortran['rbmass'].ctypes.data_as(doubleP),
-                               beam.fortran['node_master_elem'].ctypes.data_as(intP),
-                               beam.fortran['vdof'].ctypes.data_as(intP),
-                               beam.fortran['fdof'].ctypes.data_as(intP),
+                               fortran['stiffness'],
+                               fortran['inv_stiffness'],
+                               fortran['stiffness_indices'],
+                               fortran['frame_of_reference_delta'],
+                               fortran['rbmass'],
+                               fortran['node_master_elem'],
+                               fortran['vdof'],
+                               fortran['fdof'],
                                ct.byref(xbopts),
                                beam.ini_info.pos.ctypes.data_as(doubleP),
                                beam.ini_info.psi.ctypes.data_as(doubleP),
@@ -466,21 +510,23 @@ def xbeam_step_couplednlndyn(beam, settings, ts, tstep=None, dt=None):
     n_nodes = ct.c_int(beam.num_node)
     n_mass = ct.c_int(beam.n_mass)
     n_stiff = ct.c_int(beam.n_stiff)
-
-    xbopts = Xbopts()
-    xbopts.PrintInfo = ct.c_bool(settings['print_info'])
-    xbopts.MaxIterations = settings['max_iterations']
-    xbopts.NumLoadSteps = settings['num_load_steps']
-    xbopts.DeltaCurved = settings['delta_curved']
-    xbopts.MinDelta = settings['min_delta']
-    xbopts.NewmarkDamp = settings['newmark_damp']
-    xbopts.gravity_on = settings['gravity_on']
-    xbopts.gravity = settings['gravity']
-    xbopts.balancing = settings['balancing']
-    xbopts.gravity_dir_x = ct.c_double(tstep.gravity_vector_inertial[0])
-    xbopts.gravity_dir_y = ct.c_double(tstep.gravity_vector_inertial[1])
-    xbopts.gravity_dir_z = ct.c_double(tstep.gravity_vector_inertial[2])
-    xbopts.relaxation_factor = settings['relaxation_factor']
+    fortran = beam_fortran_pointers(beam)
+
+    xbopts = _options.get(Xbopts, tag='step_couplednlndyn')
+    ct_utils.update_structure(xbopts,
+                              {'PrintInfo': settings['print_info'],
+                               'MaxIterations': settings['max_iterations'],
+                               'NumLoadSteps': settings['num_load_steps'],
+                               'DeltaCurved': settings['delta_curved'],
+                               'MinDelta': settings['min_delta'],
+                               'NewmarkDamp': settings['newmark_damp'],
+                               'gravity_on': settings['gravity_on'],
+                               'gravity': settings['gravity'],
+                               'balancing': settings['balancing'],
+                               'gravity_dir_x': tstep.gravity_vector_inertial[0],
+                               'gravity_dir_y': tstep.gravity_vector_inertial[1],
+                               'gravity_dir_z': tstep.gravity_vector_inertial[2],
+                               'relaxation_factor': settings['relaxation_factor']})
 
     if dt is None:
         try:
@@ -501,22 +547,22 @@ def xbeam_step_couplednlndyn(beam, settings, ts, tstep=None, dt=None):
                                     ct.byref(n_elem),
                                     ct.byref(n_nodes),
                                     ct.byref(in_dt),
-                                    beam.fortran['num_nodes'].ctypes.data_as(intP),
-                                    beam.fortran['num_mem'].ctypes.data_as(intP),
-                                    beam.fortran['connectivities'].ctypes.data_as(intP),
-                                    beam.fortran['master'].ctypes.data_as(intP),
+                                    fortran['num_nodes'],
+                                    fortran['num_mem'],
+                                    fortran['connectivities'],
+                                    fortran['master'],
                                     ct.byref(n_mass),
-                                    beam.fortran['mass'].ctypes.data_as(doubleP),
-                                    beam.fortran['mass_indices'].ctypes.data_as(intP),
+                                    fortran['mass'],
+                                    fortran['mass_indices'],
                                     ct.byref(n_stiff),
-                                    beam.fortran['stiffness'].ctypes.data_as(doubleP),
-                                    beam.fortran['inv_stiffness'].ctypes.data_as(doubleP),
-                                    beam.fortran['stiffness_indices'].ctypes.data_as(intP),
-                                    beam.fortran['frame_of_reference_delta'].ctypes.data_as(doubleP),
-                                    beam.fortran['rbmass'].ctypes.data_as(doubleP),
-                                    beam.fortran['node_master_elem'].ctypes.data_as(intP),
-                                    beam.fortran['vdof'].ctypes.data_as(intP),
-                                    beam.fortran['fdof'].ctypes.data_as(intP),
+                                    fortran['stiffness'],
+                                    fortran['inv_stiffness'],
+                                    fortran['stiffness_indices'],
+                                    fortran['frame_of_reference_delta'],
+                                    fortran['rbmass'],
+                                    fortran['node_master_elem'],
+                                    fortran['vdof'],
+                                    fortran['fdof'],
                                     ct.byref(xbopts),
                                     beam.ini_info.pos.ctypes.data_as(doubleP),
                                     beam.ini_info.psi.ctypes.data_as(doubleP),
@@ -547,6 +593,7 @@ def xbeam_init_couplednlndyn(beam, settings, ts, dt=None):
     n_nodes = ct.c_int(beam.num_node)
     n_mass = ct.c_int(beam.n_mass)
     n_stiff = ct.c_int(beam.n_stiff)
+    fortran = beam_fortran_pointers(beam)
 
     xbopts = Xbopts()
     xbopts.PrintInfo = ct.c_bool(settings['print_info'])
@@ -574,22 +621,22 @@ def xbeam_init_couplednlndyn(beam, settings, ts, dt=None):
                                     ct.byref(n_elem),
                                     ct.byref(n_nodes),
                                     ct.byref(settings['dt']),
-                                    beam.fortran['num_nodes'].ctypes.data_as(intP),
-                                    beam.fortran['num_mem'].ctypes.data_as(intP),
-                                    beam.fortran['connectivities'].ctypes.data_as(intP),
-                                    beam.fortran['master'].ctypes.data_as(intP),
+                                    fortran['num_nodes'],
+                                    fortran['num_mem'],
+                                    fortran['connectivities'],
+                                    fortran['master'],
                                     ct.byref(n_mass),
-                                    beam.fortran['mass'].ctypes.data_as(doubleP),
-                                    beam.fortran['mass_indices'].ctypes.data_as(intP),
+                                    fortran['mass'],
+                                    fortran['mass_indices'],
                                     ct.byref(n_stiff),
-                                    beam.fortran['stiffness'].ctypes.data_as(doubleP),
-                                    beam.fortran['inv_stiffness'].ctypes.data_as(doubleP),
-                                    beam.fortran['stiffness_indices'].ctypes.data_as(intP),
-                                    beam.fortran['frame_of_reference_delta'].ctypes.data_as(doubleP),
-                                    beam.fortran['rbmass'].ctypes.data_as(doubleP),
-                                    beam.fortran['node_master_elem'].ctypes.data_as(intP),
-                                    beam.fortran['vdof'].ctypes.data_as(intP),
-                                    beam.fortran['fdof'].ctypes.data_as(intP),
+                                    fortran['stiffness'],
+                                    fortran['inv_stiffness'],
+                                    fortran['stiffness_indices'],
+                                    fortran['frame_of_reference_delta'],
+                                    fortran['rbmass'],
+                                    fortran['node_master_elem'],
+                                    fortran['vdof'],
+                                    fortran['fdof'],
                                     ct.byref(xbopts),
                                     beam.ini_info.pos.ctypes.data_as(doubleP),
                                     beam.ini_info.psi.ctypes.data_as(doubleP),
@@ -624,6 +671,7 @@ def cbeam3_solv_state2disp(beam, tstep):
     n_elem = ct.c_int(beam.num_elem)
     n_nodes = ct.c_int(beam.num_node)
     numdof = ct.c_int(beam.num_dof.value)
+    fortran = beam_fortran_pointers(beam)
 
     f_cbeam3_solv_state2disp(
         ct.byref(n_elem),
@@ -635,10 +683,10 @@ def cbeam3_solv_state2disp(beam, tstep):
         tstep.psi.ctypes.data_as(doubleP),
         tstep.pos_dot.ctypes.data_as(doubleP),
         tstep.psi_dot.ctypes.data_as(doubleP),
-        beam.fortran['node_master_elem'].ctypes.data_as(intP),
-        beam.fortran['vdof'].ctypes.data_as(intP),
-        beam.fortran['num_nodes'].ctypes.data_as(intP),
-        beam.fortran['master'].ctypes.data_as(intP),
+        fortran['node_master_elem'],
+        fortran['vdof'],
+        fortran['num_nodes'],
+        fortran['master'],
         tstep.q.ctypes.data_as(doubleP),
         tstep.dqdt.ctypes.data_as(doubleP))
 
@@ -662,6 +710,7 @@ def cbeam3_solv_disp2state(beam, tstep):
     n_elem = ct.c_int(beam.num_elem)
     n_nodes = ct.c_int(beam.num_node)
     numdof = ct.c_int(beam.num_dof.value)
+    fortran = beam_fortran_pointers(beam)
 
     f_cbeam3_solv_disp2state(
         ct.byref(n_elem),
@@ -671,8 +720,8 @@ def cbeam3_solv_disp2state(beam, tstep):
         tstep.psi.ctypes.data_as(doubleP),
         tstep.pos_dot.ctypes.data_as(doubleP),
         tstep.psi_dot.ctypes.data_as(doubleP),
-        beam.fortran['vdof'].ctypes.data_as(intP),
-        beam.fortran['node_master_elem'].ctypes.data_as(intP),
+        fortran['vdof'],
+        fortran['node_master_elem'],
         tstep.q.ctypes.data_as(doubleP),
         tstep.dqdt.ctypes.data_as(doubleP))
 
@@ -708,6 +757,7 @@ def cbeam3_solv_modal(beam, settings, ts, FullMglobal, FullCglobal, FullKglobal)
     n_nodes = ct.c_int(beam.num_node)
     n_mass = ct.c_int(beam.n_mass)
     n_stiff = ct.c_int(beam.n_stiff)
+    fortran = beam_fortran_pointers(beam)
     num_dof = ct.c_int(beam.num_dof.value)
 
     xbopts = Xbopts()
@@ -743,22 +793,22 @@ def cbeam3_solv_modal(beam, settings, ts, FullMglobal, FullCglobal, FullKglobal)
     f_cbeam3_solv_modal(ct.byref(num_dof),
                         ct.byref(n_elem),
                         ct.byref(n_nodes),
-                        beam.fortran['num_nodes'].ctypes.data_as(intP),
-                        beam.fortran['num_mem'].ctypes.data_as(intP),
-                        beam.fortran['connectivities'].ctypes.data_as(intP),
-                        beam.fortran['master'].ctypes.data_as(intP),
+                        fortran['num_nodes'],
+                        fortran['num_mem'],
+                        fortran['connectivities'],
+                        fortran['master'],
                         ct.byref(n_mass),
-                        beam.fortran['mass'].ctypes.data_as(doubleP),
-                        beam.fortran['mass_indices'].ctypes.data_as(intP),
+                        fortran['mass'],
+                        fortran['mass_indices'],
                         ct.byref(n_stiff),
-                        beam.fortran['stiffness'].ctypes.data_as(doubleP),
-                        beam.fortran['inv_stiffness'].ctypes.data_as(doubleP),
-                        beam.fortran['stiffness_indices'].ctypes.data_as(intP),
-                        beam.fortran['frame_of_reference_delta'].ctypes.data_as(doubleP),
-                        beam.fortran['rbmass'].ctypes.data_as(doubleP),
-                        beam.fortran['node_master_elem'].ctypes.data_as(intP),
-                        beam.fortran['vdof'].ctypes.data_as(intP),
-                        beam.fortran['fdof'].ctypes.data_as(intP),
+                        fortran['stiffness'],
+                        fortran['inv_stiffness'],
+                        fortran['stiffness_indices'],
+                        fortran['frame_of_reference_delta'],
+                        fortran['rbmass'],
+                        fortran['node_master_elem'],
+                        fortran['vdof'],
+                        fortran['fdof'],
                         ct.byref(xbopts),
                         beam.ini_info.pos.ctypes.data_as(doubleP),
                         beam.ini_info.psi.ctypes.data_as(doubleP),
@@ -794,8 +844,6 @@ def cbeam3_asbly_dynamic(beam, tstep, settings):
 
     """
 
-    # library load
-    xbeamlib = ct_utils.import_ctypes_lib(SharpyDir + '/lib/', 'libxbeam')
     f_cbeam3_asbly_dynamic_python = xbeamlib.cbeam3_asbly_dynamic_python
     f_cbeam3_asbly_dynamic_python.restype = None
 
@@ -805,23 +853,25 @@ def cbeam3_asbly_dynamic(beam, tstep, settings):
     num_dof = beam.num_dof.value
     n_mass = ct.c_int(beam.n_mass)
     n_stiff = ct.c_int(beam.n_stiff)
+    fortran = beam_fortran_pointers(beam)
     dt = settings['dt']
 
     # Options
-    xbopts = Xbopts()
-    xbopts.PrintInfo = ct.c_bool(settings['print_info'])
-    xbopts.Solution = ct.c_int(312)
-    xbopts.MaxIterations = settings['max_iterations']
-    xbopts.NumLoadSteps = settings['num_load_steps']
-    xbopts.NumGauss = ct.c_int(0)
-    xbopts.DeltaCurved = settings['delta_curved']
-    xbopts.MinDelta = settings['min_delta']
-    xbopts.NewmarkDamp = settings['newmark_damp']
-    xbopts.gravity_on = settings['gravity_on']
-    xbopts.gravity = settings['gravity']
-    xbopts.gravity_dir_x = ct.c_double(tstep.gravity_vector_inertial[0])
-    xbopts.gravity_dir_y = ct.c_double(tstep.gravity_vector_inertial[1])
-    xbopts.gravity_dir_z = ct.c_double(tstep.gravity_vector_inertial[2])
+    xbopts = _options.get(Xbopts, tag='asbly_dynamic')
+    ct_utils.update_structure(xbopts,
+                              {'PrintInfo': settings['print_info'],
+                               'Solution': 312,
+                               'MaxIterations': settings['max_iterations'],
+                               'NumLoadSteps': settings['num_load_steps'],
+                               'NumGauss': 0,
+                               'DeltaCurved': settings['delta_curved'],
+                               'MinDelta': settings['min_delta'],
+                               'NewmarkDamp': settings['newmark_damp'],
+                               'gravity_on': settings['gravity_on'],
+                               'gravity': settings['gravity'],
+                               'gravity_dir_x': tstep.gravity_vector_inertial[0],
+                               'gravity_dir_y': tstep.gravity_vector_inertial[1],
+                               'gravity_dir_z': tstep.gravity_vector_inertial[2]})
 
     # Initialize matrices
     Mglobal = np.zeros((num_dof, num_dof), dtype=ct.c_double, order='F')
@@ -845,22 +895,22 @@ def cbeam3_asbly_dynamic(beam, tstep, settings):
                                   tstep.unsteady_applied_forces.ctypes.data_as(doubleP),
                                   tstep.for_vel.ctypes.data_as(doubleP),
                                   tstep.for_acc.ctypes.data_as(doubleP),
-                                  beam.fortran['num_nodes'].ctypes.data_as(intP),
-                                  beam.fortran['num_mem'].ctypes.data_as(intP),
-                                  beam.fortran['connectivities'].ctypes.data_as(intP),
-                                  beam.fortran['master'].ctypes.data_as(intP),
+                                  fortran['num_nodes'],
+                                  fortran['num_mem'],
+                                  fortran['connectivities'],
+                                  fortran['master'],
                                   ct.byref(n_mass),
-                                  beam.fortran['mass'].ctypes.data_as(doubleP),
-                                  beam.fortran['mass_indices'].ctypes.data_as(intP),
+                                  fortran['mass'],
+                                  fortran['mass_indices'],
                                   ct.byref(n_stiff),
-                                  beam.fortran['stiffness'].ctypes.data_as(doubleP),
-                                  beam.fortran['inv_stiffness'].ctypes.data_as(doubleP),
-                                  beam.fortran['stiffness_indices'].ctypes.data_as(intP),
-                                  beam.fortran['frame_of_reference_delta'].ctypes.data_as(doubleP),
-                                  beam.fortran['rbmass'].ctypes.data_as(doubleP),
-                                  beam.fortran['node_master_elem'].ctypes.data_as(intP),
-                                  beam.fortran['vdof'].ctypes.data_as(intP),
-                                  beam.fortran['fdof'].ctypes.data_as(intP),
+                                  fortran['stiffness'],
+                                  fortran['inv_stiffness'],
+                                  fortran['stiffness_indices'],
+                                  fortran['frame_of_reference_delta'],
+                                  fortran['rbmass'],
+                                  fortran['node_master_elem'],
+                                  fortran['vdof'],
+                                  fortran['fdof'],
                                   ct.byref(xbopts),
                                   # CAREFUL, this is dXddt, with num_dof elements,
                                   # not num_dof + 10
@@ -898,8 +948,6 @@ def xbeam3_asbly_dynamic(beam, tstep, settings):
 
     """
 
-    # library load
-    xbeamlib = ct_utils.import_ctypes_lib(SharpyDir + '/lib/', 'libxbeam')
     f_xbeam3_asbly_dynamic_python = xbeamlib.xbeam3_asbly_dynamic_python
     f_xbeam3_asbly_dynamic_python.restype = None
 
@@ -909,23 +957,25 @@ def xbeam3_asbly_dynamic(beam, tstep, settings):
     num_dof = beam.num_dof.value
     n_mass = ct.c_int(beam.n_mass)
     n_stiff = ct.c_int(beam.n_stiff)
+    fortran = beam_fortran_pointers(beam)
     dt = settings['dt']
 
     # Options
-    xbopts = Xbopts()
-    xbopts.PrintInfo = ct.c_bool(settings['print_info'])
-    xbopts.Solution = ct.c_int(312)
-    xbopts.MaxIterations = settings['max_iterations']
-    xbopts.NumLoadSteps = settings['num_load_steps']
-    xbopts.NumGauss = ct.c_int(0)
-    xbopts.DeltaCurved = settings['delta_curved']
-    xbopts.MinDelta = settings['min_delta']
-    xbopts.NewmarkDamp = settings['newmark_damp']
-    xbopts.gravity_on = settings['gravity_on']
-    xbopts.gravity = settings['gravity']
-    xbopts.gravity_dir_x = ct.c_double(tstep.gravity_vector_inertial[0])
-    xbopts.gravity_dir_y = ct.c_double(tstep.gravity_vector_inertial[1])
-    xbopts.gravity_dir_z = ct.c_double(tstep.gravity_vector_inertial[2])
+    xbopts = _options.get(Xbopts, tag='xbeam3_asbly_dynamic')
+    ct_utils.update_structure(xbopts,
+                              {'PrintInfo': settings['print_info'],
+                               'Solution': 312,
+                               'MaxIterations': settings['max_iterations'],
+                               'NumLoadSteps': settings['num_load_steps'],
+                               'NumGauss': 0,
+                               'DeltaCurved': settings['delta_curved'],
+                               'MinDelta': settings['min_delta'],
+                               'NewmarkDamp': settings['newmark_damp'],
+                               'gravity_on': settings['gravity_on'],
+                               'gravity': settings['gravity'],
+                               'gravity_dir_x': tstep.gravity_vector_inertial[0],
+                               'gravity_dir_y': tstep.gravity_vector_inertial[1],
+                               'gravity_dir_z': tstep.gravity_vector_inertial[2]})
 
     # Initialize matrices
     Mtotal = np.zeros((num_dof+10, num_dof+10), dtype=ct.c_double, order='F')
@@ -950,22 +1000,22 @@ def xbeam3_asbly_dynamic(beam, tstep, settings):
                             tstep.for_vel.ctypes.data_as(doubleP),
                             tstep.for_acc.ctypes.data_as(doubleP),
                             # ct.byref(in_dt),
-                            beam.fortran['num_nodes'].ctypes.data_as(intP),
-                            beam.fortran['num_mem'].ctypes.data_as(intP),
-                            beam.fortran['connectivities'].ctypes.data_as(intP),
-                            beam.fortran['master'].ctypes.data_as(intP),
+                            fortran['num_nodes'],
+                            fortran['num_mem'],
+                            fortran['connectivities'],
+                            fortran['master'],
                             ct.byref(n_mass),
-                            beam.fortran['mass'].ctypes.data_as(doubleP),
-                            beam.fortran['mass_indices'].ctypes.data_as(intP),
+                            fortran['mass'],
+                            fortran['mass_indices'],
                             ct.byref(n_stiff),
-                            beam.fortran['stiffness'].ctypes.data_as(doubleP),
-                            beam.fortran['inv_stiffness'].ctypes.data_as(doubleP),
-                            beam.fortran['stiffness_indices'].ctypes.data_as(intP),
-                            beam.fortran['frame_of_reference_delta'].ctypes.data_as(doubleP),
-                            beam.fortran['rbmass'].ctypes.data_as(doubleP),
-                            beam.fortran['node_master_elem'].ctypes.data_as(intP),
-                            beam.fortran['vdof'].ctypes.data_as(intP),
-                            beam.fortran['fdof'].ctypes.data_as(intP),
+                            fortran['stiffness'],
+                            fortran['inv_stiffness'],
+                            fortran['stiffness_indices'],
+                            fortran['frame_of_reference_delta'],
+                            fortran['rbmass'],
+                            fortran['node_master_elem'],
+                            fortran['vdof'],
+                            fortran['fdof'],
                             ct.byref(xbopts),
                             tstep.quat.ctypes.data_as(doubleP),
                             tstep.q.ctypes.data_as(doubleP),
@@ -991,8 +1041,6 @@ def cbeam3_correct_gravity_forces(beam, tstep, settings):
         settings(settings):
     """
 
-    # library load
-    xbeamlib = ct_utils.import_ctypes_lib(SharpyDir + '/lib/', 'libxbeam')
     f_cbeam3_correct_gravity_forces_python = xbeamlib.cbeam3_correct_gravity_forces_python
     f_cbeam3_correct_gravity_forces_python.restype = None
 
@@ -1001,27 +1049,28 @@ def cbeam3_correct_gravity_forces(beam, tstep, settings):
     n_nodes = ct.c_int(beam.num_node)
     n_mass = ct.c_int(beam.n_mass)
     n_stiff = ct.c_int(beam.n_stiff)
+    fortran = beam_fortran_pointers(beam)
 
     f_cbeam3_correct_gravity_forces_python(ct.byref(n_nodes),
                             ct.byref(n_elem),
                             beam.ini_info.psi.ctypes.data_as(doubleP),
                             tstep.psi.ctypes.data_as(doubleP),
-                            beam.fortran['num_nodes'].ctypes.data_as(intP),
-                            beam.fortran['num_mem'].ctypes.data_as(intP),
-                            beam.fortran['connectivities'].ctypes.data_as(intP),
-                            beam.fortran['master'].ctypes.data_as(intP),
+                            fortran['num_nodes'],
+                            fortran['num_mem'],
+                            fortran['connectivities'],
+                            fortran['master'],
                             ct.byref(n_mass),
-                            beam.fortran['mass'].ctypes.data_as(doubleP),
-                            beam.fortran['mass_indices'].ctypes.data_as(intP),
+                            fortran['mass'],
+                            fortran['mass_indices'],
                             ct.byref(n_stiff),
-                            beam.fortran['stiffness'].ctypes.data_as(doubleP),
-                            beam.fortran['inv_stiffness'].ctypes.data_as(doubleP),
-                            beam.fortran['stiffness_indices'].ctypes.data_as(intP),
-                            beam.fortran['frame_of_reference_delta'].ctypes.data_as(doubleP),
-                            beam.fortran['rbmass'].ctypes.data_as(doubleP),
-                            beam.fortran['node_master_elem'].ctypes.data_as(intP),
-                            beam.fortran['vdof'].ctypes.data_as(intP),
-                            beam.fortran['fdof'].ctypes.data_as(intP),
+                            fortran['stiffness'],
+                            fortran['inv_stiffness'],
+                            fortran['stiffness_indices'],
+                            fortran['frame_of_reference_delta'],
+                            fortran['rbmass'],
+                            fortran['node_master_elem'],
+                            fortran['vdof'],
+                            fortran['fdof'],
                             tstep.gravity_forces.ctypes.data_as(doubleP))
 
 def cbeam3_asbly_static(beam, tstep, settings, iLoadStep):
@@ -1045,8 +1094,6 @@ def cbeam3_asbly_static(beam, tstep, settings, iLoadStep):
 
     """
 
-    # library load
-    xbeamlib = ct_utils.import_ctypes_lib(SharpyDir + '/lib/', 'libxbeam')
     f_cbeam3_asbly_static_python = xbeamlib.cbeam3_asbly_static_python
     f_cbeam3_asbly_static_python.restype = None
 
@@ -1056,6 +1103,7 @@ def cbeam3_asbly_static(beam, tstep, settings, iLoadStep):
     num_dof = beam.num_dof.value
     n_mass = ct.c_int(beam.n_mass)
     n_stiff = ct.c_int(beam.n_stiff)
+    fortran = beam_fortran_pointers(beam)
     # dt = settings['dt']
 
     # Options
@@ -1088,22 +1136,22 @@ def cbeam3_asbly_static(beam, tstep, settings, iLoadStep):
                             tstep.pos.ctypes.data_as(doubleP),
                             tstep.psi.ctypes.data_as(doubleP),
                             tstep.steady_applied_forces.ctypes.data_as(doubleP),
-                            beam.fortran['num_nodes'].ctypes.data_as(intP),
-                            beam.fortran['num_mem'].ctypes.data_as(intP),
-                            beam.fortran['connectivities'].ctypes.data_as(intP),
-                            beam.fortran['master'].ctypes.data_as(intP),
+                            fortran['num_nodes'],
+                            fortran['num_mem'],
+                            fortran['connectivities'],
+                            fortran['master'],
                             ct.byref(n_mass),
-                            beam.fortran['mass'].ctypes.data_as(doubleP),
-                            beam.fortran['mass_indices'].ctypes.data_as(intP),
+                            fortran['mass'],
+                            fortran['mass_indices'],
                             ct.byref(n_stiff),
-                            beam.fortran['stiffness'].ctypes.data_as(doubleP),
-                            beam.fortran['inv_stiffness'].ctypes.data_as(doubleP),
-                            beam.fortran['stiffness_indices'].ctypes.data_as(intP),
-                            beam.fortran['frame_of_reference_delta'].ctypes.data_as(doubleP),
-                            beam.fortran['rbmass'].ctypes.data_as(doubleP),
-                            beam.fortran['node_master_elem'].ctypes.data_as(intP),
-                            beam.fortran['vdof'].ctypes.data_as(intP),
-                            beam.fortran['fdof'].ctypes.data_as(intP),
+                            fortran['stiffness'],
+                            fortran['inv_stiffness'],
+                            fortran['stiffness_indices'],
+                            fortran['frame_of_reference_delta'],
+                            fortran['rbmass'],
+                            fortran['node_master_elem'],
+                            fortran['vdof'],
+                            fortran['fdof'],
                             ct.byref(xbopts),
                             tstep.gravity_forces.ctypes.data_as(doubleP),
                             Kglobal.ctypes.data_as(doubleP),
@@ -1936,3 +1936,291 @@ def multiply_matrices(*argv):
     for M in argv:
         sol = np.dot(sol, M)
     return sol
+
+
+#######
+# Batched kernels
+#
+# The functions below operate on stacks of vectors, ``(..., 3)`` for Cartesian rotation vectors and ``(..., 4)`` for
+# quaternions, and return stacks of matrices ``(..., 3, 3)`` (or ``(..., 3, 4)`` for the quaternion derivatives).
+# Each of them is equivalent to calling the scalar function of the same name without the ``_vec`` suffix on every
+# entry of the stack.
+def skew_vec(vectors):
+    """
+    Batched version of :func:`skew`
+
+    Args:
+        vectors (np.ndarray): Stack of 3-dimensional vectors ``(..., 3)``
+
+    Returns:
+        np.ndarray: Stack of skew-symmetric matrices ``(..., 3, 3)``
+    """
+    vectors = np.asarray(vectors)
+    if not vectors.shape[-1] == 3:
+        raise ValueError('The input vectors are not 3D')
+
+    matrix = np.zeros(vectors.shape + (3,))
+    matrix[..., 1, 2] = -vectors[..., 0]
+    matrix[..., 2, 0] = -vectors[..., 1]
+    matrix[..., 0, 1] = -vectors[..., 2]
+    matrix[..., 2, 1] = vectors[..., 0]
+    matrix[..., 0, 2] = vectors[..., 1]
+    matrix[..., 1, 0] = vectors[..., 2]
+    return matrix
+
+
+def quat2rotation_vec(quat):
+    """
+    Batched version of :func:`quat2rotation`
+
+    Args:
+        quat (np.ndarray): Stack of quaternions ``(..., 4)``
+
+    Returns:
+        np.ndarray: Stack of rotation matrices ``(..., 3, 3)``
+    """
+    quat = np.asarray(quat, dtype=float)
+    q = quat/_norm_vec(quat)[..., None]
+    q0, q1, q2, q3 = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+
+    rot_mat = np.zeros(q.shape[:-1] + (3, 3))
+
+    rot_mat[..., 0, 0] = q0**2 + q1**2 - q2**2 - q3**2
+    rot_mat[..., 1, 1] = q0**2 - q1**2 + q2**2 - q3**2
+    rot_mat[..., 2, 2] = q0**2 - q1**2 - q2**2 + q3**2
+
+    rot_mat[..., 1, 0] = 2.*(q1*q2 + q0*q3)
+    rot_mat[..., 0, 1] = 2.*(q1*q2 - q0*q3)
+
+    rot_mat[..., 2, 0] = 2.*(q1*q3 - q0*q2)
+    rot_mat[..., 0, 2] = 2.*(q1*q3 + q0*q2)
+
+    rot_mat[..., 2, 1] = 2.*(q2*q3 + q0*q1)
+    rot_mat[..., 1, 2] = 2.*(q2*q3 - q0*q1)
+
+    return rot_mat
+
+
+def crv2rotation_vec(psi):
+    """
+    Batched version of :func:`crv2rotation`
+
+    Args:
+        psi (np.ndarray): Stack of Cartesian rotation vectors ``(..., 3)``
+
+    Returns:
+        np.ndarray: Stack of rotation matrices ``(..., 3, 3)``
+    """
+    psi = np.asarray(psi, dtype=float)
+    norm_psi = _norm_vec(psi)
+
+    rot_matrix = np.zeros(psi.shape + (3,))
+    rot_matrix[...] = np.eye(3)
+
+    small = norm_psi < 1e-15
+    if np.any(small):
+        skew_psi = skew_vec(psi[small])
+        rot_matrix[small] += skew_psi + 0.5*np.matmul(skew_psi, skew_psi)
+
+    large = ~small
+    if np.any(large):
+        norm = norm_psi[large][:, None, None]
+        skew_normal = skew_vec(psi[large]/norm_psi[large][:, None])
+        rot_matrix[large] += np.sin(norm)*skew_normal
+        rot_matrix[large] += (1.0 - np.cos(norm))*np.matmul(skew_normal, skew_normal)
+
+    return rot_matrix
+
+
+def crv2tan_vec(psi):
+    """
+    Batched version of :func:`crv2tan`
+
+    Args:
+        psi (np.ndarray): Stack of Cartesian rotation vectors ``(..., 3)``
+
+    Returns:
+        np.ndarray: Stack of tangential operators ``(..., 3, 3)``
+    """
+    psi = np.asarray(psi, dtype=float)
+    norm_psi = _norm_vec(psi)
+    psi_skew = skew_vec(psi)
+    psi_skew2 = np.matmul(psi_skew, psi_skew)
+
+    eps = 1e-8
+    small = norm_psi < eps
+    k1 = np.zeros_like(norm_psi)
+    k2 = np.zeros_like(norm_psi)
+    k1[small] = -0.5
+    k2[small] = 1.0/6.0
+    norm = norm_psi[~small]
+    k1[~small] = (np.cos(norm) - 1.0)/(norm*norm)
+    k2[~small] = (1.0 - np.sin(norm)/norm)/(norm*norm)
+
+    return np.eye(3) + k1[..., None, None]*psi_skew + k2[..., None, None]*psi_skew2
+
+
+def rotation2crv_vec(Cab):
+    """
+    Batched version of :func:`rotation2crv`
+
+    Args:
+        Cab (np.ndarray): Stack of rotation matrices ``(..., 3, 3)``
+
+    Returns:
+        np.ndarray: Stack of Cartesian rotation vectors ``(..., 3)``
+    """
+    Cab = np.asarray(Cab, dtype=float)
+    if np.any(np.sqrt(np.sum(Cab*Cab, axis=(-2, -1))) < 1e-6):
+        raise AttributeError(\
+                 'Element Vector V is not orthogonal to reference line (51105)')
+
+    shape = Cab.shape[:-2]
+    Cab = Cab.reshape((-1, 3, 3))
+    n = Cab.shape[0]
+
+    # rotation2quat
+    s = np.zeros((n, 4, 4))
+    s[:, 0, 0] = 1.0 + np.trace(Cab, axis1=1, axis2=2)
+    s[:, 0, 1] = Cab[:, 2, 1] - Cab[:, 1, 2]
+    s[:, 0, 2] = Cab[:, 0, 2] - Cab[:, 2, 0]
+    s[:, 0, 3] = Cab[:, 1, 0] - Cab[:, 0, 1]
+
+    s[:, 1, 0] = Cab[:, 2, 1] - Cab[:, 1, 2]
+    s[:, 1, 1] = 1.0 + Cab[:, 0, 0] - Cab[:, 1, 1] - Cab[:, 2, 2]
+    s[:, 1, 2] = Cab[:, 0, 1] + Cab[:, 1, 0]
+    s[:, 1, 3] = Cab[:, 0, 2] + Cab[:, 2, 0]
+
+    s[:, 2, 0] = Cab[:, 0, 2] - Cab[:, 2, 0]
+    s[:, 2, 1] = Cab[:, 1, 0] + Cab[:, 0, 1]
+    s[:, 2, 2] = 1.0 - Cab[:, 0, 0] + Cab[:, 1, 1] - Cab[:, 2, 2]
+    s[:, 2, 3] = Cab[:, 1, 2] + Cab[:, 2, 1]
+
+    s[:, 3, 0] = Cab[:, 1, 0] - Cab[:, 0, 1]
+    s[:, 3, 1] = Cab[:, 0, 2] + Cab[:, 2, 0]
+    s[:, 3, 2] = Cab[:, 1, 2] + Cab[:, 2, 1]
+    s[:, 3, 3] = 1.0 - Cab[:, 0, 0] - Cab[:, 1, 1] + Cab[:, 2, 2]
+
+    rows = np.arange(n)
+    ismax = np.argmax(np.diagonal(s, axis1=1, axis2=2), axis=1)
+    quat_max = 0.5*np.sqrt(s[rows, ismax, ismax])
+    quat = 0.25*s[rows, ismax, :]/quat_max[:, None]
+    quat[rows, ismax] = quat_max
+    # quat_bound
+    quat[quat[:, 0] < 0] *= -1.
+
+    # quat2crv
+    crv_norm = 2.0*np.arccos(np.maximum(-1.0, np.minimum(quat[:, 0], 1.0)))
+    psi = np.zeros((n, 3))
+    nonzero = np.abs(crv_norm) >= 1e-15
+    psi[nonzero] = crv_norm[nonzero, None]*quat[nonzero, 1:4]/np.sin(crv_norm[nonzero]*0.5)[:, None]
+
+    # crv_bounds
+    norm_ini = _norm_vec(psi)
+    norm = norm_ini - 2.0*np.pi*np.trunc(norm_ini/(2*np.pi))
+    norm[norm > np.pi] -= 2.0*np.pi
+    norm[norm < -np.pi] += 2.0*np.pi
+    nonzero = norm != 0.0
+    psi[~nonzero] *= 0.0
+    psi[nonzero] *= (norm[nonzero]/norm_ini[nonzero])[:, None]
+
+    return psi.reshape(shape + (3,))
+
+
+def der_Cquat_by_v_vec(q, v):
+    """
+    Batched version of :func:`der_Cquat_by_v`
+
+    Args:
+        q (np.ndarray): Stack of quaternions ``(..., 4)``
+        v (np.ndarray): Stack of vectors ``(..., 3)``, or a single vector
+
+    Returns:
+        np.ndarray: Stack of derivative matrices ``(..., 3, 4)``
+    """
+    q = np.asarray(q, dtype=float)
+    v = np.asarray(v, dtype=float)
+    vx, vy, vz = v[..., 0], v[..., 1], v[..., 2]
+    q0, q1, q2, q3 = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+
+    return 2.*_stack_matrix([[ q0*vx + q2*vz - q3*vy, q1*vx + q2*vy + q3*vz,
+                                      q0*vz + q1*vy - q2*vx, -q0*vy + q1*vz - q3*vx],
+                              [ q0*vy - q1*vz + q3*vx, -q0*vz - q1*vy + q2*vx,
+                                      q1*vx + q2*vy + q3*vz,  q0*vx + q2*vz - q3*vy],
+                              [ q0*vz + q1*vy - q2*vx, q0*vy - q1*vz + q3*vx,
+                                     -q0*vx - q2*vz + q3*vy, q1*vx + q2*vy + q3*vz]])
+
+
+def der_CquatT_by_v_vec(q, v):
+    """
+    Batched version of :func:`der_CquatT_by_v`
+
+    Args:
+        q (np.ndarray): Stack of quaternions ``(..., 4)``
+        v (np.ndarray): Stack of vectors ``(..., 3)``, or a single vector
+
+    Returns:
+        np.ndarray: Stack of derivative matrices ``(..., 3, 4)``
+    """
+    q = np.asarray(q, dtype=float)
+    v = np.asarray(v, dtype=float)
+    vx, vy, vz = v[..., 0], v[..., 1], v[..., 2]
+    q0, q1, q2, q3 = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+
+    return 2.*_stack_matrix([[ q0*vx - q2*vz + q3*vy, q1*vx + q2*vy + q3*vz,
+                                      - q0*vz + q1*vy - q2*vx, q0*vy + q1*vz - q3*vx],
+                              [q0*vy + q1*vz - q3*vx, q0*vz - q1*vy + q2*vx,
+                                        q1*vx + q2*vy + q3*vz,-q0*vx + q2*vz - q3*vy],
+                              [q0*vz - q1*vy + q2*vx, -q0*vy - q1*vz + q3*vx,
+                                     q0*vx - q2*vz + q3*vy, q1*vx + q2*vy + q3*vz]])
+
+
+def der_Ccrv_by_v_vec(fv0, v):
+    """
+    Batched version of :func:`der_Ccrv_by_v`
+
+    Args:
+        fv0 (np.ndarray): Stack of Cartesian rotation vectors ``(..., 3)``
+        v (np.ndarray): Stack of vectors ``(..., 3)``, or a single vector
+
+    Returns:
+        np.ndarray: Stack of derivative matrices ``(..., 3, 3)``
+    """
+    Cab0 = crv2rotation_vec(fv0)
+    T0 = crv2tan_vec(fv0)
+    vskew = skew_vec(v)
+
+    return -np.matmul(Cab0, np.matmul(vskew, T0))
+
+
+def der_CcrvT_by_v_vec(fv0, v):
+    """
+    Batched version of :func:`der_CcrvT_by_v`
+
+    Args:
+        fv0 (np.ndarray): Stack of Cartesian rotation vectors ``(..., 3)``
+        v (np.ndarray): Stack of vectors ``(..., 3)``, or a single vector
+
+    Returns:
+        np.ndarray: Stack of derivative matrices ``(..., 3, 3)``
+    """
+    Cba0 = np.swapaxes(crv2rotation_vec(fv0), -1, -2)
+    T0 = crv2tan_vec(fv0)
+    v = np.asarray(v, dtype=float)
+
+    return np.matmul(skew_vec(np.matmul(Cba0, v[..., None])[..., 0]), T0)
+
+
+def _norm_vec(vectors):
+    """
+    Euclidean norm of a stack of vectors along the last axis, computed as the scalar ``np.linalg.norm`` does
+    """
+    return np.sqrt(np.matmul(vectors[..., None, :], vectors[..., :, None])[..., 0, 0])
+
+
+def _stack_matrix(entries):
+    """
+    Builds a stack of matrices ``(..., n_rows, n_cols)`` from a nested list of arrays with the value of each entry
+    """
+    rows = [np.stack(np.broadcast_arrays(*row), axis=-1) for row in entries]
+    return np.stack(np.broadcast_arrays(*rows), axis=-2)
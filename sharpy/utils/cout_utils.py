@@ -4,6 +4,7 @@ import os
 import numpy as np
 import subprocess
 import sharpy.utils.sharpydir as sharpydir
+import sharpy.utils.profiling as profiling
 
 cwd = os.getcwd()
 
@@ -131,6 +132,7 @@ def start_writer():
 
 def finish_writer():
     global cout_wrap
+    profiling.profiler.finish()
     if cout_wrap is not None:
         cout_wrap.close()
 
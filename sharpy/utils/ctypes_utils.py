@@ -22,3 +22,52 @@ def import_ctypes_lib(route, libname):
         traceback.print_exc(file=sys.stderr)
         sys.exit(1)
     return library
+
+
+def update_structure(structure, values):
+    """
+    Updates the fields of a ``ctypes.Structure`` that differ from ``values``
+
+    Args:
+        structure (ctypes.Structure): Structure to update.
+        values (dict): New value of the fields, either as Python types, ``ctypes`` types or arrays for the fields
+            that are ``ctypes`` arrays.
+
+    Returns:
+        ctypes.Structure: The updated structure.
+    """
+    for name, value in values.items():
+        if isinstance(value, ct._SimpleCData):
+            value = value.value
+        current = getattr(structure, name)
+        if isinstance(current, ct.Array):
+            if list(current) != list(value):
+                setattr(structure, name, tuple(value))
+        elif current != value:
+            setattr(structure, name, value)
+    return structure
+
+
+class StructureCache(object):
+    """
+    Option structures passed to the compiled libraries
+
+    A single instance of each structure type is kept for each ``tag``, which identifies the function filling it in.
+    Every call refills the same fields from the settings of the caller, so the structure can be shared by solvers with
+    different settings: it is built once and only the fields that differ from the previous call are updated with
+    :func:`update_structure`. No reference to the settings is kept.
+    """
+    def __init__(self):
+        self.structures = dict()
+
+    def get(self, structure_type, tag=None):
+        """
+        Returns the structure of type ``structure_type`` for ``tag``, building it in the first call
+        """
+        key = (structure_type, tag)
+        try:
+            return self.structures[key]
+        except KeyError:
+            structure = structure_type()
+            self.structures[key] = structure
+            return structure
@@ -4,11 +4,15 @@ Classes for the Aerotimestep and Structuraltimestep, amongst others
 """
 import copy
 import ctypes as ct
+import weakref
 import numpy as np
 
 import sharpy.utils.algebra as algebra
 import sharpy.utils.multibody as mb
 
+# ctypes pointer tables of the AeroTimeStepInfo instances, kept for as long as the time step is alive
+_ctypes_bindings = weakref.WeakKeyDictionary()
+
 
 class AeroTimeStepInfo(object):
     def __init__(self, dimensions, dimensions_star):
@@ -171,6 +175,34 @@ class AeroTimeStepInfo(object):
         return copied
 
     def generate_ctypes_pointers(self):
+        """
+        Generates the ``ct_p_*`` pointer tables to the grid arrays passed to the UVLM library
+
+        The tables are bound to the arrays of the time step and reused in subsequent calls. They are only regenerated
+        if any of the arrays has been reallocated (or the dimensions of the grid have changed) since the tables were
+        last generated. :meth:`remove_ctypes_pointers` only removes the attributes, the tables are released when
+        the time step is garbage collected.
+        """
+        arrays = (self.zeta + self.zeta_dot + self.zeta_star + self.u_ext + self.u_ext_star + self.gamma +
+                  self.gamma_dot + self.gamma_star + self.normals + self.forces + self.dynamic_forces)
+        try:
+            bound_arrays, binding = _ctypes_bindings[self]
+        except KeyError:
+            pass
+        else:
+            if (len(arrays) == len(bound_arrays)
+                    and all(array is bound_array for array, bound_array in zip(arrays, bound_arrays))
+                    and np.array_equal(self.dimensions, binding['ct_dimensions'])
+                    and np.array_equal(self.dimensions_star, binding['ct_dimensions_star'])):
+                self.__dict__.update(binding)
+                return
+
+        self._bind_ctypes_pointers()
+        # the flattened lists only hold views of contiguous arrays, otherwise they are copies and cannot be reused
+        if all(array.flags.c_contiguous for array in arrays):
+            _ctypes_bindings[self] = (arrays, {k: v for k, v in self.__dict__.items() if k.startswith('ct_')})
+
+    def _bind_ctypes_pointers(self):
         self.ct_dimensions = self.dimensions.astype(dtype=ct.c_uint, copy=True)
         self.ct_dimensions_star = self.dimensions_star.astype(dtype=ct.c_uint, copy=True)
 
@@ -472,12 +504,9 @@ class StructTimeStepInfo(object):
         return copied
 
     def glob_pos(self, include_rbm=True):
-        coords = self.pos.copy()
-        c = self.cga()
-        for i_node in range(self.num_node):
-            coords[i_node, :] = np.dot(c, coords[i_node, :])
-            if include_rbm:
-                coords[i_node, :] += self.for_pos[0:3]
+        coords = np.dot(self.pos, self.cga().T)
+        if include_rbm:
+            coords += self.for_pos[0:3]
         return coords
 
     def cga(self):
@@ -609,31 +638,25 @@ class StructTimeStepInfo(object):
         delta_vel_ms = self.mb_FoR_vel[global_ibody,:] - self.mb_FoR_vel[0,:]
 
         # Modify position
-        for inode in range(self.pos.shape[0]):
-            pos_previous = self.pos[inode,:] + np.zeros((3,),)
-            self.pos[inode,:] = np.dot(Csm,self.pos[inode,:]) - np.dot(CAslaveG,delta_pos_ms[0:3])
-            # self.pos_dot[inode,:] = np.dot(Csm,self.pos_dot[inode,:]) - np.dot(CAslaveG,delta_vel_ms[0:3])
-            self.pos_dot[inode,:] = (np.dot(Csm, self.pos_dot[inode,:]) -
-                                    np.dot(CAslaveG, delta_vel_ms[0:3]) -
-                                    np.dot(algebra.skew(np.dot( CAslaveG, self.mb_FoR_vel[global_ibody,3:6])), self.pos[inode,:]) +
-                                    np.dot(Csm, np.dot(algebra.skew(np.dot(CGAmaster.T, self.mb_FoR_vel[0,3:6])), pos_previous)))
-
-            self.gravity_forces[inode,0:3] = np.dot(Csm, self.gravity_forces[inode,0:3])
-            self.gravity_forces[inode,3:6] = np.dot(Csm, self.gravity_forces[inode,3:6])
-
-            # self.pos_dot[inode,:] = (np.dot(np.transpose(Csm),self.pos_dot[inode,:]) +
-            #                         np.dot(np.transpose(CGAmaster),delta_vel_ms[0:3]) +
-            #                         np.dot(Csm.T, np.cross( np.dot(CAslaveG, self.mb_FoR_vel[global_ibody,3:6]), pos_previous)) -
-            #                         np.cross(np.dot(CGAmaster.T, self.mb_FoR_vel[0,3:6]), self.pos[inode,:]))
-
+        # (the nodal quantities are stored by rows, so the rotations are applied as post-multiplications by the
+        # transpose)
+        pos_previous = self.pos.copy()
+        self.pos[:, :] = np.dot(pos_previous, Csm.T) - np.dot(CAslaveG, delta_pos_ms[0:3])
+        self.pos_dot[:, :] = (np.dot(self.pos_dot, Csm.T) -
+                              np.dot(CAslaveG, delta_vel_ms[0:3]) -
+                              np.dot(self.pos, algebra.skew(np.dot(CAslaveG, self.mb_FoR_vel[global_ibody, 3:6])).T) +
+                              np.dot(pos_previous,
+                                     np.dot(Csm, algebra.skew(np.dot(CGAmaster.T, self.mb_FoR_vel[0, 3:6]))).T))
+
+        self.gravity_forces[:, 0:3] = np.dot(self.gravity_forces[:, 0:3], Csm.T)
+        self.gravity_forces[:, 3:6] = np.dot(self.gravity_forces[:, 3:6], Csm.T)
 
         # Modify local rotations
-        for ielem in range(self.psi.shape[0]):
-            for inode in range(3):
-                psi_previous = self.psi[ielem,inode,:] + np.zeros((3,),)
-                self.psi[ielem,inode,:] = algebra.rotation2crv(np.dot(Csm,algebra.crv2rotation(self.psi[ielem,inode,:])))
-                self.psi_dot[ielem, inode, :] = np.dot(np.dot(algebra.crv2tan(self.psi[ielem,inode,:]),Csm),
-                                                    (np.dot(algebra.crv2tan(psi_previous).T,self.psi_dot[ielem,inode,:]) - np.dot(CGAmaster.T,delta_vel_ms[3:6])))
+        psi_previous = self.psi.copy()
+        self.psi[:, :, :] = algebra.rotation2crv_vec(np.matmul(Csm, algebra.crv2rotation_vec(psi_previous)))
+        psi_dot_b = (np.matmul(np.swapaxes(algebra.crv2tan_vec(psi_previous), -1, -2), self.psi_dot[..., None])[..., 0] -
+                     np.dot(CGAmaster.T, delta_vel_ms[3:6]))
+        self.psi_dot[:, :, :] = np.matmul(np.matmul(algebra.crv2tan_vec(self.psi), Csm), psi_dot_b[..., None])[..., 0]
 
         # Set the output FoR variables
         self.for_pos = self.mb_FoR_pos[global_ibody,:].astype(dtype=ct.c_double, order='F', copy=True)
@@ -673,25 +696,22 @@ class StructTimeStepInfo(object):
         delta_pos_ms = self.mb_FoR_pos[global_ibody,:] - self.mb_FoR_pos[0,:]
         delta_vel_ms = self.mb_FoR_vel[global_ibody,:] - self.mb_FoR_vel[0,:]
 
-        for inode in range(self.pos.shape[0]):
-            pos_previous = self.pos[inode,:] + np.zeros((3,),)
-            self.pos[inode,:] = (np.dot(np.transpose(Csm),self.pos[inode,:]) +
-                                np.dot(np.transpose(CGAmaster),delta_pos_ms[0:3]))
-            self.pos_dot[inode,:] = (np.dot(np.transpose(Csm),self.pos_dot[inode,:]) +
-                                    np.dot(np.transpose(CGAmaster),delta_vel_ms[0:3]) +
-                                    np.dot(Csm.T, np.dot(algebra.skew(np.dot(CAslaveG, self.mb_FoR_vel[global_ibody,3:6])), pos_previous)) -
-                                    np.dot(algebra.skew(np.dot(CGAmaster.T, self.mb_FoR_vel[0,3:6])), self.pos[inode,:]))
-            self.gravity_forces[inode,0:3] = np.dot(Csm.T, self.gravity_forces[inode,0:3])
-            self.gravity_forces[inode,3:6] = np.dot(Csm.T, self.gravity_forces[inode,3:6])
-                                    # np.cross(np.dot(CGAmaster.T, delta_vel_ms[3:6]), pos_previous))
-
-        for ielem in range(self.psi.shape[0]):
-            for inode in range(3):
-                psi_previous = self.psi[ielem,inode,:] + np.zeros((3,),)
-                self.psi[ielem,inode,:] = algebra.rotation2crv(np.dot(Csm.T, algebra.crv2rotation(self.psi[ielem,inode,:])))
-                self.psi_dot[ielem, inode, :] = np.dot(algebra.crv2tan(self.psi[ielem,inode,:]),
-                                                (np.dot(Csm.T, np.dot(algebra.crv2tan(psi_previous).T, self.psi_dot[ielem, inode, :])) +
-                                                np.dot(algebra.quat2rotation(self.mb_quat[0,:]).T, delta_vel_ms[3:6])))
+        pos_previous = self.pos.copy()
+        self.pos[:, :] = np.dot(pos_previous, Csm) + np.dot(np.transpose(CGAmaster), delta_pos_ms[0:3])
+        self.pos_dot[:, :] = (np.dot(self.pos_dot, Csm) +
+                              np.dot(np.transpose(CGAmaster), delta_vel_ms[0:3]) +
+                              np.dot(pos_previous,
+                                     np.dot(Csm.T, algebra.skew(np.dot(CAslaveG, self.mb_FoR_vel[global_ibody, 3:6]))).T) -
+                              np.dot(self.pos, algebra.skew(np.dot(CGAmaster.T, self.mb_FoR_vel[0, 3:6])).T))
+        self.gravity_forces[:, 0:3] = np.dot(self.gravity_forces[:, 0:3], Csm)
+        self.gravity_forces[:, 3:6] = np.dot(self.gravity_forces[:, 3:6], Csm)
+
+        psi_previous = self.psi.copy()
+        self.psi[:, :, :] = algebra.rotation2crv_vec(np.matmul(Csm.T, algebra.crv2rotation_vec(psi_previous)))
+        psi_dot_a = (np.dot(np.matmul(np.swapaxes(algebra.crv2tan_vec(psi_previous), -1, -2),
+                                      self.psi_dot[..., None])[..., 0], Csm) +
+                     np.dot(CGAmaster.T, delta_vel_ms[3:6]))
+        self.psi_dot[:, :, :] = np.matmul(algebra.crv2tan_vec(self.psi), psi_dot_a[..., None])[..., 0]
 
         # Set the output FoR variables
         self.for_pos = self.mb_FoR_pos[0,:].astype(dtype=ct.c_double, order='F', copy=True)
@@ -720,3 +740,40 @@ class LinearTimeStepInfo(object):
         copied.u = self.u.copy()
         copied.t = self.t.copy()
 
+
+
+class LinearTimeSeries(object):
+    """
+    Time history of the state, output and input variables of a linear simulation
+
+    The variables are stored as arrays whose rows are the time steps. Indexing returns a
+    :class:`LinearTimeStepInfo` whose vectors are views of those rows, such that no data is copied per time step.
+
+    Args:
+        t (np.ndarray): Time ``[n_tsteps]``
+        x (np.ndarray): State ``[n_tsteps, n_x]``
+        y (np.ndarray): Output ``[n_tsteps, n_y]``
+        u (np.ndarray): Input ``[n_tsteps, n_u]``
+    """
+    def __init__(self, t, x, y, u):
+        self.t = t
+        self.x = x
+        self.y = y
+        self.u = u
+
+    def __len__(self):
+        return len(self.t)
+
+    def __iter__(self):
+        for n in range(len(self)):
+            yield self[n]
+
+    def __getitem__(self, n):
+        if isinstance(n, slice):
+            return [self[i] for i in range(*n.indices(len(self)))]
+        tstep = LinearTimeStepInfo()
+        tstep.x = self.x[n, :]
+        tstep.y = self.y[n, :]
+        tstep.u = self.u[n, :]
+        tstep.t = self.t[n]
+        return tstep
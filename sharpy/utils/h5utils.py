@@ -12,6 +12,7 @@ import errno
 
 import numpy as np
 import warnings
+from collections import OrderedDict
 from numpy import ndarray, float64, float32, array, int32, int64
 import ctypes as ct
 
@@ -146,6 +147,8 @@ def read_group(Grp):
     read_as = 'class'
     if '_read_as' in MainLev:
         read_as = Grp['_read_as'][()]
+        if isinstance(read_as, bytes):
+            read_as = read_as.decode()
 
     ### initialise output
     if read_as == 'class':
@@ -196,6 +199,224 @@ class ReadInto:
     pass
 
 
+def readh5_lazy(filename, cache_size=128, mmap=False):
+    """
+    Opens the HDF5 file 'filename' for lazy reading.
+
+    Groups are exposed with the same structure as in :func:`readh5` (classes, dictionaries and lists, according to
+    their ``_read_as`` attribute) but datasets are only read when accessed, e.g.
+    ``readh5_lazy(filename).data.structure.timestep_info[10].pos``. The last ``cache_size`` datasets read are kept
+    in memory.
+
+    Stored time histories can be read into a single array with :meth:`LazyList.stack`, e.g.
+    ``data.structure.timestep_info.stack('pos', 100, 200)``.
+
+    Args:
+        filename (str): path to the HDF5 file
+        cache_size (int): number of datasets kept in memory
+        mmap (bool): return contiguous, uncompressed datasets as read only ``np.memmap`` arrays instead of reading
+            them.
+
+    Returns:
+        LazyGroup: root group of the file. The file is closed with its ``close`` method or when used as a context
+        manager.
+    """
+    check_file_exists(filename)
+    return LazyGroup(LazyH5File(filename, cache_size, mmap), '/')
+
+
+class LazyH5File:
+    """
+    Open HDF5 file with a least recently used cache of the datasets read
+    """
+    def __init__(self, filename, cache_size=128, mmap=False):
+        self.filename = filename
+        self.hdfile = h5.File(filename, 'r')
+        self.cache_size = cache_size
+        self.mmap = mmap
+        self.cache = OrderedDict()
+
+    def close(self):
+        self.cache.clear()
+        self.hdfile.close()
+
+    def read(self, path, index=()):
+        """
+        Reads the dataset in ``path``, or the part of it given by ``index``, bypassing the cache
+        """
+        dataset = self.hdfile[path]
+        if self.mmap and index == () and dataset.ndim > 0 and dataset.dtype.kind in 'biufc':
+            offset = dataset.id.get_offset()
+            if dataset.chunks is None and offset is not None:
+                return np.memmap(self.filename, mode='r', dtype=dataset.dtype, shape=dataset.shape, offset=offset)
+        value = dataset[index]
+        if isinstance(value, bytes):
+            value = value.decode()
+        return value
+
+    def get(self, path, index=()):
+        """
+        Returns the dataset in ``path``, or the part of it given by ``index``, using the cache
+        """
+        key = (path, index)
+        try:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        except KeyError:
+            pass
+
+        value = self.read(path, index)
+        if self.cache_size > 0:
+            self.cache[key] = value
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return value
+
+    def node(self, path):
+        """
+        Returns the lazy object for the item in ``path``: datasets are read and groups wrapped according to their
+        ``_read_as`` attribute.
+        """
+        item = self.hdfile[path]
+        if not isinstance(item, h5._hl.group.Group):
+            return self.get(path)
+
+        read_as = 'class'
+        if '_read_as' in item:
+            read_as = self.get(path + '/_read_as')
+        if read_as in ('list', 'tuple'):
+            return LazyList(self, path)
+        elif read_as == 'dict':
+            return LazyDict(self, path)
+        return LazyGroup(self, path)
+
+
+class LazyGroup:
+    """
+    HDF5 group read as a class, whose attributes are read on access
+    """
+    def __init__(self, h5file, path):
+        self._h5file = h5file
+        self._path = path.rstrip('/') + '/' if path != '/' else path
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name not in self._h5file.hdfile[self._path]:
+            raise AttributeError('%s has no attribute %s' % (self._path, name))
+        return self._h5file.node(self._path + name)
+
+    def __dir__(self):
+        return [name for name in self._h5file.hdfile[self._path].keys() if name != '_read_as']
+
+    def keys(self):
+        return self.__dir__()
+
+    def close(self):
+        self._h5file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class LazyDict(LazyGroup):
+    """
+    HDF5 group read as a dictionary, whose items are read on access
+    """
+    def __getitem__(self, key):
+        try:
+            return self.__getattr__(key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        for key in self.keys():
+            yield key, self[key]
+
+
+class LazyList:
+    """
+    HDF5 group read as a list, whose items are read on access.
+
+    Lists saved as arrays (``_as_array``) only read the requested rows.
+    """
+    def __init__(self, h5file, path):
+        self._h5file = h5file
+        self._path = path.rstrip('/') + '/'
+        group = h5file.hdfile[self._path]
+        self._as_array = '_as_array' in group
+        if self._as_array:
+            self._len = group['_as_array'].shape[0]
+        else:
+            self._len = len([name for name in group.keys() if name.isdigit()])
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[ii] for ii in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('list index out of range')
+
+        if self._as_array:
+            return self._h5file.get(self._path + '_as_array', index)
+        return self._h5file.node(self._path + '%.5d' % index)
+
+    def stack(self, name, start=0, stop=None, step=1):
+        """
+        Stacks the attribute ``name`` of the items ``start:stop:step`` along a new first axis.
+
+        Items stored as ``NoneType`` are skipped. If the attribute is itself a list of arrays (e.g. ``gamma``, with
+        one array per surface), a list with the stacked arrays of each entry is returned.
+
+        Args:
+            name (str): attribute of the items, e.g. ``pos``. Nested attributes are separated by ``/``.
+            start (int): first item
+            stop (int): last item (not included). Defaults to the length of the list.
+            step (int): step between items
+
+        Returns:
+            np.ndarray or list(np.ndarray): stacked values
+        """
+        hdfile = self._h5file.hdfile
+        paths = []
+        for index in range(*slice(start, stop, step).indices(len(self))):
+            item_path = self._path + '%.5d' % index
+            if isinstance(hdfile[item_path], h5._hl.group.Group):
+                paths.append(item_path + '/' + name)
+
+        if len(paths) == 0:
+            return np.array([])
+        if isinstance(hdfile[paths[0]], h5._hl.dataset.Dataset):
+            return np.array([self._h5file.read(path) for path in paths])
+
+        # list of arrays, one per entry
+        first = self._h5file.node(paths[0])
+        if first._as_array:
+            return np.array([self._h5file.read(path + '/_as_array') for path in paths])
+        return [np.array([self._h5file.read(path + '/%.5d' % entry) for path in paths])
+                for entry in range(len(first))]
+
+
 # ---------------------------------------------------------------- Saving tools
 
 
@@ -0,0 +1,274 @@
+"""Profiling
+
+Hierarchical timing of the solvers, postprocessors and hot paths of a SHARPy run.
+
+The profiler is enabled with the ``profiling`` setting in the ``[SHARPy]`` section of the ``.solver.txt`` file. Then,
+the ``initialise`` and ``run`` methods of every solver generated with
+:func:`sharpy.utils.solver_interface.initialise_solver` are timed, together with the spans defined in the code with
+:meth:`Profiler.span` or the :func:`profile` decorator. Spans are nested, such that each of them is identified by its
+path, e.g. ``DynamicCoupled.run/StepUvlm.run/uvlm_solver``.
+
+The totals of each path, also aggregated per time step, are written to ``profiling.json`` when the run finishes
+(see :func:`sharpy.utils.cout_utils.finish_writer`), as well as the time line of all spans in the Chrome trace format
+(``trace.json``), which can be opened in ``chrome://tracing`` or https://ui.perfetto.dev.
+
+Examples:
+
+    >>> import sharpy.utils.profiling as profiling
+    >>> with profiling.profiler.span('force_mapping'):
+    >>>     forces = mapping.aero2struct_force_mapping(...)
+
+    >>> @profiling.profile('wake_convection')
+    >>> def convect_wake(...):
+    >>>     ...
+
+When the profiler is disabled, spans return a shared context manager that does nothing, so the instrumentation can
+be left in the hot paths.
+"""
+import functools
+import json
+import os
+import time
+
+
+class _NullSpan(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_null_span = _NullSpan()
+
+
+class _Span(object):
+    __slots__ = ('profiler', 'name', 't0')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.t0 = None
+
+    def __enter__(self):
+        self.profiler.stack.append(self.name)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        t1 = time.perf_counter()
+        self.profiler.record(self.t0, t1)
+        return False
+
+
+class Profiler(object):
+    """
+    Hierarchical timer
+
+    Attributes:
+        enabled (bool): Record the spans.
+        trace (bool): Keep the time line of the spans for the Chrome trace export.
+        stack (list(str)): Names of the currently open spans.
+        totals (dict): ``{path: [calls, total_time, max_time]}``.
+        step_totals (dict): ``{time_step: {path: total_time}}``.
+        events (list): Recorded spans ``(path, start, duration, time_step)``.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.trace = True
+        self.folder = None
+
+        self.stack = []
+        self.time_step = None
+        self.t_start = None
+        self.totals = dict()
+        self.step_totals = dict()
+        self.events = []
+
+    def initialise(self, enabled, folder=None, trace=True):
+        """
+        Resets the profiler
+
+        Args:
+            enabled (bool): Record the spans.
+            folder (str): Folder where the results are written by :meth:`finish`. If ``None``, nothing is written.
+            trace (bool): Keep the time line of the spans for the Chrome trace export.
+        """
+        self.__init__()
+        self.enabled = enabled
+        self.folder = folder
+        self.trace = trace
+        self.t_start = time.perf_counter()
+
+    def span(self, name):
+        """
+        Returns a context manager timing the enclosed block as a child of the currently open span
+
+        Args:
+            name (str): Name of the span.
+        """
+        if not self.enabled:
+            return _null_span
+        return _Span(self, name)
+
+    def set_time_step(self, ts):
+        """
+        Sets the time step to which the subsequent spans are assigned in the per time step aggregation
+        """
+        self.time_step = ts
+
+    def record(self, t0, t1):
+        path = '/'.join(self.stack)
+        self.stack.pop()
+        duration = t1 - t0
+
+        try:
+            total = self.totals[path]
+        except KeyError:
+            self.totals[path] = [1, duration, duration]
+        else:
+            total[0] += 1
+            total[1] += duration
+            if duration > total[2]:
+                total[2] = duration
+
+        if self.time_step is not None:
+            step_total = self.step_totals.setdefault(self.time_step, dict())
+            step_total[path] = step_total.get(path, 0.) + duration
+
+        if self.trace:
+            self.events.append((path, t0, duration, self.time_step))
+
+    def wrap(self, method, name):
+        """
+        Returns ``method`` timed in a span named ``name``
+        """
+        @functools.wraps(method)
+        def wrapped(*args, **kwargs):
+            with self.span(name):
+                return method(*args, **kwargs)
+        return wrapped
+
+    def wrap_methods(self, instance, prefix, method_names):
+        """
+        Times the methods ``method_names`` of ``instance`` in spans named ``<prefix>.<method_name>``
+        """
+        for method_name in method_names:
+            setattr(instance, method_name,
+                    self.wrap(getattr(instance, method_name), '%s.%s' % (prefix, method_name)))
+        return instance
+
+    def wrap_solver(self, solver):
+        """
+        Times the ``initialise`` and ``run`` methods of a solver instance in spans named ``<solver_id>.initialise``
+        and ``<solver_id>.run``
+        """
+        return self.wrap_methods(solver, solver.solver_id, ('initialise', 'run'))
+
+    def summary(self):
+        """
+        Returns the totals of each span path sorted in depth first order
+
+        Returns:
+            list(dict): ``path``, ``calls``, ``total``, ``mean``, ``max`` and ``self`` time (not spent in child
+            spans) of each path.
+        """
+        child_time = dict()
+        for path, (calls, total, max_time) in self.totals.items():
+            parent = path.rpartition('/')[0]
+            if parent:
+                child_time[parent] = child_time.get(parent, 0.) + total
+
+        summary = []
+        for path in sorted(self.totals.keys(), key=lambda p: p.split('/')):
+            calls, total, max_time = self.totals[path]
+            summary.append({'path': path,
+                            'calls': calls,
+                            'total': total,
+                            'mean': total / calls,
+                            'max': max_time,
+                            'self': total - child_time.get(path, 0.)})
+        return summary
+
+    def print_summary(self):
+        import sharpy.utils.cout_utils as cout
+
+        cout.cout_wrap('Profiling summary (wall time in seconds)', 1)
+        cout.cout_wrap('%12s %10s %12s %12s  %s' % ('total', 'calls', 'mean', 'self', 'span'), 1)
+        for entry in self.summary():
+            depth = entry['path'].count('/')
+            cout.cout_wrap('%12.4f %10u %12.6f %12.4f  %s%s' % (entry['total'], entry['calls'], entry['mean'],
+                                                                 entry['self'], '  ' * depth,
+                                                                 entry['path'].rpartition('/')[2]), 1)
+
+    def export_json(self, filename):
+        """
+        Writes the totals of each span path and their aggregation per time step to ``filename``
+        """
+        with open(filename, 'w') as outfile:
+            json.dump({'wall_time': time.perf_counter() - self.t_start,
+                       'spans': self.summary(),
+                       'time_steps': {str(ts): step_total for ts, step_total in self.step_totals.items()}},
+                      outfile, indent=1)
+
+    def export_chrome_trace(self, filename):
+        """
+        Writes the recorded spans to ``filename`` in the Chrome trace event format
+        """
+        pid = os.getpid()
+        events = []
+        for path, t0, duration, ts in self.events:
+            event = {'name': path.rpartition('/')[2],
+                     'cat': 'sharpy',
+                     'ph': 'X',
+                     'ts': (t0 - self.t_start) * 1e6,
+                     'dur': duration * 1e6,
+                     'pid': pid,
+                     'tid': 0,
+                     'args': {'path': path}}
+            if ts is not None:
+                event['args']['time_step'] = ts
+            events.append(event)
+
+        with open(filename, 'w') as outfile:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, outfile)
+
+    def finish(self):
+        """
+        Prints the summary and writes ``profiling.json`` and, if ``trace``, ``trace.json`` to the output folder
+        """
+        if not self.enabled:
+            return
+
+        self.print_summary()
+        if self.folder is not None:
+            if not os.path.exists(self.folder):
+                os.makedirs(self.folder)
+            self.export_json(self.folder + '/profiling.json')
+            if self.trace:
+                self.export_chrome_trace(self.folder + '/trace.json')
+        self.enabled = False
+
+
+profiler = Profiler()
+
+
+def profile(name=None):
+    """
+    Decorator timing a function in a span of the global profiler
+
+    Args:
+        name (str): Name of the span. Defaults to the qualified name of the function.
+    """
+    def decorator(function):
+        span_name = function.__qualname__ if name is None else name
+
+        @functools.wraps(function)
+        def wrapped(*args, **kwargs):
+            with profiler.span(span_name):
+                return function(*args, **kwargs)
+        return wrapped
+    return decorator
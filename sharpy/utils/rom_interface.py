@@ -1,5 +1,6 @@
 from abc import ABCMeta, abstractmethod
 import sharpy.utils.cout_utils as cout
+import sharpy.utils.profiling as profiling
 import os
 
 dict_of_roms = {}
@@ -66,6 +67,8 @@ def initialise_rom(rom_name):
     cout.cout_wrap('Generating an instance of %s' % rom_name, 2)
     cls_type = rom_from_string(rom_name)
     solver = cls_type()
+    if profiling.profiler.enabled:
+        profiling.profiler.wrap_methods(solver, rom_name, ('run',))
     return solver
 
 def dictionary_of_solvers():
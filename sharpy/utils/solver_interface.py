@@ -2,8 +2,11 @@ from abc import ABCMeta, abstractmethod
 import sharpy.utils.cout_utils as cout
 import os
 import sharpy.utils.settings as settings
+import sharpy.utils.profiling as profiling
 import inspect
 import shutil
+import multiprocessing as mpr
+import numpy as np
 
 dict_of_solvers = {}
 solvers = {}  # for internal working
@@ -53,6 +56,10 @@ class BaseSolver(metaclass=ABCMeta):
     def run(self):
         pass
 
+    # Called once after the last time step by the solver running this one online, to write any pending output
+    def finalise(self):
+        pass
+
     # @property
     def __doc__(self):
         # Generate documentation table
@@ -86,8 +93,72 @@ def initialise_solver(solver_name, print_info=True):
         cout.cout_wrap('Generating an instance of %s' % solver_name, 2)
     cls_type = solver_from_string(solver_name)
     solver = cls_type()
+    if profiling.profiler.enabled:
+        profiling.profiler.wrap_solver(solver)
     return solver
 
+# solver run by the worker processes of run_offline_steps, shared with them by fork
+_offline_solver = None
+
+
+def _worker_offline_steps(args):
+    step_method, time_steps = args
+    step = getattr(_offline_solver, step_method)
+    return [(ts, step(ts)) for ts in time_steps]
+
+
+def run_offline_steps(solver, time_steps, step_method, merge_method=None, num_processes=1):
+    """
+    Runs the postprocessing of each of the stored time steps.
+
+    The method ``step_method`` of ``solver`` is called with each time step index and returns the output of that
+    time step (or ``None``). The outputs are passed in ascending time step order to ``merge_method``, if given,
+    which is always run in the calling process. Hence, ``step_method`` should only write to separate files or return
+    the results to be stored in ``solver.data`` by ``merge_method``.
+
+    If ``num_processes > 1`` the time steps are split in contiguous chunks that are processed by a pool of
+    forked processes, which share the data of ``solver`` (i.e. the beam, aerodynamic grid and time step
+    information) without copying it. If forking is not available, the time steps are processed serially.
+
+    Args:
+        solver (BaseSolver): Postprocessor
+        time_steps (iterable): Indices of the time steps to process
+        step_method (str): Name of the method processing a time step: ``output = solver.step_method(ts)``
+        merge_method (str): Name of the method merging the output of a time step: ``solver.merge_method(ts, output)``
+        num_processes (int): Number of processes
+    """
+    global _offline_solver
+
+    time_steps = np.array(time_steps, dtype=int)
+    merge = None if merge_method is None else getattr(solver, merge_method)
+
+    if num_processes > 1 and 'fork' not in mpr.get_all_start_methods():
+        cout.cout_wrap('Forking processes is not available. Running %s serially' % solver.solver_id, 3)
+        num_processes = 1
+
+    if num_processes <= 1 or len(time_steps) <= 1:
+        step = getattr(solver, step_method)
+        for ts in time_steps:
+            output = step(ts)
+            if merge is not None:
+                merge(ts, output)
+        return
+
+    # several chunks per process for load balancing, in order to keep the merge in order
+    num_chunks = min(len(time_steps), 4 * num_processes)
+    chunks = [(step_method, chunk) for chunk in np.array_split(time_steps, num_chunks)]
+
+    _offline_solver = solver
+    try:
+        with mpr.get_context('fork').Pool(num_processes) as pool:
+            for outputs in pool.imap(_worker_offline_steps, chunks):
+                if merge is not None:
+                    for ts, output in outputs:
+                        merge(ts, output)
+    finally:
+        _offline_solver = None
+
+
 def dictionary_of_solvers(print_info=True):
     import sharpy.solvers
     import sharpy.postproc
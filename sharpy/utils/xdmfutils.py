@@ -0,0 +1,203 @@
+"""XDMF Time Series Utilities
+
+Writes the time history of unstructured grids to a single HDF5 heavy-data file
+described by an XDMF temporal collection, which can be opened directly in
+Paraview.
+"""
+import os
+
+import h5py as h5
+import numpy as np
+
+
+def step_time(data, ts, dt):
+    """
+    Physical time of the time step ``ts`` of ``data``, used as the time of the XDMF output.
+
+    It is the time recorded by the solver if the time steps are not uniform (adaptive time stepping), ``ts*dt``
+    otherwise or ``ts`` itself if ``dt`` is not given.
+
+    Args:
+        data (sharpy.presharpy.presharpy.PreSharpy): Problem data
+        ts (int): Time step
+        dt (float): Time step length. ``0`` if unknown.
+
+    Returns:
+        float: Time of the time step
+    """
+    try:
+        return data.step_times[ts]
+    except (AttributeError, KeyError):
+        pass
+    if dt:
+        return ts*dt
+    return float(ts)
+
+
+class XdmfTimeSeries(object):
+    """
+    Time series of unstructured grids in XDMF format
+
+    The heavy data (coordinates, connectivities and fields) of all time steps is stored in ``filename.h5`` while
+    ``filename.xdmf`` contains the description of the grids. Each time step is a spatial collection of grids,
+    which are added with :meth:`add_grid` after starting the time step with :meth:`add_step`. The time step is
+    appended to both files by :meth:`write_step`, such that the output can be visualised while the simulation
+    is running.
+
+    Connectivities are only written to the HDF5 file when they change, such that grids of constant topology
+    only store the coordinates and fields at each time step.
+
+    Examples:
+
+        >>> xdmf = XdmfTimeSeries('./output/case')
+        >>> xdmf.add_step(0.)
+        >>> xdmf.add_grid('beam', coords, conn, 'Polyline', point_data={'node_id': node_id})
+        >>> xdmf.write_step()
+
+    Args:
+        filename (str): Path of the output files without extension. Existing files are overwritten.
+    """
+
+    topology_nodes = {'Polyline': None,
+                      'Triangle': 3,
+                      'Quadrilateral': 4,
+                      'Polyvertex': 1}
+
+    xdmf_footer = '    </Grid>\n  </Domain>\n</Xdmf>\n'
+
+    def __init__(self, filename):
+        self.h5_filename = filename + '.h5'
+        self.xdmf_filename = filename + '.xdmf'
+
+        self.h5file = h5.File(self.h5_filename, 'w')
+
+        with open(self.xdmf_filename, 'w') as xdmf_file:
+            xdmf_file.write('<?xml version="1.0" ?>\n'
+                            '<Xdmf Version="3.0">\n'
+                            '  <Domain>\n'
+                            '    <Grid Name="TimeSeries" GridType="Collection" CollectionType="Temporal">\n')
+            self.xdmf_offset = xdmf_file.tell()
+            xdmf_file.write(self.xdmf_footer)
+
+        self.step = -1
+        self.step_xml = None
+        self.connectivities = dict()
+
+    def add_step(self, time):
+        """
+        Starts a new time step
+
+        Args:
+            time (float): Time value associated to the step.
+        """
+        self.step += 1
+        self.step_xml = ['      <Grid Name="step_%06u" GridType="Collection" CollectionType="Spatial">\n' % self.step,
+                         '        <Time Value="%.16g"/>\n' % time]
+
+    def add_grid(self, name, coords, connectivity, topology, point_data=None, cell_data=None):
+        """
+        Adds a grid to the current time step
+
+        Args:
+            name (str): Grid name. It must be unique within the time step.
+            coords (np.ndarray): Point coordinates ``[num_points, 3]``.
+            connectivity (np.ndarray): Point indices of each cell ``[num_cells, nodes_per_cell]``.
+            topology (str): XDMF topology type (``Quadrilateral``, ``Triangle``, ``Polyline`` or ``Polyvertex``).
+            point_data (dict): Point fields ``{name: array}``, where arrays are ``[num_points]`` or
+                ``[num_points, 3]``.
+            cell_data (dict): Cell fields ``{name: array}``, where arrays are ``[num_cells]`` or
+                ``[num_cells, 3]``.
+        """
+        if topology not in self.topology_nodes:
+            raise NotImplementedError('Topology %s not supported. Supported topologies are %s'
+                                      % (topology, list(self.topology_nodes.keys())))
+        if point_data is None:
+            point_data = dict()
+        if cell_data is None:
+            cell_data = dict()
+
+        connectivity_path = self.write_connectivity(name, connectivity)
+        step_path = '/%s/%06u' % (name, self.step)
+
+        num_cells, nodes_per_cell = connectivity.shape
+        if topology == 'Polyline':
+            nodes_attr = ' NodesPerElement="%u"' % nodes_per_cell
+        else:
+            nodes_attr = ''
+
+        xml = ['        <Grid Name="%s" GridType="Uniform">\n' % name,
+               '          <Topology TopologyType="%s" NumberOfElements="%u"%s>\n' % (topology, num_cells, nodes_attr),
+               '            ' + self.data_item(connectivity_path, connectivity) + '\n',
+               '          </Topology>\n',
+               '          <Geometry GeometryType="XYZ">\n',
+               '            ' + self.data_item(self.write_array(step_path + '/coords', coords), coords) + '\n',
+               '          </Geometry>\n']
+
+        for center, fields in (('Node', point_data), ('Cell', cell_data)):
+            for field_name, field in fields.items():
+                field = np.asarray(field)
+                if field.ndim == 1:
+                    attribute_type = 'Scalar'
+                elif field.shape[1] == 3:
+                    attribute_type = 'Vector'
+                else:
+                    attribute_type = 'Matrix'
+                path = self.write_array(step_path + '/' + field_name, field)
+                xml += ['          <Attribute Name="%s" AttributeType="%s" Center="%s">\n'
+                        % (field_name, attribute_type, center),
+                        '            ' + self.data_item(path, field) + '\n',
+                        '          </Attribute>\n']
+
+        xml.append('        </Grid>\n')
+        self.step_xml += xml
+
+    def write_step(self):
+        """
+        Appends the current time step to the XDMF description and flushes the HDF5 file
+        """
+        self.h5file.flush()
+        with open(self.xdmf_filename, 'r+') as xdmf_file:
+            xdmf_file.seek(self.xdmf_offset)
+            xdmf_file.write(''.join(self.step_xml))
+            xdmf_file.write('      </Grid>\n')
+            self.xdmf_offset = xdmf_file.tell()
+            xdmf_file.write(self.xdmf_footer)
+            xdmf_file.truncate()
+        self.step_xml = None
+
+    def close(self):
+        """
+        Closes the HDF5 file. The XDMF description is complete after every :meth:`write_step`
+        """
+        self.h5file.close()
+
+    def write_connectivity(self, name, connectivity):
+        """
+        Writes the connectivity of the grid ``name`` if it differs from the one previously written and returns
+        the path to the dataset.
+        """
+        try:
+            previous, path = self.connectivities[name]
+        except KeyError:
+            pass
+        else:
+            if connectivity is previous or np.array_equal(connectivity, previous):
+                return path
+
+        path = self.write_array('/%s/connectivity_%06u' % (name, self.step), connectivity)
+        self.connectivities[name] = (connectivity, path)
+        return path
+
+    def write_array(self, path, array):
+        self.h5file.create_dataset(path, data=array)
+        return path
+
+    def data_item(self, path, array):
+        array = np.asarray(array)
+        if np.issubdtype(array.dtype, np.integer):
+            number_type = 'NumberType="Int" Precision="%u"' % array.dtype.itemsize
+        else:
+            number_type = 'NumberType="Float" Precision="%u"' % array.dtype.itemsize
+        return '<DataItem Dimensions="%s" %s Format="HDF">%s:%s</DataItem>' \
+               % (' '.join([str(dim) for dim in array.shape]), number_type,
+                  os.path.basename(self.h5_filename), path)
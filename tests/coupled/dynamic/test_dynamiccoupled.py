@@ -0,0 +1,356 @@
+import copy
+import ctypes as ct
+import types
+import unittest
+import unittest.mock
+
+import numpy as np
+
+from tests.synthetic import straight_wake, structural_step, polynomial_coefficients, SyntheticStructTimeStep, \
+    dynamic_coupled
+
+
+class TestAdaptiveTimeStep(unittest.TestCase):
+
+    num_dof = 12
+    dt = 0.1
+    tolerance = 1e-3
+
+    def setUp(self):
+        self.rs = np.random.RandomState(4)
+        self.previous_tstep = structural_step(self.num_dof, self.rs)
+        self.solver = dynamic_coupled({'adaptive_time_step': True,
+                                       'dt': self.dt,
+                                       'time_step_tolerance': self.tolerance,
+                                       'max_time_step_ratio': 4.},
+                                      self.num_dof,
+                                      [self.previous_tstep])
+        self.solver.final_time = 1.
+
+    def step_with_error(self, error, dt):
+        """
+        Structural step whose relative local error estimate over a step of length ``dt`` is ``error``, for a
+        structure whose initial states are zero. The structural states at the beginning of the step are modified
+        accordingly
+        """
+        tstep = structural_step(self.num_dof, self.rs)
+        q = tstep.q[:self.num_dof]
+        direction = self.rs.rand(self.num_dof)
+        direction *= error*self.tolerance*np.linalg.norm(q)/np.linalg.norm(direction)
+        self.previous_tstep.q[:self.num_dof] = (q - direction - dt*self.previous_tstep.dqdt[:self.num_dof] -
+                                                0.5*dt*dt*self.previous_tstep.dqddt[:self.num_dof])
+        return tstep
+
+    def test_time_step_error(self):
+        dt = 0.05
+        for error in (0., 0.3, 2.):
+            tstep = self.step_with_error(error, dt)
+            self.assertAlmostEqual(self.solver.time_step_error(tstep, self.previous_tstep, dt), error, 10)
+
+        # zero structural states: absolute error
+        tstep = structural_step(self.num_dof, self.rs)
+        tstep.q[:] = 0.
+        self.previous_tstep.q[:] = 0.
+        self.previous_tstep.dqdt[:] = 0.
+        self.previous_tstep.dqddt[:self.num_dof] = 1.
+        self.assertAlmostEqual(self.solver.time_step_error(tstep, self.previous_tstep, dt),
+                               0.5*dt*dt*np.sqrt(self.num_dof)/self.tolerance, 10)
+
+    def test_rigid_translation(self):
+        # the estimated error and the next time step do not depend on the position of the structure
+        dt = 0.1
+        tstep = self.step_with_error(0.5, dt)
+        self.solver.data.structure.ini_info.q[:self.num_dof] = 0.2*tstep.q[:self.num_dof]
+        error = self.solver.time_step_error(tstep, self.previous_tstep, dt)
+        self.assertAlmostEqual(error, 0.5/0.8)
+        self.assertTrue(self.solver.accept_time_step(tstep, dt))
+        next_dt = self.solver.next_dt
+
+        # each node has three translational and three rotational degrees of freedom
+        offset = np.zeros(self.num_dof + 10)
+        offset[:self.num_dof] = np.tile(np.array([1e3, -50., 20., 0., 0., 0.]), self.num_dof // 6)
+        for step in (tstep, self.previous_tstep, self.solver.data.structure.ini_info):
+            step.q += offset
+        self.assertAlmostEqual(self.solver.time_step_error(tstep, self.previous_tstep, dt), error, 6)
+        self.assertTrue(self.solver.accept_time_step(tstep, dt))
+        self.assertAlmostEqual(self.solver.next_dt, next_dt, 8)
+
+    def test_accept_time_step(self):
+        dt = 0.1
+        # no error: the step grows as much as allowed
+        self.assertTrue(self.solver.accept_time_step(self.step_with_error(0., dt), dt))
+        self.assertAlmostEqual(self.solver.next_dt, 4.*dt)
+
+        # within the tolerance: third order law with the safety factor
+        self.assertTrue(self.solver.accept_time_step(self.step_with_error(0.5, dt), dt))
+        self.assertAlmostEqual(self.solver.next_dt, 0.9*0.5**(-1./3.)*dt)
+
+        # above the tolerance: rejected and repeated with a shorter step
+        self.assertFalse(self.solver.accept_time_step(self.step_with_error(8., dt), dt))
+        self.assertAlmostEqual(self.solver.next_dt, 0.45*dt)
+        self.assertEqual(self.solver.num_rejected_steps, 1)
+
+        # the reduction is bounded by the maximum ratio
+        self.assertFalse(self.solver.accept_time_step(self.step_with_error(1e3, dt), dt))
+        self.assertAlmostEqual(self.solver.next_dt, 0.25*dt)
+
+        # and by the minimum time step, at which the steps are always accepted
+        dt = self.solver.dt_min
+        self.assertTrue(self.solver.accept_time_step(self.step_with_error(1e3, dt), dt))
+        self.assertAlmostEqual(self.solver.next_dt, self.solver.dt_min)
+
+        # and the maximum one
+        dt = self.solver.dt_max
+        self.assertTrue(self.solver.accept_time_step(self.step_with_error(0., dt), dt))
+        self.assertAlmostEqual(self.solver.next_dt, self.solver.dt_max)
+
+    def test_fixed_time_step(self):
+        solver = dynamic_coupled({'dt': self.dt}, self.num_dof, [self.previous_tstep])
+        self.assertTrue(solver.accept_time_step(self.step_with_error(1e3, self.dt), self.dt))
+        self.assertEqual(solver.set_time_step(None), self.dt)
+
+    def test_set_time_step(self):
+        aero_tstep = straight_wake(6, 2)
+        zeta_star = aero_tstep.zeta_star[0].copy()
+
+        # without a wake convected with the flow, only the time step of the aerodynamics changes
+        self.solver.next_dt = 0.15
+        self.assertAlmostEqual(self.solver.set_time_step(aero_tstep), 0.15)
+        self.assertAlmostEqual(self.solver.aero_solver.settings['dt'].value, 0.15)
+        self.assertAlmostEqual(self.solver.substep_dt, 0.15)
+        np.testing.assert_array_equal(aero_tstep.zeta_star[0], zeta_star)
+
+        self.solver.resample_wake = True
+        self.solver.next_dt = 0.3
+        self.solver.set_time_step(aero_tstep)
+        self.assertAlmostEqual(self.solver.aero_dt, 0.3)
+        np.testing.assert_allclose(aero_tstep.zeta_star[0], straight_wake(6, 2, panel_length=1.).zeta_star[0])
+
+    def test_end_of_simulation(self):
+        self.solver.next_dt = 0.2
+
+        # the last step is clipped to the final time
+        self.solver.time = 0.85
+        self.assertAlmostEqual(self.solver.set_time_step(None), 0.15)
+
+        # rather than leaving a step shorter than the minimum one, the remaining time is split in two steps
+        self.solver.time = 0.795
+        self.assertAlmostEqual(self.solver.set_time_step(None), 0.1025)
+
+        self.solver.time = 0.5
+        self.assertAlmostEqual(self.solver.set_time_step(None), 0.2)
+
+        self.solver.time = 1.
+        self.assertTrue(self.solver.finished(10))
+
+
+class TestFSIPredictor(unittest.TestCase):
+
+    num_dof = 12
+
+    def setUp(self):
+        self.coefficients = polynomial_coefficients(self.num_dof, 2, np.random.RandomState(6))
+
+    def predictor(self, fsi_predictor, times, order):
+        """
+        ``DynamicCoupled`` with converged steps at ``times`` of polynomials of ``order``
+        """
+        steps = [SyntheticStructTimeStep(self.num_dof, t, self.coefficients[:order + 1]) for t in times]
+        solver = dynamic_coupled({'dt': 0.1, 'fsi_predictor': fsi_predictor}, self.num_dof, steps)
+        solver.predictor = True
+        solver.predictor_order = {'linear': 1, 'quadratic': 2, 'newmark': 1}[fsi_predictor]
+        solver.step_times = list(times)
+        solver.structural_solver = types.SimpleNamespace(settings={'newmark_damp': ct.c_double(1e-3)})
+        return solver, steps
+
+    def assert_prediction(self, predicted, time, order):
+        expected = SyntheticStructTimeStep(self.num_dof, time, self.coefficients[:order + 1])
+        for name in ['pos', 'psi', 'pos_dot', 'psi_dot', 'for_pos', 'quat', 'q', 'dqdt',
+                     'steady_applied_forces', 'unsteady_applied_forces']:
+            np.testing.assert_allclose(getattr(predicted, name), getattr(expected, name), rtol=1e-12, atol=1e-12,
+                                       err_msg=name)
+
+    def test_lagrange_extrapolation(self):
+        # the extrapolation is exact for polynomials of its order, on uneven steps
+        times = [0.1, 0.25, 0.3]
+        for fsi_predictor, order in (('linear', 1), ('quadratic', 2)):
+            solver, steps = self.predictor(fsi_predictor, times, order)
+            tstep = steps[-1].copy()
+            predicted = solver.predict_step(tstep, 0.12)
+            self.assert_prediction(predicted, 0.42, order)
+
+            # the state at the beginning of the step is not modified
+            self.assert_prediction(tstep, 0.3, order)
+
+        # a quadratic history is not extrapolated exactly by the linear predictor
+        solver, steps = self.predictor('linear', times, 2)
+        predicted = solver.predict_step(steps[-1], 0.12)
+        expected = SyntheticStructTimeStep(self.num_dof, 0.42, self.coefficients)
+        self.assertGreater(np.max(np.abs(predicted.q - expected.q)), 1e-3)
+
+    def test_not_enough_steps(self):
+        solver, steps = self.predictor('quadratic', [0.3], 2)
+        self.assertIsNone(solver.predict_step(steps[-1], 0.1))
+
+        # with two steps, the quadratic predictor falls back to a linear extrapolation
+        solver, steps = self.predictor('quadratic', [0.2, 0.3], 1)
+        self.assert_prediction(solver.predict_step(steps[-1], 0.1), 0.4, 1)
+
+    def test_newmark(self):
+        dt = 0.1
+        gamma = 0.5 + 1e-3
+        beta = 0.25*(gamma + 0.5)**2
+        for times in ([0.3], [0.2, 0.3]):
+            solver, steps = self.predictor('newmark', times, 1)
+            tstep = steps[-1]
+            with unittest.mock.patch('sharpy.solvers.dynamiccoupled.xbeam.cbeam3_solv_state2disp') as state2disp:
+                predicted = solver.predict_step(tstep, dt)
+            state2disp.assert_called_once_with(solver.data.structure, predicted)
+
+            n = self.num_dof
+            np.testing.assert_allclose(predicted.q[:n],
+                                       tstep.q[:n] + dt*tstep.dqdt[:n] + (0.5 - beta)*dt*dt*tstep.dqddt[:n])
+            np.testing.assert_allclose(predicted.dqdt[:n], tstep.dqdt[:n] + (1. - gamma)*dt*tstep.dqddt[:n])
+
+        # the rest of quantities are extrapolated linearly when there are enough converged steps
+        expected = SyntheticStructTimeStep(self.num_dof, 0.4, self.coefficients[:2])
+        np.testing.assert_allclose(predicted.q[n:], expected.q[n:])
+        np.testing.assert_allclose(predicted.steady_applied_forces, expected.steady_applied_forces)
+
+    def test_predicted_convergence(self):
+        rs = np.random.RandomState(7)
+        tstep = structural_step(self.num_dof, rs)
+        previous_tstep = copy.deepcopy(tstep)
+        previous_tstep.q += 1e-8
+        previous_tstep.dqdt += 1e-8
+
+        solver = dynamic_coupled({'dt': 0.1, 'minimum_steps': 0}, self.num_dof)
+        # the first iteration only converges if it started from a prediction
+        self.assertFalse(solver.convergence(0, tstep, previous_tstep))
+        self.assertTrue(solver.convergence(0, tstep, previous_tstep, predicted=True))
+
+        previous_tstep.q += 1e-3
+        self.assertFalse(solver.convergence(0, tstep, previous_tstep, predicted=True))
+
+        # the default minimum number of iterations prevents the convergence of the first ones
+        solver = dynamic_coupled({'dt': 0.1}, self.num_dof)
+        previous_tstep.q -= 1e-3
+        self.assertFalse(solver.convergence(0, tstep, previous_tstep, predicted=True))
+        self.assertFalse(solver.convergence(2, tstep, previous_tstep, predicted=True))
+        self.assertTrue(solver.convergence(3, tstep, previous_tstep, predicted=True))
+
+
+class RecordingAeroSolver:
+    """
+    Aerodynamic solver that records the structural states and time steps it is run with
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.settings = {'dt': ct.c_double(0.)}
+        self.runs = []
+
+    def update_custom_grid(self, structural_step, aero_step):
+        pass
+
+    def run(self, aero_step, structural_step, convect_wake=True, unsteady_contribution=False, dt=None, t=None):
+        self.runs.append((structural_step.q.copy(), dt, t))
+        return self.data
+
+
+class TestStaggeredCoupling(unittest.TestCase):
+
+    num_dof = 12
+    dt = 0.1
+    subcycles = 3
+
+    def setUp(self):
+        rs = np.random.RandomState(8)
+        self.coefficients = polynomial_coefficients(self.num_dof, 0, rs)
+        self.aero_forces = rs.rand(4, 6)
+
+    def staggered(self, coupling_scheme):
+        initial_step = SyntheticStructTimeStep(self.num_dof, 0., self.coefficients)
+        solver = dynamic_coupled({'dt': self.dt,
+                                  'coupling_scheme': coupling_scheme,
+                                  'aero_subcycles': self.subcycles},
+                                 self.num_dof,
+                                 [initial_step])
+        solver.staggered = True
+        solver.first_ts = 1
+        solver.data.ts = 0
+        solver.aero_solver = RecordingAeroSolver(solver.data)
+
+        def map_forces(aero_kstep, structural_kstep, unsteady_forces_coeff=1.0):
+            structural_kstep.steady_applied_forces[:] = self.aero_forces
+            structural_kstep.unsteady_applied_forces[:] = 0.
+        solver.map_forces = map_forces
+
+        solver.structural_forces = []
+
+        def run_structural_solver(structural_kstep):
+            solver.structural_forces.append((structural_kstep.steady_applied_forces.copy(),
+                                             structural_kstep.unsteady_applied_forces.copy()))
+            structural_kstep.dqdt[:] += 1e-3
+        solver.run_structural_solver = run_structural_solver
+        return solver, initial_step
+
+    def run_steps(self, solver, initial_step, num_steps):
+        for _ in range(num_steps):
+            solver.data.ts += 1
+            solver.staggered_step(initial_step, unittest.mock.Mock())
+            solver.time += self.dt
+
+    def test_css(self):
+        solver, initial_step = self.staggered('css')
+        self.run_steps(solver, initial_step, 2*self.subcycles)
+
+        # one aerodynamic solution per cycle, on the state at the beginning of the cycle
+        self.assertEqual(len(solver.aero_solver.runs), 2)
+        for i_cycle, (q, dt, t) in enumerate(solver.aero_solver.runs):
+            np.testing.assert_array_equal(q, initial_step.q)
+            self.assertAlmostEqual(dt, self.subcycles*self.dt)
+            self.assertAlmostEqual(t, (i_cycle + 1)*self.subcycles*self.dt)
+
+        # one structural solution per step, with the forces interpolated along the cycle
+        self.assertEqual(len(solver.structural_forces), 2*self.subcycles)
+        for i_step, (steady_forces, unsteady_forces) in enumerate(solver.structural_forces):
+            coeff = (i_step % self.subcycles + 1)/self.subcycles
+            np.testing.assert_allclose(steady_forces, (1. - coeff)*initial_step.steady_applied_forces +
+                                       coeff*self.aero_forces)
+            np.testing.assert_allclose(unsteady_forces, (1. - coeff)*initial_step.unsteady_applied_forces)
+
+        # coupling residual at the end of the cycle
+        self.assertTrue(np.isfinite(solver.res_dqdt))
+        self.assertGreater(solver.res_dqdt, 0.)
+
+    def test_gss(self):
+        solver, initial_step = self.staggered('gss')
+        predicted_step = initial_step.copy()
+        predicted_step.q[:] = -1.
+        solver.predict_step = unittest.mock.Mock(return_value=predicted_step)
+        self.run_steps(solver, initial_step, self.subcycles)
+
+        # the aerodynamics are solved on the state predicted at the end of the cycle
+        solver.predict_step.assert_called_once_with(initial_step, self.subcycles*self.dt)
+        self.assertEqual(len(solver.aero_solver.runs), 1)
+        np.testing.assert_array_equal(solver.aero_solver.runs[0][0], predicted_step.q)
+        np.testing.assert_allclose(solver.structural_forces[-1][0], self.aero_forces)
+
+        # without enough converged steps to predict, the state at the beginning of the cycle is used
+        solver, initial_step = self.staggered('gss')
+        solver.predict_step = unittest.mock.Mock(return_value=None)
+        self.run_steps(solver, initial_step, 1)
+        np.testing.assert_array_equal(solver.aero_solver.runs[0][0], initial_step.q)
+
+    def test_aero_time_step(self):
+        # the aerodynamic solver runs with the time step of a whole cycle
+        solver, initial_step = self.staggered('css')
+        solver.set_time_step(None)
+        self.assertAlmostEqual(solver.aero_dt, self.subcycles*self.dt)
+        self.assertAlmostEqual(solver.aero_solver.settings['dt'].value, self.subcycles*self.dt)
+        self.assertAlmostEqual(solver.substep_dt, self.dt)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import numpy as np
+import unittest
+import os
+import shutil
+
+folder = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+name = 'staggered_wing'
+
+
+class TestStaggeredCoupling(unittest.TestCase):
+    """
+    Response of a flexible wing clamped at the root to the sudden start of the flow with the staggered coupling
+    schemes, compared with the strong coupling. The staggered schemes lag the aerodynamic forces by less than a time
+    step, so their response should be close to the strongly coupled one with a short enough time step
+    """
+
+    num_steps = 20
+    num_chord_panels = 4
+    u_inf = 10.
+    chord = 1.
+
+    def setUp(self):
+        import sharpy.utils.generate_cases as gc
+
+        deg2rad = np.pi/180.
+        nnodes = 11
+        span = 16.
+        airfoil = np.zeros((1, 20, 2),)
+        airfoil[0, :, 0] = np.linspace(0., 1., 20)
+
+        wing = gc.AeroelasticInformation()
+        node_pos = np.zeros((nnodes, 3),)
+        node_pos[:, 1] = np.linspace(0., span, nnodes)
+        wing.StructuralInformation.generate_uniform_sym_beam(node_pos, 0.75, 1e-1, 1e7, 1e7, 1e4, 2e4,
+                                                             num_node_elem=3, y_BFoR='x_AFoR', num_lumped_mass=0)
+        wing.StructuralInformation.boundary_conditions[0] = 1
+        wing.StructuralInformation.boundary_conditions[-1] = -1
+        wing.AerodynamicInformation.create_one_uniform_aerodynamics(wing.StructuralInformation,
+                                                                    chord=self.chord,
+                                                                    twist=2.*deg2rad,
+                                                                    sweep=0.,
+                                                                    num_chord_panels=self.num_chord_panels,
+                                                                    m_distribution='uniform',
+                                                                    elastic_axis=0.5,
+                                                                    num_points_camber=20,
+                                                                    airfoil=airfoil)
+
+        SimInfo = gc.SimulationInformation()
+        SimInfo.set_default_values()
+        SimInfo.define_uinf(np.array([1., 0., 0.]), self.u_inf)
+
+        SimInfo.solvers['SHARPy']['flow'] = ['BeamLoader', 'AerogridLoader', 'DynamicCoupled']
+        SimInfo.solvers['SHARPy']['case'] = name
+        SimInfo.solvers['SHARPy']['write_screen'] = 'off'
+        SimInfo.solvers['SHARPy']['route'] = folder + '/'
+        SimInfo.solvers['SHARPy']['log_folder'] = folder + '/output/'
+
+        SimInfo.set_variable_all_dicts('dt', self.chord/self.num_chord_panels/self.u_inf)
+        SimInfo.set_variable_all_dicts('rho', 1.225)
+        SimInfo.set_variable_all_dicts('velocity_field_input', SimInfo.solvers['SteadyVelocityField'])
+        SimInfo.set_variable_all_dicts('folder', folder + '/output/')
+        SimInfo.set_variable_all_dicts('print_info', 'off')
+        SimInfo.define_num_steps(self.num_steps)
+
+        SimInfo.solvers['BeamLoader']['unsteady'] = 'on'
+        SimInfo.solvers['AerogridLoader']['unsteady'] = 'on'
+        SimInfo.solvers['AerogridLoader']['mstar'] = 10*self.num_chord_panels
+
+        SimInfo.solvers['NonLinearDynamicPrescribedStep']['gravity_on'] = 'off'
+        SimInfo.solvers['DynamicCoupled']['structural_solver'] = 'NonLinearDynamicPrescribedStep'
+        SimInfo.solvers['DynamicCoupled']['structural_solver_settings'] = \
+            SimInfo.solvers['NonLinearDynamicPrescribedStep']
+        SimInfo.solvers['DynamicCoupled']['aero_solver'] = 'StepUvlm'
+        SimInfo.solvers['DynamicCoupled']['aero_solver_settings'] = SimInfo.solvers['StepUvlm']
+        SimInfo.solvers['DynamicCoupled']['postprocessors'] = []
+        SimInfo.solvers['DynamicCoupled']['postprocessors_settings'] = dict()
+        SimInfo.with_forced_vel = False
+        SimInfo.with_dynamic_forces = False
+
+        gc.clean_test_files(SimInfo.solvers['SHARPy']['route'], SimInfo.solvers['SHARPy']['case'])
+        SimInfo.generate_dyn_file(self.num_steps)
+        wing.generate_h5_files(SimInfo.solvers['SHARPy']['route'], SimInfo.solvers['SHARPy']['case'])
+        self.SimInfo = SimInfo
+
+    def run_coupling(self, coupling_scheme):
+        """
+        Runs the case with ``coupling_scheme`` and returns the history of the vertical displacement of the tip
+        """
+        import sharpy.sharpy_main
+
+        self.SimInfo.solvers['DynamicCoupled']['coupling_scheme'] = coupling_scheme
+        self.SimInfo.solvers['DynamicCoupled']['aero_subcycles'] = 1
+        self.SimInfo.generate_solver_file()
+        data = sharpy.sharpy_main.main(['', folder + '/' + name + '.solver.txt'])
+        return np.array([tstep.pos[-1, 2] for tstep in data.structure.timestep_info[1:]])
+
+    def test_staggered_schemes(self):
+        tip_strong = self.run_coupling('strong')
+        self.assertEqual(len(tip_strong), self.num_steps)
+        self.assertGreater(np.max(np.abs(tip_strong)), 1e-3)
+
+        for coupling_scheme in ('css', 'gss'):
+            with self.subTest(coupling_scheme=coupling_scheme):
+                tip = self.run_coupling(coupling_scheme)
+                self.assertEqual(len(tip), self.num_steps)
+                np.testing.assert_allclose(tip, tip_strong, rtol=0, atol=5e-2*np.max(np.abs(tip_strong)))
+
+    def tearDown(self):
+        files_to_delete = [name + '.aero.h5',
+                           name + '.dyn.h5',
+                           name + '.fem.h5',
+                           name + '.solver.txt']
+        for f in files_to_delete:
+            try:
+                os.remove(folder + '/' + f)
+            except FileNotFoundError:
+                pass
+
+        try:
+            shutil.rmtree(folder + '/output/')
+        except FileNotFoundError:
+            pass
+
+
+if __name__ == '__main__':
+    unittest.main()
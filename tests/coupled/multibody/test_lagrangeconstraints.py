@@ -0,0 +1,150 @@
+import ctypes as ct
+import os
+import types
+import unittest
+
+import numpy as np
+
+import sharpy.structure.utils.lagrangeconstraints as lagrangeconstraints
+import sharpy.utils.algebra as algebra
+
+route = os.path.dirname(os.path.realpath(__file__))
+reference_file = route + '/src/lagrange_matrices.npz'
+
+
+def multibody_model():
+    """
+    Synthetic system of two free bodies and a body with prescribed motion, with one instance of every constraint
+
+    The states are random, but repeatable, such that all the blocks of the constraints are non-trivial.
+
+    Returns:
+        tuple: ``MB_beam``, ``MB_tstep``, the ``MBdict`` with the constraints, ``Lambda`` and ``Lambda_dot``
+    """
+    rs = np.random.RandomState(20)
+    num_node = 4
+    num_elem = 3
+
+    MB_beam = []
+    MB_tstep = []
+    for movement in ('free', 'free', 'prescribed'):
+        beam = types.SimpleNamespace()
+        beam.FoR_movement = movement
+        beam.num_dof = ct.c_int(6*(num_node - 1))
+        beam.vdof = np.array([-1] + list(range(num_node - 1)))
+        beam.node_master_elem = np.array([[0, 0], [0, 2], [1, 2], [2, 2]])
+        beam.ini_info = types.SimpleNamespace(pos=rs.rand(num_node, 3),
+                                              quat=algebra.unit_vector(rs.rand(4)),
+                                              for_pos=rs.rand(6))
+        MB_beam.append(beam)
+
+        MB_tstep.append(types.SimpleNamespace(pos=rs.rand(num_node, 3),
+                                              pos_dot=rs.rand(num_node, 3),
+                                              psi=0.3*rs.rand(num_elem, 3, 3),
+                                              psi_dot=rs.rand(num_elem, 3, 3),
+                                              quat=algebra.unit_vector(rs.rand(4)),
+                                              for_pos=rs.rand(6),
+                                              for_vel=rs.rand(6)))
+
+    constraints = [{'behaviour': 'hinge_node_FoR', 'node_in_body': 3, 'body': 0, 'body_FoR': 1,
+                    'rot_axisB': np.array([0., 1., 0.])},
+                   {'behaviour': 'hinge_node_FoR_constant_vel', 'node_in_body': 2, 'body': 1, 'body_FoR': 0,
+                    'rot_axisB': np.array([0., 0., 1.]), 'rot_vel': 0.3},
+                   {'behaviour': 'spherical_node_FoR', 'node_in_body': 1, 'body': 2, 'body_FoR': 1},
+                   {'behaviour': 'free'},
+                   {'behaviour': 'spherical_FoR', 'body_FoR': 0},
+                   {'behaviour': 'hinge_FoR', 'body_FoR': 1, 'rot_axis_AFoR': np.array([1., 0., 0.])},
+                   {'behaviour': 'hinge_FoR_wrtG', 'body_FoR': 0, 'rot_axis_AFoR': np.array([0., 0., 1.])},
+                   {'behaviour': 'fully_constrained_node_FoR', 'node_in_body': 2, 'body': 0, 'body_FoR': 1},
+                   {'behaviour': 'constant_rot_vel_FoR', 'FoR_body': 1, 'rot_vel': rs.rand(3)},
+                   {'behaviour': 'constant_vel_FoR', 'FoR_body': 0, 'vel': rs.rand(6)},
+                   {'behaviour': 'lin_vel_node_wrtA', 'body_number': 2, 'node_number': 3, 'velocity': rs.rand(4, 3)},
+                   {'behaviour': 'lin_vel_node_wrtG', 'body_number': 0, 'node_number': 1, 'velocity': rs.rand(3)},
+                   {'behaviour': 'lin_vel_node_wrtG', 'body_number': 2, 'node_number': 2, 'velocity': rs.rand(3)}]
+    MBdict = {'num_constraints': len(constraints)}
+    for iconstraint, constraint in enumerate(constraints):
+        MBdict['constraint_%02d' % iconstraint] = constraint
+
+    num_LM_eq = 5 + 6 + 3 + 0 + 3 + 5 + 5 + 6 + 3 + 6 + 3 + 3 + 3
+    Lambda = rs.rand(num_LM_eq)
+    Lambda_dot = rs.rand(num_LM_eq)
+
+    return MB_beam, MB_tstep, MBdict, Lambda, Lambda_dot
+
+
+class TestLagrangeConstraints(unittest.TestCase):
+    """
+    Compares the sparse assembly of the Lagrange multipliers matrices with the matrices of the original dense
+    implementation, stored in ``src/lagrange_matrices.npz``
+    """
+
+    ts = 2
+    dt = 0.1
+
+    def setUp(self):
+        self.MB_beam, self.MB_tstep, MBdict, self.Lambda, self.Lambda_dot = multibody_model()
+        self.lc_list = lagrangeconstraints.initialize_constraints(MBdict)
+        self.num_LM_eq = lagrangeconstraints.define_num_LM_eq(self.lc_list)
+        self.sys_size = sum([beam.num_dof.value + 10 for beam in self.MB_beam if beam.FoR_movement == 'free']) + \
+            sum([beam.num_dof.value for beam in self.MB_beam if beam.FoR_movement != 'free'])
+        self.reference = np.load(reference_file)
+
+    def generate(self, dynamic_or_static, lc_list=None, patterns=None):
+        if lc_list is None:
+            lc_list = self.lc_list
+        return lagrangeconstraints.generate_lagrange_matrix(lc_list, self.MB_beam, self.MB_tstep, self.ts,
+                                                            self.num_LM_eq, self.sys_size, self.dt,
+                                                            self.Lambda, self.Lambda_dot, dynamic_or_static,
+                                                            patterns)
+
+    def assert_matches_reference(self, LM_C, LM_K, LM_Q, case):
+        for name, value in zip(('C', 'K'), (LM_C, LM_K)):
+            reference = self.reference[case + '_' + name]
+            self.assertEqual(value.shape, reference.shape)
+            np.testing.assert_allclose(value.toarray(), reference, rtol=0, atol=1e-15,
+                                       err_msg='LM_%s of the %s constraints' % (name, case))
+        np.testing.assert_allclose(LM_Q, self.reference[case + '_Q'], rtol=0, atol=1e-15,
+                                   err_msg='LM_Q of the %s constraints' % case)
+
+    def test_dynamic(self):
+        self.assertEqual(self.num_LM_eq, self.reference['dynamic_Q'].shape[0] - self.sys_size)
+        self.assert_matches_reference(*self.generate('dynamic'), 'dynamic')
+
+    def test_static(self):
+        # the static position constraint with respect to G is left out, its definition needs a 3 entry for_pos
+        lc_list = [lc for lc in self.lc_list if lc._lc_id != 'lin_vel_node_wrtG']
+        self.assert_matches_reference(*self.generate('static', lc_list), 'static')
+
+    def test_reuse_patterns(self):
+        patterns = (lagrangeconstraints.SparsityPattern(), lagrangeconstraints.SparsityPattern())
+        self.generate('dynamic', patterns=patterns)
+        indices = patterns[0].indices
+
+        # same layout, new values
+        self.Lambda_dot *= 2.
+        LM_C, LM_K, LM_Q = self.generate('dynamic', patterns=patterns)
+        self.assertIs(patterns[0].indices, indices)
+        LM_C_new, LM_K_new, LM_Q_new = self.generate('dynamic')
+        np.testing.assert_array_equal(LM_C.toarray(), LM_C_new.toarray())
+        np.testing.assert_array_equal(LM_K.toarray(), LM_K_new.toarray())
+        np.testing.assert_array_equal(LM_Q, LM_Q_new)
+
+    def test_sparsity_pattern(self):
+        rs = np.random.RandomState(3)
+        shape = (7, 9)
+        pattern = lagrangeconstraints.SparsityPattern()
+        for layout in ([(0, 0, (2, 3)), (1, 2, (3, 3)), (6, 8, (1, 1))],
+                       [(4, 1, (3, 5)), (4, 1, (2, 2))],
+                       []):
+            blocks = [(row, col, rs.rand(*block_shape)) for row, col, block_shape in layout]
+            dense = np.zeros(shape)
+            for row, col, values in blocks:
+                dense[row:row + values.shape[0], col:col + values.shape[1]] += values
+
+            matrix = pattern.assemble(blocks, shape)
+            np.testing.assert_array_equal(matrix.toarray(), dense)
+            self.assertEqual(matrix.nnz, np.count_nonzero(dense))
+
+
+if __name__ == '__main__':
+    unittest.main()
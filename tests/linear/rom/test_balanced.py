@@ -0,0 +1,103 @@
+"""
+Test low-rank ADI balancing using Hospital Building Model
+"""
+
+import unittest
+import numpy as np
+import scipy.linalg as sclalg
+import scipy.io as scio
+import sharpy.utils.sharpydir as sharpydir
+import sharpy.utils.cout_utils as cout
+import sharpy.linear.src.libss as libss
+import sharpy.linear.src.libsparse as libsp
+import sharpy.rom.balanced as balanced
+import sharpy.rom.utils.librom as librom
+
+
+class TestLowRankADI(unittest.TestCase):
+
+    test_dir = sharpydir.SharpyDir + '/tests/linear/rom'
+
+    def setUp(self):
+        cout.cout_wrap.initialise(False, False)
+        A = scio.loadmat(self.test_dir + '/src/' + 'A.mat')
+        B = scio.loadmat(self.test_dir + '/src/' + 'B.mat')
+        C = scio.loadmat(self.test_dir + '/src/' + 'C.mat')
+        self.A = libsp.csc_matrix(A['A'])
+        self.B = B['B']
+        self.C = C['C']
+        self.D = np.zeros((self.C.shape[0], self.B.shape[1]))
+
+    def test_hankel_singular_values(self):
+        """
+        The dominant Hankel singular values obtained with the low-rank ADI Gramians of the sparse system
+        match those of the direct solution of the Lyapunov equations for both the continuous and discrete time
+        systems.
+        """
+        A_ct = self.A.todense()
+        A_dt = sclalg.expm(0.05 * A_ct)  # zero-order hold discretisation
+        for DLTI, A in zip((False, True), (A_ct, A_dt)):
+            with self.subTest(DLTI=DLTI):
+                hsv_direct = librom.balreal_direct_py(A, self.B, self.C, DLTI=DLTI)[0].real
+                hsv_adi = librom.balreal_lr_adi(libsp.csc_matrix(A), self.B, self.C, DLTI=DLTI, tolADI=1e-12)[0]
+
+                n_check = 10
+                np.testing.assert_allclose(hsv_adi[:n_check], hsv_direct[:n_check], rtol=1e-6)
+
+    def test_balanced_rom(self):
+        ss = libss.ss(self.A, self.B, self.C, self.D)
+
+        rom = balanced.Balanced()
+        rom.initialise({'algorithm': 'LowRankADI',
+                        'algorithm_settings': {'tolSVD': 1e-3}})
+        ssrom = rom.run(ss)
+
+        wv = np.logspace(-1, 2, 50)
+        Y_fom = libss.ss(self.A.todense(), self.B, self.C, self.D).freqresp(wv)
+        Y_rom = ssrom.freqresp(wv)
+
+        self.assertLess(ssrom.states, ss.states)
+        self.assertLess(np.max(np.abs(Y_fom - Y_rom)) / np.max(np.abs(Y_fom)), 1e-2)
+
+
+class TestFrequencyLimited(unittest.TestCase):
+
+    test_dir = sharpydir.SharpyDir + '/tests/linear/rom'
+
+    def setUp(self):
+        cout.cout_wrap.initialise(False, False)
+        A = scio.loadmat(self.test_dir + '/src/' + 'A.mat')
+        B = scio.loadmat(self.test_dir + '/src/' + 'B.mat')
+        C = scio.loadmat(self.test_dir + '/src/' + 'C.mat')
+        dt = 0.02
+        self.A = sclalg.expm(dt * A['A'].toarray())
+        self.A[np.abs(self.A) < 1e-4] = 0.
+        self.B = B['B']
+        self.C = C['C']
+        self.D = np.zeros((self.C.shape[0], self.B.shape[1]))
+        self.dt = dt
+
+    def test_parallel_streaming(self):
+        """
+        Frequency limited balancing of the sparse system in parallel and with the streaming SVD of the Gramian
+        factors returns the same Hankel singular values as the serial solution of the dense system.
+        """
+        balfreq_settings = {'frequency': 20.,
+                            'method_low': 'gauss',
+                            'options_low': {'partitions': 2, 'order': 6},
+                            'method_high': 'gauss',
+                            'options_high': {'partitions': 2, 'order': 4},
+                            'check_stability': False}
+
+        hsv_ref = librom.balfreq(libss.ss(self.A, self.B, self.C, self.D, dt=self.dt), balfreq_settings.copy())[1]
+
+        balfreq_settings.update({'Ncpu': 2, 'streaming_svd': True})
+        hsv = librom.balfreq(libss.ss(libsp.csc_matrix(self.A), self.B, self.C, self.D, dt=self.dt),
+                             balfreq_settings)[1]
+
+        n_check = 10
+        np.testing.assert_allclose(hsv[:n_check], hsv_ref[:n_check], rtol=1e-8)
+
+
+if __name__ == '__main__':
+    unittest.main()
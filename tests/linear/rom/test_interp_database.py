@@ -0,0 +1,69 @@
+"""
+Test ROM database and interpolation
+"""
+
+import os
+import unittest
+import numpy as np
+import scipy.linalg as sclalg
+import sharpy.utils.sharpydir as sharpydir
+import sharpy.linear.src.libss as libss
+import sharpy.rom.utils.librom as librom
+import sharpy.rom.utils.librom_interp as librom_interp
+
+
+class TestROMDatabase(unittest.TestCase):
+
+    test_dir = sharpydir.SharpyDir + '/tests/linear/rom'
+
+    def setUp(self):
+        np.random.seed(10)
+        Nx, Nu, Ny = 12, 2, 3
+        self.A0 = 0.6 * sclalg.orth(np.random.rand(Nx, Nx))
+        self.A1 = 0.2 * np.random.rand(Nx, Nx) / Nx
+        self.B = np.random.rand(Nx, Nu)
+        self.C = np.random.rand(Ny, Nx)
+        self.D = np.zeros((Ny, Nu))
+        self.dt = 0.1
+        self.params = np.linspace(0., 1., 5)
+
+        # balanced ROMs over the parameter grid
+        self.SS, self.VV, self.WWT = [], [], []
+        for param in self.params:
+            A = self.A0 + param * self.A1
+            hsv, T, Tinv = librom.balreal_direct_py(A, self.B, self.C, DLTI=True)
+            self.SS.append(libss.ss(np.dot(Tinv, np.dot(A, T)), np.dot(Tinv, self.B), np.dot(self.C, T), self.D,
+                                    dt=self.dt))
+            self.VV.append(T)
+            self.WWT.append(Tinv)
+
+        self.filename = self.test_dir + '/rom_database.h5'
+        librom_interp.save_rom_database(self.filename, self.params, self.SS, self.VV, self.WWT,
+                                        Vref=self.VV[0], WTref=self.WWT[0])
+
+    def test_interpolation(self):
+        """
+        The transfer function interpolation of the ROMs stored in the database matches the frequency response of the
+        weighted sum of the neighbouring ROMs, while the matrix interpolation recovers the ROMs at the grid points.
+        """
+        wv = np.linspace(0.1, 10., 20)
+        with librom_interp.ROMDatabase(self.filename, cache_size=2) as database:
+            interp = librom_interp.InterpROMDatabase(database, method_proj='strongMAC_BT')
+
+            param = 0.6
+            indices, weights = interp.weights(param)
+            np.testing.assert_array_equal(np.sort(indices), [2, 3])
+
+            Y_ref = libss.join([self.SS[ii] for ii in indices], weights).freqresp(wv)
+            np.testing.assert_allclose(interp.transfer_function(param, wv), Y_ref, atol=1e-10)
+
+            ss_grid = interp(self.params[3])
+            Y_grid = ss_grid.freqresp(wv)
+            np.testing.assert_allclose(Y_grid, self.SS[3].freqresp(wv), atol=1e-8)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,6 +10,7 @@ import scipy.io as scio
 import sharpy.utils.sharpydir as sharpydir
 import sharpy.linear.src.libss as libss
 import sharpy.rom.krylov as krylov
+import sharpy.rom.utils.krylovutils as krylovutils
 import sharpy.linear.src.libsparse as libsp
 import sharpy.postproc.frequencyresponse as frequencyresponse
 
@@ -78,9 +79,82 @@ class TestKrylov(unittest.TestCase):
                                  'frequency': algorithm_list[algorithm]['frequency']}
                 self.run_test(test_settings)
 
+    def test_krylov_parallel(self):
+        ortho_list = ['mgs', 'block_cgs']
+        for ortho in ortho_list:
+            with self.subTest(orthogonalisation=ortho):
+                test_settings = {'algorithm': 'mimo_rational_arnoldi',
+                                 'r': 16,
+                                 'frequency': np.array([1.0j, 10.0j]),
+                                 'parallel': True,
+                                 'num_cores': 2,
+                                 'orthogonalisation': ortho}
+                self.run_test(test_settings)
+
+    def test_warm_start(self):
+        test_settings = {'algorithm': 'mimo_rational_arnoldi',
+                         'r': 4,
+                         'frequency': np.array([1.0j, 10.0j]),
+                         'warm_start': True,
+                         'warm_start_tolerance': 1e-3}
+        self.rom.initialise(test_settings)
+        self.rom.run(self.ss)
+        cached_bases = [point_bases[3] for point_bases in self.rom.point_bases]
+        V = self.rom.V
+
+        # the point within the tolerance of a cached one reuses its basis, the others are built
+        test_settings['frequency'] = np.array([1.0005j, 10.1j])
+        self.rom.initialise(test_settings)
+        self.rom.run(self.ss)
+        self.assertIs(self.rom.point_bases[0][3], cached_bases[0])
+        self.assertIsNot(self.rom.point_bases[1][3], cached_bases[1])
+        self.assertEqual(self.rom.point_bases[0][2], 1.0005j)
+        np.testing.assert_array_equal(self.rom.V[:, :cached_bases[0][0].shape[1]], V[:, :cached_bases[0][0].shape[1]])
+
+        # a different basis specification is not reused
+        test_settings['r'] = 3
+        self.rom.initialise(test_settings)
+        self.rom.run(self.ss)
+        self.assertIsNot(self.rom.point_bases[0][3], cached_bases[0])
+
     def tearDown(self):
         import shutil
         shutil.rmtree(self.test_dir + '/figs/')
 
+
+class TestBlockCGS(unittest.TestCase):
+
+    def setUp(self):
+        rs = np.random.RandomState(4)
+        self.n = 60
+        self.Q = np.linalg.qr(rs.randn(self.n, 8) + 1j*rs.randn(self.n, 8))[0]
+        # nearly dependent columns, as those of a Krylov space
+        A = np.diag(np.linspace(1., 1.05, self.n))
+        x = rs.randn(self.n)
+        self.X = np.column_stack([np.linalg.matrix_power(A, k).dot(x) for k in range(6)])
+
+    def assert_orthonormal(self, Q):
+        np.testing.assert_allclose(Q.conj().T.dot(Q), np.eye(Q.shape[1]), rtol=0, atol=1e-12)
+
+    def test_orthonormalise(self):
+        Q = krylovutils.block_cgs_ortho(self.X)
+        self.assertEqual(Q.shape, self.X.shape)
+        self.assert_orthonormal(Q)
+        np.testing.assert_allclose(Q.dot(Q.conj().T.dot(self.X)), self.X, atol=1e-10*np.max(np.abs(self.X)))
+
+    def test_append(self):
+        Q = krylovutils.block_cgs_ortho(self.X, self.Q)
+        self.assertEqual(Q.shape, (self.n, 14))
+        # the existing basis is kept and extended with orthonormal columns spanning the block
+        np.testing.assert_array_equal(Q[:, :8], self.Q)
+        self.assert_orthonormal(Q)
+        np.testing.assert_allclose(Q.dot(Q.conj().T.dot(self.X)), self.X, atol=1e-10*np.max(np.abs(self.X)))
+
+    def test_deflation(self):
+        X = np.column_stack((self.X[:, 0], self.Q.dot(np.arange(1., 9.)), self.X[:, 1]))
+        Q = krylovutils.block_cgs_ortho(X, self.Q, deflation_tolerance=1e-10)
+        self.assertEqual(Q.shape, (self.n, 10))
+        self.assert_orthonormal(Q)
+
 if __name__ == '__main__':
     unittest.main()
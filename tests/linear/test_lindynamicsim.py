@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+import types
+import unittest
+
+import h5py as h5
+import numpy as np
+
+import sharpy.utils.settings as settings
+from sharpy.solvers.lindynamicsim import LinDynamicSim
+from sharpy.linear.utils.ss_interface import state_indices
+from sharpy.utils.datastructures import LinearTimeSeries
+
+
+def variable(first, size):
+    return types.SimpleNamespace(cols_loc=np.arange(first, first + size))
+
+
+class TestLinearTimeSeries(unittest.TestCase):
+
+    def setUp(self):
+        n_tsteps = 5
+        self.t = np.linspace(0, 1, n_tsteps)
+        self.x = np.random.rand(n_tsteps, 4)
+        self.y = np.random.rand(n_tsteps, 3)
+        self.u = np.random.rand(n_tsteps, 2)
+        self.series = LinearTimeSeries(self.t, self.x, self.y, self.u)
+
+    def test_views(self):
+        self.assertEqual(len(self.series), 5)
+        tstep = self.series[2]
+        np.testing.assert_array_equal(tstep.x, self.x[2])
+        np.testing.assert_array_equal(tstep.y, self.y[2])
+        np.testing.assert_array_equal(tstep.u, self.u[2])
+        self.assertEqual(tstep.t, self.t[2])
+
+        # the time steps are views of the rows of the results, not copies
+        self.assertTrue(np.shares_memory(tstep.x, self.x))
+        tstep.x[0] = -1.
+        self.assertEqual(self.x[2, 0], -1.)
+
+    def test_iteration(self):
+        np.testing.assert_array_equal(np.array([tstep.x for tstep in self.series]), self.x)
+        self.assertEqual(self.series[-1].t, self.t[-1])
+        np.testing.assert_array_equal([tstep.t for tstep in self.series[1:4]], self.t[1:4])
+
+
+class TestStateIndices(unittest.TestCase):
+
+    def test_single_system(self):
+        linear_system = types.SimpleNamespace(state_variables={'eta': variable(0, 3), 'eta_dot': variable(3, 3)})
+        self.assertIsNone(state_indices(linear_system, 6))
+        np.testing.assert_array_equal(state_indices(linear_system, 6, ['eta_dot'], [4, 0]), [0, 3, 4, 5])
+
+        with self.assertRaises(KeyError):
+            state_indices(linear_system, 6, ['gamma'])
+
+    def test_aeroelastic_system(self):
+        # 2 gust states, 4 aerodynamic states and 4 structural states
+        uvlm = types.SimpleNamespace(gust_assembler=types.SimpleNamespace(ss_gust=types.SimpleNamespace(states=2)),
+                                     state_variables={'gamma': variable(0, 2), 'gamma_w': variable(2, 2)})
+        beam = types.SimpleNamespace(ss=types.SimpleNamespace(states=4),
+                                     state_variables={'eta': variable(0, 2), 'eta_dot': variable(2, 2)})
+        linear_system = types.SimpleNamespace(uvlm=uvlm, beam=beam)
+
+        np.testing.assert_array_equal(state_indices(linear_system, 10, ['gamma_w', 'eta']), [4, 5, 6, 7])
+
+
+class TestLinDynamicSimOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        linear_system = types.SimpleNamespace(state_variables={'eta': variable(0, 3), 'eta_dot': variable(3, 3)})
+
+        self.solver = LinDynamicSim()
+        self.solver.data = types.SimpleNamespace(linear=types.SimpleNamespace(linear_system=linear_system))
+        self.solver.folder = self.folder
+
+        n_tsteps = 20
+        self.t = np.linspace(0, 1, n_tsteps)
+        self.x = np.random.rand(n_tsteps, 6)
+        self.y = np.random.rand(n_tsteps, 4)
+        self.u = np.random.rand(n_tsteps, 2)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write(self, custom_settings):
+        self.solver.settings = custom_settings
+        settings.to_custom_types(self.solver.settings, LinDynamicSim.settings_types, LinDynamicSim.settings_default)
+        self.solver.write_output(self.t, self.x, self.y, self.u)
+
+    def test_h5(self):
+        self.write({'write_dat': ['t', 'x', 'y'],
+                    'output_format': 'h5',
+                    'x_variables': ['eta_dot'],
+                    'x_indices': [1],
+                    'y_indices': [0, 2]})
+
+        with h5.File(self.folder + '/lindynamicsim.h5', 'r') as h5file:
+            self.assertNotIn('u', h5file)
+            self.assertEqual(h5file['x'].compression, 'gzip')
+            np.testing.assert_array_equal(h5file['t'][()], self.t)
+            np.testing.assert_array_equal(h5file['x_indices'][()], [1, 3, 4, 5])
+            np.testing.assert_array_equal(h5file['x'][()], self.x[:, [1, 3, 4, 5]])
+            np.testing.assert_array_equal(h5file['y_indices'][()], [0, 2])
+            np.testing.assert_array_equal(h5file['y'][()], self.y[:, [0, 2]])
+
+    def test_h5_single_precision(self):
+        self.write({'write_dat': ['x', 'u'],
+                    'output_format': 'h5',
+                    'compression': 'lzf',
+                    'compress_float': True})
+
+        with h5.File(self.folder + '/lindynamicsim.h5', 'r') as h5file:
+            self.assertNotIn('x_indices', h5file)
+            self.assertEqual(h5file['x'].dtype, np.float32)
+            self.assertEqual(h5file['u'].compression, 'lzf')
+            np.testing.assert_allclose(h5file['x'][()], self.x, rtol=1e-7)
+
+    def test_dat(self):
+        self.write({'write_dat': ['x', 'y'],
+                    'x_indices': [0, 5]})
+
+        self.assertFalse(os.path.isfile(self.folder + '/u_out.dat'))
+        np.testing.assert_allclose(np.loadtxt(self.folder + '/x_out.dat'), self.x[:, [0, 5]])
+        np.testing.assert_allclose(np.loadtxt(self.folder + '/y_out.dat'), self.y)
+
+
+if __name__ == '__main__':
+    unittest.main()
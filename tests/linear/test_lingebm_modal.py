@@ -0,0 +1,137 @@
+import unittest
+
+import numpy as np
+import scipy.linalg as sclalg
+import scipy.signal as scsig
+
+import sharpy.linear.src.libss as libss
+import sharpy.linear.src.lingebm as lingebm
+
+
+def spring_mass_chain(num_dof):
+    """
+    Mass, damping and stiffness matrices of a clamped chain of springs, dampers and masses
+    """
+    k_db = np.linspace(1, 10, num_dof)
+    m_db = np.logspace(1, 0, num_dof)
+    c_db = 0.05*np.ones(num_dof)
+
+    M = np.diag(m_db)
+    K = np.zeros((num_dof, num_dof))
+    C = np.zeros((num_dof, num_dof))
+    for i in range(num_dof):
+        K[i, i] += k_db[i]
+        C[i, i] += c_db[i]
+        if i < num_dof - 1:
+            K[i:i + 2, i:i + 2] += k_db[i + 1]*np.array([[1., -1.], [-1., 1.]])
+            C[i:i + 2, i:i + 2] += c_db[i + 1]*np.array([[1., -1.], [-1., 1.]])
+    return M, C, K
+
+
+class TestFlexDynamicModalProjection(unittest.TestCase):
+    """
+    Compares the modal assembly of ``FlexDynamic``, which applies the nodal gains blockwise after the system is
+    built in modal coordinates, with the explicit projection of the nodal gains
+    """
+
+    num_dof = 8
+    num_modes = 4
+    dt = 0.05
+
+    def setUp(self):
+        M, C, K = spring_mass_chain(self.num_dof)
+        _, U = sclalg.eigh(K, M)
+
+        # the beam is built directly from the matrices, bypassing the structural timestep info
+        beam = lingebm.FlexDynamic.__new__(lingebm.FlexDynamic)
+        beam.Mstr, beam.Cstr, beam.Kstr = M, C, K
+        beam.U = U
+        beam.Ccut = None
+        beam.num_dof = self.num_dof
+        beam._num_modes = self.num_modes
+        beam.modal = True
+        beam.proj_modes = 'undamped'
+        beam.inout_coords = 'nodes'
+        beam.dt = self.dt
+        beam.newmark_damp = 1e-4
+        beam.SScont = None
+        beam.SSdisc = None
+        beam.Kin = None
+        beam.Kout = None
+        self.beam = beam
+
+        self.Phi = U[:, :self.num_modes]
+        self.Mmodal = self.Phi.T.dot(M.dot(self.Phi))
+        self.Cmodal = self.Phi.T.dot(C.dot(self.Phi))
+        self.Kmodal = self.Phi.T.dot(K.dot(self.Phi))
+
+    def nodal_gains(self, ss):
+        ss = libss.addGain(ss, self.Phi.T, 'in')
+        return libss.addGain(ss, sclalg.block_diag(self.Phi, self.Phi), 'out')
+
+    def assert_ss_equal(self, ss, ss_ref):
+        for matrix in ('A', 'B', 'C', 'D'):
+            np.testing.assert_allclose(getattr(ss, matrix), getattr(ss_ref, matrix), rtol=1e-10, atol=1e-12,
+                                       err_msg='Matrix %s' % matrix)
+        self.assertEqual(ss.dt, ss_ref.dt)
+
+    def test_set_modal_gains(self):
+        self.beam.set_modal_gains(self.Phi)
+        np.testing.assert_array_equal(self.beam.Kin, self.Phi.T)
+
+        # the output gain is only formed when accessed
+        self.assertIsNone(self.beam._Kout)
+        np.testing.assert_array_equal(self.beam.Kout, sclalg.block_diag(self.Phi, self.Phi))
+
+        # an explicit output gain replaces the modal one
+        Kout = np.random.rand(3, 2*self.num_modes)
+        self.beam.Kout = Kout
+        self.assertIs(self.beam.Kout, Kout)
+        self.beam.Kout = None
+        self.assertIsNone(self.beam.Kout)
+
+    def test_project_modal_gains(self):
+        rs = np.random.RandomState(1)
+        n_states = 2*self.num_modes
+        ss = libss.ss(rs.rand(n_states, n_states), rs.rand(n_states, self.num_modes),
+                      rs.rand(n_states, n_states), rs.rand(n_states, self.num_modes), dt=self.dt)
+
+        self.beam.set_modal_gains(self.Phi)
+        self.assert_ss_equal(self.beam.project_modal_gains(ss), self.nodal_gains(ss))
+
+        # explicit gains are applied as they are
+        Kout = rs.rand(3, n_states)
+        self.beam.Kout = Kout
+        ss_ref = libss.addGain(libss.addGain(ss, self.Phi.T, 'in'), Kout, 'out')
+        self.assert_ss_equal(self.beam.project_modal_gains(ss), ss_ref)
+
+    def test_newmark(self):
+        self.beam.dlti = True
+        self.beam.discr_method = 'newmark'
+        self.beam.assemble()
+
+        Ass, Bss, Css, Dss = lingebm.newmark_ss(np.linalg.inv(self.Mmodal), self.Cmodal, self.Kmodal,
+                                                self.dt, self.beam.newmark_damp)
+        self.assert_ss_equal(self.beam.SSdisc, self.nodal_gains(libss.ss(Ass, Bss, Css, Dss, dt=self.dt)))
+        self.assertIsNone(self.beam.Kin)
+        self.assertIsNone(self.beam.Kout)
+
+    def test_zoh(self):
+        self.beam.dlti = True
+        self.beam.discr_method = 'zoh'
+        self.beam.assemble()
+
+        # continuous time system with the modes normalised by the mass matrix
+        n = self.num_modes
+        Ass = np.block([[np.zeros((n, n)), np.eye(n)], [-self.Kmodal, -self.Cmodal]])
+        Bss = np.vstack((np.zeros((n, n)), np.eye(n)))
+        ss_cont = self.nodal_gains(libss.ss(Ass, Bss, np.eye(2*n), np.zeros((2*n, n))))
+        self.assert_ss_equal(self.beam.SScont, ss_cont)
+
+        ss_disc = scsig.cont2discrete((ss_cont.A, ss_cont.B, ss_cont.C, ss_cont.D), dt=self.dt, method='zoh')
+        self.assert_ss_equal(self.beam.SSdisc, libss.ss(*ss_disc[:-1], dt=ss_disc[-1]))
+        self.assertEqual(self.beam.inout_coords, 'nodes')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import unittest
+
+import numpy as np
+
+import sharpy.utils.h5utils as h5utils
+import sharpy.linear.src.linuvlm as linuvlm
+
+
+class TestUVLMFrequencyResponse(unittest.TestCase):
+    """
+    Frequency response of the linear UVLM with the wake condensed at each frequency, compared with that of the full
+    state-space model, on a two-surface wing with a short wake
+    """
+
+    kv = np.array([0., 0.3, 1., 5.])
+
+    def setUp(self):
+        fname = os.path.abspath(os.path.dirname(os.path.realpath(__file__))) + \
+                '/../assembly/h5input/goland_mod_Nsurf02_M003_N004_a040.aero_state.h5'
+        self.tsdata = h5utils.readh5(fname).ts00000
+
+    def linear_uvlm(self, integr_order, remove_predictor, uvlm_type=linuvlm.Dynamic):
+        uvlm = uvlm_type(self.tsdata,
+                         dynamic_settings={'dt': 0.1,
+                                           'integr_order': integr_order,
+                                           'density': 1.225,
+                                           'ScalingDict': {'length': 1., 'speed': 1., 'density': 1.},
+                                           'remove_predictor': remove_predictor,
+                                           'use_sparse': True})
+        uvlm.assemble_ss()
+        return uvlm
+
+    def test_condensed_wake(self):
+        for integr_order in (1, 2):
+            for remove_predictor in (True, False):
+                with self.subTest(integr_order=integr_order, remove_predictor=remove_predictor):
+                    uvlm = self.linear_uvlm(integr_order, remove_predictor)
+                    Y = uvlm.freqresp(self.kv)
+                    Y_ref = uvlm.SS.freqresp(self.kv)
+                    np.testing.assert_allclose(Y, Y_ref, rtol=0, atol=1e-10*np.max(np.abs(Y_ref)))
+
+                    # the frequencies can be distributed over threads
+                    np.testing.assert_allclose(uvlm.freqresp(self.kv, Ncpu=2), Y, rtol=0, atol=0)
+
+    def test_block_realisation(self):
+        uvlm = self.linear_uvlm(2, True, linuvlm.DynamicBlock)
+        Y_ref = self.linear_uvlm(2, True).SS.freqresp(self.kv)
+        np.testing.assert_allclose(uvlm.freqresp(self.kv), Y_ref, rtol=0, atol=1e-10*np.max(np.abs(Y_ref)))
+
+    def test_cached_blocks(self):
+        uvlm = self.linear_uvlm(2, True)
+        blocks = uvlm.get_freqresp_blocks()
+        self.assertIs(uvlm.get_freqresp_blocks(), blocks)
+
+        # the blocks are condensed again if the state-space matrices are reassigned
+        uvlm.SS.A = uvlm.SS.A.copy()
+        self.assertIsNot(uvlm.get_freqresp_blocks(), blocks)
+
+
+if __name__ == '__main__':
+    unittest.main()
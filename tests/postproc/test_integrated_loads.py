@@ -0,0 +1,197 @@
+import os
+import shutil
+import types
+import unittest
+import unittest.mock
+
+import numpy as np
+
+import sharpy.utils.algebra as algebra
+
+
+def reference_forces(data, ts):
+    """
+    Total forces of each surface at the time step ``ts`` with the panel by panel summation previously used by
+    ``AeroForcesCalculator``
+    """
+    rot = algebra.quat2rotation(data.structure.timestep_info[ts].quat)
+    force = data.aero.timestep_info[ts].forces
+    unsteady_force = data.aero.timestep_info[ts].dynamic_forces
+    n_surf = len(force)
+    forces = {name: np.zeros((n_surf, 3)) for name in ['inertial_steady_forces', 'inertial_unsteady_forces',
+                                                       'body_steady_forces', 'body_unsteady_forces']}
+    for i_surf in range(n_surf):
+        total_steady_force = np.zeros((3,))
+        total_unsteady_force = np.zeros((3,))
+        _, n_rows, n_cols = force[i_surf].shape
+        for i_m in range(n_rows):
+            for i_n in range(n_cols):
+                total_steady_force += force[i_surf][0:3, i_m, i_n]
+                total_unsteady_force += unsteady_force[i_surf][0:3, i_m, i_n]
+        forces['inertial_steady_forces'][i_surf, :] = total_steady_force
+        forces['inertial_unsteady_forces'][i_surf, :] = total_unsteady_force
+        forces['body_steady_forces'][i_surf, :] = np.dot(rot.T, total_steady_force)
+        forces['body_unsteady_forces'][i_surf, :] = np.dot(rot.T, total_unsteady_force)
+    return forces
+
+
+class TestAeroForcesCalculator(unittest.TestCase):
+    """
+    The forces integrated at once over all the time steps are those of the panel by panel summation, both offline and
+    when the time steps are processed as they are added
+    """
+
+    route_test_dir = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+    output_dir = route_test_dir + '/output/'
+    case = 'integrated_forces'
+
+    n_tsteps = 4
+    dimensions = [(3, 4), (2, 5)]
+
+    def setUp(self):
+        rs = np.random.RandomState(11)
+        structure_tsteps = []
+        aero_tsteps = []
+        for _ in range(self.n_tsteps):
+            quat = rs.randn(4)
+            structure_tsteps.append(types.SimpleNamespace(quat=quat/np.linalg.norm(quat)))
+            aero_tstep = types.SimpleNamespace()
+            aero_tstep.forces = [rs.randn(6, m + 1, n + 1) for m, n in self.dimensions]
+            aero_tstep.dynamic_forces = [rs.randn(6, m + 1, n + 1) for m, n in self.dimensions]
+            for name in ['inertial_steady_forces', 'inertial_unsteady_forces',
+                         'body_steady_forces', 'body_unsteady_forces']:
+                setattr(aero_tstep, name, np.zeros((len(self.dimensions), 6)))
+            aero_tsteps.append(aero_tstep)
+
+        self.data = types.SimpleNamespace(ts=self.n_tsteps - 1,
+                                          settings={'SHARPy': {'case': self.case}},
+                                          structure=types.SimpleNamespace(settings={'unsteady': True},
+                                                                          timestep_info=structure_tsteps),
+                                          aero=types.SimpleNamespace(timestep_info=aero_tsteps))
+
+    def forces_calculator(self):
+        from sharpy.postproc.aeroforcescalculator import AeroForcesCalculator
+
+        calculator = AeroForcesCalculator()
+        calculator.initialise(self.data, {'folder': self.output_dir,
+                                          'write_text_file': True,
+                                          'text_file_name': 'forces.txt',
+                                          'screen_output': False})
+        return calculator
+
+    def assert_forces(self):
+        for ts in range(self.n_tsteps):
+            for name, forces in reference_forces(self.data, ts).items():
+                np.testing.assert_allclose(getattr(self.data.aero.timestep_info[ts], name)[:, 0:3], forces,
+                                           rtol=1e-12, atol=1e-12, err_msg=name)
+
+    def test_offline(self):
+        calculator = self.forces_calculator()
+        calculator.run()
+        self.assert_forces()
+
+        # one line per time step with the sum over the surfaces
+        force_matrix = np.loadtxt(calculator.folder, delimiter=',')
+        np.testing.assert_array_equal(force_matrix[:, 0], np.arange(self.n_tsteps))
+        for ts in range(self.n_tsteps):
+            forces = reference_forces(self.data, ts)
+            np.testing.assert_allclose(force_matrix[ts, 1:],
+                                       np.concatenate([np.sum(forces[name], axis=0) for name in
+                                                       ['inertial_steady_forces', 'inertial_unsteady_forces',
+                                                        'body_steady_forces', 'body_unsteady_forces']]),
+                                       rtol=1e-6)
+
+    def test_online(self):
+        calculator = self.forces_calculator()
+        calculator.run()
+        offline_output = np.loadtxt(calculator.folder, delimiter=',')
+
+        # the time steps are added one by one during the simulation
+        aero_tsteps = self.data.aero.timestep_info
+        calculator = self.forces_calculator()
+        for ts in range(self.n_tsteps):
+            self.data.aero.timestep_info = aero_tsteps[:ts + 1]
+            calculator.run(online=True)
+            # without new time steps, nothing is processed
+            calculator.run(online=True)
+        self.assert_forces()
+        np.testing.assert_array_equal(np.loadtxt(calculator.folder, delimiter=','), offline_output)
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+
+class TestBeamLoads(unittest.TestCase):
+    """
+    The element coordinates computed at once for all the time steps are those of the element by element loop
+    previously used by ``BeamLoads``, and each time step is written to its own file
+    """
+
+    route_test_dir = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+    output_dir = route_test_dir + '/output/'
+    case = 'beam_loads'
+
+    n_tsteps = 3
+    num_node = 9
+    num_elem = 4
+
+    def setUp(self):
+        rs = np.random.RandomState(12)
+        self.connectivities = np.array([[2*i_elem, 2*i_elem + 2, 2*i_elem + 1] for i_elem in range(self.num_elem)])
+        self.loads = [rs.randn(self.num_elem, 6) for _ in range(self.n_tsteps)]
+        timestep_info = [types.SimpleNamespace(pos=rs.randn(self.num_node, 3),
+                                               psi=rs.randn(self.num_elem, 3, 3),
+                                               num_elem=self.num_elem,
+                                               postproc_cell=dict())
+                         for _ in range(self.n_tsteps)]
+        self.data = types.SimpleNamespace(case_name=self.case,
+                                          structure=types.SimpleNamespace(timestep_info=timestep_info,
+                                                                          connectivities=self.connectivities,
+                                                                          beam_number=np.zeros((self.num_elem,),
+                                                                                               dtype=int)))
+        os.makedirs(self.output_dir + self.case + '/beam/')
+
+    def run_beam_loads(self, online=False):
+        from sharpy.postproc.beamloads import BeamLoads
+
+        def cbeam3_loads(structure, it):
+            return -self.loads[it], self.loads[it]
+
+        beam_loads = BeamLoads()
+        beam_loads.initialise(self.data, {'folder': self.output_dir,
+                                          'csv_output': True})
+        with unittest.mock.patch('sharpy.postproc.beamloads.xbeamlib.cbeam3_loads', side_effect=cbeam3_loads):
+            beam_loads.run(online=online)
+
+    def reference_coords(self, tstep):
+        coords_a = np.zeros((tstep.num_elem, 3))
+        for ielem in range(tstep.num_elem):
+            iglobal_node = self.connectivities[ielem, 2]
+            coords_a[ielem, :] = tstep.pos[iglobal_node, :]
+        return coords_a
+
+    def assert_output(self, it):
+        tstep = self.data.structure.timestep_info[it]
+        np.testing.assert_array_equal(tstep.postproc_cell['coords_a'], self.reference_coords(tstep))
+        np.testing.assert_array_equal(tstep.postproc_cell['loads'], self.loads[it])
+
+        output = np.loadtxt(self.output_dir + self.case + '/beam/beam_loads_%d.csv' % it, delimiter=',')
+        np.testing.assert_allclose(output[:, 0:3], self.reference_coords(tstep))
+        np.testing.assert_allclose(output[:, 4:10], self.loads[it])
+
+    def test_offline(self):
+        self.run_beam_loads()
+        for it in range(self.n_tsteps):
+            self.assert_output(it)
+
+    def test_online(self):
+        self.run_beam_loads(online=True)
+        self.assert_output(self.n_tsteps - 1)
+        self.assertNotIn('loads', self.data.structure.timestep_info[0].postproc_cell)
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
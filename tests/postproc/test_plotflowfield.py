@@ -0,0 +1,162 @@
+import os
+import shutil
+import threading
+import time
+import types
+import unittest
+import unittest.mock
+
+import numpy as np
+
+from sharpy.utils.datastructures import AeroTimeStepInfo
+import sharpy.aero.utils.flowprobe as flowprobe
+
+
+def aero_time_step(gamma):
+    """
+    Aerodynamic time step with a flat lattice of 2x3 panels and a wake of 4 rows within the box ``[0, 3]x[0, 1]``,
+    with uniform circulation ``gamma``
+    """
+    aero_tstep = AeroTimeStepInfo(np.array([[2, 3]]), np.array([[4, 3]]))
+    aero_tstep.zeta[0][0, :, :] = np.linspace(0., 1., 3)[:, None]
+    aero_tstep.zeta[0][1, :, :] = np.linspace(0., 1., 4)[None, :]
+    aero_tstep.zeta_star[0][0, :, :] = np.linspace(1., 3., 5)[:, None]
+    aero_tstep.zeta_star[0][1, :, :] = np.linspace(0., 1., 4)[None, :]
+    aero_tstep.gamma[0][:] = gamma
+    aero_tstep.gamma_star[0][:] = gamma
+    return aero_tstep
+
+
+def induced_velocity(ts_info, target_triads, for_pos=np.zeros((6,)), ncores=None):
+    """
+    Replacement of the UVLM library call: the induced velocity is the circulation of the lattice times the
+    coordinates of the points
+    """
+    return ts_info.gamma[0][0, 0]*target_triads
+
+
+class TestFlowProbe(unittest.TestCase):
+
+    points = np.array([[0.5, 0.5, 0.],
+                       [2., 0.5, 0.5],
+                       [5., 0.5, 0.],
+                       [0.5, 0.5, -2.]])
+
+    def setUp(self):
+        self.aero_tstep = aero_time_step(2.)
+
+    def test_points(self):
+        probe = flowprobe.FlowProbe(np.asfortranarray(self.points))
+        self.assertTrue(probe.points.flags['C_CONTIGUOUS'])
+        self.assertEqual(probe.n_points, 4)
+        np.testing.assert_array_equal(probe.points, self.points)
+
+    def test_bounding_box(self):
+        bbox_min, bbox_max = flowprobe.lattice_bounding_box(self.aero_tstep)
+        np.testing.assert_array_equal(bbox_min, [0., 0., 0.])
+        np.testing.assert_array_equal(bbox_max, [3., 1., 0.])
+
+    def test_cutoff(self):
+        probe = flowprobe.FlowProbe(self.points, cutoff=1.)
+        np.testing.assert_array_equal(probe.active_points(self.aero_tstep), [True, True, False, False])
+        # the lattice is displaced with the A frame
+        np.testing.assert_array_equal(probe.active_points(self.aero_tstep, np.array([0., 0., -2.])),
+                                      [False, False, False, True])
+        # without cutoff all the points are active
+        self.assertTrue(np.all(flowprobe.FlowProbe(self.points).active_points(self.aero_tstep)))
+
+    def test_induced_velocity(self):
+        with unittest.mock.patch('sharpy.aero.utils.uvlmlib.uvlm_calculate_total_induced_velocity_at_points',
+                                 side_effect=induced_velocity) as library:
+            u_ind = flowprobe.FlowProbe(self.points, cutoff=1.).induced_velocity(self.aero_tstep)
+            # only the active points are sent to the library
+            np.testing.assert_array_equal(library.call_args[0][1], self.points[:2, :])
+            np.testing.assert_array_equal(u_ind, np.concatenate((2.*self.points[:2, :], np.zeros((2, 3)))))
+
+            library.reset_mock()
+            u_ind = flowprobe.FlowProbe(self.points[2:, :], cutoff=1.).induced_velocity(self.aero_tstep)
+            library.assert_not_called()
+            np.testing.assert_array_equal(u_ind, np.zeros((2, 3)))
+
+
+class TestPlotFlowField(unittest.TestCase):
+    """
+    The velocities at the probes computed asynchronously, while the aerodynamic time steps are modified by the
+    solver, are those computed synchronously
+    """
+
+    route_test_dir = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+    case = 'flow_field'
+    n_tsteps = 4
+    probe_points = [0.5, 0.5, 0.1, 2., 0.5, 0.5]
+
+    def setUp(self):
+        self.data = types.SimpleNamespace(case_route=self.route_test_dir + '/',
+                                          case_name=self.case,
+                                          ts=0,
+                                          aero=types.SimpleNamespace(timestep_info=[]),
+                                          structure=types.SimpleNamespace(timestep_info=[]))
+
+    def run_flow_field(self, asynchronous):
+        import sharpy.generators
+        from sharpy.postproc.plotflowfield import PlotFlowField
+
+        velocities = dict()
+        worker_threads = set()
+
+        def add_velocities(vtk_info, u):
+            velocities[len(velocities)] = [u_i.copy() for u_i in u]
+            worker_threads.add(threading.current_thread())
+
+        def slow_induced_velocity(ts_info, target_triads, for_pos=np.zeros((6,)), ncores=None):
+            # the solver goes on while the velocities are computed
+            time.sleep(0.01)
+            return induced_velocity(ts_info, target_triads)
+
+        flow_field = PlotFlowField()
+        flow_field.initialise(self.data, {'postproc_grid_generator': '',
+                                          'probe_points': self.probe_points,
+                                          'velocity_field_input': {'u_inf': 2.,
+                                                                   'u_inf_direction': [1., 0., 0.]},
+                                          'asynchronous': asynchronous})
+        flow_field.add_velocities = add_velocities
+
+        self.data.aero.timestep_info = []
+        self.data.structure.timestep_info = []
+        with unittest.mock.patch('sharpy.postproc.plotflowfield.write_data'), \
+                unittest.mock.patch('sharpy.aero.utils.uvlmlib.uvlm_calculate_total_induced_velocity_at_points',
+                                    side_effect=slow_induced_velocity):
+            for ts in range(self.n_tsteps):
+                self.data.ts = ts
+                self.data.aero.timestep_info.append(aero_time_step(float(ts + 1)))
+                self.data.structure.timestep_info.append(types.SimpleNamespace(for_pos=np.zeros((6,))))
+                flow_field.run(online=True)
+                # the solver modifies the time step once the postprocessor has been run
+                self.data.aero.timestep_info[-1].gamma[0][:] = -1.
+            flow_field.finalise()
+
+        self.assertIsNone(flow_field.pool)
+        return velocities, worker_threads
+
+    def test_asynchronous(self):
+        velocities, worker_threads = self.run_flow_field(asynchronous=False)
+        self.assertEqual(worker_threads, {threading.current_thread()})
+        self.assertEqual(len(velocities), self.n_tsteps)
+        points = np.reshape(self.probe_points, (-1, 3))
+        for ts in range(self.n_tsteps):
+            u_ind, u_ext = velocities[ts]
+            np.testing.assert_allclose(u_ind, (ts + 1)*points)
+            np.testing.assert_allclose(u_ext, np.outer(np.ones(2), [2., 0., 0.]))
+
+        async_velocities, async_worker_threads = self.run_flow_field(asynchronous=True)
+        self.assertNotIn(threading.current_thread(), async_worker_threads)
+        for ts in range(self.n_tsteps):
+            for u, async_u in zip(velocities[ts], async_velocities[ts]):
+                np.testing.assert_array_equal(async_u, u)
+
+    def tearDown(self):
+        shutil.rmtree(self.route_test_dir + '/output/', ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
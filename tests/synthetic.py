@@ -0,0 +1,108 @@
+"""Synthetic time steps shared by the tests
+
+Aerodynamic and structural time step information with the minimum attributes used by the solver methods under
+test, which can then be run without generating and loading a case.
+"""
+import copy
+import ctypes as ct
+import types
+
+import numpy as np
+
+
+def straight_wake(m_star, n, panel_length=0.5, gamma=None):
+    """
+    Synthetic aerodynamic time step with a single surface and a flat wake of ``m_star`` rows of panels of length
+    ``panel_length`` shed in the ``x`` direction
+
+    The circulation of the panels is ``gamma`` (one value per row) or grows linearly along the wake.
+    """
+    zeta_star = np.zeros((3, m_star + 1, n + 1))
+    zeta_star[0, :, :] = 1. + panel_length*np.arange(m_star + 1)[:, None]
+    zeta_star[1, :, :] = np.linspace(0., 2., n + 1)[None, :]
+    zeta_star[2, :, :] = 0.1*np.arange(m_star + 1)[:, None]*panel_length
+    if gamma is None:
+        gamma = 1. + 0.2*np.arange(m_star)
+    gamma_star = np.outer(gamma, np.ones(n))
+
+    aero_tstep = types.SimpleNamespace()
+    aero_tstep.n_surf = 1
+    aero_tstep.dimensions_star = np.array([[m_star, n]])
+    aero_tstep.zeta_star = [zeta_star]
+    aero_tstep.gamma_star = [gamma_star]
+    aero_tstep.u_ext_star = [np.zeros_like(zeta_star)]
+    aero_tstep.u_ext = [np.zeros((3, 2, n + 1))]
+    aero_tstep.u_ext[0][0, :, :] = 1.
+    return aero_tstep
+
+
+def structural_step(num_dof, rs):
+    """
+    Structural states of ``num_dof`` degrees of freedom drawn from ``rs``, or zero if it is ``None``
+    """
+    if rs is None:
+        return types.SimpleNamespace(q=np.zeros(num_dof + 10),
+                                     dqdt=np.zeros(num_dof + 10),
+                                     dqddt=np.zeros(num_dof + 10))
+    return types.SimpleNamespace(q=rs.rand(num_dof + 10),
+                                 dqdt=rs.rand(num_dof + 10),
+                                 dqddt=rs.rand(num_dof + 10))
+
+
+def polynomial_coefficients(num_dof, order, rs):
+    """
+    Random coefficients, drawn from ``rs``, of the polynomials of ``order`` of the time of each of the quantities of
+    :class:`SyntheticStructTimeStep`
+    """
+    return [{name: rs.rand(size) for name, size in [('pos', 12), ('psi', 27), ('pos_dot', 12), ('psi_dot', 27),
+                                                    ('for_pos', 6), ('q', num_dof + 10), ('dqdt', num_dof + 10),
+                                                    ('dqddt', num_dof + 10), ('steady_applied_forces', 24),
+                                                    ('unsteady_applied_forces', 24)]}
+            for _ in range(order + 1)]
+
+
+class SyntheticStructTimeStep:
+    """
+    Structural time step with the quantities extrapolated by the FSI predictor, as polynomials of the time
+    """
+
+    def __init__(self, num_dof, time, coefficients):
+        for name, shape in [('pos', (4, 3)), ('psi', (3, 3, 3)), ('pos_dot', (4, 3)), ('psi_dot', (3, 3, 3)),
+                            ('for_pos', (6,)), ('q', (num_dof + 10,)), ('dqdt', (num_dof + 10,)),
+                            ('dqddt', (num_dof + 10,)), ('steady_applied_forces', (4, 6)),
+                            ('unsteady_applied_forces', (4, 6))]:
+            setattr(self, name, sum(c[name]*time**i for i, c in enumerate(coefficients)).reshape(shape))
+        self.quat = np.array([1., 0., 0., 0.])
+        self.mb_dict = None
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+
+def dynamic_coupled(custom_settings, num_dof, timestep_info=None):
+    """
+    ``DynamicCoupled`` instance with the time stepping attributes of ``initialise``, but no solvers, on a synthetic
+    structure of ``num_dof`` degrees of freedom whose initial states are zero
+    """
+    import sharpy.utils.settings as settings
+    from sharpy.solvers.dynamiccoupled import DynamicCoupled
+
+    solver = DynamicCoupled()
+    solver.settings = {'structural_solver': 'NonLinearDynamicPrescribedStep',
+                       'structural_solver_settings': dict(),
+                       'aero_solver': 'StepUvlm',
+                       'aero_solver_settings': dict(),
+                       'n_time_steps': 10}
+    solver.settings.update(custom_settings)
+    settings.to_custom_types(solver.settings, DynamicCoupled.settings_types, DynamicCoupled.settings_default)
+    solver.dt = solver.settings['dt']
+    solver.current_dt = solver.dt.value
+    solver.next_dt = solver.dt.value
+    solver.aero_dt = solver.dt.value
+    solver.dt_min = 0.1*solver.dt.value
+    solver.dt_max = 10.*solver.dt.value
+    solver.data = types.SimpleNamespace(structure=types.SimpleNamespace(num_dof=ct.c_int(num_dof),
+                                                                        timestep_info=timestep_info,
+                                                                        ini_info=structural_step(num_dof, None)))
+    solver.aero_solver = types.SimpleNamespace(settings={'dt': ct.c_double(solver.dt.value)})
+    return solver
@@ -574,6 +574,39 @@ class TestAlgebra(unittest.TestCase):
         np.testing.assert_array_almost_equal(Pag_quat.dot(aircraft_nose_rotated), aircraft_nose,
                                              err_msg='Error in projection from A to G using quaternions')
 
+    def test_batched_rotation_kernels(self):
+        """
+        Checks that the batched kernels return the same as the scalar functions applied to each entry
+        """
+        np.random.seed(0)
+        num_vec = 50
+        # include null, small and large rotations to cover all branches
+        psi = np.random.rand(num_vec, 3)*np.random.choice([0., 1e-20, 1e-9, 0.5, 4.], size=(num_vec, 1))
+        quat = np.random.rand(num_vec, 4) - 0.5
+        v = np.random.rand(num_vec, 3)
+
+        checks = (('skew', algebra.skew_vec, algebra.skew, (v,)),
+                  ('quat2rotation', algebra.quat2rotation_vec, algebra.quat2rotation, (quat,)),
+                  ('crv2rotation', algebra.crv2rotation_vec, algebra.crv2rotation, (psi,)),
+                  ('crv2tan', algebra.crv2tan_vec, algebra.crv2tan, (psi,)),
+                  ('rotation2crv', algebra.rotation2crv_vec, algebra.rotation2crv,
+                   (algebra.crv2rotation_vec(psi),)),
+                  ('der_Cquat_by_v', algebra.der_Cquat_by_v_vec, algebra.der_Cquat_by_v, (quat, v)),
+                  ('der_CquatT_by_v', algebra.der_CquatT_by_v_vec, algebra.der_CquatT_by_v, (quat, v)),
+                  ('der_Ccrv_by_v', algebra.der_Ccrv_by_v_vec, algebra.der_Ccrv_by_v, (psi, v)),
+                  ('der_CcrvT_by_v', algebra.der_CcrvT_by_v_vec, algebra.der_CcrvT_by_v, (psi, v)))
+
+        for name, batched_fun, scalar_fun, args in checks:
+            batched = batched_fun(*args)
+            for i_vec in range(num_vec):
+                np.testing.assert_allclose(batched[i_vec], scalar_fun(*[arg[i_vec] for arg in args]),
+                                           rtol=0, atol=1e-14,
+                                           err_msg='Batched %s does not match the scalar version' % name)
+
+        # arbitrary leading dimensions
+        np.testing.assert_array_equal(algebra.crv2rotation_vec(psi.reshape((5, 10, 3))).reshape((num_vec, 3, 3)),
+                                      algebra.crv2rotation_vec(psi))
+
 # if __name__=='__main__':
 # unittest.main()
 # # T=TestAlgebra()
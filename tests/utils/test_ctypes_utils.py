@@ -0,0 +1,69 @@
+import ctypes as ct
+import unittest
+
+import sharpy.utils.ctypes_utils as ct_utils
+
+
+class Options(ct.Structure):
+    """
+    Option structure recording the fields that are set
+    """
+    _fields_ = [('print_info', ct.c_bool),
+                ('max_iter', ct.c_int),
+                ('delta_curved', ct.c_double),
+                ('gravity_dir', ct.c_double*3)]
+
+    def __init__(self):
+        super().__init__()
+        self.__dict__['set_fields'] = []
+
+    def __setattr__(self, name, value):
+        self.set_fields.append(name)
+        super().__setattr__(name, value)
+
+
+class TestUpdateStructure(unittest.TestCase):
+
+    def test_update(self):
+        options = Options()
+        values = {'print_info': ct.c_bool(True),
+                  'max_iter': 10,
+                  'delta_curved': ct.c_double(1e-2),
+                  'gravity_dir': [0., 0., 1.]}
+        self.assertIs(ct_utils.update_structure(options, values), options)
+        self.assertEqual(options.set_fields, ['print_info', 'max_iter', 'delta_curved', 'gravity_dir'])
+        self.assertTrue(options.print_info)
+        self.assertEqual(options.max_iter, 10)
+        self.assertEqual(options.delta_curved, 1e-2)
+        self.assertEqual(list(options.gravity_dir), [0., 0., 1.])
+
+        # only the fields that change are set
+        options.set_fields.clear()
+        values['max_iter'] = ct.c_int(20)
+        ct_utils.update_structure(options, values)
+        self.assertEqual(options.set_fields, ['max_iter'])
+        self.assertEqual(options.max_iter, 20)
+
+        options.set_fields.clear()
+        values['gravity_dir'] = (0., -1., 0.)
+        ct_utils.update_structure(options, values)
+        self.assertEqual(options.set_fields, ['gravity_dir'])
+        self.assertEqual(list(options.gravity_dir), [0., -1., 0.])
+
+
+class TestStructureCache(unittest.TestCase):
+
+    def test_get(self):
+        cache = ct_utils.StructureCache()
+        options = cache.get(Options, 'xbeam_solv_couplednlndyn')
+        self.assertIsInstance(options, Options)
+
+        # one structure per type and tag, shared by all the calls
+        self.assertIs(cache.get(Options, 'xbeam_solv_couplednlndyn'), options)
+        self.assertIsNot(cache.get(Options, 'cbeam3_solv_nlnstatic'), options)
+        self.assertIsNot(cache.get(Options), options)
+        self.assertIsNot(ct_utils.StructureCache().get(Options, 'xbeam_solv_couplednlndyn'), options)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import ctypes as ct
+import unittest
+
+import numpy as np
+
+import sharpy.aero.utils.utils as aero_utils
+import sharpy.utils.datastructures as datastructures
+
+
+class TestAeroCtypesBinding(unittest.TestCase):
+    """
+    The ``ctypes`` pointer tables of ``AeroTimeStepInfo`` are reused until an array is reallocated or the
+    dimensions of the grid change
+    """
+
+    dimensions = np.array([[3, 4], [2, 5]])
+    dimensions_star = np.array([[6, 4], [6, 5]])
+
+    def setUp(self):
+        self.aero_tstep = datastructures.AeroTimeStepInfo(self.dimensions, self.dimensions_star)
+
+    def test_reuse(self):
+        self.aero_tstep.generate_ctypes_pointers()
+        p_zeta = self.aero_tstep.ct_p_zeta
+        p_gamma_star = self.aero_tstep.ct_p_gamma_star
+
+        # the tables point to the arrays of the time step
+        gamma = np.ctypeslib.as_array(self.aero_tstep.ct_p_gamma[1], shape=(2*5,))
+        gamma[:] = 3.
+        np.testing.assert_array_equal(self.aero_tstep.gamma[1], 3.)
+
+        self.aero_tstep.remove_ctypes_pointers()
+        self.assertFalse(hasattr(self.aero_tstep, 'ct_p_zeta'))
+        # in-place modifications of the arrays keep the binding
+        self.aero_tstep.zeta[0][:] = 1.
+        self.aero_tstep.generate_ctypes_pointers()
+        self.assertIs(self.aero_tstep.ct_p_zeta, p_zeta)
+        self.assertIs(self.aero_tstep.ct_p_gamma_star, p_gamma_star)
+
+    def test_reallocated_array(self):
+        self.aero_tstep.generate_ctypes_pointers()
+        p_zeta = self.aero_tstep.ct_p_zeta
+        self.aero_tstep.zeta[1] = self.aero_tstep.zeta[1].copy()
+        self.aero_tstep.generate_ctypes_pointers()
+        self.assertIsNot(self.aero_tstep.ct_p_zeta, p_zeta)
+        zeta = np.ctypeslib.as_array(self.aero_tstep.ct_p_zeta[3], shape=(3*6,))
+        zeta[:] = 2.
+        np.testing.assert_array_equal(self.aero_tstep.zeta[1][0], 2.)
+
+    def test_truncated_wake(self):
+        self.aero_tstep.generate_ctypes_pointers()
+        p_gamma_star = self.aero_tstep.ct_p_gamma_star
+
+        # a wake whose last three rows of panels have a negligible circulation
+        for i_surf in range(2):
+            self.aero_tstep.zeta_star[i_surf][0, :, :] = np.arange(7)[:, None]
+            self.aero_tstep.zeta_star[i_surf][1, :, :] = np.arange(self.dimensions[i_surf, 1] + 1)[None, :]
+            self.aero_tstep.gamma_star[i_surf][:] = 1.
+            self.aero_tstep.gamma_star[i_surf][-3:, :] = 1e-9
+            self.aero_tstep.u_ext[i_surf][0, :, :] = 1.
+        self.assertEqual(aero_utils.truncate_wake(self.aero_tstep, 1e-4), 6)
+
+        self.aero_tstep.generate_ctypes_pointers()
+        self.assertIsNot(self.aero_tstep.ct_p_gamma_star, p_gamma_star)
+        np.testing.assert_array_equal(self.aero_tstep.ct_dimensions_star, [[3, 4], [3, 5]])
+        gamma_star = np.ctypeslib.as_array(self.aero_tstep.ct_p_gamma_star[0], shape=(3*4,))
+        gamma_star[:] = 2.
+        np.testing.assert_array_equal(self.aero_tstep.gamma_star[0], 2.)
+
+    def test_dimensions(self):
+        self.aero_tstep.generate_ctypes_pointers()
+        p_zeta = self.aero_tstep.ct_p_zeta
+        self.aero_tstep.dimensions_star[0, 0] = 5
+        self.aero_tstep.generate_ctypes_pointers()
+        self.assertIsNot(self.aero_tstep.ct_p_zeta, p_zeta)
+        np.testing.assert_array_equal(self.aero_tstep.ct_dimensions_star, [[5, 4], [6, 5]])
+
+    def test_non_contiguous(self):
+        # the flattened views of non contiguous arrays are copies, which are never reused
+        self.aero_tstep.gamma[0] = np.asfortranarray(self.aero_tstep.gamma[0])
+        self.aero_tstep.generate_ctypes_pointers()
+        p_gamma = self.aero_tstep.ct_p_gamma
+        self.assertNotIn(self.aero_tstep, datastructures._ctypes_bindings)
+
+        self.aero_tstep.generate_ctypes_pointers()
+        self.assertIsNot(self.aero_tstep.ct_p_gamma, p_gamma)
+
+    def test_released(self):
+        self.aero_tstep.generate_ctypes_pointers()
+        self.assertIn(self.aero_tstep, datastructures._ctypes_bindings)
+        n_bindings = len(datastructures._ctypes_bindings)
+        del self.aero_tstep
+        self.assertEqual(len(datastructures._ctypes_bindings), n_bindings - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import shutil
+import unittest
+
+import numpy as np
+
+import sharpy.utils.h5utils as h5utils
+
+
+class TimeStep:
+    def __init__(self, ts):
+        self.pos = ts*np.ones((4, 3))
+        self.gamma = [ts*np.ones((2, 3)), ts*np.ones((1, 5))]
+
+
+class Results:
+    def __init__(self, n_tsteps):
+        self.case_name = 'lazy'
+        self.settings = {'n_tsteps': n_tsteps}
+        self.ts = np.arange(n_tsteps)
+        self.timestep_info = [TimeStep(ts) for ts in range(n_tsteps)]
+
+
+class TestLazyReader(unittest.TestCase):
+
+    route = os.path.abspath(os.path.dirname(os.path.realpath(__file__))) + '/output_h5utils/'
+
+    def setUp(self):
+        os.makedirs(self.route, exist_ok=True)
+        self.n_tsteps = 6
+        h5utils.saveh5(self.route, 'results.h5', Results(self.n_tsteps), permission='w', ClassesToSave=(TimeStep,))
+        self.filename = self.route + 'results.h5'
+
+    def test_lazy_access(self):
+        reference = h5utils.readh5(self.filename).Results
+        for mmap in (False, True):
+            with self.subTest(mmap=mmap):
+                with h5utils.readh5_lazy(self.filename, cache_size=2, mmap=mmap) as lazy:
+                    results = lazy.Results
+                    self.assertEqual(len(results.timestep_info), self.n_tsteps)
+                    self.assertEqual(results.settings['n_tsteps'], self.n_tsteps)
+                    np.testing.assert_array_equal(results.ts, reference.ts)
+                    np.testing.assert_array_equal(results.timestep_info[-1].pos, 5*np.ones((4, 3)))
+                    np.testing.assert_array_equal(results.timestep_info[3].gamma[1], 3*np.ones((1, 5)))
+                    self.assertLessEqual(len(lazy._h5file.cache), 2)
+
+    def test_stack(self):
+        with h5utils.readh5_lazy(self.filename) as lazy:
+            timestep_info = lazy.Results.timestep_info
+            pos = timestep_info.stack('pos', 1, 5, 2)
+            self.assertEqual(pos.shape, (2, 4, 3))
+            np.testing.assert_array_equal(pos[:, 0, 0], [1, 3])
+
+            gamma = timestep_info.stack('gamma')
+            self.assertEqual(len(gamma), 2)
+            self.assertEqual(gamma[1].shape, (self.n_tsteps, 1, 5))
+            np.testing.assert_array_equal(gamma[0][:, 1, 2], np.arange(self.n_tsteps))
+
+    def tearDown(self):
+        shutil.rmtree(self.route)
+
+
+if __name__ == '__main__':
+    unittest.main()
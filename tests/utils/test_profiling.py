@@ -0,0 +1,73 @@
+import json
+import os
+import shutil
+import unittest
+
+import sharpy.utils.cout_utils as cout
+import sharpy.utils.profiling as profiling
+
+
+class DummySolver:
+    solver_id = 'DummySolver'
+
+    def initialise(self, data):
+        pass
+
+    @profiling.profile('step')
+    def step(self):
+        pass
+
+    def run(self, n_steps=3):
+        for ts in range(n_steps):
+            profiling.profiler.set_time_step(ts)
+            self.step()
+        profiling.profiler.set_time_step(None)
+
+
+class TestProfiler(unittest.TestCase):
+
+    route = os.path.abspath(os.path.dirname(os.path.realpath(__file__))) + '/output_profiling/'
+
+    def setUp(self):
+        cout.cout_wrap.initialise(False, False)
+
+    def test_spans(self):
+        """
+        Spans are nested, aggregated per path and time step, and exported to JSON and Chrome trace files.
+        """
+        profiler = profiling.profiler
+        profiler.initialise(True, folder=self.route)
+
+        solver = profiler.wrap_solver(DummySolver())
+        solver.initialise(None)
+        solver.run(n_steps=3)
+
+        totals = {entry['path']: entry for entry in profiler.summary()}
+        self.assertEqual(totals['DummySolver.run/step']['calls'], 3)
+        self.assertEqual(totals['DummySolver.initialise']['calls'], 1)
+        self.assertLessEqual(totals['DummySolver.run/step']['total'], totals['DummySolver.run']['total'])
+        self.assertEqual(sorted(profiler.step_totals.keys()), [0, 1, 2])
+
+        profiler.finish()
+        self.assertFalse(profiler.enabled)
+        with open(self.route + '/profiling.json') as infile:
+            results = json.load(infile)
+        self.assertEqual(len(results['time_steps']), 3)
+        with open(self.route + '/trace.json') as infile:
+            trace = json.load(infile)
+        self.assertEqual(len(trace['traceEvents']), 5)
+
+    def test_disabled(self):
+        profiler = profiling.profiler
+        profiler.initialise(False)
+        DummySolver().run()
+        self.assertEqual(profiler.totals, dict())
+
+    def tearDown(self):
+        profiling.profiler.initialise(False)
+        if os.path.isdir(self.route):
+            shutil.rmtree(self.route)
+
+
+if __name__ == '__main__':
+    unittest.main()
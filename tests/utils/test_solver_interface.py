@@ -0,0 +1,78 @@
+import multiprocessing as mpr
+import os
+import unittest
+import unittest.mock
+
+import numpy as np
+
+import sharpy.utils.solver_interface as solver_interface
+
+
+class OfflinePostprocessor(object):
+    """
+    Postprocessor whose output of each time step is computed from its data and the process in which it is computed
+    """
+
+    solver_id = 'OfflinePostprocessor'
+
+    def __init__(self, n_tsteps):
+        self.data = np.random.RandomState(13).rand(n_tsteps, 5)
+        self.merged = []
+
+    def step(self, ts):
+        return np.sum(self.data[ts]), os.getpid()
+
+    def merge(self, ts, output):
+        self.merged.append((ts, output, os.getpid()))
+
+
+class TestRunOfflineSteps(unittest.TestCase):
+
+    n_tsteps = 23
+
+    def setUp(self):
+        self.postprocessor = OfflinePostprocessor(self.n_tsteps)
+        self.time_steps = range(2, self.n_tsteps)
+
+    def assert_merged(self):
+        # all the outputs are merged in order in the calling process
+        self.assertEqual([ts for ts, _, _ in self.postprocessor.merged], list(self.time_steps))
+        for ts, (output, _), merge_pid in self.postprocessor.merged:
+            self.assertAlmostEqual(output, np.sum(self.postprocessor.data[ts]))
+            self.assertEqual(merge_pid, os.getpid())
+        return set([step_pid for _, (_, step_pid), _ in self.postprocessor.merged])
+
+    def test_serial(self):
+        solver_interface.run_offline_steps(self.postprocessor, self.time_steps, 'step', 'merge')
+        self.assertEqual(self.assert_merged(), {os.getpid()})
+
+    @unittest.skipIf('fork' not in mpr.get_all_start_methods(), 'Forking processes is not available')
+    def test_parallel(self):
+        solver_interface.run_offline_steps(self.postprocessor, self.time_steps, 'step', 'merge', num_processes=3)
+        step_pids = self.assert_merged()
+        self.assertNotIn(os.getpid(), step_pids)
+        self.assertIsNone(solver_interface._offline_solver)
+
+        # a single time step is not worth a pool
+        self.postprocessor.merged = []
+        self.time_steps = [4]
+        solver_interface.run_offline_steps(self.postprocessor, self.time_steps, 'step', 'merge', num_processes=3)
+        self.assertEqual(self.assert_merged(), {os.getpid()})
+
+    def test_without_fork(self):
+        with unittest.mock.patch('sharpy.utils.solver_interface.mpr.get_all_start_methods',
+                                 return_value=['spawn']):
+            solver_interface.run_offline_steps(self.postprocessor, self.time_steps, 'step', 'merge',
+                                               num_processes=3)
+        self.assertEqual(self.assert_merged(), {os.getpid()})
+
+    @unittest.skipIf('fork' not in mpr.get_all_start_methods(), 'Forking processes is not available')
+    def test_without_merge(self):
+        # the steps only write their output, nothing is returned to the calling process
+        solver_interface.run_offline_steps(self.postprocessor, self.time_steps, 'step', num_processes=3)
+        self.assertEqual(self.postprocessor.merged, [])
+        self.assertIsNone(solver_interface._offline_solver)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import shutil
+import types
+import unittest
+import xml.etree.ElementTree as ET
+import numpy as np
+import h5py as h5
+import sharpy.utils.xdmfutils as xdmfutils
+
+
+class TestXdmfTimeSeries(unittest.TestCase):
+
+    route_test_dir = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+    output_dir = route_test_dir + '/xdmf_output/'
+
+    def setUp(self):
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir)
+
+    def test_time_series(self):
+        """
+        All time steps are written to a single HDF5 file described by a valid XDMF temporal collection, and the
+        connectivity of a grid of constant topology is only stored once.
+        """
+        num_steps = 3
+        coords = np.random.rand(6, 3)
+        conn = np.array([[0, 1, 4, 3], [1, 2, 5, 4]])
+
+        xdmf = xdmfutils.XdmfTimeSeries(self.output_dir + 'case')
+        for it in range(num_steps):
+            xdmf.add_step(0.1 * it)
+            xdmf.add_grid('surface', coords + it, conn, 'Quadrilateral',
+                          point_data={'point_id': np.arange(6)},
+                          cell_data={'normal': np.ones((2, 3)) * it})
+            xdmf.write_step()
+        xdmf.close()
+
+        root = ET.parse(self.output_dir + 'case.xdmf').getroot()
+        steps = root.find('Domain/Grid').findall('Grid')
+        self.assertEqual(len(steps), num_steps)
+        self.assertEqual(float(steps[-1].find('Time').get('Value')), 0.1 * (num_steps - 1))
+
+        with h5.File(self.output_dir + 'case.h5', 'r') as h5file:
+            self.assertEqual([k for k in h5file['surface'].keys() if k.startswith('connectivity')],
+                             ['connectivity_000000'])
+            np.testing.assert_array_equal(h5file['surface/000002/coords'][()], coords + 2)
+            np.testing.assert_array_equal(h5file['surface/000001/normal'][()], np.ones((2, 3)))
+
+    def test_step_time(self):
+        data = types.SimpleNamespace(step_times={3: 0.25})
+        self.assertEqual(xdmfutils.step_time(data, 3, 0.1), 0.25)
+        self.assertAlmostEqual(xdmfutils.step_time(data, 2, 0.1), 0.2)
+        self.assertEqual(xdmfutils.step_time(data, 2, 0.), 2.)
+        # problem data without recorded times
+        self.assertAlmostEqual(xdmfutils.step_time(types.SimpleNamespace(), 4, 0.5), 2.)
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+
+class TestXdmfPostprocessors(unittest.TestCase):
+    """
+    The ``xdmf`` output of the plotting postprocessors is written with the physical time of the steps and closed by
+    ``finalise``, such that the case can be run again in the same process
+    """
+
+    route_test_dir = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+    output_dir = route_test_dir + '/xdmf_output/'
+
+    coords = np.random.rand(4, 3)
+
+    def setUp(self):
+        self.data = types.SimpleNamespace(settings={'SHARPy': {'case': 'case'}}, ts=0, step_times={2: 0.15})
+
+    def run_postprocessor(self, postprocessor_type, grid):
+        for _ in range(2):
+            postprocessor = postprocessor_type()
+            postprocessor.initialise(self.data, {'folder': self.output_dir,
+                                                 'output_format': 'xdmf',
+                                                 'dt': 0.1})
+            postprocessor.write_step_grids(1, [grid])
+            postprocessor.write_step_grids(2, [grid])
+            postprocessor.finalise()
+            self.assertIsNone(postprocessor.xdmf)
+        return postprocessor
+
+    def assert_times(self, filename, times):
+        root = ET.parse(filename).getroot()
+        steps = root.find('Domain/Grid').findall('Grid')
+        np.testing.assert_allclose([float(step.find('Time').get('Value')) for step in steps], times)
+
+    def test_beamplot(self):
+        from sharpy.postproc.beamplot import BeamPlot
+
+        conn = np.array([[0, 2, 1], [2, 3, 3]])
+        postprocessor = self.run_postprocessor(BeamPlot, ('beam', 'Polyline', (self.coords, conn, None, None)))
+        self.assert_times(postprocessor.filename + '.xdmf', [0.1, 0.15])
+
+    def test_aerogridplot(self):
+        from sharpy.postproc.aerogridplot import AerogridPlot
+
+        conn = np.array([[0, 1, 3, 2]])
+        postprocessor = self.run_postprocessor(AerogridPlot, ('body_00', (self.coords, conn, None, None)))
+        self.assert_times(postprocessor.folder + 'aero_case.xdmf', [0.1, 0.15])
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
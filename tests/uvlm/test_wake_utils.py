@@ -0,0 +1,211 @@
+import ctypes as ct
+import unittest
+
+import numpy as np
+
+import sharpy.aero.utils.utils as aero_utils
+from tests.synthetic import straight_wake
+
+
+def panel_length(zeta_star):
+    edge_length = np.linalg.norm(np.diff(zeta_star, axis=1), axis=0)
+    return 0.5*(edge_length[:, :-1] + edge_length[:, 1:])
+
+
+class TestResampleWake(unittest.TestCase):
+
+    m_star = 8
+    n = 3
+
+    def test_identity(self):
+        aero_tstep = straight_wake(self.m_star, self.n)
+        aero_tstep.zeta_star[0] += np.random.RandomState(2).rand(*aero_tstep.zeta_star[0].shape)
+        zeta_star = aero_tstep.zeta_star[0].copy()
+        gamma_star = aero_tstep.gamma_star[0].copy()
+
+        aero_utils.resample_wake(aero_tstep, 1.)
+        np.testing.assert_allclose(aero_tstep.zeta_star[0], zeta_star, rtol=0, atol=1e-14)
+        np.testing.assert_allclose(aero_tstep.gamma_star[0], gamma_star, rtol=0, atol=1e-14)
+
+    def test_halving(self):
+        aero_tstep = straight_wake(self.m_star, self.n)
+        reference = straight_wake(self.m_star, self.n, panel_length=0.25, gamma=1. + 0.1*np.arange(self.m_star))
+
+        aero_utils.resample_wake(aero_tstep, 0.5)
+        self.assertEqual(aero_tstep.dimensions_star[0, 0], self.m_star)
+        np.testing.assert_allclose(aero_tstep.zeta_star[0], reference.zeta_star[0], rtol=0, atol=1e-14)
+        # the circulation at the centre of the new panels, interpolated from the old ones
+        np.testing.assert_allclose(aero_tstep.gamma_star[0][1:, :], reference.gamma_star[0][1:, :] - 0.05,
+                                   rtol=0, atol=1e-14)
+        # the centre of the first new panel is ahead of that of the first old one, whose circulation it takes
+        np.testing.assert_allclose(aero_tstep.gamma_star[0][0, :], 1., rtol=0, atol=1e-14)
+
+    def test_doubling(self):
+        aero_tstep = straight_wake(self.m_star, self.n)
+        gamma_last = aero_tstep.gamma_star[0][-1, 0]
+        reference = straight_wake(self.m_star, self.n, panel_length=1.)
+
+        aero_utils.resample_wake(aero_tstep, 2.)
+        # the vertices beyond the end of the old wake are extrapolated from its last row of panels
+        np.testing.assert_allclose(aero_tstep.zeta_star[0], reference.zeta_star[0], rtol=0, atol=1e-13)
+
+        # the circulation of the new panels within the old wake is interpolated and beyond it, the one of its end
+        age = 2.*(np.arange(self.m_star) + 0.5)
+        expected = np.where(age < self.m_star - 0.5, 1. + 0.2*(age - 0.5), gamma_last)
+        np.testing.assert_allclose(aero_tstep.gamma_star[0][:, 0], expected, rtol=0, atol=1e-14)
+
+    def test_empty_wake(self):
+        aero_tstep = straight_wake(0, self.n)
+        aero_utils.resample_wake(aero_tstep, 2.)
+        self.assertEqual(aero_tstep.zeta_star[0].shape, (3, 1, self.n + 1))
+
+
+class TestWakeVertexDistance(unittest.TestCase):
+
+    def test_straight_wake(self):
+        aero_tstep = straight_wake(5, 2, panel_length=0.5)
+        np.testing.assert_allclose(aero_utils.wake_vertex_distance(aero_tstep.zeta_star[0]),
+                                   0.5*np.sqrt(1.01)*np.arange(6))
+
+    def test_spanwise_average(self):
+        # the wake is sheared, its panels are twice as long at one tip
+        zeta_star = straight_wake(4, 1).zeta_star[0]
+        zeta_star[:, :, 1] = zeta_star[:, 0:1, 1] + 2.*(zeta_star[:, :, 1] - zeta_star[:, 0:1, 1])
+        np.testing.assert_allclose(aero_utils.wake_vertex_distance(zeta_star), 0.75*np.sqrt(1.01)*np.arange(5))
+
+
+class TestLumpWake(unittest.TestCase):
+
+    m_star = 10
+    n = 3
+
+    def setUp(self):
+        rs = np.random.RandomState(3)
+        self.aero_tstep = straight_wake(self.m_star, self.n)
+        self.aero_tstep.gamma_star[0][:] = rs.rand(self.m_star, self.n)
+        self.aero_tstep.u_ext_star[0][:] = rs.rand(*self.aero_tstep.u_ext_star[0].shape)
+
+    def test_merge(self):
+        zeta_star = self.aero_tstep.zeta_star[0].copy()
+        gamma_star = self.aero_tstep.gamma_star[0].copy()
+        u_ext_star = self.aero_tstep.u_ext_star[0].copy()
+        circulation = np.sum(panel_length(zeta_star)*gamma_star, axis=0)
+
+        # the panels are 0.5 long, so the first pair no longer than half its distance to the trailing edge is the 4th
+        self.assertEqual(aero_utils.lump_wake(self.aero_tstep, distance=1., ratio=0.5), 1)
+        i_row = 4
+        self.assertEqual(self.aero_tstep.dimensions_star[0, 0], self.m_star)
+        self.assertEqual(self.aero_tstep.zeta_star[0].shape, zeta_star.shape)
+
+        # the total circulation shed in the wake is conserved, besides the panel that extends its end
+        new_zeta_star = self.aero_tstep.zeta_star[0]
+        new_gamma_star = self.aero_tstep.gamma_star[0]
+        new_circulation = np.sum(panel_length(new_zeta_star)[:-1]*new_gamma_star[:-1], axis=0)
+        np.testing.assert_allclose(new_circulation, circulation)
+        np.testing.assert_allclose(new_gamma_star[i_row], 0.5*(gamma_star[i_row] + gamma_star[i_row + 1]))
+
+        # the panels ahead of the merged ones are not modified and the rest are shifted
+        np.testing.assert_array_equal(new_zeta_star[:, :i_row + 1, :], zeta_star[:, :i_row + 1, :])
+        np.testing.assert_array_equal(new_gamma_star[:i_row], gamma_star[:i_row])
+        np.testing.assert_array_equal(new_zeta_star[:, i_row + 1:-1, :], zeta_star[:, i_row + 2:, :])
+        np.testing.assert_array_equal(new_gamma_star[i_row + 1:-1], gamma_star[i_row + 2:])
+        np.testing.assert_array_equal(self.aero_tstep.u_ext_star[0][:, i_row + 1:-1, :], u_ext_star[:, i_row + 2:, :])
+
+        # the end of the wake is extended with a panel like the last one
+        np.testing.assert_allclose(new_zeta_star[:, -1, :] - new_zeta_star[:, -2, :],
+                                   zeta_star[:, -1, :] - zeta_star[:, -2, :])
+        np.testing.assert_array_equal(new_gamma_star[-1], gamma_star[-1])
+
+    def test_merged_panels_grow(self):
+        # called once per step, the merged panels are merged again further along the wake
+        for _ in range(3):
+            aero_utils.lump_wake(self.aero_tstep, distance=1., ratio=0.5)
+        length = np.mean(panel_length(self.aero_tstep.zeta_star[0]), axis=1)
+        np.testing.assert_allclose(length[:4], 0.5*np.sqrt(1.01))
+        self.assertTrue(np.all(length[4:] >= length[3]))
+        self.assertGreater(np.max(length), 1.)
+
+    def test_no_merge(self):
+        gamma_star = self.aero_tstep.gamma_star[0].copy()
+        # beyond the end of the wake
+        self.assertEqual(aero_utils.lump_wake(self.aero_tstep, distance=10., ratio=0.5), 0)
+        # too coarse merged panels
+        self.assertEqual(aero_utils.lump_wake(self.aero_tstep, distance=0., ratio=0.1), 0)
+        # too short wake
+        self.assertEqual(aero_utils.lump_wake(straight_wake(2, self.n), distance=0., ratio=10.), 0)
+        np.testing.assert_array_equal(self.aero_tstep.gamma_star[0], gamma_star)
+
+
+class TestTruncateWake(unittest.TestCase):
+
+    m_star = 8
+    n = 3
+
+    def setUp(self):
+        # the circulation of the last three rows of panels is negligible
+        gamma = np.ones((self.m_star,))
+        gamma[-3:] = 1e-9
+        self.aero_tstep = straight_wake(self.m_star, self.n, gamma=gamma)
+
+    def test_truncation(self):
+        zeta_star = self.aero_tstep.zeta_star[0].copy()
+        gamma_star = self.aero_tstep.gamma_star[0].copy()
+
+        self.assertEqual(aero_utils.truncate_wake(self.aero_tstep, 1e-4), 3)
+        self.assertEqual(self.aero_tstep.dimensions_star[0, 0], self.m_star - 3)
+        np.testing.assert_array_equal(self.aero_tstep.zeta_star[0], zeta_star[:, :-3, :])
+        np.testing.assert_array_equal(self.aero_tstep.gamma_star[0], gamma_star[:-3, :])
+        self.assertEqual(self.aero_tstep.u_ext_star[0].shape, (3, self.m_star - 2, self.n + 1))
+
+        # the rest of the panels are not negligible
+        self.assertEqual(aero_utils.truncate_wake(self.aero_tstep, 1e-4), 0)
+
+    def test_min_panels(self):
+        self.assertEqual(aero_utils.truncate_wake(self.aero_tstep, 1e3, min_panels=6), 2)
+        self.assertEqual(self.aero_tstep.dimensions_star[0, 0], 6)
+
+    def test_wake_without_circulation(self):
+        # a wake initialised without circulation is kept whole until the shed circulation reaches its end
+        aero_tstep = straight_wake(self.m_star, self.n, gamma=np.zeros((self.m_star,)))
+        self.assertEqual(aero_utils.truncate_wake(aero_tstep, 1e-4), 0)
+        self.assertEqual(aero_tstep.dimensions_star[0, 0], self.m_star)
+
+        aero_tstep.gamma_star[0][0, :] = 1.
+        self.assertEqual(aero_utils.truncate_wake(aero_tstep, 1e-4), 0)
+        self.assertEqual(aero_tstep.gamma_star[0].shape, (self.m_star, self.n))
+
+    def test_no_external_velocity(self):
+        self.aero_tstep.u_ext[0][:] = 0.
+        self.assertEqual(aero_utils.truncate_wake(self.aero_tstep, 1e-4), 0)
+
+
+class TestFreezeWake(unittest.TestCase):
+
+    m_star = 8
+    n = 3
+
+    def test_far_wake_not_convected(self):
+        from sharpy.solvers.stepuvlm import StepUvlm
+
+        solver = StepUvlm()
+        solver.settings = {'wake_freeze_distance': ct.c_double(2.)}
+        aero_tstep = straight_wake(self.m_star, self.n)
+        zeta_star = aero_tstep.zeta_star[0].copy()
+        # the vertices farther than 2 from the trailing edge are the last five rows
+        far_wake = solver.far_wake(aero_tstep)
+        self.assertEqual(far_wake[0][0], 4)
+
+        # convection of the wake by the UVLM library: all the vertices move and are shifted one row downstream
+        convected = zeta_star + np.array([0.3, 0.1, 0.2])[:, None, None]
+        aero_tstep.zeta_star[0][:, 1:, :] = convected[:, :-1, :]
+        aero_tstep.zeta_star[0][:, 0, :] = zeta_star[:, 0, :]
+
+        solver.freeze_far_wake(aero_tstep, far_wake)
+        # the near wake is convected and the far one keeps its position, a row further downstream
+        np.testing.assert_array_equal(aero_tstep.zeta_star[0][:, :5, :],
+                                      np.concatenate((zeta_star[:, :1, :], convected[:, :4, :]), axis=1))
+        np.testing.assert_array_equal(aero_tstep.zeta_star[0][:, 5:, :], zeta_star[:, 4:-1, :])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import shutil
+import tempfile
+import types
+import unittest
+
+import h5py
+import numpy as np
+
+import sharpy.structure.utils.modalutils as modalutils
+from sharpy.postproc.asymptoticstability import AsymptoticStability
+
+
+class TestEigenData(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filename = self.folder + '/eigen_data.h5'
+
+        rs = np.random.RandomState(0)
+        self.num_dof = 30
+        self.num_modes = 8
+        self.eigenvalues = rs.randn(self.num_modes) + 1j*rs.randn(self.num_modes)
+        self.eigenvectors = rs.randn(self.num_dof, self.num_modes) + 1j*rs.randn(self.num_dof, self.num_modes)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_round_trip(self):
+        frequencies = np.abs(self.eigenvalues)
+        modalutils.write_eigen_data(self.filename, self.eigenvalues, self.eigenvectors, frequencies=frequencies)
+
+        eigen_data = modalutils.read_eigen_data(self.filename)
+        np.testing.assert_array_equal(eigen_data['eigenvalues'], self.eigenvalues)
+        np.testing.assert_array_equal(eigen_data['eigenvectors'], self.eigenvectors)
+        np.testing.assert_array_equal(eigen_data['frequencies'], frequencies)
+        self.assertIsNone(eigen_data['dof_indices'])
+
+        with h5py.File(self.filename, 'r') as h5file:
+            self.assertEqual(h5file['eigenvectors'].compression, 'gzip')
+            self.assertEqual(h5file['eigenvectors'].chunks, (self.num_dof, 1))
+
+    def test_truncation(self):
+        dof_indices = np.array([1, 4, 5, 20])
+        modalutils.write_eigen_data(self.filename, self.eigenvalues, self.eigenvectors, num_evals=3,
+                                    dof_indices=dof_indices, compress_float=True)
+
+        eigen_data = modalutils.read_eigen_data(self.filename)
+        self.assertEqual(eigen_data['eigenvectors'].dtype, np.complex64)
+        np.testing.assert_array_equal(eigen_data['dof_indices'], dof_indices)
+        np.testing.assert_array_equal(eigen_data['eigenvalues'], self.eigenvalues[:3])
+        np.testing.assert_allclose(eigen_data['eigenvectors'], self.eigenvectors[dof_indices, :3], rtol=1e-6)
+
+    def test_read_modes(self):
+        modalutils.write_eigen_data(self.filename, self.eigenvalues, self.eigenvectors)
+
+        # modes in any order and repeated
+        modes = [5, 1, 5]
+        eigen_data = modalutils.read_eigen_data(self.filename, modes=modes)
+        np.testing.assert_array_equal(eigen_data['eigenvalues'], self.eigenvalues[modes])
+        np.testing.assert_array_equal(eigen_data['eigenvectors'], self.eigenvectors[:, modes])
+
+    def test_asymptotic_stability_mode_shape(self):
+        dof_indices = np.arange(10, 20)
+        modalutils.write_eigen_data(self.filename, self.eigenvalues, self.eigenvectors, dof_indices=dof_indices)
+
+        stability = AsymptoticStability()
+        stability.folder = self.folder
+        stability.data = types.SimpleNamespace(linear=types.SimpleNamespace(ss=types.SimpleNamespace(
+            states=self.num_dof)))
+
+        # read from file, with zeros in the states that were not exported
+        eigenvalue, eigenvector = stability.mode_shape(3)
+        self.assertEqual(eigenvalue, self.eigenvalues[3])
+        expected = np.zeros(self.num_dof, dtype=complex)
+        expected[dof_indices] = self.eigenvectors[dof_indices, 3]
+        np.testing.assert_array_equal(eigenvector, expected)
+
+        # in memory
+        stability.eigenvalues = self.eigenvalues
+        stability.eigenvectors = self.eigenvectors
+        eigenvalue, eigenvector = stability.mode_shape(3)
+        np.testing.assert_array_equal(eigenvector, self.eigenvectors[:, 3])
+
+    def test_asymptotic_stability_h5_export(self):
+        rs = np.random.RandomState(1)
+        A = rs.randn(self.num_dof, self.num_dof)
+        data = types.SimpleNamespace(settings={'SHARPy': {'case': 'eigen'}},
+                                     linear=types.SimpleNamespace(ss=types.SimpleNamespace(A=A, dt=None,
+                                                                                           states=self.num_dof),
+                                                                  linear_system=types.SimpleNamespace()))
+        stability = AsymptoticStability()
+        stability.initialise(data, {'folder': self.folder,
+                                    'print_info': 'off',
+                                    'export_eigenvalues': 'on',
+                                    'export_format': 'h5',
+                                    'num_evals': 5})
+        stability.run()
+
+        # the exported eigenvectors are read back from the file
+        self.assertIsNone(stability.eigenvectors)
+        eigenvalue, eigenvector = stability.mode_shape(2)
+        self.assertEqual(eigenvalue, stability.eigenvalues[2])
+        np.testing.assert_allclose(A.dot(eigenvector), eigenvalue*eigenvector, atol=1e-10*np.max(np.abs(A)))
+
+
+if __name__ == '__main__':
+    unittest.main()
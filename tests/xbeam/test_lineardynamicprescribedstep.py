@@ -0,0 +1,128 @@
+import numpy as np
+import unittest
+import os
+import shutil
+
+import sharpy.utils.solver_interface as solver_interface
+
+folder = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+name = 'linear_dynamic_cantilever'
+
+
+class TestLinearDynamicPrescribedStep(unittest.TestCase):
+    """
+    Compares ``LinearDynamicPrescribedStep`` with ``NonLinearDynamicPrescribedStep`` for a clamped beam under a small
+    tip load suddenly applied, where the response of both solvers should be the same
+    """
+
+    num_steps = 20
+    dt = 0.01
+    tip_force = 1.
+
+    def setUp(self):
+        import sharpy.utils.generate_cases as gc
+
+        nnodes = 11
+        length = 10.
+        mass_per_unit_length = 1.
+        mass_iner = 1e-4
+        EA = 1e7
+        GA = 1e7
+        GJ = 1e3
+        EI = 1e4
+
+        beam = gc.AeroelasticInformation()
+        beam.StructuralInformation.num_node = nnodes
+        beam.StructuralInformation.num_node_elem = 3
+        beam.StructuralInformation.compute_basic_num_elem()
+        beam.StructuralInformation.set_to_zero(beam.StructuralInformation.num_node_elem,
+                                               beam.StructuralInformation.num_node,
+                                               beam.StructuralInformation.num_elem)
+        node_pos = np.zeros((nnodes, 3), )
+        node_pos[:, 0] = np.linspace(0.0, length, nnodes)
+        beam.StructuralInformation.generate_uniform_sym_beam(node_pos, mass_per_unit_length, mass_iner, EA, GA, GJ, EI,
+                                                             num_node_elem=3, y_BFoR='y_AFoR', num_lumped_mass=1)
+        beam.StructuralInformation.boundary_conditions[0] = 1
+        beam.StructuralInformation.boundary_conditions[-1] = -1
+        beam.StructuralInformation.lumped_mass_nodes = np.array([nnodes - 1], dtype=int)
+        beam.StructuralInformation.lumped_mass = np.array([1.])
+        beam.StructuralInformation.lumped_mass_inertia = np.zeros((1, 3, 3),)
+        beam.StructuralInformation.lumped_mass_position = np.zeros((1, 3),)
+
+        SimInfo = gc.SimulationInformation()
+        SimInfo.set_default_values()
+        SimInfo.solvers['SHARPy']['flow'] = ['BeamLoader']
+        SimInfo.solvers['SHARPy']['case'] = name
+        SimInfo.solvers['SHARPy']['write_screen'] = 'off'
+        SimInfo.solvers['SHARPy']['route'] = folder + '/'
+        SimInfo.solvers['SHARPy']['log_folder'] = folder + '/output/'
+        SimInfo.solvers['BeamLoader']['unsteady'] = 'on'
+        SimInfo.with_forced_vel = False
+        SimInfo.with_dynamic_forces = False
+
+        # only the structure is generated, the solvers are run step by step by the tests
+        gc.clean_test_files(SimInfo.solvers['SHARPy']['route'], SimInfo.solvers['SHARPy']['case'])
+        SimInfo.generate_solver_file()
+        SimInfo.generate_dyn_file(self.num_steps)
+        beam.StructuralInformation.generate_fem_file(SimInfo.solvers['SHARPy']['route'],
+                                                     SimInfo.solvers['SHARPy']['case'])
+        self.solvers = SimInfo.solvers
+
+    def run_solver(self, solver_name):
+        """
+        Runs ``solver_name`` on the beam and returns the history of ``q`` and ``dqdt``
+        """
+        import sharpy.sharpy_main
+
+        data = sharpy.sharpy_main.main(['', folder + '/' + name + '.solver.txt'])
+        solver_settings = self.solvers[solver_name].copy()
+        solver_settings.update({'print_info': 'off',
+                                'dt': self.dt,
+                                'num_steps': self.num_steps,
+                                'min_delta': 1e-9,
+                                'newmark_damp': 1e-4})
+
+        solver = solver_interface.initialise_solver(solver_name)
+        solver.initialise(data, solver_settings)
+
+        num_dof = data.structure.num_dof.value
+        q = np.zeros((self.num_steps, num_dof))
+        dqdt = np.zeros((self.num_steps, num_dof))
+        for i_step in range(self.num_steps):
+            data.ts = i_step + 1
+            solver.add_step()
+            structural_step = data.structure.timestep_info[-1]
+            structural_step.unsteady_applied_forces[:] = 0.
+            structural_step.unsteady_applied_forces[-1, 2] = self.tip_force
+            solver.run(structural_step=structural_step, dt=self.dt)
+            q[i_step, :] = structural_step.q[:num_dof]
+            dqdt[i_step, :] = structural_step.dqdt[:num_dof]
+        return q, dqdt
+
+    def test_small_displacements(self):
+        q_nonlinear, dqdt_nonlinear = self.run_solver('NonLinearDynamicPrescribedStep')
+        q_linear, dqdt_linear = self.run_solver('LinearDynamicPrescribedStep')
+
+        # the tip deflects about 0.3% of the span, the geometric nonlinearities are of the order of its square
+        self.assertGreater(np.max(np.abs(q_nonlinear)), 1e-3)
+        np.testing.assert_allclose(q_linear, q_nonlinear, rtol=0, atol=1e-3*np.max(np.abs(q_nonlinear)))
+        np.testing.assert_allclose(dqdt_linear, dqdt_nonlinear, rtol=0, atol=1e-3*np.max(np.abs(dqdt_nonlinear)))
+
+    def tearDown(self):
+        files_to_delete = [name + '.dyn.h5',
+                           name + '.fem.h5',
+                           name + '.solver.txt']
+        for f in files_to_delete:
+            try:
+                os.remove(folder + '/' + f)
+            except FileNotFoundError:
+                pass
+
+        try:
+            shutil.rmtree(folder + '/output/')
+        except FileNotFoundError:
+            pass
+
+
+if __name__ == '__main__':
+    unittest.main()
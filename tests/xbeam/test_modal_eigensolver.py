@@ -0,0 +1,110 @@
+import ctypes as ct
+import unittest
+
+import numpy as np
+import scipy.linalg
+import scipy.sparse as scsp
+
+from sharpy.solvers.modal import Modal
+
+
+def cantilever_matrices(num_elem=20, length=1., EI=1., mass=1.):
+    """
+    Consistent mass and stiffness matrices of an Euler-Bernoulli cantilever discretised with Hermite elements
+    """
+    le = length/num_elem
+    ke = EI/le**3*np.array([[12., 6*le, -12., 6*le],
+                            [6*le, 4*le**2, -6*le, 2*le**2],
+                            [-12., -6*le, 12., -6*le],
+                            [6*le, 2*le**2, -6*le, 4*le**2]])
+    me = mass*le/420.*np.array([[156., 22*le, 54., -13*le],
+                                [22*le, 4*le**2, 13*le, -3*le**2],
+                                [54., 13*le, 156., -22*le],
+                                [-13*le, -3*le**2, -22*le, 4*le**2]])
+    num_dof = 2*(num_elem + 1)
+    M = np.zeros((num_dof, num_dof))
+    K = np.zeros((num_dof, num_dof))
+    for i_elem in range(num_elem):
+        dofs = np.arange(2*i_elem, 2*i_elem + 4)
+        M[np.ix_(dofs, dofs)] += me
+        K[np.ix_(dofs, dofs)] += ke
+
+    # clamped root
+    return scsp.csc_matrix(M[2:, 2:]), scsp.csc_matrix(K[2:, 2:])
+
+
+class TestSparseEigensolver(unittest.TestCase):
+
+    num_modes = 5
+
+    def setUp(self):
+        self.M, self.K = cantilever_matrices()
+        self.C = 0.05*self.M + 1e-3*self.K
+        self.modal = Modal()
+        self.modal.settings = {'eigensolver_shift': ct.c_double(0.)}
+
+    def test_undamped_modes(self):
+        eigenvalues, eigenvectors = self.modal.sparse_undamped_modes(self.M, self.K, self.num_modes)
+        order = np.argsort(eigenvalues)
+
+        reference = scipy.linalg.eigh(self.K.toarray(), self.M.toarray(), eigvals_only=True)[:self.num_modes]
+        np.testing.assert_allclose(eigenvalues[order], reference, rtol=1e-8)
+
+        # first cantilever frequency
+        self.assertAlmostEqual(np.sqrt(np.min(eigenvalues)), 1.875104**2, places=4)
+
+        residual = self.K.dot(eigenvectors) - self.M.dot(eigenvectors)*eigenvalues
+        self.assertLess(np.max(np.abs(residual)), 1e-6*np.max(eigenvalues))
+
+    def test_damped_modes(self):
+        self.modal.settings['eigensolver_shift'] = ct.c_double(-0.1)
+        eigenvalues, eigenvectors_left, eigenvectors = self.modal.sparse_damped_modes(self.M, self.C, self.K,
+                                                                                      self.num_modes)
+
+        num_dof = self.M.shape[0]
+        Minv = np.linalg.inv(self.M.toarray())
+        A = np.block([[np.zeros((num_dof, num_dof)), np.eye(num_dof)],
+                      [-Minv.dot(self.K.toarray()), -Minv.dot(self.C.toarray())]])
+        reference = scipy.linalg.eig(A, right=False)
+        reference = reference[np.argsort(np.abs(reference + 0.1))][:2*self.num_modes]
+
+        np.testing.assert_allclose(np.sort_complex(eigenvalues), np.sort_complex(reference), rtol=1e-8)
+
+        # right and left eigenvectors of the state space matrix
+        np.testing.assert_allclose(A.dot(eigenvectors), eigenvectors*eigenvalues, atol=1e-6*np.max(np.abs(A)))
+        np.testing.assert_allclose(eigenvectors_left.conj().T.dot(A),
+                                   eigenvalues[:, np.newaxis]*eigenvectors_left.conj().T,
+                                   atol=1e-6*np.max(np.abs(A)))
+
+    def test_repeated_damped_modes(self):
+        # two identical cantilevers clamped at the same root have every eigenvalue repeated
+        M = scsp.block_diag((self.M, self.M), format='csc')
+        K = scsp.block_diag((self.K, self.K), format='csc')
+        C = scsp.block_diag((self.C, self.C), format='csc')
+        self.modal.settings['eigensolver_shift'] = ct.c_double(-0.1)
+        eigenvalues, eigenvectors_left, eigenvectors = self.modal.sparse_damped_modes(M, C, K, 4)
+
+        multiplicity = np.sum(np.abs(eigenvalues[:, np.newaxis] - eigenvalues[np.newaxis, :]) <
+                              1e-8*np.abs(eigenvalues), axis=1)
+        np.testing.assert_array_equal(multiplicity, 2)
+
+        num_dof = M.shape[0]
+        Minv = np.linalg.inv(M.toarray())
+        A = np.block([[np.zeros((num_dof, num_dof)), np.eye(num_dof)],
+                      [-Minv.dot(K.toarray()), -Minv.dot(C.toarray())]])
+        np.testing.assert_allclose(eigenvectors_left.conj().T.dot(A),
+                                   eigenvalues[:, np.newaxis]*eigenvectors_left.conj().T,
+                                   atol=1e-6*np.max(np.abs(A)))
+
+        # the left and right eigenvectors are biorthogonal and can be normalised to diagonalise the system
+        overlap = eigenvectors_left.conj().T.dot(eigenvectors)
+        np.testing.assert_allclose(np.abs(overlap - np.diag(np.diag(overlap))), 0., atol=1e-8)
+        self.assertGreater(np.min(np.abs(np.diag(overlap))), 1e-8)
+
+    def test_too_many_modes(self):
+        with self.assertRaises(ValueError):
+            self.modal.sparse_undamped_modes(self.M, self.K, self.M.shape[0])
+
+
+if __name__ == '__main__':
+    unittest.main()